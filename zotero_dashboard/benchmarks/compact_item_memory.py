@@ -0,0 +1,77 @@
+"""Benchmark of the memory held by a cached library as pyzotero dicts and as compact item records.
+
+The synthetic library is round tripped through JSON first so that, like a real API response,
+every item holds its own copy of every string. Usage:
+
+    python benchmarks/compact_item_memory.py --items 100000
+
+"""
+# Importing packages used to run the benchmark:
+import argparse
+import tracemalloc
+import json
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Importing the compact records and the synthetic data:
+from utils.compact_item_methods import compact_zotero_items
+from utils.zotero_data_methods import extract_zotero_items_for_date, zotero_collection_to_dataframe
+from synthetic_library import generate_synthetic_library
+
+def measure_allocated_bytes(build):
+    """The method measures the memory still allocated after calling a function, ie: the size of
+    the objects it returns.
+
+    Args:
+        build (callable): The function building the measured objects.
+
+    Returns:
+        object: The objects returned by the function.
+
+        int: The number of bytes allocated by the objects.
+
+    """
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    allocated_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return value, allocated_bytes
+
+def run_benchmark(num_items: int):
+    """The method prints the memory footprint of every representation of the library, per 100k items.
+
+    Args:
+        num_items (int): The number of items of the synthetic library.
+
+    """
+    payload = json.dumps(generate_synthetic_library(num_items=num_items))
+    scale = 100000 / num_items
+
+    items, raw_bytes = measure_allocated_bytes(lambda: json.loads(payload))
+    # The records are built from a separate parse so the strings they keep are measured too:
+    _, compact_bytes = measure_allocated_bytes(lambda: compact_zotero_items(json.loads(payload)))
+
+    # The copies the previous dashboard held alongside the cached library:
+    _, filtered_bytes = measure_allocated_bytes(lambda: extract_zotero_items_for_date(items, start_date="2000-01-01"))
+    _, dataframe_bytes = measure_allocated_bytes(lambda: zotero_collection_to_dataframe(items))
+
+    print(f"Items: {num_items} (figures per 100k items)")
+    print(f"pyzotero dicts:            {raw_bytes * scale / 2**20:8.1f} MiB")
+    print(f"  + filtered item list:    {filtered_bytes * scale / 2**20:8.1f} MiB")
+    print(f"  + item dataframe:        {dataframe_bytes * scale / 2**20:8.1f} MiB")
+    print(f"compact records:           {compact_bytes * scale / 2**20:8.1f} MiB")
+    print(f"reduction:                 {raw_bytes / compact_bytes:8.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory footprint of cached zotero items.")
+    parser.add_argument("--items", type=int, default=100000, help="Number of synthetic items.")
+    args = parser.parse_args()
+
+    run_benchmark(args.items)
@@ -0,0 +1,160 @@
+"""A local stand-in for the parts of the zotero web API queried by the dashboard, serving
+synthetic libraries so the dashboard can be load tested without any network access.
+
+Every library id gets its own synthetic library (seeded by the id). Point the dashboard at it
+with the ZOTERO_API_ENDPOINT environment variable. Usage:
+
+    python benchmarks/fake_zotero_api.py --port 8090 --items 20000
+
+"""
+# Importing packages used to serve the fake API:
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+from urllib.parse import urlencode
+import argparse
+import threading
+import logging
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Importing the synthetic data:
+from synthetic_library import generate_synthetic_library, generate_synthetic_collections
+
+# Page size limit of the zotero API:
+MAX_PAGE_SIZE = 100
+
+def create_fake_zotero_api(num_items: int = 20000, num_collections: int = 25):
+    """The method builds the flask app serving the fake zotero API.
+
+    Args:
+        num_items (int): The number of items of every synthetic library.
+
+        num_collections (int): The number of collections of every synthetic library.
+
+    Returns:
+        Flask: The fake API app.
+
+    """
+    api = Flask(__name__)
+    libraries = {}
+    libraries_lock = threading.Lock()
+
+    def get_library(library_id):
+        with libraries_lock:
+            if library_id not in libraries:
+                collections = generate_synthetic_collections(num_collections, seed=library_id)
+                items = generate_synthetic_library(num_items, collections=collections, seed=library_id)
+                libraries[library_id] = {
+                    "items": items,
+                    "collections": collections,
+                    "version": max([item["version"] for item in items], default=0)
+                }
+
+        return libraries[library_id]
+
+    def json_page(objects, version):
+        """Paginates a list of zotero objects like the API, with the 'next' page in the Link header."""
+        start = int(request.args.get("start", 0))
+        limit = min(int(request.args.get("limit", 25) or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        page = objects[start: start + limit]
+
+        headers = {"Last-Modified-Version": str(version), "Total-Results": str(len(objects))}
+        if start + limit < len(objects):
+            args = request.args.to_dict()
+            args.update(start=str(start + limit), limit=str(limit))
+            headers["Link"] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+
+        return Response(json.dumps(page), headers=headers, content_type="application/json")
+
+    def filter_items(items, top_level_only=False):
+        since = int(request.args.get("since", 0))
+        items = [item for item in items if item["version"] > since]
+        if top_level_only:
+            items = [item for item in items if "parentItem" not in item["data"]]
+
+        item_types = request.args.get("itemType", None)
+        if item_types != None and item_types.startswith("-"):
+            excluded = set(item_types[1:].split(" || "))
+            items = [item for item in items if item["data"]["itemType"] not in excluded]
+
+        if request.args.get("direction", "asc") == "desc":
+            items = items[::-1]
+
+        return items
+
+    @api.route("/<library_type>/<int:library_id>/items")
+    def items(library_type, library_id):
+        library = get_library(library_id)
+        return json_page(filter_items(library["items"]), library["version"])
+
+    @api.route("/<library_type>/<int:library_id>/items/top")
+    def top_items(library_type, library_id):
+        library = get_library(library_id)
+        return json_page(filter_items(library["items"], top_level_only=True), library["version"])
+
+    @api.route("/<library_type>/<int:library_id>/collections/<collection_key>/items")
+    def collection_items(library_type, library_id, collection_key):
+        library = get_library(library_id)
+        items = [item for item in library["items"] if collection_key in item["data"]["collections"]]
+        return json_page(filter_items(items), library["version"])
+
+    @api.route("/<library_type>/<int:library_id>/collections/<collection_key>/items/top")
+    def collection_top_items(library_type, library_id, collection_key):
+        library = get_library(library_id)
+        items = [item for item in library["items"] if collection_key in item["data"]["collections"]]
+        return json_page(filter_items(items, top_level_only=True), library["version"])
+
+    @api.route("/<library_type>/<int:library_id>/collections")
+    @api.route("/<library_type>/<int:library_id>/collections/top")
+    def collections(library_type, library_id):
+        library = get_library(library_id)
+        return json_page(library["collections"], library["version"])
+
+    @api.route("/<library_type>/<int:library_id>/deleted")
+    def deleted(library_type, library_id):
+        library = get_library(library_id)
+        return Response(
+            json.dumps({"collections": [], "items": [], "searches": [], "tags": [], "settings": []}),
+            headers={"Last-Modified-Version": str(library["version"])},
+            content_type="application/json")
+
+    @api.route("/<library_type>/<int:library_id>/items/trash")
+    def trash(library_type, library_id):
+        library = get_library(library_id)
+        # The synthetic libraries have nothing in the trash, only the keys format is served:
+        return Response("", headers={"Last-Modified-Version": str(library["version"])}, content_type="text/plain")
+
+    return api
+
+def start_fake_zotero_api(port: int = 8090, num_items: int = 20000, num_collections: int = 25):
+    """The method serves the fake zotero API from a background thread.
+
+    Args:
+        port (int): The local port of the API.
+
+        num_items (int): The number of items of every synthetic library.
+
+        num_collections (int): The number of collections of every synthetic library.
+
+    Returns:
+        werkzeug.serving.BaseWSGIServer: The running server, stopped with server.shutdown().
+
+    """
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    server = make_server("127.0.0.1", port, create_fake_zotero_api(num_items, num_collections), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake zotero API serving synthetic libraries.")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--items", type=int, default=20000, help="Number of items per library.")
+    parser.add_argument("--collections", type=int, default=25, help="Number of collections per library.")
+    args = parser.parse_args()
+
+    make_server("127.0.0.1", args.port, create_fake_zotero_api(args.items, args.collections), threaded=True).serve_forever()
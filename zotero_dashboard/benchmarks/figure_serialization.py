@@ -0,0 +1,123 @@
+"""Benchmark of the time and bytes it takes to serialize the dashboard figures and the item store.
+
+Every payload is serialized with the standard library JSON engine of plotly, with orjson and
+plain lists, with orjson and plotly.js typed arrays and finally returned as a pre-serialized
+fragment (the cost of a cached figure on every later request). Usage:
+
+    python benchmarks/figure_serialization.py --items 100000
+
+"""
+# Importing packages used to run the benchmark:
+import argparse
+import time
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import plotly.io as pio
+
+# Importing the figure builders and the synthetic data:
+from utils.compact_item_methods import compact_zotero_items
+from utils.heatmap_methods import display_year
+from utils.timeseries_graph_methods import plot_single_collection_timeseries
+from utils.sharded_aggregation_methods import build_sharded_aggregates, sharded_source_array, sharded_collection_timeseries_df
+from utils.figure_serialization_methods import encode_figure, pre_serialize, ORJSON_OPTIONS, _serialize_default
+from synthetic_library import generate_synthetic_collections, generate_synthetic_library
+import orjson
+
+def measure_serialization(serialize, repeat: int):
+    """The method times a serialization function.
+
+    Args:
+        serialize (callable): The function returning the serialized payload.
+
+        repeat (int): The number of times the payload is serialized.
+
+    Returns:
+        float: The best time in milliseconds.
+
+        int: The size of the payload in bytes.
+
+    """
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = serialize()
+        best_time = min(best_time, time.perf_counter() - start)
+
+    return best_time * 1000, len(payload)
+
+def dash_response(value, engine: str):
+    """The method serializes a callback output the way dash does, with the given plotly JSON engine.
+
+    Args:
+        value (object): The callback output.
+
+        engine (str): The plotly.io JSON engine, 'json' or 'orjson'.
+
+    Returns:
+        bytes: The serialized output.
+
+    """
+    payload = pio.json.to_json_plotly({"response": {"figure": value}}, engine=engine)
+    return payload.encode() if isinstance(payload, str) else payload
+
+def run_benchmark(num_items: int, repeat: int):
+    """The method prints the serialization time and size of every payload.
+
+    Args:
+        num_items (int): The number of items of the synthetic library.
+
+        repeat (int): The number of times every payload is serialized.
+
+    """
+    collections = generate_synthetic_collections()
+    items = compact_zotero_items(generate_synthetic_library(num_items=num_items, collections=collections))
+    aggregates = build_sharded_aggregates(items, collections)
+
+    # The largest collection of the library as the single collection timeseries:
+    timeseries_df = sharded_collection_timeseries_df(aggregates, collections)
+    collection_name = timeseries_df.sum().idxmax()
+    year = int(str(aggregates["first_day"])[:4]) + 1
+
+    figures = {
+        "heatmap": display_year(sharded_source_array(aggregates, year), year=year, collection_name="All Sources"),
+        "timeseries": plot_single_collection_timeseries(timeseries_df[[collection_name]].cumsum(), collection_name)
+    }
+
+    print(f"Items: {num_items}, best of {repeat}")
+    print(f"{'payload':<12}{'method':<26}{'time (ms)':>12}{'size (KiB)':>14}")
+
+    for name, figure in figures.items():
+        fragment = pre_serialize(encode_figure(figure))
+        methods = {
+            "json engine": lambda: dash_response(figure, "json"),
+            "orjson, lists": lambda: dash_response(figure, "orjson"),
+            "orjson, typed arrays": lambda: dash_response(encode_figure(figure), "orjson"),
+            "pre-serialized fragment": lambda: dash_response(fragment, "orjson")
+        }
+        for method, serialize in methods.items():
+            elapsed, size = measure_serialization(serialize, repeat)
+            print(f"{name:<12}{method:<26}{elapsed:>12.2f}{size / 1024:>14.1f}")
+
+    # The item store written to the browser session by the library query:
+    fragment = pre_serialize(items)
+    methods = {
+        "json": lambda: json.dumps([item.to_plotly_json() for item in items]).encode(),
+        "orjson": lambda: orjson.dumps(items, default=_serialize_default, option=ORJSON_OPTIONS),
+        "pre-serialized fragment": lambda: orjson.dumps(fragment)
+    }
+    for method, serialize in methods.items():
+        elapsed, size = measure_serialization(serialize, repeat)
+        print(f"{'items':<12}{method:<26}{elapsed:>12.2f}{size / 1024:>14.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serialization cost of the dashboard figures and stores.")
+    parser.add_argument("--items", type=int, default=100000, help="Number of synthetic items.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times every payload is serialized.")
+    args = parser.parse_args()
+
+    run_benchmark(args.items, args.repeat)
@@ -0,0 +1,331 @@
+"""Load test of the dashboard that replays concurrent browser sessions against the dash
+_dash-update-component endpoint, with the zotero API replaced by the local fake API.
+
+Every session loads a library, waits for the homepage callbacks fired by the loaded data, clicks
+collections on the radar graph and browses collection pages (heatmap years and item table pages).
+The day selection of the homepage heatmap runs clientside so it sends no requests. Usage:
+
+    python benchmarks/load_test.py --sessions 16 --libraries 4 --items 20000 --workers 4
+
+The latency percentiles of every callback, the request throughput and the peak resident memory
+of the dashboard worker processes (read from /proc, so linux only) are reported.
+
+"""
+# Importing packages used to run the load test:
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+import subprocess
+import argparse
+import threading
+import tempfile
+import random
+import time
+import os
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(BENCHMARK_DIR, "..", "src")
+sys.path.insert(0, BENCHMARK_DIR)
+
+# Importing the fake zotero API:
+from fake_zotero_api import start_fake_zotero_api
+
+def start_dashboard(port: int, api_port: int, server: str = "gunicorn", workers: int = 4):
+    """The method starts the dashboard in a subprocess pointed at the fake zotero API.
+
+    Args:
+        port (int): The local port of the dashboard.
+
+        api_port (int): The local port of the fake zotero API.
+
+        server (str): Either 'gunicorn' (the production server) or 'flask' (the threaded
+            development server, a single process).
+
+        workers (int): The number of gunicorn workers.
+
+    Returns:
+        subprocess.Popen: The dashboard process.
+
+    """
+    env = dict(
+        os.environ,
+        ZOTERO_API_ENDPOINT=f"http://127.0.0.1:{api_port}",
+        ZOTERO_ROLLUP_DB=os.path.join(tempfile.mkdtemp(), "rollups.sqlite3"))
+
+    if server == "gunicorn":
+        command = [
+            sys.executable, "-m", "gunicorn", "--workers", str(workers), "--timeout", "600",
+            "--bind", f"127.0.0.1:{port}", "app:server"]
+    else:
+        command = [
+            sys.executable, "-c", f"from app import server; server.run(host='127.0.0.1', port={port}, threaded=True)"]
+
+    process = subprocess.Popen(command, cwd=SOURCE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Waiting for the app to import and bind:
+    for _ in range(120):
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_dash-dependencies", timeout=5).status_code == 200:
+                return process
+        except requests.ConnectionError:
+            pass
+        if process.poll() != None:
+            break
+        time.sleep(0.5)
+
+    process.kill()
+    raise RuntimeError(f"The dashboard did not start with the '{server}' server")
+
+def get_worker_pids(process_id: int):
+    """The method lists the process and its direct children (the gunicorn workers).
+
+    Args:
+        process_id (int): The process id of the dashboard.
+
+    Returns:
+        lst: The process ids.
+
+    """
+    pids = [process_id]
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                if int(stat.read().rsplit(")", 1)[1].split()[1]) == process_id:
+                    pids.append(int(pid))
+        except (OSError, IndexError):
+            continue
+
+    return pids
+
+def get_resident_memory(process_id: int):
+    """The method reads the resident memory of a process.
+
+    Args:
+        process_id (int): The process id.
+
+    Returns:
+        int: The resident memory in bytes (0 if the process exited).
+
+    """
+    try:
+        with open(f"/proc/{process_id}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return 0
+
+class MemorySampler(threading.Thread):
+    """A thread sampling the peak resident memory of every dashboard process."""
+
+    def __init__(self, process_id: int, interval: float = 0.25):
+        super().__init__(daemon=True)
+        self.process_id = process_id
+        self.interval = interval
+        self.peak_memory = {}
+        self.peak_total_memory = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            memory = {pid: get_resident_memory(pid) for pid in get_worker_pids(self.process_id)}
+            for pid, resident_memory in memory.items():
+                self.peak_memory[pid] = max(self.peak_memory.get(pid, 0), resident_memory)
+            self.peak_total_memory = max(self.peak_total_memory, sum(memory.values()))
+            self.stopped.wait(self.interval)
+
+class DashSession:
+    """A simulated browser session that keeps the value of every component property it knows and
+    calls the server side callbacks the way the dash renderer does."""
+
+    def __init__(self, url: str, dependencies: list, latencies: dict, latencies_lock: threading.Lock):
+        self.url = url.rstrip("/")
+        self.dependencies = dependencies
+        self.latencies = latencies
+        self.latencies_lock = latencies_lock
+        self.http = requests.Session()
+        self.values = {}
+
+    def find_dependency(self, output: str):
+        """Returns the server side callback writing to an 'id.property' output, preferring the
+        callback that does not use allow_duplicate."""
+        matches = [
+            dependency for dependency in self.dependencies
+            if dependency.get("clientside_function") == None and
+            output in [spec.split("@")[0] for spec in dependency["output"].strip(".").split("...")]]
+        matches.sort(key=lambda dependency: "@" in dependency["output"])
+
+        return matches[0]
+
+    def call(self, name: str, output: str, changed: list):
+        """Calls the callback writing to an output and stores the returned property values.
+
+        Args:
+            name (str): The name the latency is reported under.
+
+            output (str): The 'id.property' output of the callback.
+
+            changed (lst): The 'id.property' inputs that triggered the callback.
+
+        """
+        dependency = self.find_dependency(output)
+        output_specs = dependency["output"].strip(".").split("...")
+        outputs = [{"id": spec.split(".", 1)[0], "property": spec.split(".", 1)[1]} for spec in output_specs]
+
+        def with_values(specs):
+            return [dict(spec, value=self.values.get(f"{spec['id']}.{spec['property']}", None)) for spec in specs]
+
+        payload = {
+            "output": dependency["output"],
+            "outputs": outputs if dependency["output"].startswith("..") else outputs[0],
+            "inputs": with_values(dependency["inputs"]),
+            "state": with_values(dependency["state"]),
+            "changedPropIds": changed
+        }
+
+        start = time.perf_counter()
+        response = self.http.post(f"{self.url}/_dash-update-component", json=payload, timeout=600)
+        latency = time.perf_counter() - start
+
+        with self.latencies_lock:
+            self.latencies.setdefault(name, {"latencies": [], "errors": 0, "first_error": None})
+            self.latencies[name]["latencies"].append(latency)
+            if response.status_code not in (200, 204):
+                self.latencies[name]["errors"] += 1
+                if self.latencies[name]["first_error"] == None:
+                    self.latencies[name]["first_error"] = f"{response.status_code}: {response.text[:200]}"
+
+        if response.status_code == 200:
+            for component_id, properties in response.json()["response"].items():
+                for component_property, value in properties.items():
+                    self.values[f"{component_id}.{component_property}"] = value
+
+    def run(self, library_id: int, radar_clicks: int, collection_views: int, seed: int):
+        """Replays a full session."""
+        generator = random.Random(seed)
+        self.values.update({
+            "zotero_library_id.value": library_id,
+            "zotero_api_key.value": "load-test",
+            "library_search.value": None
+        })
+
+        # Library load and the homepage callbacks fired by the loaded data:
+        self.call("store_zotero_library", "main_zotero_collection.data", ["zotero_api_key.value"])
+        for name, output in [
+            ("generate_heatmap_day_index", "heatmap_day_index.data"),
+            ("build_radial_graph_breakdown", "source_radar.figure"),
+            ("build_total_collection_timeseries", "total_items_timeseries.figure"),
+            ("build_creator_analytics_figures", "top_creators_timeseries.figure")]:
+            self.call(name, output, ["main_zotero_collection.data"])
+
+        collections = self.values.get("all_zotero_collections.data", None) or []
+        if len(collections) == 0:
+            return
+
+        # Radar clicks rendering the timeseries of a single collection:
+        for _ in range(radar_clicks):
+            collection = generator.choice(collections)
+            self.values["source_radar.clickData"] = {"points": [{"theta": collection["data"]["name"]}]}
+            self.call("build_single_collection_timeseries", "source_timeseries.figure", ["source_radar.clickData"])
+
+        # Collection pages: the heatmap of a few years and the first pages of the item table:
+        for _ in range(collection_views):
+            collection = generator.choice(collections)
+            self.values.update({
+                "collection_page_key.data": collection["key"],
+                "collection_heatmap_year.value": generator.randint(2015, time.localtime().tm_year),
+                "collection_item_table.page_current": generator.randint(0, 3),
+                "collection_item_table.page_size": 25,
+                "collection_item_table.sort_by": [],
+                "collection_item_table.filter_query": ""
+            })
+            self.call("build_collection_heatmap", "collection_heatmap.figure", ["collection_heatmap_year.value"])
+            self.call("update_collection_item_table", "collection_item_table.data", ["collection_item_table.page_current"])
+
+def report(latencies: dict, wall_time: float, memory_sampler: MemorySampler = None):
+    """The method prints the latency percentiles, throughput and worker memory of a load test."""
+    print(f"{'callback':<36}{'calls':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    num_requests = 0
+    for name, stats in latencies.items():
+        latency = np.array(stats["latencies"]) * 1000
+        num_requests += len(latency)
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99])
+        print(f"{name:<36}{len(latency):>7}{stats['errors']:>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+
+    for name, stats in latencies.items():
+        if stats["first_error"] != None:
+            print(f"first {name} error: {stats['first_error']}")
+
+    print(f"\n{num_requests} requests in {wall_time:.1f}s: {num_requests / wall_time:.2f} requests/s")
+
+    if memory_sampler != None:
+        for pid, peak_memory in sorted(memory_sampler.peak_memory.items()):
+            print(f"process {pid}: peak RSS {peak_memory / 2**20:.1f} MiB")
+        print(f"all processes: peak RSS {memory_sampler.peak_total_memory / 2**20:.1f} MiB")
+
+def run_load_test(args):
+    """The method starts the fake API (and the dashboard unless a url is given) and replays the sessions."""
+    api = start_fake_zotero_api(args.api_port, args.items, args.collections)
+
+    process = None
+    url = args.url
+    if url == None:
+        process = start_dashboard(args.port, args.api_port, server=args.server, workers=args.workers)
+        url = f"http://127.0.0.1:{args.port}"
+
+    memory_sampler = None
+    if process != None or args.server_pid != None:
+        memory_sampler = MemorySampler(process.pid if process != None else args.server_pid)
+        memory_sampler.start()
+
+    try:
+        dependencies = requests.get(f"{url}/_dash-dependencies", timeout=30).json()
+        latencies, latencies_lock = {}, threading.Lock()
+
+        def run_session(session_num):
+            session = DashSession(url, dependencies, latencies, latencies_lock)
+            session.run(
+                library_id=1000 + session_num % args.libraries,
+                radar_clicks=args.radar_clicks,
+                collection_views=args.collection_views,
+                seed=session_num)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency or args.sessions) as executor:
+            list(executor.map(run_session, range(args.sessions)))
+        wall_time = time.perf_counter() - start
+
+        report(latencies, wall_time, memory_sampler)
+
+    finally:
+        if memory_sampler != None:
+            memory_sampler.stopped.set()
+        if process != None:
+            process.terminate()
+            process.wait()
+        api.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent session load test of the zotero dashboard.")
+    parser.add_argument("--sessions", type=int, default=8, help="Number of simulated sessions.")
+    parser.add_argument("--concurrency", type=int, default=None, help="Sessions run at once (default: all).")
+    parser.add_argument("--libraries", type=int, default=2, help="Number of distinct libraries the sessions load.")
+    parser.add_argument("--items", type=int, default=5000, help="Number of items per library.")
+    parser.add_argument("--collections", type=int, default=25, help="Number of collections per library.")
+    parser.add_argument("--radar-clicks", type=int, default=5, help="Radar clicks per session.")
+    parser.add_argument("--collection-views", type=int, default=3, help="Collection pages viewed per session.")
+    parser.add_argument("--server", choices=["gunicorn", "flask"], default="gunicorn")
+    parser.add_argument("--workers", type=int, default=4, help="Number of gunicorn workers.")
+    parser.add_argument("--port", type=int, default=8060, help="Port the dashboard is started on.")
+    parser.add_argument("--api-port", type=int, default=8090, help="Port of the fake zotero API.")
+    parser.add_argument("--url", default=None, help="Url of an already running dashboard (started with "
+        "ZOTERO_API_ENDPOINT=http://127.0.0.1:<api-port>) instead of starting one.")
+    parser.add_argument("--server-pid", type=int, default=None, help="Process id of the running dashboard for memory sampling.")
+    args = parser.parse_args()
+
+    run_load_test(args)
@@ -0,0 +1,130 @@
+"""Benchmark of the ingest of a library from a local zotero desktop database.
+
+A synthetic zotero.sqlite holding the tables of the zotero schema read by the dashboard is
+written first, then read back through read_zotero_database. Usage:
+
+    python benchmarks/local_ingest.py --items 100000
+
+"""
+# Importing packages used to run the benchmark:
+import argparse
+import tempfile
+import sqlite3
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Importing the local ingest and the synthetic data:
+from utils.local_library_methods import read_zotero_database
+from utils.compact_item_methods import compact_zotero_items
+from synthetic_library import generate_synthetic_library, generate_synthetic_collections
+
+# The subset of the zotero desktop schema read by the dashboard:
+ZOTERO_SCHEMA = """
+CREATE TABLE libraries (libraryID INTEGER PRIMARY KEY, type TEXT NOT NULL, editable INT, filesEditable INT, version INT);
+CREATE TABLE groups (groupID INTEGER PRIMARY KEY, libraryID INT NOT NULL UNIQUE, name TEXT);
+CREATE TABLE itemTypes (itemTypeID INTEGER PRIMARY KEY, typeName TEXT);
+CREATE TABLE fields (fieldID INTEGER PRIMARY KEY, fieldName TEXT);
+CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+CREATE TABLE items (
+    itemID INTEGER PRIMARY KEY, itemTypeID INT NOT NULL, dateAdded TIMESTAMP, dateModified TIMESTAMP,
+    clientDateModified TIMESTAMP, libraryID INT NOT NULL, key TEXT NOT NULL, version INT, synced INT);
+CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value UNIQUE);
+CREATE TABLE itemData (itemID INT, fieldID INT, valueID INT, PRIMARY KEY (itemID, fieldID));
+CREATE TABLE creators (creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT, fieldMode INT, UNIQUE (lastName, firstName, fieldMode));
+CREATE TABLE itemCreators (itemID INT, creatorID INT, creatorTypeID INT, orderIndex INT, PRIMARY KEY (itemID, creatorID, creatorTypeID, orderIndex));
+CREATE TABLE tags (tagID INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE itemTags (itemID INT, tagID INT, type INT, PRIMARY KEY (itemID, tagID));
+CREATE TABLE collections (
+    collectionID INTEGER PRIMARY KEY, collectionName TEXT, parentCollectionID INT, clientDateModified TIMESTAMP,
+    libraryID INT, key TEXT, version INT, synced INT);
+CREATE TABLE collectionItems (collectionID INT, itemID INT, orderIndex INT, PRIMARY KEY (collectionID, itemID));
+CREATE TABLE itemAttachments (itemID INTEGER PRIMARY KEY, parentItemID INT, linkMode INT, contentType TEXT, path TEXT);
+CREATE TABLE itemNotes (itemID INTEGER PRIMARY KEY, parentItemID INT, note TEXT, title TEXT);
+CREATE TABLE deletedItems (itemID INTEGER PRIMARY KEY, dateDeleted TIMESTAMP);
+CREATE TABLE deletedCollections (collectionID INTEGER PRIMARY KEY, dateDeleted TIMESTAMP);
+"""
+
+def write_synthetic_zotero_database(path: str, num_items: int):
+    """The method writes a synthetic library into a database using the zotero desktop schema.
+
+    Args:
+        path (str): The path of the database.
+
+        num_items (int): The number of items.
+
+    """
+    collections = generate_synthetic_collections()
+    items = generate_synthetic_library(num_items, collections=collections)
+
+    connection = sqlite3.connect(path)
+    connection.executescript(ZOTERO_SCHEMA)
+    connection.execute("INSERT INTO libraries VALUES (1, 'user', 1, 1, 0)")
+
+    codes = {"itemTypes": {}, "fields": {}, "creatorTypes": {}, "itemDataValues": {}, "creators": {}, "tags": {}}
+    def code(table, value):
+        if value not in codes[table]:
+            codes[table][value] = len(codes[table]) + 1
+        return codes[table][value]
+
+    collection_ids = {collection["key"]: num + 1 for num, collection in enumerate(collections)}
+    connection.executemany(
+        "INSERT INTO collections VALUES (?, ?, NULL, NULL, 1, ?, 1, 1)",
+        [(collection_ids[collection["key"]], collection["data"]["name"], collection["key"]) for collection in collections])
+
+    rows = {"items": [], "itemData": [], "itemCreators": [], "itemTags": [], "collectionItems": []}
+    for item_id, item in enumerate(items, start=1):
+        data = item["data"]
+        timestamp = data["dateAdded"].replace("T", " ").rstrip("Z")
+        rows["items"].append((item_id, code("itemTypes", data["itemType"]), timestamp, timestamp, timestamp, 1, data["key"], data["version"], 1))
+
+        for field, value in data.items():
+            if isinstance(value, str) and value != "" and field not in ("key", "itemType", "dateAdded", "dateModified"):
+                rows["itemData"].append((item_id, code("fields", field), code("itemDataValues", value)))
+        for order, author in enumerate(data["creators"]):
+            creator_id = code("creators", (author["firstName"], author["lastName"]))
+            rows["itemCreators"].append((item_id, creator_id, code("creatorTypes", author["creatorType"]), order))
+        for tag in {tag["tag"] for tag in data["tags"]}:
+            rows["itemTags"].append((item_id, code("tags", tag), 0))
+        for order, collection_key in enumerate(data["collections"]):
+            rows["collectionItems"].append((collection_ids[collection_key], item_id, order))
+
+    for table, table_rows in rows.items():
+        connection.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(table_rows[0]))})", table_rows)
+
+    connection.executemany("INSERT INTO itemTypes VALUES (?, ?)", [(num, name) for name, num in codes["itemTypes"].items()])
+    connection.executemany("INSERT INTO fields VALUES (?, ?)", [(num, name) for name, num in codes["fields"].items()])
+    connection.executemany("INSERT INTO creatorTypes VALUES (?, ?)", [(num, name) for name, num in codes["creatorTypes"].items()])
+    connection.executemany("INSERT INTO itemDataValues VALUES (?, ?)", [(num, value) for value, num in codes["itemDataValues"].items()])
+    connection.executemany("INSERT INTO tags VALUES (?, ?)", [(num, name) for name, num in codes["tags"].items()])
+    connection.executemany(
+        "INSERT INTO creators VALUES (?, ?, ?, 0)", [(num, first, last) for (first, last), num in codes["creators"].items()])
+
+    connection.commit()
+    connection.close()
+
+def run_benchmark(num_items: int):
+    """The method prints the time taken to read and compact a synthetic zotero desktop database."""
+    path = os.path.join(tempfile.mkdtemp(), "zotero.sqlite")
+    write_synthetic_zotero_database(path, num_items)
+    print(f"Synthetic zotero.sqlite: {num_items} items, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    start = time.perf_counter()
+    items, collections = read_zotero_database(path)
+    read_time = time.perf_counter() - start
+
+    compact_items = compact_zotero_items(items)
+    total_time = time.perf_counter() - start
+
+    print(f"read_zotero_database: {read_time:.2f}s ({len(items)} items, {len(collections)} collections)")
+    print(f"read + compact records: {total_time:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest time of a local zotero desktop database.")
+    parser.add_argument("--items", type=int, default=100000, help="Number of synthetic items.")
+    args = parser.parse_args()
+
+    run_benchmark(args.items)
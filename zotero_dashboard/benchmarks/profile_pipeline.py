@@ -0,0 +1,255 @@
+"""Offline profile of the ingest to figure pipeline of the dashboard, without the dash server or
+the zotero API.
+
+The library is either a saved pyzotero JSON dump (eg: json.dump(zot.everything(zot.top()), file))
+or a synthetic library of the given size. Every stage of the pipeline is run in order and its wall
+time, the memory it still holds once done, its peak allocation and the peak resident memory of the
+process are printed. Usage:
+
+    python benchmarks/profile_pipeline.py --dump library.json --collections collections.json
+    python benchmarks/profile_pipeline.py --items 20000 --cprofile pipeline.prof --flamegraph pipeline.folded
+
+The flamegraph output is in the folded stack format read by flamegraph.pl and speedscope.
+
+The timeseries stage scans every item for every day of the library, on large libraries the other
+stages can be profiled on their own with eg: --stages parse compact dataframe source_array display_year.
+
+"""
+# Importing packages used to profile the pipeline:
+import argparse
+import tracemalloc
+import resource
+import threading
+import cProfile
+import pstats
+import collections
+import time
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Importing the pipeline and the synthetic data:
+from utils.compact_item_methods import compact_zotero_items
+from utils.zotero_data_methods import zotero_collection_to_dataframe, create_collection_counts, create_collection_timeseries_df
+from utils.heatmap_methods import build_source_array, display_year
+from utils.timeseries_graph_methods import plot_total_item_timeseries
+from utils.figure_serialization_methods import serialize_figure, pre_serialize
+from synthetic_library import generate_synthetic_library, generate_synthetic_collections
+
+def parse_library(state):
+    """The stage decoding the JSON library, sorted by dateAdded like the dashboard query."""
+    state["items"] = json.loads(state["payload"])
+    if isinstance(state["items"], dict):
+        state["collections"] = state["items"].get("collections", state.get("collections", []))
+        state["items"] = state["items"]["items"]
+    state["items"] = sorted(state["items"], key=lambda item: item["data"]["dateAdded"])
+
+def compact_library(state):
+    """The stage converting the items into the compact records held by the library cache."""
+    state["items"] = compact_zotero_items(state["items"])
+
+def build_dataframe(state):
+    """The stage building the item dataframe the heatmap array is built from."""
+    state["dataframe"] = zotero_collection_to_dataframe(state["items"])
+
+def build_counts(state):
+    """The stage counting the sources read per collection (the radar graph)."""
+    state["counts"] = create_collection_counts(state["items"], state["collections"], cutoff=20)
+
+def build_timeseries(state):
+    """The stage building the cumulative collection timeseries and its figure."""
+    state["timeseries"] = create_collection_timeseries_df(state["items"], state["collections"]).cumsum()
+    state["figures"]["timeseries"] = plot_total_item_timeseries(state["timeseries"])
+
+def build_heatmap_array(state):
+    """The stage counting the sources read per day of the heatmap year."""
+    state["source_array"] = build_source_array(state["dataframe"], state["year"])
+
+def build_heatmap(state):
+    """The stage rendering the calendar heatmap of the year."""
+    state["figures"]["heatmap"] = display_year(state["source_array"], year=state["year"])
+
+def serialize_outputs(state):
+    """The stage serializing the figures and the item store sent to the browser."""
+    state["serialized"] = {name: serialize_figure(figure) for name, figure in state["figures"].items()}
+    state["serialized"]["items"] = pre_serialize(state["items"])
+
+# The stages of the pipeline in the order they are run, every stage reads and writes the shared state:
+PIPELINE_STAGES = collections.OrderedDict([
+    ("parse", parse_library),
+    ("compact", compact_library),
+    ("dataframe", build_dataframe),
+    ("counts", build_counts),
+    ("timeseries", build_timeseries),
+    ("source_array", build_heatmap_array),
+    ("display_year", build_heatmap),
+    ("serialize", serialize_outputs)
+])
+
+class StackSampler:
+    """A sampling profiler recording the stack of the main thread every interval, written in the
+    folded stack format ('frame;frame;frame count') used to draw flamegraphs.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id, None)
+            stack = []
+            while frame != None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if len(stack) > 0:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        with open(path, "w") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+def get_max_rss_bytes():
+    """The method returns the peak resident memory of the process (ru_maxrss is in KiB on linux and
+    in bytes on macOS).
+
+    Returns:
+        int: The peak resident memory in bytes.
+
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+def run_stage(stage, state, trace_memory: bool = True):
+    """The method runs a single stage of the pipeline and measures it.
+
+    Args:
+        stage (callable): The stage function, called with the shared state.
+
+        state (dict): The shared state of the pipeline.
+
+        trace_memory (bool): Whether the allocations of the stage are traced (which slows it down).
+
+    Returns:
+        dict: The measures in the form {"time", "retained", "peak", "max_rss"} in seconds and bytes.
+
+    """
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    stage(state)
+    elapsed = time.perf_counter() - start
+
+    retained, peak = (None, None)
+    if trace_memory:
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {"time": elapsed, "retained": retained, "peak": peak, "max_rss": get_max_rss_bytes()}
+
+def load_payload(dump: str = None, collections_path: str = None, num_items: int = 10000):
+    """The method reads the saved library or generates the synthetic one, the parse stage decodes it.
+
+    Args:
+        dump (str): The path of a pyzotero JSON dump, either a list of items or a dict with the
+            "items" and "collections" lists.
+
+        collections_path (str): The path of a JSON dump of the collections (zot.everything(zot.collections())).
+
+        num_items (int): The size of the synthetic library used when there is no dump.
+
+    Returns:
+        dict: The initial state of the pipeline.
+
+    """
+    if dump != None:
+        with open(dump, "rb") as file:
+            payload = file.read()
+        library_collections = []
+        if collections_path != None:
+            with open(collections_path, "rb") as file:
+                library_collections = json.loads(file.read())
+    else:
+        library_collections = generate_synthetic_collections()
+        payload = json.dumps(generate_synthetic_library(num_items=num_items, collections=library_collections))
+
+    return {"payload": payload, "collections": library_collections, "figures": {}}
+
+def format_bytes(value):
+    """The method formats a number of bytes in MiB ("-" when it was not measured)."""
+    return "-" if value == None else f"{value / 2**20:.1f}"
+
+def run_profile(args):
+    """The method runs the pipeline stages and prints their measures, writing the cProfile and
+    flamegraph outputs when requested.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    """
+    state = load_payload(args.dump, args.collections, args.items)
+    stages = args.stages if args.stages else list(PIPELINE_STAGES.keys())
+
+    profiler = cProfile.Profile() if args.cprofile else None
+    sampler = StackSampler(args.sample_interval / 1000) if args.flamegraph else None
+    if sampler != None:
+        sampler.start()
+
+    print(f"{'stage':<14}{'time (ms)':>12}{'retained (MiB)':>16}{'peak (MiB)':>12}{'max rss (MiB)':>15}")
+    for name in stages:
+        # The heatmap year defaults to the year of the last item, once the items are parsed:
+        if name == "source_array" and state.get("year", None) == None:
+            state["year"] = args.year if args.year != None else int(state["items"][-1]["data"]["dateAdded"][:4])
+
+        if profiler != None:
+            profiler.enable()
+        measures = run_stage(PIPELINE_STAGES[name], state, trace_memory=not args.no_tracemalloc)
+        if profiler != None:
+            profiler.disable()
+
+        print(
+            f"{name:<14}{measures['time'] * 1000:>12.1f}{format_bytes(measures['retained']):>16}"
+            f"{format_bytes(measures['peak']):>12}{format_bytes(measures['max_rss']):>15}", flush=True)
+
+    if sampler != None:
+        sampler.stop()
+        sampler.write(args.flamegraph)
+        print(f"Folded stacks written to {args.flamegraph} ({sum(sampler.samples.values())} samples)")
+
+    if profiler != None:
+        profiler.dump_stats(args.cprofile)
+        print(f"cProfile stats written to {args.cprofile}, slowest functions:")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.top)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline profile of the ingest to figure pipeline.")
+    parser.add_argument("--dump", help="Path of a saved pyzotero JSON dump of the library items.")
+    parser.add_argument("--collections", help="Path of a saved pyzotero JSON dump of the library collections.")
+    parser.add_argument("--items", type=int, default=10000, help="Number of synthetic items when there is no dump.")
+    parser.add_argument("--year", type=int, help="Year of the heatmap, defaults to the year of the last item.")
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(PIPELINE_STAGES.keys()),
+        help="Only run these stages (the stages they depend on must be included).")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Only measure time, tracing allocations slows the stages down.")
+    parser.add_argument("--cprofile", help="Write the cProfile stats of the stages to this path.")
+    parser.add_argument("--top", type=int, default=25, help="Number of functions printed from the cProfile stats.")
+    parser.add_argument("--flamegraph", help="Write the sampled stacks of the stages to this path (folded stack format).")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Milliseconds between two stack samples.")
+
+    run_profile(parser.parse_args())
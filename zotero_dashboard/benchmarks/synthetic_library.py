@@ -0,0 +1,129 @@
+# Importing packages used to generate the synthetic library:
+import random
+import datetime
+import string
+
+ITEM_TYPES = ["journalArticle", "webpage", "book", "report", "conferencePaper", "attachment"]
+TITLE_WORDS = [
+    "deep", "learning", "graph", "energy", "policy", "market", "network", "climate", "model",
+    "analysis", "data", "system", "review", "urban", "health", "trade", "neural", "risk"]
+
+def _random_key(generator):
+    """The method generates an 8 character zotero style object key.
+
+    Args:
+        generator (random.Random): The seeded random generator.
+
+    Returns:
+        str: The key eg: 'X4GH7K2P'.
+
+    """
+    return "".join(generator.choice(string.ascii_uppercase + string.digits) for _ in range(8))
+
+def generate_synthetic_collections(num_collections: int = 25, seed: int = 0):
+    """The method generates a list of collections in the format of the pyzotero collections() response.
+
+    Args:
+        num_collections (int): The number of collections.
+
+        seed (int): The seed of the random generator.
+
+    Returns:
+        lst: The list of zotero collections.
+
+    """
+    generator = random.Random(seed)
+
+    collections = []
+    for num in range(num_collections):
+        key = _random_key(generator)
+        collections.append({
+            "key": key,
+            "version": 1,
+            "library": {"type": "user", "id": 1, "name": "synthetic", "links": {}},
+            "links": {"self": {"href": f"https://api.zotero.org/users/1/collections/{key}", "type": "application/json"}},
+            "meta": {"numCollections": 0, "numItems": 0},
+            "data": {"key": key, "version": 1, "name": f"Collection {num}", "parentCollection": False, "relations": {}}
+        })
+
+    return collections
+
+def generate_synthetic_library(
+    num_items: int = 100000,
+    collections: list = None,
+    num_creators: int = 5000,
+    start_year: int = 2015,
+    seed: int = 0):
+    """The method generates a library of zotero items in the format of the pyzotero items() response,
+    including the "links", "meta" and "library" dicts, sorted by dateAdded like the dashboard query.
+
+    Args:
+        num_items (int): The number of items.
+
+        collections (None|lst): The collections items are filed into, generated if None.
+
+        num_creators (int): The number of distinct creators items are written by.
+
+        start_year (int): The year of the first item, items are spread up to the current day.
+
+        seed (int): The seed of the random generator.
+
+    Returns:
+        lst: The list of zotero items.
+
+    """
+    generator = random.Random(seed)
+    if collections == None:
+        collections = generate_synthetic_collections(seed=seed)
+
+    creators = [
+        {"creatorType": "author", "firstName": generator.choice(string.ascii_uppercase) + ".", "lastName": f"Author{num}"}
+        for num in range(num_creators)]
+
+    start = datetime.datetime(start_year, 1, 1, tzinfo=datetime.timezone.utc)
+    span = (datetime.datetime.now(datetime.timezone.utc) - start).total_seconds()
+
+    items = []
+    for num in range(num_items):
+        key = _random_key(generator)
+        item_type = generator.choice(ITEM_TYPES)
+        date_added = (start + datetime.timedelta(seconds=generator.random() * span)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        data = {
+            "key": key,
+            "version": num + 1,
+            "itemType": item_type,
+            "title": " ".join(generator.choice(TITLE_WORDS) for _ in range(generator.randint(3, 10))).capitalize(),
+            "creators": generator.sample(creators, generator.randint(0, 4)) if item_type != "attachment" else [],
+            "abstractNote": " ".join(generator.choice(TITLE_WORDS) for _ in range(generator.randint(0, 120))),
+            "websiteTitle": generator.choice(["", "Nature", "arXiv", "The Economist", "GitHub"]),
+            "websiteType": "",
+            "date": "",
+            "shortTitle": "",
+            "url": f"https://example.org/{key.lower()}",
+            "accessDate": date_added,
+            "language": generator.choice(["", "en"]),
+            "rights": "",
+            "extra": "",
+            "tags": [{"tag": generator.choice(TITLE_WORDS)} for _ in range(generator.randint(0, 3))],
+            "collections": [generator.choice(collections)["key"]] if generator.random() < 0.9 else [],
+            "relations": {},
+            "dateAdded": date_added,
+            "dateModified": date_added
+        }
+
+        items.append({
+            "key": key,
+            "version": num + 1,
+            "library": {"type": "user", "id": 1, "name": "synthetic", "links": {
+                "alternate": {"href": "https://www.zotero.org/synthetic", "type": "text/html"}}},
+            "links": {
+                "self": {"href": f"https://api.zotero.org/users/1/items/{key}", "type": "application/json"},
+                "alternate": {"href": f"https://www.zotero.org/synthetic/items/{key}", "type": "text/html"}},
+            "meta": {"creatorSummary": "Synthetic", "numChildren": 0},
+            "data": data
+        })
+
+    items.sort(key=lambda item: item["data"]["dateAdded"])
+
+    return items
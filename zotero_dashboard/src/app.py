@@ -2,12 +2,22 @@
 import dash
 from dash import dcc
 from dash import html
+from dash import Patch, no_update
 from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+
+# Importing flask methods used by the export routes:
+from flask import Response, request, abort
+from pyzotero import zotero_errors
 
 import dash_bootstrap_components as dbc
 
 # Importing zotero data management APIs:
-from utils import get_zotero_collection, get_all_collections
+from utils import (
+    load_library, sync_library, get_cached_library, build_day_index_delta, create_collection_count_delta,
+    get_current_library, get_library_delta_since, mark_library_active, start_refresh_scheduler,
+    get_cached_search_index, get_export_aggregates, parse_export_filters, iter_item_export_rows, iter_aggregate_export_rows,
+    stream_export, EXPORT_DATASETS, EXPORT_FORMATS, use_orjson_engine, get_serialized_library_items, parse_group_ids, load_libraries)
 
 app = dash.Dash(
     __name__,
@@ -18,6 +28,11 @@ app = dash.Dash(
 )
 server = app.server
 
+# Serializing the callback responses with orjson, which also embeds the pre-serialized figures and stores as is:
+use_orjson_engine()
+
+# Keeping the libraries of recent sessions up to date in the background (once per server process):
+start_refresh_scheduler()
 
 # Main layout for the Dash Application:
 app.layout = dbc.Container([
@@ -74,6 +89,7 @@ app.layout = dbc.Container([
                     # Main Zotero Account Inputs:
                     dbc.Col(dbc.Input(id="zotero_library_id", type="number", placeholder="Zotero Library ID")),
                     dbc.Col(dbc.Input(id="zotero_api_key", type="text", placeholder="Zotero API Key")),
+                    dbc.Col(dbc.Input(id="zotero_group_ids", type="text", debounce=True, placeholder="Group Library IDs")),
                     dbc.Col(dbc.Button("No Data Found", color="danger", id="status_button")),
                     dbc.Col(dbc.Button("Help", id="help_button", color="info", className="me-1"))
                 ]),
@@ -87,6 +103,11 @@ app.layout = dbc.Container([
                     "This is your web API key for your Zotero account.",
                     target="zotero_api_key",
                     placement="bottom"
+                ),
+                dbc.Tooltip(
+                    "Optional comma separated IDs of the group libraries combined with your library eg: 123456, 654321.",
+                    target="zotero_group_ids",
+                    placement="bottom"
                 )
             ]
         )
@@ -97,6 +118,14 @@ app.layout = dbc.Container([
     dcc.Store(id="main_zotero_collection"),
     dcc.Store(id="all_zotero_collections"),
 
+    # Library version of the data in the browser session and the changes found by the last sync:
+    dcc.Store(id="library_version"),
+    dcc.Store(id="library_delta"),
+
+    # Group libraries combined with the main library and their versions:
+    dcc.Store(id="group_libraries"),
+    dcc.Interval(id="library_sync_interval", interval=5*60*1000),
+
     dash.page_container
 
 ])
@@ -118,6 +147,7 @@ def toggle_modal(n1, is_open):
     Output("all_zotero_collections", "data"),
     Output("status_button", "children"),
     Output("status_button", "color"),
+    Output("library_version", "data"),
 
     Input("zotero_library_id", "value"),
     Input("zotero_api_key", "value")
@@ -142,20 +172,23 @@ def store_zotero_library(library_id=None, api_key=None):
 
         int: The number of Zotero items collected.
 
-
+        int: The zotero library version of the collection.
 
     """ 
     # Using the Zotero API to query the full collection:
     if library_id and api_key != None:
 
-        # Querying the Zotero API:
-        data = get_zotero_collection(
+        # Reusing the server side cache (pre-warmed by the background refresh) after a version check:
+        library = get_current_library(
             library_id=library_id,
             api_key=api_key)
 
-        collection_data = get_all_collections(
-            library_id=library_id,
-            api_key=api_key)
+        # Only libraries the key could be validated against are refreshed in the background:
+        mark_library_active(api_key=api_key, library_id=library_id)
+
+        data = library["items"]
+        collection_data = library["collections"]
+        serialized_data = get_serialized_library_items(library_id)
 
         # If Zotero data is successfully queried, generating the status check values:
         if data != None and len(data) > 0:
@@ -168,10 +201,210 @@ def store_zotero_library(library_id=None, api_key=None):
                 dbc.Badge(num_items, color="light", text_color="primary", className="ms-1", style={"padding-left": "0.25rem"})
             ]
 
-        return data, collection_data, status, color
+        return serialized_data, collection_data, status, color, library["version"]
     
     else:
-        return None, None, "No Data Found", "danger"
+        return None, None, "No Data Found", "danger", None
+
+# Periodic library sync:
+@app.callback(
+    Output("main_zotero_collection", "data", allow_duplicate=True),
+    Output("all_zotero_collections", "data", allow_duplicate=True),
+    Output("library_version", "data", allow_duplicate=True),
+    Output("library_delta", "data"),
+    Output("status_button", "children", allow_duplicate=True),
+
+    Input("library_sync_interval", "n_intervals"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    State("library_version", "data"),
+    prevent_initial_call=True
+)
+def sync_zotero_library(n_intervals, library_id=None, api_key=None, version=None):
+    """The method that periodically checks the zotero library for changes and only sends
+    what changed to the browser session.
+
+    The changes since the version of the browser session (including the ones already applied
+    by the background refresh) are sent as a compact library delta along with the new item count
+    and the figures are patched from the delta. If they are no longer kept or the request reached
+    a server process that never loaded the library, the full collection is written to the
+    browser session like the initial query.
+
+    Args:
+        n_intervals (int): The number of times the sync interval has fired.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        version (int): The zotero library version of the data in the browser session.
+
+    Returns:
+        lst: The JSON object of the zotero collection if a full refresh was required.
+
+        lst: The JSON object of the zotero collections if a full refresh was required.
+
+        int: The zotero library version after the sync.
+
+        dict: The compact library delta used to patch the figures.
+
+        dash.Patch: The partial update of the status button item count badge.
+
+    """
+    if library_id == None or api_key == None or version == None:
+        raise PreventUpdate
+
+    # Full refresh when this process never loaded the library:
+    if get_cached_library(library_id) == None:
+        library = load_library(library_id=library_id, api_key=api_key)
+        mark_library_active(api_key=api_key, library_id=library_id)
+
+        status = Patch()
+        status[1]["props"]["children"] = len(library["items"])
+
+        return get_serialized_library_items(library_id), library["collections"], library["version"], no_update, status
+
+    # Changes since the version of the browser session, including the ones already applied by the background refresh:
+    sync_library(library_id=library_id, api_key=api_key)
+    mark_library_active(api_key=api_key, library_id=library_id)
+    delta = get_library_delta_since(library_id, version)
+
+    # Full refresh from the cache when the changes since the browser session version are no longer kept:
+    if delta == None:
+        library = get_cached_library(library_id)
+
+        status = Patch()
+        status[1]["props"]["children"] = len(library["items"])
+
+        return get_serialized_library_items(library_id), library["collections"], library["version"], no_update, status
+
+    if len(delta["added"]) == 0 and len(delta["removed"]) == 0:
+        raise PreventUpdate
+
+    # Compact changes used by the clientside heatmap and the timeseries patch callbacks:
+    library_delta = build_day_index_delta(delta)
+    library_delta["version"] = delta["version"]
+    library_delta["base_version"] = version
+    library_delta["timeseries"] = create_collection_count_delta(delta["added"], delta["removed"], delta["collections"])
+
+    # Only updating the badge inside of the status button:
+    status = Patch()
+    status[1]["props"]["children"] = len(get_cached_library(library_id)["items"])
+
+    return no_update, no_update, delta["version"], library_delta, status
+
+# Group library loading and sync:
+@app.callback(
+    Output("group_libraries", "data"),
+
+    Input("zotero_group_ids", "value"),
+    Input("zotero_api_key", "value"),
+    Input("library_sync_interval", "n_intervals"),
+    State("group_libraries", "data")
+)
+def store_group_libraries(group_ids=None, api_key=None, n_intervals=None, group_libraries=None):
+    """The method concurrently loads (or syncs) the group libraries combined with the main library
+    and writes their versions to the browser session. Every group library is cached and synced on
+    its own, so adding a group only queries that group.
+
+    Args:
+        group_ids (str): The comma separated group library IDs.
+
+        api_key (str): The zotero API user key.
+
+        n_intervals (int): The number of times the sync interval has fired.
+
+        group_libraries (lst): The group libraries currently in the browser session.
+
+    Returns:
+        lst|None: The summary of every group library (see utils.load_library_summary) or None if
+            there is no group library.
+
+    """
+    group_ids = parse_group_ids(group_ids)
+    if len(group_ids) == 0 or api_key == None:
+        return None
+
+    libraries = load_libraries(
+        api_key=api_key,
+        libraries=[{"library_id": group_id, "library_type": "group"} for group_id in group_ids])
+
+    # The sync interval only updates the session when one of the group libraries changed:
+    if libraries == group_libraries:
+        raise PreventUpdate
+
+    return libraries
+
+# Streaming exports of the cached library data:
+@server.route("/export/<library_type>/<int:library_id>/<dataset>.<export_format>")
+def export_library_data(library_type, library_id, dataset, export_format):
+    """The route that streams the items or the aggregates of a library as CSV, JSON-lines or parquet.
+
+    The file is encoded and sent in chunks (chunked transfer encoding) straight from the server side
+    cache, so it is never fully held in memory. The API key is read from the 'Zotero-API-Key' header
+    or the 'key' query parameter like the zotero API and is checked by the library version check.
+
+    The items can be filtered with the 'collection' (key), 'item_type', 'start', 'end' ('YYYY-MM-DD')
+    and 'q' (search query) parameters, the aggregates with 'start' and 'end'. Eg:
+
+        /export/user/123456/items.csv?collection=ABCD1234&start=2022-01-01
+
+    Args:
+        library_type (str): The library type of the zotero object. Can be group or user.
+
+        library_id (int): The zotero API user ID.
+
+        dataset (str): One of 'items', 'daily', 'daily_collections' or 'collections'.
+
+        export_format (str): One of 'csv', 'jsonl' or 'parquet'.
+
+    Returns:
+        flask.Response: The streamed file.
+
+    """
+    if library_type not in ("user", "group") or dataset not in EXPORT_DATASETS or export_format not in EXPORT_FORMATS:
+        abort(404)
+
+    api_key = request.headers.get("Zotero-API-Key", request.args.get("key", None))
+    if api_key == None:
+        abort(401)
+
+    # Bringing the cached library up to date (an invalid key fails the version check):
+    try:
+        library = get_current_library(api_key=api_key, library_id=library_id, library_type=library_type)
+    except zotero_errors.PyZoteroError:
+        abort(403)
+    mark_library_active(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    # The filters are checked before the response starts streaming, which sends its status:
+    try:
+        filters = parse_export_filters(request.args, library["collections"])
+    except ValueError:
+        abort(400)
+
+    if dataset == "items":
+        query = request.args.get("q", None)
+        rows = iter_item_export_rows(
+            library["items"],
+            library["collections"],
+            search_index=get_cached_search_index(api_key=api_key, library_id=library_id, library_type=library_type) if query else None,
+            query=query,
+            **filters)
+    else:
+        rows = iter_aggregate_export_rows(
+            get_export_aggregates(library_id, library_type=library_type),
+            library["collections"],
+            dataset,
+            start_date=filters["start_date"],
+            end_date=filters["end_date"])
+
+    return Response(
+        stream_export(rows, dataset, export_format),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=zotero_{library_type}_{library_id}_{dataset}.{export_format}",
+            "Last-Modified-Version": str(library["version"])
+        })
 
 #if __name__ == "__main__":
 #    app.run_server(host="0.0.0.0", port=8050, debug=True)
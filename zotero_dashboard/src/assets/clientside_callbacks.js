@@ -0,0 +1,395 @@
+// Clientside callbacks for the homepage heatmap.
+//
+// All of these functions work from the compact per-day index built by
+// utils/day_index_methods.py::build_day_index and written once to the
+// "heatmap_day_index" dcc.Store. Selecting a day, switching the year or
+// highlighting a single collection never reaches the server.
+
+(function () {
+
+    var MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
+    var MONTH_DAYS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31];
+    var DAY_MS = 24 * 60 * 60 * 1000;
+
+    function pad(value) {
+        return value < 10 ? "0" + value : String(value);
+    }
+
+    // "YYYY-MM-DD" string for a UTC date:
+    function isoDay(date) {
+        return date.getUTCFullYear() + "-" + pad(date.getUTCMonth() + 1) + "-" + pad(date.getUTCDate());
+    }
+
+    // Same weeknumber logic as display_year: ISO week, with the trailing week 1 of December moved to 53:
+    function weekNumber(date) {
+        var target = new Date(date.getTime());
+        var weekday = (date.getUTCDay() + 6) % 7;
+        target.setUTCDate(target.getUTCDate() - weekday + 3);
+        var firstThursday = new Date(Date.UTC(target.getUTCFullYear(), 0, 4));
+        var week = 1 + Math.round(((target - firstThursday) / DAY_MS - 3 + ((firstThursday.getUTCDay() + 6) % 7)) / 7);
+        if (week === 1 && date.getUTCMonth() === 11) {
+            return 53;
+        }
+        return week;
+    }
+
+    // Binary search for the position of a day in the sorted dates array (-1 if the day has no sources):
+    function findDay(dates, day) {
+        var low = 0;
+        var high = dates.length - 1;
+        while (low <= high) {
+            var middle = (low + high) >> 1;
+            if (dates[middle] === day) {
+                return middle;
+            } else if (dates[middle] < day) {
+                low = middle + 1;
+            } else {
+                high = middle - 1;
+            }
+        }
+        return -1;
+    }
+
+    // Whether the i-th item of the index passes the collection highlight and the library search:
+    function itemMatches(dayIndex, i, collectionCode, keyFilter) {
+        if (collectionCode !== null && collectionCode !== undefined && dayIndex.items.collection[i] !== collectionCode) {
+            return false;
+        }
+        return !keyFilter || keyFilter.has(dayIndex.items.key[i]);
+    }
+
+    // Number of sources for a day, optionally only counting a single collection code and the search results:
+    function countDay(dayIndex, position, collectionCode, keyFilter) {
+        if (position < 0) {
+            return 0;
+        }
+        var start = dayIndex.offsets[position];
+        var end = dayIndex.offsets[position + 1];
+        if ((collectionCode === null || collectionCode === undefined) && !keyFilter) {
+            return end - start;
+        }
+        var count = 0;
+        for (var i = start; i < end; i++) {
+            if (itemMatches(dayIndex, i, collectionCode, keyFilter)) {
+                count++;
+            }
+        }
+        return count;
+    }
+
+    // Set of the item keys matching the library search (null when there is no search):
+    function searchKeyFilter(searchResults) {
+        return searchResults ? new Set(searchResults.keys) : null;
+    }
+
+    // Mirrors utils/heatmap_methods.py::display_year so the client and server heatmaps look identical:
+    function buildYearFigure(dayIndex, year, collectionCode, keyFilter, color) {
+        var start = Date.UTC(year, 0, 1);
+        var numDays = Math.round((Date.UTC(year + 1, 0, 1) - start) / DAY_MS);
+
+        var x = [], y = [], z = [], text = [];
+        var lineTraces = [];
+        var lineStyle = {color: "#9e9e9e", width: 1};
+
+        for (var i = 0; i < numDays; i++) {
+            var date = new Date(start + i * DAY_MS);
+            var weekday = (date.getUTCDay() + 6) % 7;
+            var week = weekNumber(date);
+
+            x.push(week);
+            y.push(weekday);
+            z.push(countDay(dayIndex, findDay(dayIndex.dates, isoDay(date)), collectionCode, keyFilter));
+            text.push(pad(date.getUTCDate()) + " " + MONTH_NAMES[date.getUTCMonth()] + ", " + year);
+
+            // Month seperator lines:
+            if (date.getUTCDate() === 1) {
+                lineTraces.push({type: "scatter", mode: "lines", line: lineStyle, hoverinfo: "skip",
+                    x: [week - 0.5, week - 0.5], y: [weekday - 0.5, 6.5]});
+                if (weekday) {
+                    lineTraces.push({type: "scatter", mode: "lines", line: lineStyle, hoverinfo: "skip",
+                        x: [week - 0.5, week + 0.5], y: [weekday - 0.5, weekday - 0.5]});
+                    lineTraces.push({type: "scatter", mode: "lines", line: lineStyle, hoverinfo: "skip",
+                        x: [week + 0.5, week + 0.5], y: [weekday - 0.5, -0.5]});
+                }
+            }
+        }
+
+        var monthPositions = [];
+        var total = 0;
+        for (var m = 0; m < MONTH_DAYS.length; m++) {
+            total += MONTH_DAYS[m];
+            monthPositions.push((total - 15) / 7);
+        }
+
+        var heatmap = {
+            type: "heatmap",
+            x: x, y: y, z: z, text: text,
+            hovertemplate: "<b style='font-family: Helvetica Neue;'>%{z} sources read on %{text}</b>",
+            xgap: 3, ygap: 3,
+            showscale: false,
+            colorscale: [[0, "#eeeeee"], [1, color]],
+            hoverlabel: {align: "left"}
+        };
+
+        return {
+            data: [heatmap].concat(lineTraces),
+            layout: {
+                height: 260,
+                yaxis: {showline: false, showgrid: false, zeroline: false, tickmode: "array",
+                    ticktext: ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], tickvals: [0, 1, 2, 3, 4, 5, 6],
+                    autorange: "reversed"},
+                xaxis: {showline: false, showgrid: false, zeroline: false, tickmode: "array",
+                    ticktext: MONTH_NAMES, tickvals: monthPositions},
+                font: {size: 10, color: "#000000"},
+                plot_bgcolor: "#fff",
+                margin: {t: 40},
+                showlegend: false,
+                meta: {year: year, collection: collectionCode}
+            }
+        };
+    }
+
+    // Only recounts the heatmap cells of the days that changed in the last library sync:
+    function patchYearFigure(figure, dayIndex, year, collectionCode, keyFilter) {
+        var start = Date.UTC(year, 0, 1);
+        var heatmap = Object.assign({}, figure.data[0], {z: figure.data[0].z.slice()});
+
+        dayIndex.changed_dates.forEach(function (day) {
+            if (Number(day.slice(0, 4)) !== year) {
+                return;
+            }
+            var dayOfYear = Math.round((Date.UTC(year, Number(day.slice(5, 7)) - 1, Number(day.slice(8, 10))) - start) / DAY_MS);
+            heatmap.z[dayOfYear] = countDay(dayIndex, findDay(dayIndex.dates, day), collectionCode, keyFilter);
+        });
+
+        return Object.assign({}, figure, {data: [heatmap].concat(figure.data.slice(1))});
+    }
+
+    // Merges the compact delta of a library sync into the per-day index (see utils.build_day_index_delta):
+    function mergeDayIndex(dayIndex, delta) {
+        var removedKeys = {};
+        var changedDates = {};
+        delta.removed_keys.forEach(function (key) {
+            removedKeys[key] = true;
+        });
+
+        // The delta carries the current collections, existing items are re-coded against them:
+        var collections = delta.day_index.collections;
+        var recode = dayIndex.collections.keys.map(function (key) {
+            return collections.keys.indexOf(key);
+        });
+
+        var records = [];
+        function collect(index, isDelta) {
+            for (var position = 0; position < index.dates.length; position++) {
+                for (var i = index.offsets[position]; i < index.offsets[position + 1]; i++) {
+                    var removed = !isDelta && removedKeys[index.items.key[i]];
+                    if (isDelta || removed) {
+                        changedDates[index.dates[position]] = true;
+                    }
+                    if (removed) {
+                        continue;
+                    }
+                    var code = index.items.collection[i];
+                    records.push({date: index.dates[position], index: index, i: i,
+                        collection: !isDelta && code >= 0 ? recode[code] : code});
+                }
+            }
+        }
+        collect(dayIndex, false);
+        collect(delta.day_index, true);
+
+        // Stable sort by day so existing items keep their order:
+        records.forEach(function (record, order) {
+            record.order = order;
+        });
+        records.sort(function (a, b) {
+            return a.date < b.date ? -1 : (a.date > b.date ? 1 : a.order - b.order);
+        });
+
+        var merged = {dates: [], offsets: [], years: [], collections: collections, items: {}, changed_dates: Object.keys(changedDates)};
+        Object.keys(dayIndex.items).forEach(function (column) {
+            merged.items[column] = [];
+        });
+
+        var years = {};
+        dayIndex.years.forEach(function (year) {
+            years[year] = true;
+        });
+        records.forEach(function (record, position) {
+            if (merged.dates.length === 0 || merged.dates[merged.dates.length - 1] !== record.date) {
+                merged.dates.push(record.date);
+                merged.offsets.push(position);
+                years[Number(record.date.slice(0, 4))] = true;
+            }
+            Object.keys(merged.items).forEach(function (column) {
+                merged.items[column].push(column === "collection" ? record.collection : record.index.items[column][record.i]);
+            });
+        });
+        merged.offsets.push(records.length);
+        merged.years = Object.keys(years).map(Number).sort(function (a, b) {
+            return a - b;
+        });
+
+        return merged;
+    }
+
+    function component(namespace, type, props) {
+        return {namespace: namespace, type: type, props: props};
+    }
+
+    function dbc(type, props) {
+        return component("dash_bootstrap_components", type, props);
+    }
+
+    function html(type, props) {
+        return component("dash_html_components", type, props);
+    }
+
+    // Mirrors components/zotero_accordion.py::build_source_accordion from the compact item columns:
+    function buildSourceAccordion(dayIndex, i) {
+        var items = dayIndex.items;
+        var title = items.title[i];
+        var website = items.website[i];
+        var code = items.collection[i];
+        var collectionName = code >= 0 ? dayIndex.collections.names[code] : null;
+
+        var authors = items.creators[i].map(function (label) {
+            return dbc("Col", {children: dbc("Button", {children: label, color: "info", className: "me-1"})});
+        });
+        if (authors.length === 0) {
+            authors.push(dbc("Col", {children: dbc("Button", {children: "No Author Found", color: "info", className: "me-1"})}));
+        }
+
+        var body = html("Div", {children: [
+            dbc("Row", {children: [
+                dbc("Col", {children: html("A", {children: html("H3", {children: title}), href: items.url[i]}), width: 10}),
+                dbc("Col", {children: dbc("Button", {children: website, color: "dark", className: "me-1"}), width: 2})
+            ]}),
+            dbc("Row", {children: dbc("Col", {children: dbc("Button", {children: collectionName, color: "warning", className: "me-1"})})}),
+            dbc("Row", {children: authors, style: {"padding-top": "0.5rem", "padding-right": "0.5rem"}}),
+            dbc("Row", {children: dbc("Col", {children: items.abstract[i], style: {"padding-top": "1rem", "padding-bottom": "0.5rem"}})})
+        ]});
+
+        var accordionTitle = website === "No Source Found" ? title : website + ": " + title;
+
+        return dbc("AccordionItem", {children: body, title: accordionTitle});
+    }
+
+    // Converts the heatmap hover text ("03 Jan, 2022") into "2022-01-03":
+    function parseHeatmapText(value) {
+        var parts = value.replace(",", "").split(" ");
+        return parts[2] + "-" + pad(MONTH_NAMES.indexOf(parts[1]) + 1) + "-" + parts[0];
+    }
+
+    function collectionCodeFromKey(dayIndex, collectionKey) {
+        if (!collectionKey) {
+            return null;
+        }
+        var code = dayIndex.collections.keys.indexOf(collectionKey);
+        return code >= 0 ? code : null;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        zotero: {
+
+            // Populates the year and collection selectors once the day index is loaded:
+            heatmap_selector_options: function (dayIndex, currentYear) {
+                if (!dayIndex) {
+                    return [[], [], null];
+                }
+                var years = dayIndex.years.map(function (year) {
+                    return {label: String(year), value: year};
+                });
+                var collections = dayIndex.collections.keys.map(function (key, code) {
+                    return {label: dayIndex.collections.names[code], value: key};
+                });
+                // Keeping the selected year when the index is updated by a library sync:
+                if (currentYear && dayIndex.years.indexOf(currentYear) >= 0) {
+                    return [years, collections, window.dash_clientside.no_update];
+                }
+                return [years, collections, dayIndex.years[dayIndex.years.length - 1]];
+            },
+
+            // Renders the calendar heatmap for the selected year and (optional) highlighted collection:
+            render_heatmap: function (dayIndex, year, collectionKey, searchResults, figure) {
+                if (!dayIndex || !year) {
+                    return [{data: [], layout: {}}, "No Data Selected"];
+                }
+                var code = collectionCodeFromKey(dayIndex, collectionKey);
+                var keyFilter = searchKeyFilter(searchResults);
+                var triggered = window.dash_clientside.callback_context.triggered.map(function (trigger) {
+                    return trigger.prop_id;
+                });
+                var color = code === null ? "#76cf63" : "#f0ad4e";
+                var title = "Sources Read in " + year;
+                if (code !== null) {
+                    title = dayIndex.collections.names[code] + " Sources Read in " + year;
+                }
+                if (searchResults) {
+                    title = title + " matching '" + searchResults.query + "'";
+                }
+
+                // A library sync only changed the index, patching the cells of the changed days:
+                var onlySynced = triggered.length === 1 && triggered[0] === "heatmap_day_index.data" && dayIndex.changed_dates;
+                if (onlySynced && figure && figure.layout && figure.layout.meta &&
+                        figure.layout.meta.year === year && figure.layout.meta.collection === code) {
+                    return [patchYearFigure(figure, dayIndex, year, code, keyFilter), title];
+                }
+
+                return [buildYearFigure(dayIndex, year, code, keyFilter, color), title];
+            },
+
+            // Merges the changes found by a library sync into the per-day index:
+            apply_day_index_delta: function (delta, dayIndex) {
+                if (!delta || !dayIndex) {
+                    return window.dash_clientside.no_update;
+                }
+                return mergeDayIndex(dayIndex, delta);
+            },
+
+            // Lets the deferred homepage sections render once the heatmap has its day index:
+            homepage_sections_ready: function (dayIndex, ready) {
+                var dayIndexLoaded = Boolean(dayIndex);
+                if (dayIndexLoaded === Boolean(ready)) {
+                    return window.dash_clientside.no_update;
+                }
+                return dayIndexLoaded ? true : null;
+            },
+
+            // Highlights the collection clicked on the radar graph in the heatmap:
+            highlight_collection_from_radar: function (clickData, dayIndex) {
+                if (!clickData || !dayIndex) {
+                    return window.dash_clientside.no_update;
+                }
+                var code = dayIndex.collections.names.indexOf(clickData.points[0].theta);
+                return code >= 0 ? dayIndex.collections.keys[code] : null;
+            },
+
+            // Builds the accordion of sources read on the clicked day:
+            build_day_accordion: function (clickData, dayIndex, collectionKey, searchResults) {
+                if (!clickData || !dayIndex) {
+                    return [
+                        dbc("AccordionItem", {children: "Click on a data point on the heatmap to see sources read for that day.", title: "No Date Selected"}),
+                        "Select a Date on the Heatmap"
+                    ];
+                }
+                var day = parseHeatmapText(clickData.points[0].text);
+                var position = findDay(dayIndex.dates, day);
+                var code = collectionCodeFromKey(dayIndex, collectionKey);
+                var keyFilter = searchKeyFilter(searchResults);
+                var accordionItems = [];
+
+                if (position >= 0) {
+                    for (var i = dayIndex.offsets[position]; i < dayIndex.offsets[position + 1]; i++) {
+                        if (itemMatches(dayIndex, i, code, keyFilter)) {
+                            accordionItems.push(buildSourceAccordion(dayIndex, i));
+                        }
+                    }
+                }
+
+                return [accordionItems, "Sources read on " + day];
+            }
+        }
+    });
+})();
@@ -1,24 +1,30 @@
 # Importing dash methods:
 import dash
-from dash import dcc, html, callback
-from dash.dependencies import Input, Output
+from dash import dcc, html, callback, clientside_callback, ClientsideFunction, ctx, Patch
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from dash import no_update
 import dash_bootstrap_components as dbc
 
 import plotly.graph_objs as go
-import plotly.express as px
-
-# Data management packages:
-import datetime
 
 # Importing display methods:
 from utils import (
-    build_heatmap_from_collection, extract_zotero_items_for_date, create_collection_counts, plot_collections_count_radar_figure, 
-    create_collection_timeseries_df, plot_collection_timeseries, plot_total_item_timeseries
+    plot_collections_count_radar_figure, 
+    plot_total_item_timeseries, build_day_index, plot_single_collection_timeseries,
+    build_timeseries_figure_patch,
+    get_cached_search_index, search_library, filter_items_by_search, get_cached_creator_analytics,
+    build_sharded_aggregates, sharded_collection_counts, sharded_collection_timeseries_df,
+    get_rollup_version, query_rollup_collection_counts, query_rollup_timeseries_df,
+    compute_top_creators_over_time, get_top_creator_coauthorship, plot_top_creators_timeseries, plot_coauthorship_heatmap,
+    get_cached_reading_analytics, plot_rolling_reading_averages, build_reading_stat_cards, build_year_over_year_table,
+    get_cached_figure, get_cached_tag_analytics, compute_top_tags_over_time, compute_tag_collection_counts,
+    plot_top_tags_timeseries, plot_tag_heatmap, get_cached_collection_item_index, get_collection_tree,
+    build_collection_heatmap_grid, display_year, sharded_source_array, load_libraries, get_merged_library_aggregates,
+    get_merged_library_key, authorize_library, get_authorized_library, get_or_build_library_aggregate, get_current_library,
+    cache_timeseries_df, apply_cached_timeseries_delta
 )
 
-# Importing the component methods:
-from components import build_source_accordion
-
 dash.register_page(
     __name__,
     path='/',
@@ -31,190 +37,528 @@ def layout():
 
             html.Div([
             
+            # Compact per-day index used by the clientside heatmap callbacks:
+            dcc.Store(id="heatmap_day_index"),
+
+            # Keys of the items matching the library search, used to filter the heatmap:
+            dcc.Store(id="search_results"),
+
+            # Library Search Components:
+            dbc.Row([
+                dbc.Col(dbc.Input(
+                    id="library_search", 
+                    type="search", 
+                    debounce=True,
+                    placeholder='Search titles, abstracts, creators and tags eg: energ* "carbon pricing"'))
+            ], style={"padding-top":"2rem"}),
+
             # Top Heatmap Components:
-            html.H3(style={"padding-top":"2rem"}, id="heatmap_title"),
+            dbc.Row([
+                dbc.Col(html.H3(id="heatmap_title"), width=6),
+                dbc.Col(dcc.Dropdown(id="heatmap_year", clearable=False, placeholder="Year"), width=2),
+                dbc.Col(dcc.Dropdown(id="heatmap_collection", placeholder="Highlight a collection"), width=4)
+            ], style={"padding-top":"2rem"}, align="center"),
             dcc.Graph("main_heatmap"),
             html.H4(id="heatmap_accordion_title"),
             dbc.Accordion(id="main_heatmap_accordion", flush=True, always_open=True, start_collapsed=True),
+
+            # Reading Streak and Velocity Components:
+            dbc.Row(id="reading_stat_cards", style={"padding-top":"1rem"}),
+            dbc.Row([
+                dbc.Col([
+                    html.H5("Rolling average of sources read per day", style={"padding-bottom":"0.25rem"}),
+                    dcc.Graph(id="rolling_reading_averages")
+                ], width=8),
+                dbc.Col([
+                    html.H5("Sources read this year to date vs last year", style={"padding-bottom":"0.25rem"}),
+                    html.Div(id="year_over_year_table")
+                ], width=4)
+            ], style={"padding-top":"1rem"}),
             html.Hr(),
             
-            # Sources Count Components:
-            dbc.Row([
+            # Sections below the heatmap, only rendered once their tab is opened (see render_homepage_section):
+            dcc.Store(id="homepage_sections_ready"),
+            dcc.Store(id="collections_section_rendered", data={}),
+            dcc.Store(id="total_sources_section_rendered", data={}),
+            dcc.Store(id="creators_section_rendered", data={}),
+            dcc.Store(id="tags_section_rendered", data={}),
+            dcc.Store(id="collection_calendars_section_rendered", data={}),
+            dcc.Store(id="all_libraries_section_rendered", data={}),
+            dbc.Tabs(id="homepage_sections", active_tab="collections_section", children=[
 
+                # Sources Count Components:
+                dbc.Tab(label="Collections", tab_id="collections_section", children=[
+                    dbc.Row([
+                        dbc.Col([
+                            html.H4("Breakdown of sources read by category", style={"padding-bottom":"0.25rem"})
+                        ])], style={"padding-top":"1rem"}),
 
-                dbc.Row([
-                    dbc.Col([
-                        html.H4("Breakdown of sources read by category", style={"padding-bottom":"0.25rem"})
-                    ])]),
+                    dbc.Row([
+                        dbc.Col([
+                            dcc.Loading(dcc.Graph(id="source_radar"))], width=6),
 
-                dbc.Row([
-                    dbc.Col([
-                        dcc.Graph(id="source_radar")], width=6),
+                        dbc.Col([dcc.Loading(dcc.Graph(id="source_timeseries"))], width=6)
+                        ])
+                ]),
 
-                    dbc.Col([dcc.Graph(id="source_timeseries")], width=6)
-                    ])
-                ], style={"padding-top":"0.5rem"}),
-                html.Hr(),
+                dbc.Tab(label="Total Sources", tab_id="total_sources_section", children=[
+                    dbc.Row([
+                        dbc.Col([
+                            html.H4("Total sources read overtime", style={"padding-bottom":"0.25rem"}),
+                            dcc.Loading(dcc.Graph(id="total_items_timeseries"))
+                        ])
+                    ], style={"padding-top":"1rem"})
+                ]),
+
+                # Creator Analytics Components:
+                dbc.Tab(label="Creators", tab_id="creators_section", children=[
+                    dbc.Row([
+                        dbc.Col([
+                            html.H4("Most read creators overtime", style={"padding-bottom":"0.25rem"}),
+                            dcc.Loading(dcc.Graph(id="top_creators_timeseries"))
+                        ], width=6),
+                        dbc.Col([
+                            html.H4("Co-authorship of the most read creators", style={"padding-bottom":"0.25rem"}),
+                            dcc.Loading(dcc.Graph(id="coauthorship_heatmap"))
+                        ], width=6)
+                    ], style={"padding-top":"1rem"})
+                ]),
+
+                # Tag Analytics Components:
+                dbc.Tab(label="Tags", tab_id="tags_section", children=[
+                    dbc.Row([
+                        dbc.Col([
+                            html.H4("Most used tags overtime", style={"padding-bottom":"0.25rem"}),
+                            dcc.Loading(dcc.Graph(id="top_tags_timeseries"))
+                        ], width=6),
+                        dbc.Col([
+                            html.H4("Most used tags by collection", style={"padding-bottom":"0.25rem"}),
+                            dcc.Loading(dcc.Graph(id="tag_heatmap"))
+                        ], width=6)
+                    ], style={"padding-top":"1rem"})
+                ]),
 
-                dbc.Row([
-                    dbc.Col([
-                        html.H4("Total sources read overtime", style={"padding-bottom":"0.25rem"}),    
-                        dcc.Graph(id="total_items_timeseries")
+                # Collection Small Multiples Components:
+                dbc.Tab(label="Collection Calendars", tab_id="collection_calendars_section", children=[
+                    dbc.Row([
+                        dbc.Col([
+                            html.H4(id="collection_calendars_title", style={"padding-bottom":"0.25rem"}),
+                            dcc.Loading(dcc.Graph(id="collection_calendars"))
+                        ])
+                    ], style={"padding-top":"1rem"})
+                ]),
+
+                # Combined User and Group Libraries Components:
+                dbc.Tab(label="All Libraries", tab_id="all_libraries_section", children=[
+                    dbc.Row([
+                        dbc.Col([
+                            html.H4(id="all_libraries_title", style={"padding-bottom":"0.25rem"}),
+                            html.Div(id="all_libraries_summary"),
+                            dcc.Loading(dcc.Graph(id="all_libraries_heatmap"))
+                        ])
+                    ], style={"padding-top":"1rem"}),
+                    dbc.Row([
+                        dbc.Col([dcc.Loading(dcc.Graph(id="all_libraries_radar"))], width=6),
+                        dbc.Col([dcc.Loading(dcc.Graph(id="all_libraries_timeseries"))], width=6)
                     ])
+                ])
             ])
 
         ])
     ])
 
-# Callback that generates the graph from the collection data stored in the browser session:
+# Callback that builds the compact per-day index from the server side cache of the library:
 @callback(
-    Output("main_heatmap", "figure"),
-    Output("heatmap_title", "children"),
-    Input("main_zotero_collection", "data")
+    Output("heatmap_day_index", "data"),
+    Input("all_zotero_collections", "data"),
+    State("library_version", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value")
 )
-def generate_heatmap(data):
-    """The method that takes the zotero collection data and builds the plotly heatmap via 
-    existing zotero data methods.
+def generate_heatmap_day_index(collections, version, library_id, api_key):
+    """The method that builds the compact per-day index that the clientside heatmap callbacks
+    render from, out of the cached items of the library.
+
+    This is the only part of the heatmap that runs on the server. It runs once per library load
+    (the collections are only written to the browser session by a full load), every day selection,
+    year switch and collection highlight is then handled in the browser and library syncs are
+    merged into the index by the clientside apply_day_index_delta callback.
 
     Args:
-        data (list): The JSON list of the zotero collection data
+        collections (lst): The list of collection data.
 
-    Return:
-        figure: A plotly.graph_obj heatmap
+        version (int): The zotero library version of the data in the browser session.
 
-        str: The string used to format the heatmap title
+        library_id (int): The zotero API user ID.
 
-    """
-    if data != None:
-        
-        # Setting the year used to build all the datasets:
-        year = datetime.datetime.now().year
-
-        # Generating heatmap from browser session zotero collection:
-        heatmap = build_heatmap_from_collection(data, year=year)
+        api_key (str): The zotero API user key.
 
-        title_string = f"Sources Read in {year}"
+    Return:
+        dict: The per-day index built by utils.build_day_index
 
-        return heatmap, title_string
+    """
+    if collections != None and version != None and library_id != None and api_key != None:
+        library = get_session_library(library_id, api_key, version)
+        return build_day_index(library["items"], library["collections"])
 
     else:
-        return go.Figure(), "No Data Selected"
+        return None
 
-# Callback that generates a collapsable list of data on a single day from a specific click event:
+# Callback that runs the library search against the server side search index:
 @callback(
-    Output("main_heatmap_accordion", "children"),
-    Output("heatmap_accordion_title", "children"),
-    Input("main_heatmap", "clickData"),
-    Input("main_zotero_collection", "data"),
-    Input("all_zotero_collections", "data")
+    Output("search_results", "data"),
+    Input("library_search", "value"),
+    Input("library_version", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value")
 )
-def build_accordion_from_heatmap_daily_point(clickData, data, collections):
-    """The callback that builds and returns the children for the accordion component
-    that displays information about the sources returned  for a single day given an 
-    on click event from the heatmap. 
-    
-    It also returns frontend styling infomration for other assocaited components. 
+def search_zotero_library(query, version, library_id, api_key):
+    """The callback that queries the search index of the library and writes the keys of the
+    matching items to the browser session so the clientside heatmap callbacks can filter on them.
 
     Args:
-        clickData (dict): The dict of a single zotero item that contains a date.
+        query (str): The search query (see utils.search_library).
 
-        data (lst): The list of zotero item data.
+        version (int): The library version in the browser session, used to re-run the search
+            after a library sync.
 
-        collections (lst): The list of collection data.
+        library_id (int): The zotero API user ID.
 
-    Return:
+        api_key (str): The zotero API user key.
+
+    Returns:
+        dict|None: The search query and the sorted list of matching item keys, or None if there
+            is no query.
+
+    """
+    if not query or version == None or library_id == None or api_key == None:
+        return None
+
+    search_index = get_cached_search_index(api_key=api_key, library_id=library_id)
+    matching_keys = search_library(search_index, query)
+    if matching_keys == None:
+        return None
+
+    return {"query": query, "keys": sorted(matching_keys)}
+
+def get_session_library(library_id, api_key, version):
+    """The method returns the cached library the server side callbacks of a session read the items
+    from, so that the items stored in the browser session are never sent back to the server.
+
+    The cache is synced first if it is behind the version of the browser session (eg: another
+    server process handled the last sync), it can also be ahead of it if the background refresh
+    already applied changes the session has not synced yet.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
 
-        abc.AccordionItem: A list of dbc.AccordionItems generated from zotero sources from the date
-            value provided.
+        version (int): The zotero library version of the data in the browser session.
 
-        str: A string for the title of the heatmap accordion.
+    Returns:
+        dict: The cache entry (see load_library) at the version of the browser session or a later one.
 
     """
-    # Extracting the point data from the heatmap:
-    if clickData == None:
-        return dbc.AccordionItem("Click on a data point on the heatmap to see sources read for that day.", title="No Date Selected"), "Select a Date on the Heatmap"
-    
-    else:
-        
-        # Extracting the date value from the heatmap click:
-        date_value = datetime.datetime.strptime(clickData["points"][0]["text"], '%d %b, %Y').strftime("%Y-%m-%d")
-        #print(date_value)
+    library = get_authorized_library(api_key=api_key, library_id=library_id)
+    if version != None and library["version"] < version:
+        library = get_current_library(api_key=api_key, library_id=library_id)
 
-        # Extracting the main zotero collection from browser session and filtering it based on the provided date vale:
-        day_sources = extract_zotero_items_for_date(collection=data, date=date_value)
-        #print(day_sources)
+    return library
 
-        # Iterating over all the sources for the day and building dbc.AccordionItems:
-        accordion_items = [build_source_accordion(source, collections) for source in day_sources]
-        
-        # Building the accordion item title:
-        accordion_title = f"Sources read on {date_value}"
+def filter_items_by_library_search(items, query, library_id, api_key):
+    """The method filters the zotero items used to build the homepage charts down to the items
+    matching the library search.
+
+    Args:
+        items (lst): The list of zotero item data.
+
+        query (str): The search query.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        lst: The zotero items matching the search or all items if there is no query.
+
+    """
+    if not query or library_id == None or api_key == None:
+        return items
+
+    search_index = get_cached_search_index(api_key=api_key, library_id=library_id)
+
+    return filter_items_by_search(items, search_index, query)
+
+def library_rollups_available(query, library_id, api_key, version):
+    """The method checks whether the homepage charts can be read from the SQLite rollups, ie: there
+    is no search filtering the items, the rollups are at the version of the browser session and the
+    key of the session can read the library.
+
+    Args:
+        query (str): The search query.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        version (int): The zotero library version of the data in the browser session.
+
+    Returns:
+        bool: Whether the rollups can be queried.
+
+    """
+    if query or library_id == None or api_key == None or version == None:
+        return False
+
+    if get_rollup_version(library_id) != version:
+        return False
+
+    authorize_library(api_key, library_id)
+
+    return True
+
+def get_library_sharded_aggregates(query, library_id, api_key, version):
+    """The method returns the sharded aggregates the homepage charts are built from when the rollups
+    can't be used, reusing the daily aggregates of the server side cache (kept up to date by the
+    library syncs) when there is no search and otherwise aggregating the cached items matching it.
+
+    The collections are read from the same cache entry as the aggregates, as the cache can be ahead
+    of the collections stored in the browser session (which only change on a full load).
+
+    Args:
+        query (str): The search query.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        version (int): The zotero library version of the data in the browser session.
 
-        accordion_content = accordion_items
+    Returns:
+        dict|None: The aggregates built by build_sharded_aggregates or None if no item matches the search.
+
+        lst: The list of collection data of the cached library.
+
+        int: The library version the aggregates were built for (see get_session_library).
+
+    """
+    library = get_session_library(library_id, api_key, version)
+    if not query:
+        return get_or_build_library_aggregate(library_id, "daily_aggregates"), library["collections"], library["version"]
+
+    items = filter_items_by_library_search(library["items"], query, library_id, api_key)
+    if len(items) == 0:
+        return None, library["collections"], library["version"]
+
+    return build_sharded_aggregates(items, library["collections"]), library["collections"], library["version"]
+
+def render_homepage_section(section, graph, active_tab, sections_ready, rendered_sections, render_key):
+    """The method decides whether a graph of a homepage section is rendered by its callback.
+
+    The sections below the heatmap are only rendered while their tab is open and once the heatmap
+    day index has been built, so the heatmap is never queued behind them. Re-opening a tab only
+    renders its graphs again if the data changed since they were last rendered.
+
+    Args:
+        section (str): The tab_id of the section the graph is displayed in.
+
+        graph (str): The id of the graph (or group of graphs) rendered by the callback.
+
+        active_tab (str): The tab_id of the open section.
+
+        sections_ready (bool|None): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of every graph of the section when it was last rendered.
+
+        render_key (lst): The library version and the parameters (eg: the search query) the graph is rendered for.
+
+    Returns:
+        bool: Whether the graph has to be rendered.
+
+    """
+    if not sections_ready or active_tab != section:
+        return False
+
+    # Switching tabs (or the heatmap becoming ready) only renders the graphs that are out of date:
+    if ctx.triggered_id in ("homepage_sections", "homepage_sections_ready"):
+        return (rendered_sections or {}).get(graph, None) != render_key
+
+    return True
+
+def mark_section_rendered(graph, render_key):
+    """The method records the data a graph was rendered for in the store of its section
+    (see render_homepage_section).
+
+    Args:
+        graph (str): The id of the graph (or group of graphs) rendered by the callback.
+
+        render_key (lst): The library version and the parameters (eg: the search query) the graph is rendered for.
+
+    Returns:
+        dash.Patch: The partial update of the '<section>_rendered' store.
+
+    """
+    rendered_sections = Patch()
+    rendered_sections[graph] = render_key
+
+    return rendered_sections
+
+# Clientside callbacks (assets/clientside_callbacks.js) for the interactive parts of the heatmap:
+clientside_callback(
+    ClientsideFunction(namespace="zotero", function_name="homepage_sections_ready"),
+    Output("homepage_sections_ready", "data"),
+    Input("heatmap_day_index", "data"),
+    State("homepage_sections_ready", "data")
+)
+
+clientside_callback(
+    ClientsideFunction(namespace="zotero", function_name="heatmap_selector_options"),
+    Output("heatmap_year", "options"),
+    Output("heatmap_collection", "options"),
+    Output("heatmap_year", "value"),
+    Input("heatmap_day_index", "data"),
+    State("heatmap_year", "value")
+)
+
+clientside_callback(
+    ClientsideFunction(namespace="zotero", function_name="render_heatmap"),
+    Output("main_heatmap", "figure"),
+    Output("heatmap_title", "children"),
+    Input("heatmap_day_index", "data"),
+    Input("heatmap_year", "value"),
+    Input("heatmap_collection", "value"),
+    Input("search_results", "data"),
+    State("main_heatmap", "figure")
+)
 
-        return accordion_content, accordion_title
+clientside_callback(
+    ClientsideFunction(namespace="zotero", function_name="highlight_collection_from_radar"),
+    Output("heatmap_collection", "value"),
+    Input("source_radar", "clickData"),
+    State("heatmap_day_index", "data")
+)
+
+clientside_callback(
+    ClientsideFunction(namespace="zotero", function_name="build_day_accordion"),
+    Output("main_heatmap_accordion", "children"),
+    Output("heatmap_accordion_title", "children"),
+    Input("main_heatmap", "clickData"),
+    Input("heatmap_day_index", "data"),
+    Input("heatmap_collection", "value"),
+    Input("search_results", "data")
+)
 
 # Callback that creates and populates the Collection breakdown plots based on zotero sources and collections:
 @callback(
     Output("collection_breakdown_date_picker", "min_date_allowed"),
-    Input("main_zotero_collection", "data")
+    Input("library_version", "data")
 )
-def format_datepicker_based_on_dataset(data):
+def format_datepicker_based_on_dataset(version):
     """The method that formats the collection breakdown datepicker based on the date ranges avalible
-    provided by the the main collections dataset from the browser session.
+    in the library loaded by the browser session.
 
     Args:
-        data (list): The JSON list of the zotero collection data
+        version (int): The zotero library version of the data in the browser session.
 
     Returns:
 
         str: The minium date allowed by the datepicker
     """
     #TODO: Write this method lol:
-    if data != None:
+    if version != None:
         pass
         
 
 @callback(
     Output("source_radar", "figure"),
-    Input("main_zotero_collection", "data"),
-    Input("all_zotero_collections", "data")
+    Output("collections_section_rendered", "data", allow_duplicate=True),
+    Input("library_version", "data"),
+    Input("all_zotero_collections", "data"),
+    Input("library_search", "value"),
+    Input("homepage_sections", "active_tab"),
+    Input("homepage_sections_ready", "data"),
+    State("collections_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    prevent_initial_call="initial_duplicate"
 ) 
-def build_radial_graph_breakdown(data, collections):
+def build_radial_graph_breakdown(
+    version, collections, query=None, active_tab=None, sections_ready=None, rendered_sections=None,
+    library_id=None, api_key=None):
     """The callback that builds the radial graphs.
 
-    The method relies on the two browser session data stores containing all zotero items and collections.
+    The method counts the items of the collections from the server side cache of the library, it is
+    rendered again whenever the library version changes.
         
     Args:
-        data (lst): The list of zotero item data.
+        version (int): The zotero library version of the data in the browser session.
 
         collections (lst): The list of collection data.
 
+        query (str): The library search query used to filter the items.
+
+        active_tab (str): The tab_id of the open homepage section.
+
+        sections_ready (bool): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of the graphs of the section (see render_homepage_section).
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
     Returns:
         go.Figure: The Radial Graph.
 
+        dash.Patch: The render key of the radial graph.
+
     """
-    if data != None and collections != None:
-        # Transforming collection data into radial format:
-        collection_count_df = create_collection_counts(data, collections, cutoff=20)    
+    if version != None and collections != None and library_id != None and api_key != None:
+
+        render_key = [version, query or None]
+        if not render_homepage_section("collections_section", "source_radar", active_tab, sections_ready, rendered_sections, render_key):
+            raise PreventUpdate
+        rendered = mark_section_rendered("source_radar", render_key)
+
+        # Transforming collection data into radial format (the cutoff is dropped for search results):
+        if library_rollups_available(query, library_id, api_key, version):
+            collection_count_df = query_rollup_collection_counts(library_id, collections, cutoff=20)
+        else:
+            aggregates, library_collections, _ = get_library_sharded_aggregates(query, library_id, api_key, version)
+            if aggregates == None:
+                return go.Figure(), rendered
+            collection_count_df = sharded_collection_counts(aggregates, library_collections, cutoff=20 if not query else 0)    
+        if len(collection_count_df) == 0:
+            return go.Figure(), rendered
         
         # Generating the Radar plot:
         r = collection_count_df["count"].tolist()
         theta = collection_count_df["name"].tolist()    
         radar_graph = plot_collections_count_radar_figure(r, theta)
 
-        return radar_graph
+        return radar_graph, rendered
     
     else:
-        return go.Figure()
+        return go.Figure(), no_update
 
 @callback(
     Output("source_timeseries", "figure"),
+    Output("collections_section_rendered", "data", allow_duplicate=True),
     Input("source_radar", "clickData"),
-    Input("main_zotero_collection", "data"),
-    Input("all_zotero_collections", "data")
+    Input("all_zotero_collections", "data"),
+    Input("library_search", "value"),
+    Input("homepage_sections", "active_tab"),
+    Input("homepage_sections_ready", "data"),
+    State("collections_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    State("library_version", "data"),
+    prevent_initial_call="initial_duplicate"
 )
-def build_single_collection_timeseries(clickData=None, items=None, collections=None):
+def build_single_collection_timeseries(
+    clickData=None, collections=None, query=None, active_tab=None, sections_ready=None,
+    rendered_sections=None, library_id=None, api_key=None, version=None):
     """The method that takes in a collection name as click data from the radial graph and
     creates a timeseries displaying the number of sources read for that particular collection
     per day
@@ -222,91 +566,593 @@ def build_single_collection_timeseries(clickData=None, items=None, collections=N
     Args:
         clickData (dict): The JSON of click data returned from the radial plot.
 
-        items (lst): The list of zotero item data.
-
         collections (lst): The list of collection data.
 
+        query (str): The library search query used to filter the items.
+
+        active_tab (str): The tab_id of the open homepage section.
+
+        sections_ready (bool): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of the graphs of the section (see render_homepage_section).
+
+        library_id (int): The zotero API user ID used to cache the timeseries for library syncs.
+
+        api_key (str): The zotero API user key.
+
+        version (int): The zotero library version of the data in the browser session.
+
     Returns:
         go.Figure: The timeseries displaying the number of sources read for that particular collection
 
+        dash.Patch: The render key of the timeseries.
+
     """
     # Extracting the collection data from the radial clickData:
-    if clickData != None:
+    if clickData != None and collections != None and library_id != None and api_key != None:
+
         collection_name = clickData["points"][0]["theta"]
+        render_key = [version, query or None, collection_name]
+        if not render_homepage_section(
+            "collections_section", "source_timeseries", active_tab, sections_ready, rendered_sections, render_key):
+            raise PreventUpdate
         
         collection = [collection for collection in collections if collection["data"]["name"] == collection_name]
-        
+
         # Creating a timeseries dataset from the collection:
         # TODO: Add date functionality:
-        timeseries_df = create_collection_timeseries_df(items, collection).cumsum()
+        if library_rollups_available(query, library_id, api_key, version):
+            rendered_version = version
+            timeseries_df = query_rollup_timeseries_df(library_id, collection).cumsum()
+        else:
+            aggregates, library_collections, rendered_version = get_library_sharded_aggregates(query, library_id, api_key, version)
+            if aggregates == None:
+                return go.Figure(), mark_section_rendered("source_timeseries", render_key)
+
+            collection = [collection for collection in library_collections if collection["data"]["name"] == collection_name]
+            timeseries_df = sharded_collection_timeseries_df(aggregates, collection).cumsum()
+
+        # The render key records the version the figure was built for, which the library sync patches start from:
+        rendered = mark_section_rendered("source_timeseries", [rendered_version, query or None, collection_name])
+
+        # Search results are not patched by library syncs, they are rebuilt when the search re-runs:
+        if not query:
+            cache_timeseries_df(library_id, f"source_timeseries:{collection_name}", rendered_version, timeseries_df)
 
         # Create a timeseries from the dataframe:
-        timeseries_fig = px.area(timeseries_df, x=timeseries_df.index, y=timeseries_df.columns)
-        #timeseries_fig = plot_collection_timeseries(timeseries_df)
-
-        # Custom figure formatting:
-        timeseries_fig.update_layout(
-            title=f"Total Sources Read for {collection_name}",
-            yaxis_title="Source Read",
-            xaxis_title="",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            showlegend=False
-
-        )
-        timeseries_fig.update_layout(
-            xaxis=dict(showgrid=False, showline=True, linecolor="black"),
-            yaxis=dict(showgrid=False, showline=True, linecolor="black")
-        )
-
-        return timeseries_fig
+        timeseries_fig = plot_single_collection_timeseries(timeseries_df, collection_name)
+
+        return timeseries_fig, rendered
 
     else:
         # Displaying an empty timeseries figure:
         fig = go.Figure()
 
-        return fig
+        return fig, no_update
         
 @callback(
     Output("total_items_timeseries", "figure"),
-    Input("main_zotero_collection", "data"),
-    Input("all_zotero_collections", "data")
+    Output("total_sources_section_rendered", "data", allow_duplicate=True),
+    Input("all_zotero_collections", "data"),
+    Input("library_search", "value"),
+    Input("homepage_sections", "active_tab"),
+    Input("homepage_sections_ready", "data"),
+    State("total_sources_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    State("library_version", "data"),
+    prevent_initial_call="initial_duplicate"
 )        
-def build_total_collection_timeseries(items, collections):
+def build_total_collection_timeseries(
+    collections, query=None, active_tab=None, sections_ready=None, rendered_sections=None,
+    library_id=None, api_key=None, version=None):
     """The method plots the total number of sources read as a timeseries.
 
-    Args:
-        items (lst): The list of zotero item data.
+    Library syncs patch the figure (see update_timeseries_from_library_delta), it is only rendered
+    again when the library is fully loaded (ie: the collections in the browser session change).
 
+    Args:
         collections (lst): The list of collection data.
 
+        query (str): The library search query used to filter the items.
+
+        active_tab (str): The tab_id of the open homepage section.
+
+        sections_ready (bool): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of the graphs of the section (see render_homepage_section).
+
+        library_id (int): The zotero API user ID used to cache the timeseries for library syncs.
+
+        api_key (str): The zotero API user key.
+
+        version (int): The zotero library version of the data in the browser session.
+
     Returns:
         go.Figure: The timeseries displaying the number of sources read.
 
+        dash.Patch: The render key of the timeseries.
+
     """
-    if items != None and collections != None:
+    if collections != None and library_id != None and api_key != None:
+
+        render_key = [version, query or None]
+        if not render_homepage_section(
+            "total_sources_section", "total_items_timeseries", active_tab, sections_ready, rendered_sections, render_key):
+            raise PreventUpdate
+
         # Creating a dataframe from items:
-        total_items_df = create_collection_timeseries_df(items, collections).cumsum()
+        if library_rollups_available(query, library_id, api_key, version):
+            rendered_version = version
+            total_items_df = query_rollup_timeseries_df(library_id, collections).cumsum()
+        else:
+            aggregates, library_collections, rendered_version = get_library_sharded_aggregates(query, library_id, api_key, version)
+            if aggregates == None:
+                return go.Figure(), mark_section_rendered("total_items_timeseries", render_key)
+
+            total_items_df = sharded_collection_timeseries_df(aggregates, library_collections).cumsum()
+
+        # The render key records the version the figure was built for, which the library sync patches start from:
+        rendered = mark_section_rendered("total_items_timeseries", [rendered_version, query or None])
+        if not query:
+            cache_timeseries_df(library_id, "total_items_timeseries", rendered_version, total_items_df)
             
         # Plotting the timeseries based on dataframe:
-        total_item_fig = px.area(total_items_df, x=total_items_df.index, y=total_items_df.columns)
-
-        # Customizing the figure:
-        total_item_fig.update_layout(
-            yaxis_title="Source Read",
-            xaxis_title="",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            
-            xaxis=dict(showgrid=False, showline=True, linecolor="black"),
-            yaxis=dict(showgrid=False, showline=True, linecolor="black"),
+        total_item_fig = plot_total_item_timeseries(total_items_df)
 
-            legend=dict(title="Categories")
-        )
-
-        return total_item_fig
+        return total_item_fig, rendered
     
     else:
-        return go.Figure()
-    
-    
\ No newline at end of file
+        return go.Figure(), no_update
+
+@callback(
+    Output("top_creators_timeseries", "figure"),
+    Output("coauthorship_heatmap", "figure"),
+    Output("creators_section_rendered", "data", allow_duplicate=True),
+    Input("library_version", "data"),
+    Input("homepage_sections", "active_tab"),
+    Input("homepage_sections_ready", "data"),
+    State("creators_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    prevent_initial_call="initial_duplicate"
+)
+def build_creator_analytics_figures(version, active_tab, sections_ready, rendered_sections, library_id, api_key):
+    """The callback that plots the most read creators per year and the co-authorship between them
+    from the cached creator analytics of the library.
+
+    Args:
+        version (int): The library version in the browser session, used to trigger the callback
+            once the library has been loaded or synced.
+
+        active_tab (str): The tab_id of the open homepage section.
+
+        sections_ready (bool): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of the graphs of the section (see render_homepage_section).
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        orjson.Fragment: The number of sources read per year for the most read creators.
+
+        orjson.Fragment: The co-authorship heatmap of the most read creators.
+
+        dash.Patch: The render key of the figures.
+
+    """
+    if version == None or library_id == None or api_key == None:
+        return go.Figure(), go.Figure(), no_update
+
+    render_key = [version, None]
+    if not render_homepage_section("creators_section", "creator_analytics", active_tab, sections_ready, rendered_sections, render_key):
+        raise PreventUpdate
+    rendered = mark_section_rendered("creator_analytics", render_key)
+
+    creator_analytics = get_cached_creator_analytics(api_key=api_key, library_id=library_id)
+    if creator_analytics["matrix"].shape[1] == 0:
+        return go.Figure(), go.Figure(), rendered
+
+    # Both figures are only built and serialized once per library version:
+    return (
+        get_cached_figure(
+            library_id,
+            "top_creators_timeseries",
+            lambda: plot_top_creators_timeseries(compute_top_creators_over_time(creator_analytics, top_n=10))),
+        get_cached_figure(
+            library_id,
+            "coauthorship_heatmap",
+            lambda: plot_coauthorship_heatmap(
+                get_top_creator_coauthorship(creator_analytics, creator_analytics["coauthorship"], top_n=15))),
+        rendered)
+
+@callback(
+    Output("top_tags_timeseries", "figure"),
+    Output("tag_heatmap", "figure"),
+    Output("tags_section_rendered", "data", allow_duplicate=True),
+    Input("library_version", "data"),
+    Input("homepage_sections", "active_tab"),
+    Input("homepage_sections_ready", "data"),
+    State("tags_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    prevent_initial_call="initial_duplicate"
+)
+def build_tag_analytics_figures(version, active_tab, sections_ready, rendered_sections, library_id, api_key):
+    """The callback that plots the most used tags per year and per collection from the cached
+    tag matrix of the library.
+
+    Args:
+        version (int): The library version in the browser session, used to trigger the callback
+            once the library has been loaded or synced.
+
+        active_tab (str): The tab_id of the open homepage section.
+
+        sections_ready (bool): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of the graphs of the section (see render_homepage_section).
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        orjson.Fragment: The number of sources read per year for the most used tags.
+
+        orjson.Fragment: The heatmap of the most used tags by collection.
+
+        dash.Patch: The render key of the figures.
+
+    """
+    if version == None or library_id == None or api_key == None:
+        return go.Figure(), go.Figure(), no_update
+
+    render_key = [version, None]
+    if not render_homepage_section("tags_section", "tag_analytics", active_tab, sections_ready, rendered_sections, render_key):
+        raise PreventUpdate
+    rendered = mark_section_rendered("tag_analytics", render_key)
+
+    tag_analytics = get_cached_tag_analytics(api_key=api_key, library_id=library_id)
+    if tag_analytics["matrix"].shape[1] == 0:
+        return go.Figure(), go.Figure(), rendered
+
+    return (
+        get_cached_figure(
+            library_id,
+            "top_tags_timeseries",
+            lambda: plot_top_tags_timeseries(compute_top_tags_over_time(tag_analytics, top_n=10))),
+        get_cached_figure(
+            library_id,
+            "tag_heatmap",
+            lambda: plot_tag_heatmap(compute_tag_collection_counts(tag_analytics, top_n=15))),
+        rendered)
+
+@callback(
+    Output("collection_calendars", "figure"),
+    Output("collection_calendars_title", "children"),
+    Output("collection_calendars_section_rendered", "data", allow_duplicate=True),
+    Input("library_version", "data"),
+    Input("heatmap_year", "value"),
+    Input("homepage_sections", "active_tab"),
+    Input("homepage_sections_ready", "data"),
+    State("collection_calendars_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    prevent_initial_call="initial_duplicate"
+)
+def build_collection_calendars(version, year, active_tab, sections_ready, rendered_sections, library_id, api_key):
+    """The callback that plots the calendar heatmaps of the most read collections side by side
+    for the year selected on the main heatmap.
+
+    Args:
+        version (int): The library version in the browser session, used to trigger the callback
+            once the library has been loaded or synced.
+
+        year (int): The year selected on the main heatmap.
+
+        active_tab (str): The tab_id of the open homepage section.
+
+        sections_ready (bool): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of the graphs of the section (see render_homepage_section).
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        orjson.Fragment: The grid of collection calendar heatmaps.
+
+        str: The title of the grid.
+
+        dash.Patch: The render key of the figure.
+
+    """
+    if version == None or year == None or library_id == None or api_key == None:
+        return go.Figure(), "", no_update
+
+    render_key = [version, year]
+    if not render_homepage_section(
+        "collection_calendars_section", "collection_calendars", active_tab, sections_ready, rendered_sections, render_key):
+        raise PreventUpdate
+    rendered = mark_section_rendered("collection_calendars", render_key)
+
+    collection_item_index = get_cached_collection_item_index(api_key=api_key, library_id=library_id)
+    collection_tree = get_collection_tree(api_key=api_key, library_id=library_id)
+
+    collection_calendars = get_cached_figure(
+        library_id,
+        f"collection_calendars:{year}",
+        lambda: build_collection_heatmap_grid(collection_item_index, collection_tree["names"], year))
+
+    return collection_calendars, f"Sources read per collection in {year}", rendered
+
+@callback(
+    Output("all_libraries_heatmap", "figure"),
+    Output("all_libraries_radar", "figure"),
+    Output("all_libraries_timeseries", "figure"),
+    Output("all_libraries_title", "children"),
+    Output("all_libraries_summary", "children"),
+    Output("all_libraries_section_rendered", "data", allow_duplicate=True),
+    Input("library_version", "data"),
+    Input("group_libraries", "data"),
+    Input("heatmap_year", "value"),
+    Input("homepage_sections", "active_tab"),
+    Input("homepage_sections_ready", "data"),
+    State("all_libraries_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    prevent_initial_call="initial_duplicate"
+)
+def build_all_libraries_figures(
+    version, group_libraries, year, active_tab, sections_ready, rendered_sections, library_id, api_key):
+    """The callback that plots the combined heatmap, collection breakdown and timeseries of the main
+    library and the group libraries, from the sum of the daily aggregates of every library.
+
+    Args:
+        version (int): The library version in the browser session, used to trigger the callback
+            once the library has been loaded or synced.
+
+        group_libraries (lst): The group libraries in the browser session (see utils.load_library_summary).
+
+        year (int): The year selected on the main heatmap.
+
+        active_tab (str): The tab_id of the open homepage section.
+
+        sections_ready (bool): Whether the heatmap day index has been built.
+
+        rendered_sections (dict): The render key of the graphs of the section (see render_homepage_section).
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        orjson.Fragment: The combined calendar heatmap of the year.
+
+        orjson.Fragment: The radial graph of the sources read per collection of every library.
+
+        orjson.Fragment: The timeseries of the total number of sources read.
+
+        str: The title of the section.
+
+        lst: The alerts listing the group libraries that could not be loaded.
+
+        dash.Patch: The render key of the figures.
+
+    """
+    if version == None or year == None or library_id == None or api_key == None:
+        return go.Figure(), go.Figure(), go.Figure(), "", [], no_update
+
+    libraries = [{"library_id": library_id, "library_type": "user", "version": version}] + [
+        library for library in (group_libraries or []) if "error" not in library]
+    merged_key = get_merged_library_key(libraries)
+
+    render_key = [version, merged_key, year]
+    if not render_homepage_section("all_libraries_section", "all_libraries", active_tab, sections_ready, rendered_sections, render_key):
+        raise PreventUpdate
+    rendered = mark_section_rendered("all_libraries", render_key)
+
+    # Libraries loaded by another server process are loaded (concurrently) by this one first:
+    aggregates, collections = get_merged_library_aggregates(api_key, libraries)
+    if aggregates == None:
+        load_libraries(api_key=api_key, libraries=libraries)
+        aggregates, collections = get_merged_library_aggregates(api_key, libraries)
+
+    summary = [
+        dbc.Alert(f"The group library {library['library_id']} could not be loaded ({library['error']}).", color="warning")
+        for library in (group_libraries or []) if "error" in library]
+    if len(libraries) == 1:
+        summary.append(html.P("Enter the IDs of your group libraries next to your API key to combine them with your library."))
+
+    heatmap = get_cached_figure(
+        library_id,
+        f"all_libraries_heatmap:{merged_key}:{year}",
+        lambda: display_year(sharded_source_array(aggregates, year), year=year))
+
+    collection_count_df = sharded_collection_counts(aggregates, collections, cutoff=20)
+    radar = get_cached_figure(
+        library_id,
+        f"all_libraries_radar:{merged_key}",
+        lambda: plot_collections_count_radar_figure(
+            collection_count_df["count"].tolist(), collection_count_df["name"].tolist())
+            if len(collection_count_df) > 0 else go.Figure())
+
+    timeseries = get_cached_figure(
+        library_id,
+        f"all_libraries_timeseries:{merged_key}",
+        lambda: plot_total_item_timeseries(sharded_collection_timeseries_df(aggregates, collections).cumsum()))
+
+    title = f"Sources read in {year} across {len(libraries)} libraries"
+
+    return heatmap, radar, timeseries, title, summary, rendered
+
+@callback(
+    Output("reading_stat_cards", "children"),
+    Output("rolling_reading_averages", "figure"),
+    Output("year_over_year_table", "children"),
+    Input("library_version", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value")
+)
+def build_reading_analytics_components(version, library_id, api_key):
+    """The callback that displays the reading streaks, the rolling reading averages and the year over
+    year changes per collection from the cached reading analytics of the library.
+
+    Args:
+        version (int): The library version in the browser session, used to trigger the callback
+            once the library has been loaded or synced.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        lst: The streak and rolling average cards.
+
+        orjson.Fragment: The rolling averages of the sources read per day over the last year.
+
+        dbc.Table: The year to date comparison of the most read collections.
+
+    """
+    if version == None or library_id == None or api_key == None:
+        return [], go.Figure(), None
+
+    reading_analytics = get_cached_reading_analytics(api_key=api_key, library_id=library_id)
+
+    return (
+        build_reading_stat_cards(reading_analytics),
+        get_cached_figure(
+            library_id,
+            f"rolling_reading_averages:{reading_analytics['date']}",
+            lambda: plot_rolling_reading_averages(reading_analytics["rolling"])),
+        build_year_over_year_table(reading_analytics["year_over_year"]))
+
+# Callbacks that patch the homepage figures with the changes found by a library sync:
+clientside_callback(
+    ClientsideFunction(namespace="zotero", function_name="apply_day_index_delta"),
+    Output("heatmap_day_index", "data", allow_duplicate=True),
+    Input("library_delta", "data"),
+    State("heatmap_day_index", "data"),
+    prevent_initial_call=True
+)
+
+def build_library_timeseries_df(library_id, api_key, version, collection_name=None):
+    """The method rebuilds the cumulative timeseries dataframe of a library (or of one of its
+    collections) from the daily aggregates of the server side cache, eg: when the dataframe a
+    figure was built from is not cached by this server process.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        version (int): The library version the dataframe is built for.
+
+        collection_name (str|None): The name of the collection or None for every collection.
+
+    Returns:
+        pd.DataFrame|None: The cumulative dataframe or None if the cached library is not at the version.
+
+    """
+    entry = get_authorized_library(api_key=api_key, library_id=library_id)
+    if entry["version"] != version:
+        return None
+
+    collections = entry["collections"]
+    if collection_name != None:
+        collections = [collection for collection in collections if collection["data"]["name"] == collection_name]
+
+    aggregates = get_or_build_library_aggregate(library_id, "daily_aggregates")
+
+    return sharded_collection_timeseries_df(aggregates, collections).cumsum()
+
+@callback(
+    Output("total_items_timeseries", "figure", allow_duplicate=True),
+    Output("source_timeseries", "figure", allow_duplicate=True),
+    Output("total_sources_section_rendered", "data", allow_duplicate=True),
+    Output("collections_section_rendered", "data", allow_duplicate=True),
+    Input("library_delta", "data"),
+    State("total_sources_section_rendered", "data"),
+    State("collections_section_rendered", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value"),
+    prevent_initial_call=True
+)
+def update_timeseries_from_library_delta(library_delta, total_rendered_sections, collection_rendered_sections, library_id, api_key):
+    """The callback that applies the per-day collection count changes of a library sync to the
+    cached timeseries dataframes and only sends the changed points of each figure to the browser.
+
+    A figure is only patched if the session rendered it at the version the changes were computed
+    from, from the dataframe cached for that version (see apply_cached_timeseries_delta). Figures
+    rendered at another version, or whose dataframe is not cached by this server process, are
+    rebuilt from the server side cache instead.
+
+    Args:
+        library_delta (dict): The compact library delta built by the sync callback.
+
+        total_rendered_sections (dict): The render key of the graphs of the total sources section.
+
+        collection_rendered_sections (dict): The render key of the graphs of the collections section.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        dash.Patch|go.Figure: The partial (or full if it can't be patched) total items timeseries.
+
+        dash.Patch|go.Figure: The partial (or full if it can't be patched) single collection timeseries.
+
+        dash.Patch: The render key of the total items timeseries so that it is not rendered again.
+
+        dash.Patch: The render key of the single collection timeseries.
+
+    """
+    if library_delta == None or library_id == None or api_key == None:
+        raise PreventUpdate
+
+    figures = []
+    total_rendered, collection_rendered = Patch(), Patch()
+
+    # The total timeseries keeps collections that are new in the delta as new traces:
+    render_key = (total_rendered_sections or {}).get("total_items_timeseries", None)
+    total_items_df, updated_df = None, None
+    if render_key != None and render_key[1] == None and render_key[0] != library_delta["version"]:
+        if render_key[0] == library_delta["base_version"]:
+            total_items_df, updated_df = apply_cached_timeseries_delta(library_id, "total_items_timeseries", library_delta)
+        if updated_df is None:
+            updated_df = build_library_timeseries_df(library_id, api_key, library_delta["version"])
+            if updated_df is not None:
+                updated_df = cache_timeseries_df(library_id, "total_items_timeseries", library_delta["version"], updated_df)
+
+    if updated_df is None:
+        figures.append(no_update)
+    else:
+        figure_patch = build_timeseries_figure_patch(total_items_df, updated_df) if total_items_df is not None else None
+        figures.append(figure_patch if figure_patch != None else plot_total_item_timeseries(updated_df))
+        total_rendered["total_items_timeseries"] = [library_delta["version"], None]
+
+    # The single collection timeseries is cached per collection, each session patches the one it displays:
+    render_key = (collection_rendered_sections or {}).get("source_timeseries", None)
+    timeseries_df, updated_df = None, None
+    if render_key != None and len(render_key) == 3 and render_key[1] == None and render_key[0] != library_delta["version"]:
+        collection_name = render_key[2]
+        name = f"source_timeseries:{collection_name}"
+        if render_key[0] == library_delta["base_version"]:
+            timeseries_df, updated_df = apply_cached_timeseries_delta(library_id, name, library_delta, fixed_columns=True)
+        if updated_df is None:
+            updated_df = build_library_timeseries_df(library_id, api_key, library_delta["version"], collection_name=collection_name)
+            if updated_df is not None:
+                updated_df = cache_timeseries_df(library_id, name, library_delta["version"], updated_df)
+
+    if updated_df is None:
+        figures.append(no_update)
+    else:
+        figure_patch = build_timeseries_figure_patch(timeseries_df, updated_df) if timeseries_df is not None else None
+        figures.append(figure_patch if figure_patch != None else plot_single_collection_timeseries(updated_df, collection_name))
+        collection_rendered["source_timeseries"] = [library_delta["version"], None, collection_name]
+
+    return figures + [total_rendered, collection_rendered]
@@ -2,6 +2,21 @@
 import dash
 from dash import dcc
 from dash import html
+from dash import dash_table, callback
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+import dash_bootstrap_components as dbc
+
+import plotly.graph_objs as go
+
+# Data management packages:
+import datetime
+
+# Importing display methods:
+from utils import (
+    get_cached_library, get_cached_collection_item_index, build_collection_daily_counts, query_collection_items,
+    display_year, get_cached_figure, get_collection_tree, get_collection_descendants, ITEM_TABLE_COLUMNS
+)
 
 dash.register_page(
     __name__, 
@@ -9,7 +24,181 @@ dash.register_page(
     name='My Collections'
 )
 
+# Number of items sent to the browser per page of the item table:
+PAGE_SIZE = 25
+
 def layout(collection_id=None):
+    current_year = datetime.datetime.now().year
+
     return html.Div([
-        html.H1(f"PAGE {collection_id}")
-    ])
\ No newline at end of file
+
+        # The zotero collection key taken from the page url:
+        dcc.Store(id="collection_page_key", data=collection_id),
+
+        # Collection Heatmap Components:
+        dbc.Row([
+            dbc.Col(html.H3(id="collection_page_title"), width=8),
+            dbc.Col(dbc.Switch(id="collection_include_subcollections", label="Include subcollections", value=False), width=2),
+            dbc.Col(dcc.Dropdown(
+                id="collection_heatmap_year", 
+                options=[{"label": str(year), "value": year} for year in range(current_year, current_year-20, -1)],
+                value=current_year,
+                clearable=False), width=2)
+        ], style={"padding-top":"2rem"}, align="center"),
+        dcc.Graph(id="collection_heatmap"),
+        html.Hr(),
+
+        # Server side paginated item table, only the current page is ever sent to the browser:
+        html.H4(id="collection_item_count", style={"padding-bottom":"0.25rem"}),
+        dash_table.DataTable(
+            id="collection_item_table",
+            columns=[{"name": column, "id": column} for column in ITEM_TABLE_COLUMNS],
+            page_current=0,
+            page_size=PAGE_SIZE,
+            page_action="custom",
+            sort_action="custom",
+            sort_mode="multi",
+            sort_by=[],
+            filter_action="custom",
+            filter_query="",
+            style_cell={"textAlign": "left", "whiteSpace": "normal", "height": "auto"}
+        )
+    ])
+
+def get_page_collection_keys(collection_key, include_subcollections, library_id, api_key):
+    """The method lists the collections whose items are shown on a collection page.
+
+    Args:
+        collection_key (str): The zotero collection key taken from the page url.
+
+        include_subcollections (bool): Whether the items of the nested subcollections are shown.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        str|lst: The collection key or the list of the collection and subcollection keys.
+
+    """
+    if not include_subcollections:
+        return collection_key
+
+    return get_collection_descendants(get_collection_tree(api_key=api_key, library_id=library_id), collection_key)
+
+@callback(
+    Output("collection_page_title", "children"),
+    Output("collection_heatmap", "figure"),
+    Input("collection_page_key", "data"),
+    Input("collection_heatmap_year", "value"),
+    Input("collection_include_subcollections", "value"),
+    Input("library_version", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value")
+)
+def build_collection_heatmap(collection_key, year, include_subcollections, version, library_id, api_key):
+    """The callback that renders the calendar heatmap of a single collection from the cached
+    collection item index.
+
+    Args:
+        collection_key (str): The zotero collection key taken from the page url.
+
+        year (int): The year the heatmap is rendered for.
+
+        include_subcollections (bool): Whether the items of the nested subcollections are counted (once).
+
+        version (int): The library version in the browser session, used to trigger the callback
+            once the library has been loaded.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        str: The title of the collection page.
+
+        orjson.Fragment: The calendar heatmap of the collection, serialized once per library version.
+
+    """
+    if version == None or library_id == None or api_key == None:
+        return "No Data Selected", go.Figure()
+
+    collection_item_index = get_cached_collection_item_index(api_key=api_key, library_id=library_id)
+    collections = get_cached_library(library_id)["collections"]
+
+    collection_name = collection_key
+    for collection in collections:
+        if collection["key"] == collection_key:
+            collection_name = collection["data"]["name"]
+
+    collection_keys = get_page_collection_keys(collection_key, include_subcollections, library_id, api_key)
+    heatmap = get_cached_figure(
+        library_id,
+        f"collection_heatmap:{collection_key}:{year}:{bool(include_subcollections)}",
+        lambda: display_year(
+            build_collection_daily_counts(collection_item_index, collection_keys, year),
+            year=year,
+            collection_name=collection_name))
+
+    return f"{collection_name}: Sources Read in {year}", heatmap
+
+@callback(
+    Output("collection_item_table", "data"),
+    Output("collection_item_table", "page_count"),
+    Output("collection_item_count", "children"),
+    Input("collection_item_table", "page_current"),
+    Input("collection_item_table", "page_size"),
+    Input("collection_item_table", "sort_by"),
+    Input("collection_item_table", "filter_query"),
+    Input("collection_page_key", "data"),
+    Input("collection_include_subcollections", "value"),
+    Input("library_version", "data"),
+    State("zotero_library_id", "value"),
+    State("zotero_api_key", "value")
+)
+def update_collection_item_table(
+    page_current, page_size, sort_by, filter_query, collection_key, include_subcollections, version, library_id, api_key):
+    """The callback that filters, sorts and paginates the items of a collection on the server
+    and only returns the rows of the current page.
+
+    Args:
+        page_current (int): The zero based page number requested by the table.
+
+        page_size (int): The number of rows on a page.
+
+        sort_by (lst): The DataTable sort_by state.
+
+        filter_query (str): The DataTable filter query.
+
+        collection_key (str): The zotero collection key taken from the page url.
+
+        include_subcollections (bool): Whether the items of the nested subcollections are listed (once).
+
+        version (int): The library version in the browser session.
+
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        lst: The records of the current page.
+
+        int: The number of pages after filtering.
+
+        str: The number of items in the collection after filtering.
+
+    """
+    if version == None or library_id == None or api_key == None:
+        raise PreventUpdate
+
+    collection_item_index = get_cached_collection_item_index(api_key=api_key, library_id=library_id)
+
+    records, page_count, num_items = query_collection_items(
+        collection_item_index, 
+        get_page_collection_keys(collection_key, include_subcollections, library_id, api_key), 
+        page_current=page_current, 
+        page_size=page_size, 
+        sort_by=sort_by, 
+        filter_query=filter_query)
+
+    return records, page_count, f"{num_items} sources in this collection"
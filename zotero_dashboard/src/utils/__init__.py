@@ -1,7 +1,51 @@
 # Importing key methods:
-from .heatmap_methods import build_collection_heatmap_pipeline, build_heatmap_from_collection
+from .heatmap_methods import (
+    display_year, get_calendar_geometry, display_collection_grid, build_collection_heatmap_grid)
 from .zotero_data_methods import (
     get_zotero_collection, extract_zotero_items_for_date, get_all_collections, create_collection_counts, 
-    create_collection_timeseries_df)
+    create_collection_timeseries_df, create_collection_count_delta, apply_collection_count_delta)
 from .radar_graph_methods import plot_collections_count_radar_figure
-from .timeseries_graph_methods import plot_collection_timeseries, plot_total_item_timeseries
\ No newline at end of file
+from .timeseries_graph_methods import (
+    plot_collection_timeseries, plot_single_collection_timeseries, plot_total_item_timeseries, build_timeseries_figure_patch)
+from .day_index_methods import build_day_index, build_day_index_delta, format_creator_label
+from .library_cache import (
+    get_cached_library, load_library, sync_library, set_library_aggregate, 
+    get_or_build_library_aggregate, register_library_aggregate, get_library_delta_since, get_current_library,
+    prewarm_library_aggregates, authorize_library, get_authorized_library, evict_library, evict_idle_libraries)
+from .collection_index_methods import (
+    build_collection_item_index, get_cached_collection_item_index, build_collection_daily_counts, 
+    query_collection_items, get_collection_positions, build_collection_day_counts, ITEM_TABLE_COLUMNS)
+from .search_index_methods import (
+    build_search_index, update_search_index, search_library, get_cached_search_index, filter_items_by_search)
+from .creator_analytics_methods import (
+    normalize_creator_name, build_creator_matrix, compute_top_creators_over_time, compute_coauthorship_matrix,
+    get_top_creator_coauthorship, get_cached_creator_analytics)
+from .creator_graph_methods import plot_top_creators_timeseries, plot_coauthorship_heatmap
+from .sharded_aggregation_methods import (
+    build_sharded_aggregates, sharded_collection_counts, sharded_collection_timeseries_df, sharded_source_array,
+    apply_sharded_aggregates_delta)
+from .compact_item_methods import CompactItem, compact_zotero_items
+from .rollup_store_methods import (
+    get_rollup_version, query_rollup_collection_counts, query_rollup_timeseries_df, ROLLUP_GRAINS)
+from .local_library_methods import read_zotero_database, read_csl_json, read_local_library
+from .refresh_scheduler_methods import mark_library_active, start_refresh_scheduler
+from .collection_tree_methods import (
+    build_collection_tree, get_collection_tree, get_collection_descendants)
+from .reading_analytics_methods import (
+    compute_reading_streaks, compute_rolling_averages, compute_year_over_year, build_reading_analytics,
+    build_library_reading_analytics, get_cached_reading_analytics)
+from .reading_graph_methods import plot_rolling_reading_averages, build_reading_stat_cards, build_year_over_year_table
+from .export_methods import (
+    parse_export_filters, iter_item_export_rows, iter_aggregate_export_rows, get_export_aggregates, stream_export, EXPORT_DATASETS,
+    EXPORT_FORMATS)
+from .figure_serialization_methods import (
+    use_orjson_engine, encode_typed_array, encode_figure, serialize_figure, pre_serialize, get_cached_figure,
+    get_serialized_library_items)
+from .tag_analytics_methods import (
+    normalize_tag, build_tag_matrix, compute_top_tags_over_time, compute_tag_collection_counts,
+    get_cached_tag_analytics)
+from .tag_graph_methods import plot_top_tags_timeseries, plot_tag_heatmap
+from .multi_library_methods import (
+    parse_group_ids, load_library_summary, load_libraries, merge_library_aggregates, merge_library_collections,
+    get_merged_library_aggregates, get_merged_library_key, get_merged_collection_key)
+from .timeseries_cache_methods import cache_timeseries_df, get_cached_timeseries_df, apply_cached_timeseries_delta
@@ -0,0 +1,290 @@
+# Importing internal data methods:
+from .day_index_methods import format_creator_label
+from .library_cache import get_authorized_library, get_or_build_library_aggregate, register_library_aggregate
+
+# Importing data manipulation packages:
+import pandas as pd
+import numpy as np
+import datetime
+
+# Columns of the item table displayed on the collection page:
+ITEM_TABLE_COLUMNS = ["Title", "Creators", "Item Type", "Date Added"]
+
+def build_collection_item_index(items):
+    """The method builds the per-collection item index of a zotero library that the collection
+    page is served from.
+
+    Every non attachment item is written once to a flat item table and each collection only
+    stores the (date sorted) row positions of the items it contains, so a single collection can
+    be sliced, sorted, filtered and paginated without copying the item dicts.
+
+    The row positions also index the cached items themselves ("items" holds references to the
+    cached item dicts, not copies).
+
+    Args:
+        items (lst): The list of zotero item data sorted by dateAdded.
+
+    Returns:
+        dict: The index in the form:
+            {
+                "table": pd.DataFrame of ITEM_TABLE_COLUMNS (plus "key"),
+                "days": np.array of the proleptic ordinal of the day each row was added,
+                "collections": {collection_key: np.array of row positions},
+                "items": [the cached item of every row]
+            }
+
+    """
+    rows = [item for item in items if item["data"]["itemType"] != "attachment"]
+    sources = [item["data"] for item in rows]
+
+    table = pd.DataFrame({
+        "key": [source["key"] for source in sources],
+        "Title": [source.get("title", "") for source in sources],
+        "Creators": ["; ".join(format_creator_label(author) for author in source.get("creators", [])) for source in sources],
+        "Item Type": [source["itemType"] for source in sources],
+        "Date Added": [source["dateAdded"][:10] for source in sources]
+    })
+
+    days = np.array(
+        [datetime.date.fromisoformat(day).toordinal() for day in table["Date Added"]],
+        dtype=np.int32)
+
+    # Grouping row positions by every collection an item belongs to:
+    membership = {}
+    for position, source in enumerate(sources):
+        for collection_key in source.get("collections", []):
+            membership.setdefault(collection_key, []).append(position)
+
+    collections = {key: np.array(positions, dtype=np.int64) for key, positions in membership.items()}
+
+    return {"table": table, "days": days, "collections": collections, "items": rows}
+
+def get_cached_collection_item_index(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method returns the collection item index of a library from the server side cache,
+    loading the library first if this server process has not queried it yet.
+
+    The index is rebuilt whenever the cached library version changes.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The index built by build_collection_item_index.
+
+    """
+    # The key is checked against the library before any cached data is served:
+    get_authorized_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    collection_item_index = get_or_build_library_aggregate(library_id, "collection_item_index", library_type=library_type)
+
+    return collection_item_index
+
+def get_collection_positions(collection_item_index, collection_keys):
+    """The method returns the row positions of the items filed in any of several collections,
+    eg: a collection and all of its subcollections.
+
+    Args:
+        collection_item_index (dict): The index built by build_collection_item_index.
+
+        collection_keys (str|lst): The zotero collection key or a list of keys.
+
+    Returns:
+        np.array: The date sorted row positions, items filed in more than one of the collections
+            are only kept once.
+
+    """
+    if isinstance(collection_keys, str):
+        return collection_item_index["collections"].get(collection_keys, np.array([], dtype=np.int64))
+
+    positions = [
+        collection_item_index["collections"][key] for key in collection_keys
+        if key in collection_item_index["collections"]]
+    if len(positions) == 0:
+        return np.array([], dtype=np.int64)
+
+    # Rows are in dateAdded order, so the sorted unique positions stay date sorted:
+    return np.unique(np.concatenate(positions))
+
+def build_collection_daily_counts(collection_item_index, collection_key, year: int):
+    """The method counts the number of sources added to a collection per day of a year
+    using the cached day ordinals of the collection item index.
+
+    Args:
+        collection_item_index (dict): The index built by build_collection_item_index.
+
+        collection_key (str|lst): The zotero collection key or a list of keys (eg: a collection
+            and its subcollections) whose items are counted once.
+
+        year (int): The year the daily counts are built for.
+
+    Returns:
+        np.array: The 1-D array of source counts for each day of the year.
+
+    """
+    year = int(year)
+    first_day = datetime.date(year, 1, 1).toordinal()
+    num_days = datetime.date(year, 12, 31).toordinal() - first_day + 1
+
+    positions = get_collection_positions(collection_item_index, collection_key)
+    day_offsets = collection_item_index["days"][positions] - first_day
+    day_offsets = day_offsets[(day_offsets >= 0) & (day_offsets < num_days)]
+
+    return np.bincount(day_offsets, minlength=num_days)
+
+def build_collection_day_counts(collection_item_index, collection_keys: list, year: int):
+    """The method counts the number of sources added to each of several collections per day of a
+    year as a single (collections, days) array.
+
+    Every (collection, day) pair of the year is flattened into a single cell index so all the
+    collections are counted by one bincount, instead of one count per collection.
+
+    Args:
+        collection_item_index (dict): The index built by build_collection_item_index.
+
+        collection_keys (lst): The zotero collection keys, in the order of the rows.
+
+        year (int): The year the daily counts are built for.
+
+    Returns:
+        np.array: The 2-D array of source counts of shape (collections, days of the year).
+
+    """
+    year = int(year)
+    first_day = datetime.date(year, 1, 1).toordinal()
+    num_days = datetime.date(year, 12, 31).toordinal() - first_day + 1
+
+    collection_positions = [
+        collection_item_index["collections"].get(key, np.array([], dtype=np.int64)) for key in collection_keys]
+    if len(collection_positions) == 0:
+        return np.zeros((0, num_days), dtype=np.int64)
+
+    rows = np.repeat(np.arange(len(collection_positions)), [len(positions) for positions in collection_positions])
+    day_offsets = collection_item_index["days"][np.concatenate(collection_positions)] - first_day
+
+    in_year = (day_offsets >= 0) & (day_offsets < num_days)
+    cells = rows[in_year] * num_days + day_offsets[in_year]
+
+    return np.bincount(cells, minlength=len(collection_positions) * num_days).reshape(len(collection_positions), num_days)
+
+# Operators supported by the dash DataTable custom filtering syntax:
+FILTER_OPERATORS = [
+    ["ge ", ">="],
+    ["le ", "<="],
+    ["lt ", "<"],
+    ["gt ", ">"],
+    ["ne ", "!="],
+    ["eq ", "="],
+    ["contains "],
+    ["datestartswith "]
+]
+
+def split_filter_part(filter_part):
+    """The method parses a single expression of a dash DataTable filter query
+    eg: '{Title} contains energy' (from https://dash.plotly.com/datatable/callbacks).
+
+    Args:
+        filter_part (str): A single '&&' separated part of the filter query.
+
+    Returns:
+        tuple: The (column name, operator, value) of the expression, or (None, None, None) if
+            the expression could not be parsed.
+
+    """
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+
+                value_part = value_part.strip()
+                v0 = value_part[0] if len(value_part) > 0 else ""
+                if v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                    value = value_part[1: -1].replace("\\" + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                # Word operators need spaces after them in the filter string, but we don't want these later:
+                return name, operator_type[0].strip(), value
+
+    return [None] * 3
+
+def query_collection_items(
+    collection_item_index,
+    collection_key,
+    page_current: int = 0,
+    page_size: int = 25,
+    sort_by: list = None,
+    filter_query: str = None):
+    """The method applies the dash DataTable filter, sort and pagination state to a single
+    collection and returns only the rows of the requested page.
+
+    Args:
+        collection_item_index (dict): The index built by build_collection_item_index.
+
+        collection_key (str|lst): The zotero collection key or a list of keys (eg: a collection
+            and its subcollections) whose items are listed once.
+
+        page_current (int): The zero based page number requested by the table.
+
+        page_size (int): The number of rows on a page.
+
+        sort_by (lst): The DataTable sort_by state eg: [{"column_id": "Title", "direction": "asc"}].
+
+        filter_query (str): The DataTable filter query eg: '{Item Type} = book && {Title} contains energy'.
+
+    Returns:
+        lst: The records of the requested page.
+
+        int: The total number of pages after filtering.
+
+        int: The total number of items after filtering.
+
+    """
+    positions = get_collection_positions(collection_item_index, collection_key)
+    df = collection_item_index["table"].iloc[positions]
+
+    # Filtering the collection rows:
+    if filter_query:
+        for filter_part in filter_query.split(" && "):
+            column_name, operator, filter_value = split_filter_part(filter_part)
+            if column_name not in ITEM_TABLE_COLUMNS:
+                continue
+
+            column = df[column_name]
+            if operator in ("eq", "ne", "lt", "le", "gt", "ge"):
+                # Text columns are compared as text, whether pandas stores them as object or string dtype:
+                is_text = pd.api.types.is_string_dtype(column) or pd.api.types.is_object_dtype(column)
+                df = df.loc[getattr(column, operator)(str(filter_value) if is_text else filter_value)]
+            elif operator == "contains":
+                df = df.loc[column.str.contains(str(filter_value), case=False, regex=False, na=False)]
+            elif operator == "datestartswith":
+                df = df.loc[column.str.startswith(str(filter_value), na=False)]
+
+    # Sorting the filtered rows:
+    if sort_by:
+        df = df.sort_values(
+            [col["column_id"] for col in sort_by],
+            ascending=[col["direction"] == "asc" for col in sort_by],
+            inplace=False,
+            kind="mergesort")
+
+    num_items = len(df)
+    page_count = max(1, -(-num_items // page_size))
+
+    page = df.iloc[page_current * page_size: (page_current + 1) * page_size]
+
+    return page[ITEM_TABLE_COLUMNS].to_dict("records"), page_count, num_items
+
+# Maintaining the collection item index alongside every cached library:
+register_library_aggregate("collection_item_index", lambda entry: build_collection_item_index(entry["items"]))
@@ -0,0 +1,112 @@
+# Importing internal data methods:
+from .zotero_data_methods import get_zotero_connection, get_all_collections
+from .library_cache import get_library_cache_key, get_or_build_library_aggregate, register_library_aggregate, authorize_library
+
+# Importing packages used to manage the process wide cache:
+import threading
+
+# Collection trees of libraries that are not in the library cache, keyed by library cache key:
+_COLLECTION_TREES = {}
+_COLLECTION_TREES_LOCK = threading.Lock()
+
+def build_collection_tree(collections):
+    """The method indexes the full list of collections of a library by key, name and parent.
+
+    Args:
+        collections (lst): The list of collection data.
+
+    Returns:
+        dict: The index in the form:
+            {
+                "names": {collection_key: name},
+                "keys": {name: collection_key},
+                "parents": {collection_key: parent collection_key or None},
+                "children": {collection_key: [child collection_keys]},
+                "roots": [top level collection_keys]
+            }
+            Like create_collection_timeseries_df, later collections win on duplicate names.
+
+    """
+    tree = {"names": {}, "keys": {}, "parents": {}, "children": {}, "roots": []}
+
+    for collection in collections:
+        key = collection["key"]
+        tree["names"][key] = collection["data"]["name"]
+        tree["keys"][collection["data"]["name"]] = key
+        tree["children"].setdefault(key, [])
+
+        # Top level collections have a parentCollection of False:
+        parent_key = collection["data"].get("parentCollection", False) or None
+        tree["parents"][key] = parent_key
+
+    for key, parent_key in tree["parents"].items():
+        # Collections whose parent is missing (eg: deleted) are treated as top level collections:
+        if parent_key != None and parent_key in tree["children"]:
+            tree["children"][parent_key].append(key)
+        else:
+            tree["roots"].append(key)
+
+    return tree
+
+def get_collection_tree(api_key: str, library_id: int, library_type: str = "user"):
+    """The method returns the collection tree of a library, built from the server side cache if
+    the library is loaded and otherwise from the full (paginated) list of collections, which is
+    only queried again when the library version changes.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The collection tree (see build_collection_tree).
+
+    """
+    tree = get_or_build_library_aggregate(library_id, "collection_tree", library_type=library_type)
+    if tree != None:
+        # The key is checked against the library before the cached tree is served:
+        authorize_library(api_key, library_id, library_type)
+        return tree
+
+    library = get_library_cache_key(library_id, library_type)
+    version = get_zotero_connection(library_id, library_type, api_key).last_modified_version()
+
+    with _COLLECTION_TREES_LOCK:
+        cached_tree = _COLLECTION_TREES.get(library, None)
+    if cached_tree != None and cached_tree["version"] == version:
+        return cached_tree["tree"]
+
+    tree = build_collection_tree(get_all_collections(api_key=api_key, library_id=library_id, library_type=library_type))
+    with _COLLECTION_TREES_LOCK:
+        _COLLECTION_TREES[library] = {"version": version, "tree": tree}
+
+    return tree
+
+def get_collection_descendants(tree, collection_key: str):
+    """The method lists a collection along with all of its nested subcollections.
+
+    Args:
+        tree (dict): The collection tree (see build_collection_tree).
+
+        collection_key (str): The key of the collection.
+
+    Returns:
+        lst: The collection key followed by the keys of its subcollections (depth first).
+
+    """
+    descendants = []
+    stack = [collection_key]
+    while len(stack) > 0:
+        key = stack.pop()
+        if key in descendants:
+            continue
+        descendants.append(key)
+        stack.extend(reversed(tree["children"].get(key, [])))
+
+    return descendants
+
+# Indexing the collections of every cached library, rebuilt whenever the library version changes:
+register_library_aggregate("collection_tree", lambda entry: build_collection_tree(entry["collections"]))
@@ -0,0 +1,167 @@
+# Importing packages used to build the compact records:
+from collections.abc import Mapping
+import weakref
+import sys
+
+# Zotero item fields that are stored in their own slot, every other non empty field is kept in "extra":
+COMPACT_ITEM_FIELDS = (
+    "key", "version", "itemType", "title", "dateAdded", "url", "websiteTitle",
+    "abstractNote", "creators", "collections", "tags", "parentItem")
+
+class _SharedDict(dict):
+    """A creator or tag dict shared between compact records, which can be weakly referenced by
+    the pools so that it is freed with the last record using it."""
+    __slots__ = ("__weakref__",)
+
+# Shared creator and tag dicts, an author listed on a thousand items is only stored once per process. The
+# pools only hold weak references, so the dicts of evicted (or synced away) items are not kept alive:
+_CREATOR_POOL = weakref.WeakValueDictionary()
+_TAG_POOL = weakref.WeakValueDictionary()
+
+def _intern_value(value):
+    """The method interns a string value so that repeated values (item types, collection keys,
+    names) share a single object, any other value is returned unchanged.
+
+    Args:
+        value (object): The value being interned.
+
+    Returns:
+        object: The interned string or the original value.
+
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _pool_dict(pool, value):
+    """The method returns the shared copy of a small dict (a creator or a tag) with interned
+    keys and values, adding it to the pool the first time it is seen.
+
+    Args:
+        pool (weakref.WeakValueDictionary): The pool the shared dicts are stored in.
+
+        value (dict): The dict being deduplicated.
+
+    Returns:
+        dict: The shared dict. It must not be modified.
+
+    """
+    try:
+        pool_key = tuple(value.items())
+        hash(pool_key)
+    except TypeError:
+        return dict(value)
+
+    shared_value = pool.get(pool_key, None)
+    if shared_value is None:
+        shared_value = _SharedDict(
+            (_intern_value(field), _intern_value(field_value)) for field, field_value in value.items())
+        pool[pool_key] = shared_value
+
+    return shared_value
+
+class CompactItem(Mapping):
+    """A read-only, slotted record of a single zotero item.
+
+    The record keeps the data fields of the item without the "links", "meta" and "library" dicts
+    of the pyzotero response. Item types, collection keys and creator and tag strings are interned
+    and creator and tag dicts are shared between items.
+
+    It can be used anywhere a pyzotero item is read: item["key"], item["version"] and item["data"]
+    (the record itself) are supported, item["data"] behaving like the read-only data dict. Fields
+    that are missing from the zotero item raise a KeyError like the original dict.
+
+    """
+    __slots__ = COMPACT_ITEM_FIELDS + ("extra",)
+
+    def __init__(self, data, version=None):
+        for field in COMPACT_ITEM_FIELDS:
+            object.__setattr__(self, field, data.get(field, None))
+
+        if self.version == None:
+            object.__setattr__(self, "version", version)
+
+        object.__setattr__(self, "itemType", _intern_value(self.itemType))
+        object.__setattr__(self, "parentItem", _intern_value(self.parentItem))
+        if self.creators != None:
+            object.__setattr__(self, "creators", tuple(_pool_dict(_CREATOR_POOL, author) for author in self.creators))
+        if self.collections != None:
+            object.__setattr__(self, "collections", tuple(_intern_value(key) for key in self.collections))
+        if self.tags != None:
+            object.__setattr__(self, "tags", tuple(_pool_dict(_TAG_POOL, tag) for tag in self.tags))
+
+        # Empty fields that are not read by the dashboard are dropped:
+        extra = {
+            _intern_value(field): value for field, value in data.items()
+            if field not in COMPACT_ITEM_FIELDS and value not in ("", [], {}, None)}
+        object.__setattr__(self, "extra", extra if len(extra) > 0 else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactItem records are read-only")
+
+    def __getitem__(self, field):
+        if field == "data":
+            return self
+
+        if field in COMPACT_ITEM_FIELDS:
+            value = getattr(self, field)
+            if value != None:
+                return value
+        elif self.extra != None and field in self.extra:
+            return self.extra[field]
+
+        raise KeyError(field)
+
+    def __iter__(self):
+        for field in COMPACT_ITEM_FIELDS:
+            if getattr(self, field) != None:
+                yield field
+        if self.extra != None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"CompactItem(key={self.key!r}, itemType={self.itemType!r}, dateAdded={self.dateAdded!r})"
+
+    def __getstate__(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __setstate__(self, state):
+        for field, value in state.items():
+            object.__setattr__(self, field, value)
+
+    def to_dict(self):
+        """The method converts the record back into the pyzotero item format (without the
+        "links", "meta" and "library" dicts).
+
+        Returns:
+            dict: The zotero item in the form {"key", "version", "data"}.
+
+        """
+        return {
+            "key": self.key,
+            "version": self.version,
+            "data": {field: list(value) if isinstance(value, tuple) else value for field, value in self.items()}
+        }
+
+    def to_plotly_json(self):
+        """The method used by the dash JSON encoder when a record is written to a dcc.Store.
+
+        Returns:
+            dict: The zotero item in the form {"key", "version", "data"}.
+
+        """
+        return self.to_dict()
+
+def compact_zotero_items(items):
+    """The method converts a list of pyzotero items into compact slotted records. Items that
+    are already compact are kept as they are.
+
+    Args:
+        items (lst): The list of zotero items.
+
+    Returns:
+        lst: The list of CompactItem records in the same order.
+
+    """
+    return [item if isinstance(item, CompactItem) else CompactItem(item["data"], item.get("version", None)) for item in items]
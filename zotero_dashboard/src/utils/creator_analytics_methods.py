@@ -0,0 +1,210 @@
+# Importing internal data methods:
+from .library_cache import get_authorized_library, get_or_build_library_aggregate, register_library_aggregate
+
+# Importing data manipulation packages:
+import pandas as pd
+import numpy as np
+import scipy.sparse as sparse
+import unicodedata
+import re
+
+# Characters that are dropped when comparing creator names eg: 'J. Doe' and 'J Doe':
+NAME_PUNCTUATION = re.compile(r"[.,;:'\"()]")
+
+def normalize_creator_name(author):
+    """The method converts a zotero creator dict into a normalized display name and the key
+    used to match the same creator across items.
+
+    Single field creators use the 'name' field, two field creators are rendered as 'First Last'.
+    The key is the unicode normalized, accent, case and punctuation insensitive version of the name.
+
+    Args:
+        author (dict): A single zotero creator dict containing either a 'name' field or the
+            'firstName' and 'lastName' fields.
+
+    Returns:
+        tuple: The (key, display name) of the creator or (None, None) if the creator has no name.
+
+    """
+    name = author.get("name", None)
+    if name == None:
+        name = f"{author.get('firstName', '') or ''} {author.get('lastName', '') or ''}"
+
+    display_name = " ".join(unicodedata.normalize("NFKC", name).split())
+    if display_name == "":
+        return None, None
+
+    key = unicodedata.normalize("NFKD", display_name.casefold())
+    key = "".join(char for char in key if not unicodedata.combining(char))
+    key = " ".join(NAME_PUNCTUATION.sub(" ", key).split())
+
+    return key, display_name
+
+def build_creator_matrix(items):
+    """The method builds the sparse item by creator incidence matrix of a zotero library.
+
+    Row i of the matrix is the i-th non attachment item and column j is the j-th distinct
+    (normalized) creator, a cell is 1 if the creator is listed on the item.
+
+    Args:
+        items (lst): The list of zotero item data.
+
+    Returns:
+        dict: The creator matrix in the form:
+            {
+                "matrix": sparse.csr_matrix of shape (items, creators),
+                "creators": [display name], "item_keys": [item key], "item_years": np.array
+            }
+
+    """
+    creator_codes = {}
+    creators = []
+    item_keys, item_years = [], []
+    rows, columns = [], []
+
+    sources = [item["data"] for item in items if item["data"]["itemType"] != "attachment"]
+    for row, source in enumerate(sources):
+        item_keys.append(source["key"])
+        item_years.append(int(source["dateAdded"][:4]))
+
+        item_creators = set()
+        for author in source.get("creators", []):
+            key, display_name = normalize_creator_name(author)
+            if key == None or key in item_creators:
+                continue
+
+            item_creators.add(key)
+            code = creator_codes.get(key, None)
+            if code == None:
+                code = len(creators)
+                creator_codes[key] = code
+                creators.append(display_name)
+
+            rows.append(row)
+            columns.append(code)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64))),
+        shape=(len(sources), len(creators)))
+
+    return {
+        "matrix": matrix,
+        "creators": creators,
+        "item_keys": item_keys,
+        "item_years": np.array(item_years, dtype=np.int32)
+    }
+
+def compute_top_creators_over_time(creator_matrix, top_n: int = 10):
+    """The method counts the number of sources read per year for the most read creators.
+
+    The per year counts of every creator are computed as a single sparse product of a
+    year by item indicator matrix with the item by creator incidence matrix.
+
+    Args:
+        creator_matrix (dict): The creator matrix built by build_creator_matrix.
+
+        top_n (int): The number of creators (by total number of sources) that are kept.
+
+    Returns:
+        pd.DataFrame: The number of sources read per year (index) for each top creator (columns).
+
+    """
+    matrix = creator_matrix["matrix"]
+    if matrix.shape[0] == 0 or matrix.shape[1] == 0:
+        return pd.DataFrame()
+
+    totals = np.asarray(matrix.sum(axis=0)).ravel()
+    top_creators = np.argsort(-totals, kind="stable")[:top_n]
+
+    years, year_codes = np.unique(creator_matrix["item_years"], return_inverse=True)
+    year_indicator = sparse.csr_matrix(
+        (np.ones(len(year_codes), dtype=np.float32), (year_codes, np.arange(len(year_codes)))),
+        shape=(len(years), matrix.shape[0]))
+
+    yearly_counts = (year_indicator @ matrix[:, top_creators]).toarray().astype(int)
+
+    return pd.DataFrame(yearly_counts, index=years, columns=[creator_matrix["creators"][code] for code in top_creators])
+
+def compute_coauthorship_matrix(creator_matrix):
+    """The method builds the sparse creator by creator co-authorship graph of a library, the
+    weight of an edge is the number of items two creators share.
+
+    The graph is the product of the transposed incidence matrix with itself (with the diagonal,
+    the number of items per creator, removed) so no creator pairs are iterated over in Python.
+
+    Args:
+        creator_matrix (dict): The creator matrix built by build_creator_matrix.
+
+    Returns:
+        sparse.csr_matrix: The symmetric co-authorship matrix of shape (creators, creators).
+
+    """
+    matrix = creator_matrix["matrix"]
+    coauthorship = (matrix.T @ matrix).tocsr()
+    coauthorship.setdiag(0)
+    coauthorship.eliminate_zeros()
+
+    return coauthorship
+
+def get_top_creator_coauthorship(creator_matrix, coauthorship, top_n: int = 15):
+    """The method slices the co-authorship matrix down to the most read creators so it can be
+    displayed as a heatmap.
+
+    Args:
+        creator_matrix (dict): The creator matrix built by build_creator_matrix.
+
+        coauthorship (sparse.csr_matrix): The matrix built by compute_coauthorship_matrix.
+
+        top_n (int): The number of creators (by total number of sources) that are kept.
+
+    Returns:
+        pd.DataFrame: The dense (top_n, top_n) co-authorship matrix labelled with creator names.
+
+    """
+    totals = np.asarray(creator_matrix["matrix"].sum(axis=0)).ravel()
+    top_creators = np.argsort(-totals, kind="stable")[:top_n]
+    names = [creator_matrix["creators"][code] for code in top_creators]
+
+    return pd.DataFrame(coauthorship[top_creators][:, top_creators].toarray().astype(int), index=names, columns=names)
+
+def get_cached_creator_analytics(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method returns the creator matrix and co-authorship matrix of a library from the server
+    side cache, loading the library first if this server process has not queried it yet.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The creator matrix (see build_creator_matrix) with the additional "coauthorship" matrix.
+
+    """
+    # The key is checked against the library before any cached data is served:
+    get_authorized_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    return get_or_build_library_aggregate(library_id, "creator_analytics", library_type=library_type)
+
+def build_creator_analytics(items):
+    """The method builds the creator matrix of a library along with its co-authorship matrix.
+
+    Args:
+        items (lst): The list of zotero item data.
+
+    Returns:
+        dict: The creator matrix (see build_creator_matrix) with the additional "coauthorship" matrix.
+
+    """
+    creator_analytics = build_creator_matrix(items)
+    creator_analytics["coauthorship"] = compute_coauthorship_matrix(creator_analytics)
+
+    return creator_analytics
+
+# Maintaining the creator analytics alongside every cached library:
+register_library_aggregate("creator_analytics", lambda entry: build_creator_analytics(entry["items"]))
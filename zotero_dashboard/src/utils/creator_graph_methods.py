@@ -0,0 +1,59 @@
+# Importing plotly method:
+import plotly.express as px
+import plotly.graph_objects as go
+
+def plot_top_creators_timeseries(df):
+    """A method that plots the number of sources read per year for the most read creators.
+
+    Args:
+        df (pd.DataFrame): The yearly counts built by compute_top_creators_over_time.
+
+    Returns:
+        px.Figure: The line graph with one trace per creator.
+
+    """
+    fig = px.line(df, x=df.index, y=df.columns, markers=True)
+
+    fig.update_layout(
+        yaxis_title="Sources Read",
+        xaxis_title="",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+
+        xaxis=dict(showgrid=False, showline=True, linecolor="black", dtick=1),
+        yaxis=dict(showgrid=False, showline=True, linecolor="black"),
+
+        legend=dict(title="Creators")
+    )
+
+    return fig
+
+def plot_coauthorship_heatmap(df):
+    """A method that plots the co-authorship matrix of the most read creators as a heatmap.
+
+    Args:
+        df (pd.DataFrame): The square matrix built by get_top_creator_coauthorship.
+
+    Returns:
+        go.Figure: The co-authorship heatmap.
+
+    """
+    fig = go.Figure(data=go.Heatmap(
+        z=df.values,
+        x=df.columns,
+        y=df.index,
+        colorscale=[[0, '#eeeeee'], [1, "#76cf63"]],
+        hovertemplate="<b>%{y} & %{x}</b><br>%{z} shared sources<extra></extra>",
+        xgap=2,
+        ygap=2,
+        showscale=False
+    ))
+
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        yaxis=dict(autorange="reversed"),
+        xaxis=dict(tickangle=45)
+    )
+
+    return fig
@@ -0,0 +1,128 @@
+# Importing data manipulation packages:
+import datetime
+
+# Function that formats the creator strings the same way the source accordion does:
+def format_creator_label(author):
+    """The method converts a single zotero creator dict into the label that is displayed
+    on the creator buttons of the source accordion.
+
+    Args:
+        author (dict): A single zotero creator dict containing either a 'name' field or the
+            'firstName' and 'lastName' fields.
+
+    Returns:
+        str: The formatted creator label eg: 'author: Jane, Doe'.
+
+    """
+    creator_type = author.get("creatorType", None)
+    name = author.get("name", None)
+
+    # If there are no first and last name then there could be a single value as 'name':
+    if name == None:
+        first_name = author.get("firstName", None)
+        last_name = author.get("lastName", None)
+
+        return f"{creator_type}: {first_name}, {last_name}"
+
+    return f"{creator_type}: {name}"
+
+# Method that builds the compact per-day index that is shipped once to the browser:
+def build_day_index(items, collections):
+    """The method ingests the zotero items and collections and builds a compact, column
+    oriented index of sources grouped per day.
+
+    The index is written to the browser session once and is used by the clientside callbacks
+    (see assets/clientside_callbacks.js) to render the calendar heatmap for any year, highlight
+    a single collection and build the daily source accordion without a server round trip.
+
+    Items are sorted by the day they were added and the sources added on dates[i] are stored in
+    the item columns between offsets[i] and offsets[i+1].
+
+    Args:
+        items (lst): The list of zotero item data.
+
+        collections (lst): The list of collection data.
+
+    Returns:
+        dict: The per-day index in the form:
+            {
+                "dates": ["YYYY-MM-DD", ...],
+                "offsets": [0, ...],
+                "years": [2021, 2022, ...],
+                "collections": {"keys": [...], "names": [...]},
+                "items": {"key": [...], "title": [...], "url": [...], "website": [...],
+                    "abstract": [...], "creators": [[...]], "collection": [...]}
+            }
+
+    """
+    collections = collections if collections != None else []
+    collection_keys = [collection["data"]["key"] for collection in collections]
+    collection_names = [collection["data"]["name"] for collection in collections]
+    collection_codes = {key: code for code, key in enumerate(collection_keys)}
+
+    # Removing attachments and sorting by the day each item was added (dateAdded is UTC 'YYYY-MM-DDTHH:MM:SSZ'):
+    sources = [item["data"] for item in items if item["data"]["itemType"] != "attachment"]
+    sources.sort(key=lambda item: item["dateAdded"][:10])
+
+    dates, offsets = [], []
+    columns = {"key": [], "title": [], "url": [], "website": [], "abstract": [], "creators": [], "collection": []}
+
+    for position, source in enumerate(sources):
+        day = source["dateAdded"][:10]
+        if len(dates) == 0 or dates[-1] != day:
+            dates.append(day)
+            offsets.append(position)
+
+        website = source.get("websiteTitle", "No Source Found")
+        item_collections = source.get("collections", [])
+
+        columns["key"].append(source["key"])
+        columns["title"].append(source.get("title", None))
+        columns["url"].append(source.get("url", None))
+        columns["website"].append(website if website != "" else "No Source Found")
+        columns["abstract"].append(source.get("abstractNote", None))
+        columns["creators"].append([format_creator_label(author) for author in source.get("creators", [])])
+        columns["collection"].append(collection_codes.get(item_collections[0], -1) if len(item_collections) > 0 else -1)
+
+    offsets.append(len(sources))
+
+    # Always including the current year so the year selector has a sensible default:
+    years = {int(day[:4]) for day in dates}
+    years.add(datetime.datetime.now().year)
+
+    day_index = {
+        "dates": dates,
+        "offsets": offsets,
+        "years": sorted(years),
+        "collections": {"keys": collection_keys, "names": collection_names},
+        "items": columns
+    }
+
+    return day_index
+
+# Method that builds the compact payload sent to the browser when a library sync finds changes:
+def build_day_index_delta(delta):
+    """The method converts a library delta (see utils.library_cache.sync_library) into the compact
+    form that the clientside callbacks merge into the per-day index already in the browser.
+
+    Args:
+        delta (dict): The delta returned by sync_library containing the "added" and "removed"
+            zotero items and the current "collections".
+
+    Returns:
+        dict: The per-day index of the added items (see build_day_index) and the list of
+            "removed_keys" that have to be dropped from the browser index before merging. The
+            keys of the added items are dropped as well, so merging the delta into an index that
+            already holds some of its changes (eg: built from a server side cache that was ahead
+            of the browser session) does not count them twice.
+
+    """
+    removed_keys = [item["key"] for item in delta["removed"]]
+    removed_keys += [item["key"] for item in delta["added"] if item["key"] not in set(removed_keys)]
+
+    day_index_delta = {
+        "day_index": build_day_index(delta["added"], delta["collections"]),
+        "removed_keys": removed_keys
+    }
+
+    return day_index_delta
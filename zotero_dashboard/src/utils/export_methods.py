@@ -0,0 +1,353 @@
+# Importing internal data methods:
+from .day_index_methods import format_creator_label
+from .library_cache import get_or_build_library_aggregate
+from .search_index_methods import search_library
+
+# Importing packages used to encode the exports:
+import pyarrow as pa
+import pyarrow.parquet as pq
+import numpy as np
+import datetime
+import json
+import csv
+import re
+import io
+
+# Number of rows encoded at a time, every chunk is sent to the client before the next one is built:
+EXPORT_CHUNK_ROWS = 5000
+
+# Content types of the export formats:
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Columns (and their parquet types) of every exported dataset:
+EXPORT_DATASETS = {
+    "items": [
+        ("key", pa.string()), ("title", pa.string()), ("itemType", pa.string()), ("dateAdded", pa.string()),
+        ("creators", pa.string()), ("collections", pa.string()), ("tags", pa.string()), ("url", pa.string()),
+        ("websiteTitle", pa.string())
+    ],
+    "daily": [("date", pa.string()), ("count", pa.int64())],
+    "daily_collections": [
+        ("date", pa.string()), ("collection_key", pa.string()), ("collection", pa.string()), ("count", pa.int64())
+    ],
+    "collections": [
+        ("collection_key", pa.string()), ("collection", pa.string()), ("parent_collection_key", pa.string()),
+        ("count", pa.int64())
+    ]
+}
+
+# Zotero item types are camel case names eg: journalArticle:
+ITEM_TYPE_PATTERN = re.compile(r"[A-Za-z]+")
+
+def parse_export_filters(args, collections):
+    """The method validates the filters of an export request, so that invalid parameters are rejected
+    before the streamed response (and its status) is sent.
+
+    Args:
+        args (dict): The query parameters of the request.
+
+        collections (lst): The list of collection data of the library.
+
+    Returns:
+        dict: The filters in the form {"collection_key", "item_type", "start_date", "end_date"}, None
+            for the filters that are not set.
+
+    Raises:
+        ValueError: If a date is not a valid 'YYYY-MM-DD' day, the item type is not a zotero item type
+            name or the collection is not in the library.
+
+    """
+    filters = {
+        "collection_key": args.get("collection", None) or None,
+        "item_type": args.get("item_type", None) or None,
+        "start_date": args.get("start", None) or None,
+        "end_date": args.get("end", None) or None
+    }
+
+    for name in ("start_date", "end_date"):
+        if filters[name] != None:
+            # strptime also accepts single digit months and days, which don't compare as strings:
+            if re.fullmatch(r"\d{4}-\d{2}-\d{2}", filters[name]) == None:
+                raise ValueError(f"Invalid date: {filters[name]}")
+            datetime.datetime.strptime(filters[name], "%Y-%m-%d")
+
+    if filters["item_type"] != None and ITEM_TYPE_PATTERN.fullmatch(filters["item_type"]) == None:
+        raise ValueError(f"Invalid item type: {filters['item_type']}")
+
+    if filters["collection_key"] != None and filters["collection_key"] not in {collection["key"] for collection in collections}:
+        raise ValueError(f"Unknown collection: {filters['collection_key']}")
+
+    return filters
+
+def iter_item_export_rows(
+    items,
+    collections,
+    collection_key: str = None,
+    item_type: str = None,
+    start_date: str = None,
+    end_date: str = None,
+    search_index=None,
+    query: str = None):
+    """The method lazily converts the (optionally filtered) items of a library into flat export rows.
+
+    Args:
+        items (lst): The list of zotero item data sorted by dateAdded.
+
+        collections (lst): The list of collection data.
+
+        collection_key (str): Only export the items of this collection.
+
+        item_type (str): Only export the items of this item type.
+
+        start_date (str): Only export the items added on or after this 'YYYY-MM-DD' day.
+
+        end_date (str): Only export the items added on or before this 'YYYY-MM-DD' day.
+
+        search_index (dict): The index built by build_search_index, required by the query.
+
+        query (str): Only export the items matching this search query (see search_library).
+
+    Yields:
+        dict: The export row of every matching item (see EXPORT_DATASETS).
+
+    """
+    collection_names = {collection["key"]: collection["data"]["name"] for collection in collections}
+    matching_keys = search_library(search_index, query) if search_index != None and query else None
+
+    for item in items:
+        source = item["data"]
+        day = source["dateAdded"][:10]
+
+        if source["itemType"] == "attachment":
+            continue
+        if collection_key != None and collection_key not in source.get("collections", []):
+            continue
+        if item_type != None and source["itemType"] != item_type:
+            continue
+        if (start_date != None and day < start_date) or (end_date != None and day > end_date):
+            continue
+        if matching_keys != None and item["key"] not in matching_keys:
+            continue
+
+        yield {
+            "key": item["key"],
+            "title": source.get("title", ""),
+            "itemType": source["itemType"],
+            "dateAdded": source["dateAdded"],
+            "creators": "; ".join(format_creator_label(author) for author in source.get("creators", [])),
+            "collections": "; ".join(collection_names.get(key, key) for key in source.get("collections", [])),
+            "tags": "; ".join(tag["tag"] for tag in source.get("tags", [])),
+            "url": source.get("url", ""),
+            "websiteTitle": source.get("websiteTitle", "")
+        }
+
+def get_export_aggregates(library_id, library_type: str = "user"):
+    """The method returns the daily and day by collection counts of a cached library, which are kept
+    up to date by the library syncs (see apply_sharded_aggregates_delta).
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict|None: The aggregates built by build_sharded_aggregates or None if the library is not cached.
+
+    """
+    return get_or_build_library_aggregate(library_id, "daily_aggregates", library_type=library_type)
+
+def iter_aggregate_export_rows(
+    aggregates,
+    collections,
+    dataset: str,
+    start_date: str = None,
+    end_date: str = None):
+    """The method lazily converts the sharded aggregates of a library into export rows.
+
+    Args:
+        aggregates (dict): The aggregates built by build_sharded_aggregates.
+
+        collections (lst): The list of collection data.
+
+        dataset (str): One of 'daily', 'daily_collections' or 'collections'.
+
+        start_date (str): Only count the days on or after this 'YYYY-MM-DD' day.
+
+        end_date (str): Only count the days on or before this 'YYYY-MM-DD' day.
+
+    Yields:
+        dict: The export rows of the dataset (see EXPORT_DATASETS).
+
+    """
+    # Reading the arrays once as a library sync replaces them in the aggregates:
+    first_day, daily_counts = aggregates["first_day"], aggregates["daily"]
+    day_collection_counts, collection_keys = aggregates["day_collection"], aggregates["collection_keys"]
+    collection_data = {collection["key"]: collection["data"] for collection in collections}
+
+    # Slicing the day range of the aggregates:
+    num_days = len(daily_counts)
+    low = 0 if start_date == None else int(np.clip((np.datetime64(start_date, "D") - first_day).astype(int), 0, num_days))
+    high = num_days if end_date == None else \
+        int(np.clip((np.datetime64(end_date, "D") - first_day).astype(int) + 1, low, num_days))
+
+    if dataset == "daily":
+        for offset in range(low, high):
+            yield {"date": str(first_day + offset), "count": int(daily_counts[offset])}
+
+    elif dataset == "daily_collections":
+        # Only the non zero (day, collection) counts are exported:
+        day_offsets, collection_codes = np.nonzero(day_collection_counts[low:high])
+        for day_offset, collection_code in zip(day_offsets, collection_codes):
+            key = str(collection_keys[collection_code])
+            yield {
+                "date": str(first_day + low + int(day_offset)),
+                "collection_key": key,
+                "collection": collection_data.get(key, {}).get("name", ""),
+                "count": int(day_collection_counts[low + day_offset, collection_code])
+            }
+
+    elif dataset == "collections":
+        collection_totals = day_collection_counts[low:high].sum(axis=0)
+        for key, count in zip(collection_keys, collection_totals):
+            data = collection_data.get(str(key), {})
+            yield {
+                "collection_key": str(key),
+                "collection": data.get("name", ""),
+                "parent_collection_key": data.get("parentCollection", False) or "",
+                "count": int(count)
+            }
+
+def iter_row_chunks(rows):
+    """The method groups export rows into lists of EXPORT_CHUNK_ROWS rows.
+
+    Args:
+        rows (iterable): The export rows.
+
+    Yields:
+        lst: The next chunk of rows.
+
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == EXPORT_CHUNK_ROWS:
+            yield chunk
+            chunk = []
+
+    if len(chunk) > 0:
+        yield chunk
+
+def stream_csv(rows, columns):
+    """The method encodes export rows as CSV, one chunk of rows at a time.
+
+    Args:
+        rows (iterable): The export rows.
+
+        columns (lst): The (name, type) of every column (see EXPORT_DATASETS).
+
+    Yields:
+        str: The next part of the CSV file, starting with the header.
+
+    """
+    names = [name for name, _ in columns]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=names)
+    writer.writeheader()
+
+    for chunk in iter_row_chunks(rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Empty exports still contain the header:
+    if buffer.tell() > 0:
+        yield buffer.getvalue()
+
+def stream_json_lines(rows, columns=None):
+    """The method encodes export rows as JSON-lines, one chunk of rows at a time.
+
+    Args:
+        rows (iterable): The export rows.
+
+        columns (lst): Unused, the columns are the keys of every row.
+
+    Yields:
+        str: The next lines of the file.
+
+    """
+    for chunk in iter_row_chunks(rows):
+        yield "".join(json.dumps(row) + "\n" for row in chunk)
+
+class _ParquetChunkSink(io.RawIOBase):
+    """A write only file object collecting the bytes written by a parquet writer until they are sent."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush_chunks(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_parquet(rows, columns):
+    """The method encodes export rows as a parquet file with one row group per chunk of rows, every row
+    group being sent as soon as it is written.
+
+    Args:
+        rows (iterable): The export rows.
+
+        columns (lst): The (name, type) of every column (see EXPORT_DATASETS).
+
+    Yields:
+        bytes: The next part of the parquet file.
+
+    """
+    schema = pa.schema(columns)
+    sink = _ParquetChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    for chunk in iter_row_chunks(rows):
+        writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+        yield sink.flush_chunks()
+
+    # The footer holding the file metadata is written on close:
+    writer.close()
+    yield sink.flush_chunks()
+
+# Encoders of every export format:
+EXPORT_ENCODERS = {"csv": stream_csv, "jsonl": stream_json_lines, "parquet": stream_parquet}
+
+def stream_export(rows, dataset: str, export_format: str):
+    """The method encodes the rows of an exported dataset in one of the EXPORT_FORMATS.
+
+    Args:
+        rows (iterable): The export rows.
+
+        dataset (str): The name of the dataset (see EXPORT_DATASETS).
+
+        export_format (str): One of 'csv', 'jsonl' or 'parquet'.
+
+    Returns:
+        generator: The parts of the encoded file.
+
+    """
+    return EXPORT_ENCODERS[export_format](rows, EXPORT_DATASETS[dataset])
+
@@ -0,0 +1,184 @@
+# Importing internal data methods:
+from .library_cache import get_or_build_library_aggregate, register_library_aggregate
+
+# Importing packages used to serialize the figures and stores:
+import plotly.io as pio
+import numpy as np
+import datetime
+import base64
+import orjson
+
+# Numeric trace arrays shorter than this are left as JSON lists:
+TYPED_ARRAY_MIN_LENGTH = 32
+
+# Trace attributes sent as plotly.js typed arrays (base64 encoded binary):
+TYPED_ARRAY_ATTRIBUTES = ("x", "y", "z", "r", "customdata")
+
+# Integer types supported by plotly.js typed arrays, from the smallest:
+TYPED_ARRAY_INTEGER_TYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+
+# The plotly.js name of every typed array dtype:
+TYPED_ARRAY_DTYPES = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8"
+}
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def use_orjson_engine():
+    """The method makes orjson the JSON encoder of every plotly figure and every dash callback
+    response (dash serializes its responses through plotly.io.json).
+    """
+    pio.json.config.default_engine = "orjson"
+
+def encode_typed_array(values):
+    """The method encodes an array of numbers as a plotly.js typed array, using the smallest integer
+    type that holds every value of an array of whole numbers (eg: the float counts of a heatmap).
+
+    Args:
+        values (lst|np.array): The array of numbers.
+
+    Returns:
+        dict|None: The typed array in the form {"dtype", "bdata", "shape"} or None if the values are
+            not numbers (eg: dates or text) or there are less than TYPED_ARRAY_MIN_LENGTH of them.
+
+    """
+    array = np.asarray(values)
+    if array.dtype.kind not in ("i", "u", "f") or array.size < TYPED_ARRAY_MIN_LENGTH:
+        return None
+
+    # Counts are often stored as floats, NaN (ie: gaps) and fractions keep the float type:
+    whole_numbers = array.dtype.kind in ("i", "u") or bool(np.all(np.isfinite(array)) and np.all(array == np.trunc(array)))
+
+    if whole_numbers:
+        low, high = array.min(), array.max()
+        dtype = next(
+            (integer_type for integer_type in TYPED_ARRAY_INTEGER_TYPES
+             if np.iinfo(integer_type).min <= low and high <= np.iinfo(integer_type).max),
+            np.float64)
+    else:
+        dtype = np.float32 if array.dtype == np.float32 else np.float64
+
+    array = np.ascontiguousarray(array, dtype=dtype)
+    typed_array = {
+        "dtype": TYPED_ARRAY_DTYPES[np.dtype(dtype).name],
+        "bdata": base64.b64encode(array.tobytes()).decode("ascii")
+    }
+    if array.ndim > 1:
+        typed_array["shape"] = ", ".join(str(size) for size in array.shape)
+
+    return typed_array
+
+def encode_figure(figure):
+    """The method converts a figure into its JSON compatible dict with the large numeric trace arrays
+    encoded as plotly.js typed arrays.
+
+    Figures that are later updated with dash.Patch (eg: build_timeseries_figure_patch) must not be
+    encoded, the patches index into the arrays as lists.
+
+    Args:
+        figure (go.Figure|dict): The plotly figure.
+
+    Returns:
+        dict: The figure in the form {"data": [traces], "layout": dict}.
+
+    """
+    figure = figure.to_plotly_json() if hasattr(figure, "to_plotly_json") else figure
+
+    traces = []
+    for trace in figure.get("data", []):
+        trace = dict(trace)
+        for attribute in TYPED_ARRAY_ATTRIBUTES:
+            values = trace.get(attribute, None)
+            if values is None or isinstance(values, (str, dict)):
+                continue
+
+            typed_array = encode_typed_array(values)
+            if typed_array != None:
+                trace[attribute] = typed_array
+        traces.append(trace)
+
+    return {"data": traces, "layout": figure.get("layout", {})}
+
+def _serialize_default(value):
+    """The orjson fallback for the values it can't serialize natively (eg: compact items)."""
+    if hasattr(value, "to_plotly_json"):
+        return value.to_plotly_json()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def serialize_figure(figure):
+    """The method serializes a figure to JSON with its large numeric arrays encoded as typed arrays.
+
+    Args:
+        figure (go.Figure|dict): The plotly figure.
+
+    Returns:
+        bytes: The JSON figure.
+
+    """
+    return orjson.dumps(encode_figure(figure), default=_serialize_default, option=ORJSON_OPTIONS)
+
+def pre_serialize(value):
+    """The method serializes a value once so that it is embedded as is in every dash response it is
+    returned in, instead of being serialized again by every response (requires use_orjson_engine).
+
+    Args:
+        value (object): The JSON compatible value (eg: a list of zotero items or an encoded figure).
+
+    Returns:
+        orjson.Fragment: The serialized value.
+
+    """
+    return orjson.Fragment(orjson.dumps(value, default=_serialize_default, option=ORJSON_OPTIONS))
+
+def get_cached_figure(library_id, name: str, builder, library_type: str = "user"):
+    """The method returns a figure of a cached library serialized once per library version.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        name (str): The unique name of the figure, including any parameter it is built with
+            (eg: 'collection_heatmap:ABCD1234:2022').
+
+        builder (callable): The function building the figure, called without arguments.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        orjson.Fragment: The serialized figure with its large numeric arrays encoded as typed arrays.
+
+    """
+    figures = get_or_build_library_aggregate(library_id, "serialized_figures", library_type=library_type)
+    if figures == None:
+        return pre_serialize(encode_figure(builder()))
+
+    if name not in figures:
+        figures[name] = pre_serialize(encode_figure(builder()))
+
+    return figures[name]
+
+def get_serialized_library_items(library_id, library_type: str = "user"):
+    """The method returns the items of a cached library serialized once per library version, written
+    to the browser session store by the library query and the full refreshes.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        orjson.Fragment|None: The serialized list of zotero items or None if the library is not cached.
+
+    """
+    return get_or_build_library_aggregate(library_id, "serialized_items", library_type=library_type)
+
+# The serialized figures and items are dropped whenever the library version changes:
+register_library_aggregate("serialized_figures", lambda entry: {})
+register_library_aggregate("serialized_items", lambda entry: pre_serialize(entry["items"]))
@@ -1,6 +1,5 @@
-# Importing zotero API and internal data methods:
-from pyzotero import zotero
-from .zotero_data_methods import get_zotero_collection, zotero_collection_to_dataframe, extract_zotero_items_for_date
+# Importing internal data methods:
+from .collection_index_methods import build_collection_day_counts
 
 # Importing plotly methods:
 import plotly.graph_objs as go
@@ -9,6 +8,7 @@ from plotly.subplots import make_subplots
 # Importing data manipulation packages:
 import pandas as pd
 import numpy as np
+import functools
 import datetime
 
 # Function for generating calendar heatmaps (modified from https://gist.github.com/bendichter/d7dccacf55c7d95aec05c6e7bcf4e66e):
@@ -49,111 +49,112 @@ def display_year(
     """
     if year is None:
         year = datetime.datetime.now().year
-        
-        data = np.ones(365) * 0
-        data[:len(z)] = z
-        
-        d1 = datetime.date(year, 1, 1)
-        d2 = datetime.date(year, 12, 31)
 
-        delta = d2 - d1
-        
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        month_days =   [31,    28,    31,     30,    31,     30,    31,    31,    30,    31,    30,    31]
-        month_positions = (np.cumsum(month_days) - 15)/7
+    d1 = datetime.date(year, 1, 1)
+    d2 = datetime.date(year, 12, 31)
 
-        dates_in_year = [d1 + datetime.timedelta(i) for i in range(delta.days+1)] #gives me a list with datetimes for each day a year
-        weekdays_in_year = [i.weekday() for i in dates_in_year] #gives [0,1,2,3,4,5,6,0,1,2,3,4,5,6,…] (ticktext in xaxis dict translates this to weekdays
-        
-        weeknumber_of_dates = [int(i.strftime("%V")) if not (int(i.strftime("%V")) == 1 and i.month == 12) else 53
-                            for i in dates_in_year] #gives [1,1,1,1,1,1,1,2,2,2,2,2,2,2,…] name is self-explanatory
+    delta = d2 - d1
+
+    # Padding/truncating the counts to the number of days in the year (366 in leap years):
+    data = np.zeros(delta.days+1)
+    data[:min(len(z), len(data))] = z[:len(data)]
     
-        text = [str(date.strftime("%d %b, %Y")) for date in dates_in_year]
+    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    month_days =   [31,    28,    31,     30,    31,     30,    31,    31,    30,    31,    30,    31]
+    month_positions = (np.cumsum(month_days) - 15)/7
+
+    dates_in_year = [d1 + datetime.timedelta(i) for i in range(delta.days+1)] #gives me a list with datetimes for each day a year
+    weekdays_in_year = [i.weekday() for i in dates_in_year] #gives [0,1,2,3,4,5,6,0,1,2,3,4,5,6,…] (ticktext in xaxis dict translates this to weekdays
     
-        #4cc417 green #347c17 dark green
-        colorscale=[[False, '#eeeeee'], [True, color]]
-        
-        # handle end of year
-        data = [
-            go.Heatmap(
-                x=weeknumber_of_dates,
-                y=weekdays_in_year,
-                z=data,
-                text=text,
-                hovertemplate = "<b style='font-family: Helvetica Neue;'>%{z} sources read on %{text}</b>",
-                xgap=3, # this
-                ygap=3, # and this is used to make the grid-like apperance
-                showscale=False,
-                colorscale=colorscale,
-                hoverlabel=dict(align="left")
-            )
-        ]
-        
-        # TODO: Add onclick events in plotly to imbed links to each day's Sources page. 
-        # https://plotly.com/python/click-events/
-
-        if month_lines:
-            kwargs = dict(
-                mode='lines',
-                line=dict(
-                    color='#9e9e9e',
-                    width=1
-                ),
-                hoverinfo='skip'        
-            )
-            for date, dow, wkn in zip(dates_in_year,
-                                    weekdays_in_year,
-                                    weeknumber_of_dates):
-                if date.day == 1:
-                    data += [
-                        go.Scatter(
-                            x=[wkn-.5, wkn-.5],
-                            y=[dow-.5, 6.5],
-                            **kwargs
-                        )
-                    ]
-                    if dow:
-                        data += [
-                        go.Scatter(
-                            x=[wkn-.5, wkn+.5],
-                            y=[dow-.5, dow - .5],
-                            **kwargs
-                        ),
-                        go.Scatter(
-                            x=[wkn+.5, wkn+.5],
-                            y=[dow-.5, -.5],
-                            **kwargs
-                        )
-                    ]
-                        
-        layout = go.Layout(
-            height=260,
-            yaxis=dict(
-                showline=False, showgrid=False, zeroline=False,
-                tickmode='array',
-                ticktext=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-                tickvals=[0, 1, 2, 3, 4, 5, 6],
-                autorange="reversed"
-            ),
-            xaxis=dict(
-                showline=False, showgrid=False, zeroline=False,
-                tickmode='array',
-                ticktext=month_names,
-                tickvals=month_positions
+    weeknumber_of_dates = [int(i.strftime("%V")) if not (int(i.strftime("%V")) == 1 and i.month == 12) else 53
+                        for i in dates_in_year] #gives [1,1,1,1,1,1,1,2,2,2,2,2,2,2,…] name is self-explanatory
+
+    text = [str(date.strftime("%d %b, %Y")) for date in dates_in_year]
+
+    #4cc417 green #347c17 dark green
+    colorscale=[[False, '#eeeeee'], [True, color]]
+    
+    # handle end of year
+    data = [
+        go.Heatmap(
+            x=weeknumber_of_dates,
+            y=weekdays_in_year,
+            z=data,
+            text=text,
+            hovertemplate = "<b style='font-family: Helvetica Neue;'>%{z} sources read on %{text}</b>",
+            xgap=3, # this
+            ygap=3, # and this is used to make the grid-like apperance
+            showscale=False,
+            colorscale=colorscale,
+            hoverlabel=dict(align="left")
+        )
+    ]
+    
+    # TODO: Add onclick events in plotly to imbed links to each day's Sources page. 
+    # https://plotly.com/python/click-events/
+
+    if month_lines:
+        kwargs = dict(
+            mode='lines',
+            line=dict(
+                color='#9e9e9e',
+                width=1
             ),
-            font={'size':10, 'color':'#000000'},
-            plot_bgcolor=('#fff'),
-            margin = dict(t=40),
-            showlegend=False
+            hoverinfo='skip'        
         )
+        for date, dow, wkn in zip(dates_in_year,
+                                weekdays_in_year,
+                                weeknumber_of_dates):
+            if date.day == 1:
+                data += [
+                    go.Scatter(
+                        x=[wkn-.5, wkn-.5],
+                        y=[dow-.5, 6.5],
+                        **kwargs
+                    )
+                ]
+                if dow:
+                    data += [
+                    go.Scatter(
+                        x=[wkn-.5, wkn+.5],
+                        y=[dow-.5, dow - .5],
+                        **kwargs
+                    ),
+                    go.Scatter(
+                        x=[wkn+.5, wkn+.5],
+                        y=[dow-.5, -.5],
+                        **kwargs
+                    )
+                ]
+                    
+    layout = go.Layout(
+        height=260,
+        yaxis=dict(
+            showline=False, showgrid=False, zeroline=False,
+            tickmode='array',
+            ticktext=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+            tickvals=[0, 1, 2, 3, 4, 5, 6],
+            autorange="reversed"
+        ),
+        xaxis=dict(
+            showline=False, showgrid=False, zeroline=False,
+            tickmode='array',
+            ticktext=month_names,
+            tickvals=month_positions
+        ),
+        font={'size':10, 'color':'#000000'},
+        plot_bgcolor=('#fff'),
+        margin = dict(t=40),
+        showlegend=False
+    )
 
-        if fig is None:
-            fig = go.Figure(data=data, layout=layout)
-        else:
-            fig.add_traces(data, rows=[(row+1)]*len(data), cols=[1]*len(data))
-            fig.update_layout(layout)
-            fig.update_xaxes(layout['xaxis'])
-            fig.update_yaxes(layout['yaxis'])
+    if fig is None:
+        fig = go.Figure(data=data, layout=layout)
+    else:
+        fig.add_traces(data, rows=[(row+1)]*len(data), cols=[1]*len(data))
+        fig.update_layout(layout)
+        fig.update_xaxes(layout['xaxis'])
+        fig.update_yaxes(layout['yaxis'])
 
     return fig
 
@@ -180,6 +181,182 @@ def display_years(z, years):
     
     return fig
 
+@functools.lru_cache(maxsize=16)
+def get_calendar_geometry(year: int):
+    """The method computes the position of every day of a year on a calendar heatmap (one column
+    per week, one row per weekday) along with the outline of the first week of every month.
+
+    The geometry only depends on the year, so it is computed once and shared by every calendar
+    drawn for that year. The returned arrays must not be modified.
+
+    Args:
+        year (int): The year of the calendar.
+
+    Returns:
+        dict: The geometry in the form:
+            {
+                "weeks": np.array of the week column of every day,
+                "weekdays": np.array of the weekday row of every day (Monday is 0),
+                "num_weeks": the number of week columns,
+                "dates": np.array of the label of every day eg: '01 Jan, 2022',
+                "month_lines": (x, y) np.arrays of the month outlines separated by NaN
+            }
+
+    """
+    first_day = datetime.date(year, 1, 1)
+    num_days = (datetime.date(year, 12, 31) - first_day).days + 1
+
+    day_positions = np.arange(num_days) + first_day.weekday()
+    weeks, weekdays = day_positions // 7, day_positions % 7
+
+    dates = [first_day + datetime.timedelta(day) for day in range(num_days)]
+
+    # Outlining the first week of every month (but January) in a single NaN separated line:
+    line_x, line_y = [], []
+    for day, date in enumerate(dates):
+        if date.day != 1 or date.month == 1:
+            continue
+        week, weekday = weeks[day], weekdays[day]
+        if weekday == 0:
+            line_x += [week - .5, week - .5, np.nan]
+            line_y += [6.5, -.5, np.nan]
+        else:
+            line_x += [week - .5, week - .5, week + .5, week + .5, np.nan]
+            line_y += [6.5, weekday - .5, weekday - .5, -.5, np.nan]
+
+    return {
+        "weeks": weeks,
+        "weekdays": weekdays,
+        "num_weeks": int(weeks[-1]) + 1,
+        "dates": np.array([date.strftime("%d %b, %Y") for date in dates], dtype=object),
+        "month_lines": (np.array(line_x), np.array(line_y))
+    }
+
+def display_collection_grid(
+    counts,
+    collection_names: list,
+    year: int,
+    columns: int = 4,
+    color: str = "#76cf63"):
+    """The method renders the calendar heatmaps of several collections side by side as a grid of
+    small multiples.
+
+    The whole grid is drawn as a single heatmap trace (each collection is a block of the z matrix
+    placed from the shared calendar geometry of the year) and a single trace of month outlines, so
+    the cost of the figure barely depends on the number of collections. Every block shares the
+    same color scale so the collections can be compared.
+
+    Args:
+        counts (np.array): The (collections, days) array of source counts built by
+            build_collection_day_counts.
+
+        collection_names (lst): The name of the collection of every row of counts.
+
+        year (int): The year of the calendars.
+
+        columns (int): The number of calendars per row of the grid.
+
+        color (str): The color of the days with the most sources.
+
+    Returns:
+        go.Figure: The grid of calendar heatmaps.
+
+    """
+    geometry = get_calendar_geometry(int(year))
+    num_collections = len(collection_names)
+    if num_collections == 0:
+        return go.Figure()
+
+    columns = min(columns, num_collections)
+    num_rows = -(-num_collections // columns)
+
+    # Every block is a calendar plus a gap of empty cells to its right and below it (for its title):
+    block_width, block_height = geometry["num_weeks"] + 2, 9
+    block_x = (np.arange(num_collections) % columns) * block_width
+    block_y = (np.arange(num_collections) // columns) * block_height + 2
+
+    cell_x = block_x[:, None] + geometry["weeks"][None, :]
+    cell_y = block_y[:, None] + geometry["weekdays"][None, :]
+
+    z = np.full((num_rows * block_height, columns * block_width), np.nan, dtype=np.float32)
+    z[cell_y, cell_x] = counts[:, :len(geometry["weeks"])]
+
+    text = np.full(z.shape, "", dtype=object)
+    text[cell_y, cell_x] = np.array(collection_names, dtype=object)[:, None] + "<br>" + geometry["dates"][None, :]
+
+    line_x, line_y = geometry["month_lines"]
+
+    heatmap = go.Heatmap(
+        z=z,
+        text=text,
+        hovertemplate="<b style='font-family: Helvetica Neue;'>%{z} sources read</b><br>%{text}<extra></extra>",
+        hoverongaps=False,
+        xgap=2,
+        ygap=2,
+        zmin=0,
+        zmax=max(1, int(np.max(counts))),
+        showscale=False,
+        colorscale=[[0, "#eeeeee"], [1, color]])
+
+    month_lines = go.Scatter(
+        x=(block_x[:, None] + line_x[None, :]).ravel(),
+        y=(block_y[:, None] + line_y[None, :]).ravel(),
+        mode="lines",
+        line=dict(color="#9e9e9e", width=1),
+        hoverinfo="skip")
+
+    titles = [
+        dict(x=x - .5, y=y - 1, text=f"<b>{name}</b>", showarrow=False, xanchor="left", xref="x", yref="y")
+        for x, y, name in zip(block_x, block_y, collection_names)]
+
+    layout = go.Layout(
+        height=110 * num_rows + 40,
+        xaxis=dict(visible=False, range=[-1, columns * block_width - 1]),
+        yaxis=dict(visible=False, autorange="reversed"),
+        annotations=titles,
+        font={"size": 10, "color": "#000000"},
+        plot_bgcolor="#fff",
+        margin=dict(t=20, b=20, l=20, r=20),
+        showlegend=False)
+
+    return go.Figure(data=[heatmap, month_lines], layout=layout)
+
+def build_collection_heatmap_grid(
+    collection_item_index,
+    collection_names: dict,
+    year: int,
+    top_n: int = 24,
+    columns: int = 4):
+    """The method renders the calendar heatmaps of the collections with the most sources read in
+    a year as a grid of small multiples.
+
+    Args:
+        collection_item_index (dict): The index built by build_collection_item_index.
+
+        collection_names (dict): The name of every collection by key eg: the 'names' of the
+            collection tree.
+
+        year (int): The year of the calendars.
+
+        top_n (int): The number of collections (by sources read in the year) that are displayed.
+
+        columns (int): The number of calendars per row of the grid.
+
+    Returns:
+        go.Figure: The grid of calendar heatmaps (see display_collection_grid).
+
+    """
+    collection_keys = list(collection_names.keys())
+    counts = build_collection_day_counts(collection_item_index, collection_keys, year)
+
+    # Keeping the collections with the most sources read in the year, dropping the ones without any:
+    totals = counts.sum(axis=1)
+    top_rows = np.argsort(-totals, kind="stable")[:top_n]
+    top_rows = top_rows[totals[top_rows] > 0]
+
+    return display_collection_grid(
+        counts[top_rows], [collection_names[collection_keys[row]] for row in top_rows], year, columns=columns)
+
 def build_source_array(dataframe, year):
     """This is a method that inqests a dataframe of zotro items and refactors it into 
     a 1-D array (list) of the number of sources read per day in a year.
@@ -225,87 +402,3 @@ def build_source_array(dataframe, year):
     #z = df["Title"].to_list()
     
     return heatmap_series.to_list()
-
-# Function that produces a heatmap for a specific zotero collection based on name:
-def build_collection_heatmap_pipeline(
-    api_key: str,
-    library_id: int,
-    collection_name: str,
-    year: str,
-    library_type: str = "user"):
-    """The method aggregates all the other logic to construct a source
-    heatmap from the name of a zotero collection.
-    
-    It also returns the JSON response from the zotero API for use in other methods.
-    
-    Args:
-        library_id (int): The zotero API user ID.
-        
-        api_key (str): The zotero API user key.
-    
-        library_type (str): The library type of the zotero object. Can be group or 
-            user.
-    
-        collection_name (str): The verbose name for the zotero collection.
-        
-        year (str): The year that all the data will be extracted for.
-
-    Returns:
-        dict: A dictionary containing the generated heatmap as a plotly.graph_objs.heatmap and
-            the JSON zotero collection data used to generate the heatmap.
-    
-    """
-    # Extracting zotero items from a specific collection:
-    items = get_zotero_collection(api_key=api_key, library_id=library_id, collection_name=collection_name)
-    
-
-
-    # Converting the list of zotero items to a structured dataframe:
-    items_df = zotero_collection_to_dataframe(items)
-    
-    # Converting dataframe to a 1-D array of annual count values:
-    current_year = datetime.datetime.now().year
-    item_array = build_source_array(items_df, current_year)
-    
-    # Using the 1-D array to plot the heatmap:
-    heatmap = display_year(item_array, collection_name=collection_name)
-    
-    # Building the dict of heatmap and collection data:
-    payload = {"heatmap":heatmap, "collection":items}
-    
-    return payload
-
-def build_heatmap_from_collection(
-    collection: list, 
-    #collection_name: str,
-    year: int = datetime.datetime.now().year):
-    """The method ingests a zotero JSON collection and generates a heatmap for that specific
-    year using all of the other zotero dispaly methods above.
-
-    Args:
-        collection (list): This is the JSON collections data extracted using the Zotero API.
-
-        year (int): This is the year that is used to filter the data. Filtering by year is done
-            both at the dataframe array level and at the collection JSON level
-    
-        collection_name (str): The verbose name for the zotero collection.
-
-    Returns:
-
-        figure: A plotly.graph_obj heatmap.
-
-    """
-    # Filtering the collection based on the year provided:
-    start_year = datetime.date(year, 1, 1).strftime("%Y-%m-%d") # Performance / readability issue need to make all dates date objs or strings, mixing is confusing
-    
-    # Extracting all items after this date
-    items = extract_zotero_items_for_date(collection, start_date=start_year)
-    
-    # Converting the items to a dataframe and then into the 1-D array:
-    item_df = zotero_collection_to_dataframe(items)
-    item_array = build_source_array(item_df, year)
-
-    # Using the 1-D array to plot the heatmap:
-    heatmap = display_year(item_array)
-
-    return heatmap
\ No newline at end of file
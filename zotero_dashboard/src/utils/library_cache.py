@@ -0,0 +1,749 @@
+# Importing internal data methods:
+from .zotero_data_methods import get_zotero_collection, get_all_collections, get_zotero_connection, ITEM_QUERY_PARAMETERS
+from .compact_item_methods import compact_zotero_items
+from .local_library_methods import read_local_library, get_local_library_version
+from .shared_aggregate_methods import (
+    attach_shared_aggregate, publish_shared_aggregate, release_shared_aggregate, copy_shared_aggregate)
+
+# Importing packages used to manage the process wide cache:
+from collections import OrderedDict
+import threading
+import hashlib
+import time
+import os
+
+# Optional local source (a zotero.sqlite database or a CSL-JSON export) read instead of the zotero web API:
+ZOTERO_LOCAL_LIBRARY = os.environ.get("ZOTERO_LOCAL_LIBRARY", None)
+
+# Maximum number of libraries cached by a server process, the least recently used library is evicted first:
+LIBRARY_CACHE_SIZE = int(os.environ.get("ZOTERO_LIBRARY_CACHE_SIZE", 32))
+
+# Process wide cache of zotero libraries keyed by "<library_type>:<library_id>" (in least recently used order):
+_LIBRARY_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+# Derived datasets that are maintained alongside every cached library (see register_library_aggregate):
+_AGGREGATE_REGISTRY = {}
+
+# Seconds a successful check of an API key against a library is trusted before the key is checked again:
+AUTHORIZATION_TTL = float(os.environ.get("ZOTERO_AUTHORIZATION_TTL", 300))
+
+# Expiry of the successful key checks keyed by (library cache key, digest of the API key):
+_AUTHORIZATIONS = {}
+
+# Per library locks serializing syncs and the number of past deltas kept in every cache entry:
+_SYNC_LOCKS = {}
+DELTA_LOG_LENGTH = 20
+
+def _get_sync_lock(library: str):
+    """The method returns the lock serializing the syncs of a library.
+
+    Args:
+        library (str): The library cache key.
+
+    Returns:
+        threading.Lock: The lock of the library.
+
+    """
+    with _CACHE_LOCK:
+        return _SYNC_LOCKS.setdefault(library, threading.Lock())
+
+def register_library_aggregate(
+    name: str,
+    builder,
+    delta_handler=None,
+    build_on_ingest: bool = False,
+    shared: bool = False):
+    """The method registers a derived dataset (eg: a search index) that is stored alongside every
+    cached zotero library and kept at the same version as the library.
+
+    Args:
+        name (str): The name the aggregate is stored under.
+
+        builder (callable): The function that builds the aggregate from a cache entry, called as
+            builder(entry).
+
+        delta_handler (None|callable): The function that updates the aggregate when the library
+            syncs, called as delta_handler(value, delta, entry) and returning the updated value. It
+            is called without the cache lock, with the entry after the sync, so unless the aggregate
+            is shared (and copied first) it must not modify the value read by the requests in place.
+            If None the aggregate is rebuilt by the builder the next time it is requested.
+
+        build_on_ingest (bool): Whether the aggregate is built as soon as the library is loaded
+            rather than the first time it is requested.
+
+        shared (bool): Whether the aggregate (a dict of numpy arrays) is published to a shared
+            segment that every server process of the host maps read only, instead of each process
+            building and holding its own copy (see shared_aggregate_methods).
+
+    """
+    _AGGREGATE_REGISTRY[name] = {
+        "builder": builder,
+        "delta_handler": delta_handler,
+        "build_on_ingest": build_on_ingest,
+        "shared": shared
+    }
+
+def _build_versioned_aggregate(entry, name: str, builder):
+    """The method builds an aggregate of a cache entry at the version of the entry. Shared
+    aggregates are attached from the segment published by another server process when there is
+    one and published after they are built otherwise.
+
+    Args:
+        entry (dict): The cache entry.
+
+        name (str): The name the aggregate is stored under.
+
+        builder (callable): The function that builds the aggregate, called as builder(entry).
+
+    Returns:
+        dict: The aggregate in the form {"version", "value"} plus the "segment" it is mapped from
+            if it is shared.
+
+    """
+    if not _AGGREGATE_REGISTRY.get(name, {}).get("shared", False):
+        return {"version": entry["version"], "value": builder(entry)}
+
+    value, segment = attach_shared_aggregate(entry["library"], name, entry["version"])
+    if segment == None:
+        value, segment = publish_shared_aggregate(entry["library"], name, entry["version"], builder(entry))
+
+    return {"version": entry["version"], "value": value, "segment": segment}
+
+def _release_versioned_aggregate(versioned_aggregate):
+    """The method releases the shared segment an aggregate is mapped from once it is replaced.
+
+    Args:
+        versioned_aggregate (dict|None): The aggregate (see _build_versioned_aggregate).
+
+    """
+    if isinstance(versioned_aggregate, dict) and versioned_aggregate.get("segment", None) != None:
+        release_shared_aggregate(versioned_aggregate["segment"])
+
+def get_library_cache_key(library_id, library_type: str = "user"):
+    """The method builds the key used to store a zotero library in the server side cache.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        str: The cache key eg: 'user:123456'.
+
+    """
+    return f"{library_type}:{library_id}"
+
+def _get_authorization_key(api_key: str, library_id, library_type: str = "user"):
+    """The method builds the key of a key check in the authorization cache, the API key itself is
+    only stored as a digest.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        tuple: The (library cache key, API key digest).
+
+    """
+    return get_library_cache_key(library_id, library_type), hashlib.sha256(str(api_key).encode("utf-8")).hexdigest()
+
+def record_library_authorization(api_key: str, library_id, library_type: str = "user"):
+    """The method records that an API key successfully queried a library, eg: after a load or a
+    version check, so that the key is not checked again for AUTHORIZATION_TTL seconds.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    """
+    with _CACHE_LOCK:
+        _AUTHORIZATIONS[_get_authorization_key(api_key, library_id, library_type)] = time.monotonic() + AUTHORIZATION_TTL
+
+def authorize_library(api_key: str, library_id, library_type: str = "user"):
+    """The method checks that an API key can read a library before any of its cached data is
+    served, with a (cached) version query to the zotero API.
+
+    Libraries read from ZOTERO_LOCAL_LIBRARY are not checked, the local source has no API keys.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Raises:
+        zotero_errors.PyZoteroError: If the zotero API rejects the key for the library.
+
+    """
+    if ZOTERO_LOCAL_LIBRARY != None:
+        return
+
+    authorization_key = _get_authorization_key(api_key, library_id, library_type)
+    with _CACHE_LOCK:
+        expiry = _AUTHORIZATIONS.get(authorization_key, None)
+    if expiry != None and expiry > time.monotonic():
+        return
+
+    get_zotero_connection(library_id, library_type, api_key).last_modified_version()
+    record_library_authorization(api_key, library_id, library_type)
+
+def get_authorized_library(api_key: str, library_id, library_type: str = "user"):
+    """The method returns the cached entry of a library once the API key has been checked against
+    it (see authorize_library), loading the library if this server process has not queried it yet.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The cache entry (see load_library).
+
+    Raises:
+        zotero_errors.PyZoteroError: If the zotero API rejects the key for the library.
+
+    """
+    entry = get_cached_library(library_id, library_type)
+    if entry == None:
+        return load_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    authorize_library(api_key, library_id, library_type)
+
+    return entry
+
+def get_cached_library(library_id, library_type: str = "user"):
+    """The method returns the cached entry of a zotero library if it has been loaded
+    by this server process.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict|None: The cache entry in the form {"library", "items", "collections", "version", "aggregates", "deltas"}
+            or None if the library has not been loaded.
+
+    """
+    library = get_library_cache_key(library_id, library_type)
+    with _CACHE_LOCK:
+        entry = _LIBRARY_CACHE.get(library, None)
+        if entry != None:
+            _LIBRARY_CACHE.move_to_end(library)
+            entry["last_used"] = time.monotonic()
+
+        return entry
+
+def load_library(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method queries the full zotero library and all of its collections and writes them
+    to the server side cache along with the library version they were queried at.
+
+    If ZOTERO_LOCAL_LIBRARY is set the library is read from the local source instead, without
+    any request to the zotero API.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The cache entry in the form {"library", "items", "collections", "version", "aggregates", "deltas"}.
+
+    """
+    if ZOTERO_LOCAL_LIBRARY != None:
+        items, collections, version = read_local_library(ZOTERO_LOCAL_LIBRARY, library_id=library_id, library_type=library_type)
+
+    else:
+        # The version is read before the items so that changes made during the query are picked up by the next sync:
+        zotero_con = get_zotero_connection(library_id, library_type, api_key)
+        version = zotero_con.last_modified_version()
+        record_library_authorization(api_key, library_id, library_type)
+
+        items = get_zotero_collection(api_key=api_key, library_id=library_id, library_type=library_type)
+        collections = get_all_collections(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    # Only the compact records are cached, the full pyzotero dicts are released after the query:
+    entry = {
+        "library": get_library_cache_key(library_id, library_type),
+        "items": compact_zotero_items(items) if items != None else [],
+        "collections": collections,
+        "version": version,
+        "aggregates": {},
+        "deltas": [],
+        "last_used": time.monotonic()
+    }
+
+    # Building the aggregates that are required as soon as the library is available:
+    for name, aggregate in _AGGREGATE_REGISTRY.items():
+        if aggregate["build_on_ingest"]:
+            entry["aggregates"][name] = _build_versioned_aggregate(entry, name, aggregate["builder"])
+
+    with _CACHE_LOCK:
+        previous_entry = _LIBRARY_CACHE.get(entry["library"], None)
+        _LIBRARY_CACHE[entry["library"]] = entry
+        _LIBRARY_CACHE.move_to_end(entry["library"])
+
+        # Evicting the least recently used libraries once the cache is full:
+        evicted_entries = []
+        while len(_LIBRARY_CACHE) > max(LIBRARY_CACHE_SIZE, 1):
+            evicted_entries.append(_pop_library_entry(next(iter(_LIBRARY_CACHE))))
+
+    if previous_entry != None:
+        for versioned_aggregate in previous_entry["aggregates"].values():
+            _release_versioned_aggregate(versioned_aggregate)
+
+    for evicted_entry in evicted_entries:
+        _release_library_entry(evicted_entry)
+
+    return entry
+
+def _pop_library_entry(library: str):
+    """The method removes a library and its key checks from the cache, called with the cache lock held.
+
+    Args:
+        library (str): The library cache key.
+
+    Returns:
+        dict|None: The removed cache entry, to be released with _release_library_entry once the lock is released.
+
+    """
+    for authorization_key in [key for key in _AUTHORIZATIONS if key[0] == library]:
+        del _AUTHORIZATIONS[authorization_key]
+
+    return _LIBRARY_CACHE.pop(library, None)
+
+def _release_library_entry(entry):
+    """The method releases the aggregates of an evicted library, including its references to the
+    aggregate segments shared with the other server processes.
+
+    Args:
+        entry (dict|None): The cache entry returned by _pop_library_entry.
+
+    """
+    if entry == None:
+        return
+
+    # A sync in progress finishes before the aggregates are released:
+    with _get_sync_lock(entry["library"]):
+        for versioned_aggregate in entry["aggregates"].values():
+            _release_versioned_aggregate(versioned_aggregate)
+        entry["aggregates"] = {}
+
+def evict_library(library_id, library_type: str = "user"):
+    """The method removes a library from the cache of this server process and releases its
+    aggregates, the library is loaded again by the next request for it.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        bool: Whether the library was cached.
+
+    """
+    with _CACHE_LOCK:
+        entry = _pop_library_entry(get_library_cache_key(library_id, library_type))
+
+    _release_library_entry(entry)
+
+    return entry != None
+
+def evict_idle_libraries(max_idle_seconds: float, keep=()):
+    """The method evicts the libraries that have not been read from the cache for a while (see
+    evict_library), eg: from the background refresh once their sessions are gone.
+
+    Args:
+        max_idle_seconds (float): The number of seconds since its last read after which a library is evicted.
+
+        keep (iterable): The cache keys of the libraries that are kept regardless (eg: the active libraries).
+
+    Returns:
+        lst: The cache keys of the evicted libraries.
+
+    """
+    now = time.monotonic()
+    keep = set(keep)
+
+    with _CACHE_LOCK:
+        evicted_entries = [
+            _pop_library_entry(library) for library, entry in list(_LIBRARY_CACHE.items())
+            if library not in keep and now - entry["last_used"] > max_idle_seconds]
+
+    for entry in evicted_entries:
+        _release_library_entry(entry)
+
+    return [entry["library"] for entry in evicted_entries]
+
+def sync_library(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method brings a cached zotero library up to date by only querying the items that
+    changed since the cached library version.
+
+    If the library has not been loaded by this process it is fully loaded instead and the
+    returned delta is None.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict|None: The delta applied to the cache in the form:
+            {
+                "added": [items], "removed": [items], "deleted": [keys],
+                "collections": [collections], "version": int
+            }
+            where "removed" holds the previous version of every modified or deleted item (including
+            the items moved to the trash), "added" holds the new version of every added or modified
+            item and "deleted" the keys of the deleted and trashed items. An empty delta is
+            returned when the library version has not changed.
+
+    """
+    entry = get_cached_library(library_id, library_type)
+    if entry == None:
+        load_library(api_key=api_key, library_id=library_id, library_type=library_type)
+        return None
+
+    # Syncs of a library are serialized so that the same changes are never applied twice:
+    with _get_sync_lock(entry["library"]):
+
+        # Cheap version check before querying any items:
+        if ZOTERO_LOCAL_LIBRARY != None:
+            version = get_local_library_version(ZOTERO_LOCAL_LIBRARY)
+        else:
+            zotero_con = get_zotero_connection(library_id, library_type, api_key)
+            version = zotero_con.last_modified_version()
+            record_library_authorization(api_key, library_id, library_type)
+
+        delta = {"added": [], "removed": [], "deleted": [], "collections": entry["collections"], "version": version}
+        if version == entry["version"]:
+            return delta
+
+        if ZOTERO_LOCAL_LIBRARY != None:
+            items, collections, version = read_local_library(ZOTERO_LOCAL_LIBRARY, library_id=library_id, library_type=library_type)
+            changed_items, deleted_keys = diff_library_items(entry["items"], compact_zotero_items(items))
+        else:
+            changed_items = compact_zotero_items(
+                zotero_con.everything(zotero_con.top(since=entry["version"], **ITEM_QUERY_PARAMETERS)))
+            deleted_keys = zotero_con.deleted(since=entry["version"]).get("items", [])
+
+            # Items moved to the trash are not returned by the item queries (nor listed as deleted), only their keys are queried:
+            trashed_keys = zotero_con.trash(since=entry["version"], format="keys")
+            if isinstance(trashed_keys, bytes):
+                trashed_keys = trashed_keys.decode("utf-8")
+            deleted_keys = list(deleted_keys) + [key for key in (trashed_keys or "").split() if key not in deleted_keys]
+            collections = get_all_collections(api_key=api_key, library_id=library_id, library_type=library_type)
+
+        # The delta is applied to a snapshot of the entry, so the cache lock is not held while the aggregates are updated:
+        with _CACHE_LOCK:
+            previous_version = entry["version"]
+            synced_entry = dict(entry, aggregates=dict(entry["aggregates"]))
+        delta = apply_library_delta(synced_entry, changed_items, deleted_keys, collections, version)
+
+        # Updating the registered aggregates that support deltas instead of rebuilding them:
+        updated_aggregates = {}
+        for name, aggregate in _AGGREGATE_REGISTRY.items():
+            versioned_aggregate = synced_entry["aggregates"].get(name, None)
+            if aggregate["delta_handler"] == None or versioned_aggregate == None:
+                continue
+            if versioned_aggregate["version"] != previous_version:
+                continue
+
+            # Shared aggregates are never updated in place (their arrays are read without the lock, or
+            # mapped read only from a segment), the delta is applied to a private copy that is published
+            # unless another server process already published this version:
+            if aggregate["shared"]:
+                updated_aggregates[name] = _build_versioned_aggregate(
+                    synced_entry, name,
+                    lambda entry, handler=aggregate["delta_handler"], value=versioned_aggregate["value"]:
+                        handler(copy_shared_aggregate(value), delta, entry))
+            else:
+                updated_aggregates[name] = {
+                    "version": version, "value": aggregate["delta_handler"](versioned_aggregate["value"], delta, synced_entry)}
+
+        # Swapping the synced library in, unless the entry was evicted (or loaded again) in the meantime:
+        with _CACHE_LOCK:
+            replaced_aggregates = []
+            if _LIBRARY_CACHE.get(entry["library"], None) is entry and entry["version"] == previous_version:
+                entry["items"] = synced_entry["items"]
+                entry["collections"] = synced_entry["collections"]
+                entry["version"] = synced_entry["version"]
+                for name, versioned_aggregate in updated_aggregates.items():
+                    replaced_aggregates.append(entry["aggregates"].get(name, None))
+                    entry["aggregates"][name] = versioned_aggregate
+
+                # Keeping the recent deltas for sessions that are behind a background sync:
+                entry["deltas"] = (entry["deltas"] + [dict(delta, previous_version=previous_version)])[-DELTA_LOG_LENGTH:]
+            else:
+                replaced_aggregates = list(updated_aggregates.values())
+
+        for versioned_aggregate in replaced_aggregates:
+            _release_versioned_aggregate(versioned_aggregate)
+
+        return delta
+
+def diff_library_items(cached_items, items):
+    """The method compares a freshly read library with the cached items, used for local sources
+    that can't be queried for the items changed since a version.
+
+    Args:
+        cached_items (lst): The list of cached zotero items.
+
+        items (lst): The list of zotero items read from the source.
+
+    Returns:
+        lst: The list of added or modified zotero items.
+
+        lst: The list of keys of deleted zotero items.
+
+    """
+    cached_versions = {
+        item["key"]: (item["data"].get("version", None), item["data"].get("dateModified", None)) for item in cached_items}
+
+    changed_items = [
+        item for item in items 
+        if cached_versions.get(item["key"], None) != (item["data"].get("version", None), item["data"].get("dateModified", None))]
+    
+    item_keys = {item["key"] for item in items}
+    deleted_keys = [key for key in cached_versions.keys() if key not in item_keys]
+
+    return changed_items, deleted_keys
+
+def apply_library_delta(entry, changed_items, deleted_keys, collections, version):
+    """The method applies a set of changed and deleted zotero items to a cache entry, keeping
+    the items sorted by dateAdded in ascending order like the zotero API query.
+
+    Args:
+        entry (dict): The cache entry being updated.
+
+        changed_items (lst): The list of added or modified zotero items.
+
+        deleted_keys (lst): The list of keys of deleted zotero items.
+
+        collections (lst): The current list of collection data.
+
+        version (int): The library version the changes were queried at.
+
+    Returns:
+        dict: The delta that was applied (see sync_library).
+
+    """
+    changed_keys = {item["key"] for item in changed_items}
+    deleted_keys = set(deleted_keys)
+
+    removed = [item for item in entry["items"] if item["key"] in changed_keys or item["key"] in deleted_keys]
+    added = [item for item in changed_items if item["key"] not in deleted_keys]
+
+    items = [item for item in entry["items"] if item["key"] not in changed_keys and item["key"] not in deleted_keys]
+    items.extend(added)
+    items.sort(key=lambda item: item["data"]["dateAdded"])
+
+    entry["items"] = items
+    entry["collections"] = collections
+    entry["version"] = version
+
+    return {
+        "added": added,
+        "removed": removed,
+        "deleted": [item["key"] for item in removed if item["key"] in deleted_keys],
+        "collections": collections,
+        "version": version
+    }
+
+def merge_library_deltas(deltas):
+    """The method combines consecutive library deltas into the single delta between the version
+    before the first one and the version after the last one.
+
+    Args:
+        deltas (lst): The consecutive deltas (see sync_library) in the order they were applied.
+
+    Returns:
+        dict: The combined delta.
+
+    """
+    removed = {}
+    current = {}
+    for delta in deltas:
+        for item in delta["removed"]:
+            # Only the versions that existed before the first delta are removed by the combined delta:
+            if item["key"] not in current and item["key"] not in removed:
+                removed[item["key"]] = item
+            current[item["key"]] = None
+        for item in delta["added"]:
+            current[item["key"]] = item
+
+    return {
+        "added": [item for item in current.values() if item != None],
+        "removed": list(removed.values()),
+        "deleted": [key for key, item in current.items() if item == None and key in removed],
+        "collections": deltas[-1]["collections"],
+        "version": deltas[-1]["version"]
+    }
+
+def get_library_delta_since(library_id, version: int, library_type: str = "user"):
+    """The method returns the changes applied to a cached library since a version, eg: for a
+    browser session that is behind the background refresh of the library.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        version (int): The library version the changes are built from.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict|None: The combined delta (see sync_library) or None if the library is not cached or
+            the deltas since the version are no longer kept.
+
+    """
+    entry = get_cached_library(library_id, library_type)
+    if entry == None:
+        return None
+
+    with _CACHE_LOCK:
+        deltas = list(entry["deltas"])
+        current_version = entry["version"]
+
+    if version == current_version:
+        return {"added": [], "removed": [], "deleted": [], "collections": entry["collections"], "version": version}
+
+    # Walking the log back from the current version to the requested one:
+    chain = []
+    for delta in reversed(deltas):
+        if delta["version"] != current_version:
+            break
+        chain.insert(0, delta)
+        current_version = delta["previous_version"]
+        if current_version == version:
+            return merge_library_deltas(chain)
+
+    return None
+
+def get_current_library(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method returns a library from the server side cache after a cheap version check (and
+    a delta sync if it changed), only querying the full library if it is not cached.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The up to date cache entry.
+
+    """
+    if get_cached_library(library_id, library_type) == None:
+        return load_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    sync_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    return get_cached_library(library_id, library_type)
+
+def prewarm_library_aggregates(library_id, library_type: str = "user"):
+    """The method builds every registered aggregate of a cached library that is missing or out of
+    date, so that no request has to wait for them.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    """
+    for name in list(_AGGREGATE_REGISTRY.keys()):
+        get_or_build_library_aggregate(library_id, name, library_type=library_type)
+
+def set_library_aggregate(library_id, name: str, value, library_type: str = "user"):
+    """The method stores a derived dataset alongside a cached zotero library so that it can be
+    updated incrementally when the library syncs.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        name (str): The name the aggregate is stored under.
+
+        value (object): The aggregate being stored.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    """
+    entry = get_cached_library(library_id, library_type)
+    if entry != None:
+        previous_value = entry["aggregates"].get(name, None)
+        entry["aggregates"][name] = value
+        if previous_value is not value:
+            _release_versioned_aggregate(previous_value)
+
+def get_or_build_library_aggregate(library_id, name: str, builder=None, library_type: str = "user"):
+    """The method returns a derived dataset of a cached zotero library, building it with the
+    provided builder the first time it is requested and again whenever the library version changes
+    (unless a registered delta handler already brought it up to date).
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        name (str): The name the aggregate is stored under.
+
+        builder (None|callable): The function that builds the aggregate from the cache entry, called
+            as builder(entry). If None the builder registered with register_library_aggregate is used.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        object|None: The aggregate built for the current library version or None if the library
+            has not been loaded.
+
+    """
+    entry = get_cached_library(library_id, library_type)
+    if entry == None:
+        return None
+
+    if builder == None:
+        builder = _AGGREGATE_REGISTRY[name]["builder"]
+
+    versioned_aggregate = entry["aggregates"].get(name, None)
+    if versioned_aggregate == None or versioned_aggregate["version"] != entry["version"]:
+        previous_aggregate = versioned_aggregate
+        versioned_aggregate = _build_versioned_aggregate(entry, name, builder)
+        entry["aggregates"][name] = versioned_aggregate
+        _release_versioned_aggregate(previous_aggregate)
+
+    return versioned_aggregate["value"]
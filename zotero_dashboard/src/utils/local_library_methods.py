@@ -0,0 +1,341 @@
+# Importing packages used to read the local library sources:
+import sqlite3
+import json
+import datetime
+import os
+
+# Zotero item types of the most common CSL-JSON types (other types are imported as documents):
+CSL_ITEM_TYPES = {
+    "article-journal": "journalArticle",
+    "article-magazine": "magazineArticle",
+    "article-newspaper": "newspaperArticle",
+    "article": "preprint",
+    "book": "book",
+    "chapter": "bookSection",
+    "paper-conference": "conferencePaper",
+    "report": "report",
+    "thesis": "thesis",
+    "webpage": "webpage",
+    "post-weblog": "blogPost",
+    "post": "forumPost",
+    "manuscript": "manuscript",
+    "motion_picture": "film",
+    "software": "computerProgram",
+    "dataset": "dataset"
+}
+
+# Zotero fields of the most common CSL-JSON variables:
+CSL_FIELDS = {
+    "title": "title",
+    "abstract": "abstractNote",
+    "URL": "url",
+    "DOI": "DOI",
+    "container-title": "publicationTitle",
+    "publisher": "publisher",
+    "language": "language"
+}
+
+def open_zotero_database(path: str, immutable: bool = False):
+    """The method opens a zotero desktop database (zotero.sqlite) read-only.
+
+    Args:
+        path (str): The path to zotero.sqlite.
+
+        immutable (bool): Whether sqlite skips locking entirely. Required to read the database
+            while the zotero desktop app holds its exclusive lock, at the cost of possibly reading
+            a write that is in progress.
+
+    Returns:
+        sqlite3.Connection: The read-only connection.
+
+    """
+    uri = f"file:{os.path.abspath(path)}?mode=ro" + ("&immutable=1" if immutable else "")
+
+    return sqlite3.connect(uri, uri=True)
+
+def format_zotero_timestamp(timestamp: str):
+    """The method converts a zotero database timestamp into the format of the zotero web API.
+
+    Args:
+        timestamp (str): The UTC timestamp eg: '2022-03-01 14:02:11'.
+
+    Returns:
+        str: The timestamp eg: '2022-03-01T14:02:11Z'.
+
+    """
+    return timestamp.replace(" ", "T") + "Z" if timestamp else timestamp
+
+def get_zotero_library_row_id(connection, library_type: str = "user", group_id: int = None):
+    """The method finds the internal libraryID of the user library or of a group library.
+
+    Args:
+        connection (sqlite3.Connection): The zotero database connection.
+
+        library_type (str): The library type, user or group.
+
+        group_id (int): The zotero group id of a group library.
+
+    Returns:
+        int: The libraryID used by every table of the database.
+
+    """
+    if library_type == "group":
+        row = connection.execute("SELECT libraryID FROM groups WHERE groupID = ?", (group_id,)).fetchone()
+    else:
+        row = connection.execute("SELECT libraryID FROM libraries WHERE type = 'user'").fetchone()
+
+    if row == None:
+        raise ValueError(f"No {library_type} library found in the zotero database")
+
+    return row[0]
+
+def read_zotero_database(path: str, library_type: str = "user", group_id: int = None, immutable: bool = False):
+    """The method reads every item and collection of a library from a zotero desktop database in
+    a handful of bulk joins and maps them into the structures returned by the zotero web API.
+
+    Items in the trash are skipped like in the web API and, like the item queries of the web API
+    (see get_zotero_collection), only the top level items that are not attachments are read.
+
+    Args:
+        path (str): The path to zotero.sqlite.
+
+        library_type (str): The library type, user or group.
+
+        group_id (int): The zotero group id of a group library.
+
+        immutable (bool): See open_zotero_database.
+
+    Returns:
+        lst: The list of zotero items sorted by dateAdded.
+
+        lst: The list of zotero collections.
+
+    """
+    connection = open_zotero_database(path, immutable=immutable)
+    try:
+        library_row_id = get_zotero_library_row_id(connection, library_type, group_id)
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+        # Zotero 5+ exposes the built-in and custom fields and item types through the combined views:
+        fields_table = "fieldsCombined" if "fieldsCombined" in tables else "fields"
+        item_types_table = "itemTypesCombined" if "itemTypesCombined" in tables else "itemTypes"
+        deleted_filter = "AND items.itemID NOT IN (SELECT itemID FROM deletedItems)" if "deletedItems" in tables else ""
+        child_note_filter = "AND items.itemID NOT IN (SELECT itemID FROM itemNotes WHERE parentItemID IS NOT NULL)" \
+            if "itemNotes" in tables else ""
+
+        data = {}
+        for item_id, key, version, item_type, date_added, date_modified in connection.execute(f"""
+            SELECT items.itemID, items.key, items.version, {item_types_table}.typeName, items.dateAdded, items.dateModified
+            FROM items JOIN {item_types_table} ON {item_types_table}.itemTypeID = items.itemTypeID
+            WHERE items.libraryID = ? AND {item_types_table}.typeName != 'attachment' {deleted_filter} {child_note_filter}
+            ORDER BY items.dateAdded""", (library_row_id,)):
+            data[item_id] = {
+                "key": key,
+                "version": version,
+                "itemType": item_type,
+                "creators": [],
+                "tags": [],
+                "collections": [],
+                "relations": {},
+                "dateAdded": format_zotero_timestamp(date_added),
+                "dateModified": format_zotero_timestamp(date_modified)
+            }
+
+        # Every other query only reads rows of the library, filtered through the items table:
+        library_filter = "JOIN items ON items.itemID = {table}.itemID WHERE items.libraryID = ?"
+
+        for item_id, field, value in connection.execute(f"""
+            SELECT itemData.itemID, {fields_table}.fieldName, itemDataValues.value FROM itemData
+            JOIN {fields_table} ON {fields_table}.fieldID = itemData.fieldID
+            JOIN itemDataValues ON itemDataValues.valueID = itemData.valueID
+            {library_filter.format(table="itemData")}""", (library_row_id,)):
+            if item_id in data:
+                data[item_id][field] = value
+
+        for item_id, creator_type, first_name, last_name, field_mode in connection.execute(f"""
+            SELECT itemCreators.itemID, creatorTypes.creatorType, creators.firstName, creators.lastName, creators.fieldMode
+            FROM itemCreators
+            JOIN creators ON creators.creatorID = itemCreators.creatorID
+            JOIN creatorTypes ON creatorTypes.creatorTypeID = itemCreators.creatorTypeID
+            {library_filter.format(table="itemCreators")}
+            ORDER BY itemCreators.itemID, itemCreators.orderIndex""", (library_row_id,)):
+            if item_id not in data:
+                continue
+
+            # Single field creators (eg: institutions) store their name in lastName:
+            if field_mode == 1:
+                author = {"creatorType": creator_type, "name": last_name}
+            else:
+                author = {"creatorType": creator_type, "firstName": first_name, "lastName": last_name}
+            data[item_id]["creators"].append(author)
+
+        for item_id, tag, tag_type in connection.execute(f"""
+            SELECT itemTags.itemID, tags.name, itemTags.type FROM itemTags
+            JOIN tags ON tags.tagID = itemTags.tagID
+            {library_filter.format(table="itemTags")}""", (library_row_id,)):
+            if item_id in data:
+                data[item_id]["tags"].append({"tag": tag, "type": tag_type} if tag_type else {"tag": tag})
+
+        for item_id, collection_key in connection.execute(f"""
+            SELECT collectionItems.itemID, collections.key FROM collectionItems
+            JOIN collections ON collections.collectionID = collectionItems.collectionID
+            {library_filter.format(table="collectionItems")}
+            ORDER BY collectionItems.itemID, collectionItems.orderIndex""", (library_row_id,)):
+            if item_id in data:
+                data[item_id]["collections"].append(collection_key)
+
+        items = [{"key": item_data["key"], "version": item_data["version"], "data": item_data} for item_data in data.values()]
+
+        deleted_collections = "AND collections.collectionID NOT IN (SELECT collectionID FROM deletedCollections)" \
+            if "deletedCollections" in tables else ""
+        collections = [
+            {
+                "key": key,
+                "version": version,
+                "data": {"key": key, "version": version, "name": name, "parentCollection": parent_key or False, "relations": {}}
+            }
+            for key, version, name, parent_key in connection.execute(f"""
+                SELECT collections.key, collections.version, collections.collectionName, parents.key FROM collections
+                LEFT JOIN collections AS parents ON parents.collectionID = collections.parentCollectionID
+                WHERE collections.libraryID = ? {deleted_collections}""", (library_row_id,))
+        ]
+
+    finally:
+        connection.close()
+
+    return items, collections
+
+def parse_csl_date(csl_date):
+    """The method converts a CSL-JSON date variable into a zotero web API timestamp.
+
+    Args:
+        csl_date (dict): The CSL date eg: {"date-parts": [[2021, 3, 2]]} or {"raw": '2021-03-02'}.
+
+    Returns:
+        str|None: The timestamp eg: '2021-03-02T00:00:00Z' or None if the date can't be read.
+
+    """
+    if not isinstance(csl_date, dict):
+        return None
+
+    date_parts = csl_date.get("date-parts", [[]])
+    if len(date_parts) > 0 and len(date_parts[0]) > 0:
+        parts = [int(part) for part in date_parts[0][:3]] + [1, 1]
+        try:
+            return datetime.datetime(parts[0], parts[1], parts[2]).strftime("%Y-%m-%dT%H:%M:%SZ")
+        except ValueError:
+            return None
+
+    raw = csl_date.get("raw", None)
+    if raw != None:
+        try:
+            return datetime.datetime.fromisoformat(raw[:10]).strftime("%Y-%m-%dT%H:%M:%SZ")
+        except ValueError:
+            return None
+
+    return None
+
+def read_csl_json(path: str):
+    """The method reads a CSL-JSON export of a zotero library and maps it into the structures
+    returned by the zotero web API.
+
+    CSL-JSON has no dateAdded or collections: the accessed date is used as dateAdded (falling back
+    to the issued date and then the modification time of the export) and items have no collections.
+
+    Args:
+        path (str): The path to the CSL-JSON export.
+
+    Returns:
+        lst: The list of zotero items sorted by dateAdded.
+
+        lst: The list of zotero collections (always empty).
+
+    """
+    with open(path, encoding="utf-8") as csl_file:
+        csl_items = json.load(csl_file)
+
+    export_date = datetime.datetime.utcfromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    items = []
+    for csl_item in csl_items:
+        # Zotero exports the item uri as the id eg: 'http://zotero.org/users/123/items/ABCD2345':
+        key = str(csl_item.get("id", len(items))).rstrip("/").split("/")[-1]
+        date_added = parse_csl_date(csl_item.get("accessed", None)) or parse_csl_date(csl_item.get("issued", None)) or export_date
+
+        creators = []
+        for creator_type in ("author", "editor", "translator"):
+            for author in csl_item.get(creator_type, []):
+                if "literal" in author:
+                    creators.append({"creatorType": creator_type, "name": author["literal"]})
+                else:
+                    creators.append({
+                        "creatorType": creator_type, "firstName": author.get("given", ""), "lastName": author.get("family", "")})
+
+        data = {
+            "key": key,
+            "version": 0,
+            "itemType": CSL_ITEM_TYPES.get(csl_item.get("type", ""), "document"),
+            "creators": creators,
+            "tags": [{"tag": tag.strip()} for tag in csl_item.get("keyword", "").split(",") if tag.strip() != ""],
+            "collections": [],
+            "relations": {},
+            "dateAdded": date_added,
+            "dateModified": date_added
+        }
+        for csl_field, field in CSL_FIELDS.items():
+            if csl_field in csl_item:
+                data[field] = csl_item[csl_field]
+
+        items.append({"key": key, "version": 0, "data": data})
+
+    items.sort(key=lambda item: item["data"]["dateAdded"])
+
+    return items, []
+
+def get_local_library_version(path: str):
+    """The method builds a library version for a local source from its modification time, so the
+    cache and the browser session can detect that the file changed.
+
+    Args:
+        path (str): The path to zotero.sqlite or to the CSL-JSON export.
+
+    Returns:
+        int: The modification time in milliseconds of the file (or of its write-ahead log).
+
+    """
+    paths = [path] + [path + suffix for suffix in ("-wal", "-journal") if os.path.exists(path + suffix)]
+
+    return max(int(os.path.getmtime(source_path) * 1000) for source_path in paths)
+
+def read_local_library(path: str, library_id: int = None, library_type: str = "user"):
+    """The method reads a library from a local source: a zotero.sqlite database or (for .json
+    files) a CSL-JSON export. No HTTP requests are made.
+
+    Args:
+        path (str): The path to zotero.sqlite or to the CSL-JSON export.
+
+        library_id (int): The zotero group id for group libraries (ignored for the user library).
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        lst: The list of zotero items sorted by dateAdded.
+
+        lst: The list of zotero collections.
+
+        int: The version of the local source.
+
+    """
+    version = get_local_library_version(path)
+
+    if path.lower().endswith(".json"):
+        items, collections = read_csl_json(path)
+    else:
+        try:
+            items, collections = read_zotero_database(path, library_type=library_type, group_id=library_id)
+        except sqlite3.OperationalError:
+            # The zotero desktop app locks its database while it is running:
+            items, collections = read_zotero_database(path, library_type=library_type, group_id=library_id, immutable=True)
+
+    return items, collections, version
@@ -0,0 +1,272 @@
+# Importing internal data methods:
+from .library_cache import (
+    get_library_cache_key, get_cached_library, get_current_library, get_or_build_library_aggregate, authorize_library)
+from .refresh_scheduler_methods import mark_library_active
+
+# Importing data manipulation packages:
+import numpy as np
+
+# Importing packages used to load the libraries concurrently:
+from concurrent.futures import ThreadPoolExecutor
+from pyzotero import zotero_errors
+from collections import OrderedDict
+import threading
+import os
+
+# Maximum number of libraries loaded (or synced) at the same time for a session:
+MULTI_LIBRARY_WORKERS = int(os.environ.get("ZOTERO_MULTI_LIBRARY_WORKERS", 4))
+
+# Number of merged aggregates (one per combination of library versions) kept by the server process:
+MERGED_AGGREGATE_CACHE_SIZE = 16
+
+# The collection keys of the combined libraries are prefixed with their library cache key eg: 'group:123456/ABCD2345':
+MERGED_COLLECTION_KEY_DTYPE = "U48"
+
+_MERGED_AGGREGATES = OrderedDict()
+_MERGED_AGGREGATES_LOCK = threading.Lock()
+
+def parse_group_ids(value):
+    """The method parses the group library IDs entered by the user eg: '123456, 654321'.
+
+    Args:
+        value (str|None): The comma (or space) separated group IDs.
+
+    Returns:
+        lst: The unique group IDs in the order they were entered, invalid IDs are ignored.
+
+    """
+    group_ids = []
+    for group_id in (value or "").replace(",", " ").split():
+        if group_id.isdigit() and int(group_id) not in group_ids:
+            group_ids.append(int(group_id))
+
+    return group_ids
+
+def load_library_summary(api_key: str, library_id: int, library_type: str = "user"):
+    """The method brings a single library of a session up to date in the server side cache (loading
+    it if needed) along with its daily aggregates, and marks it for the background refresh.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        library_id (int): The zotero API user or group ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The library in the form {"library_id", "library_type", "version", "num_items"}, with an
+            "error" instead of the version if the library could not be queried (eg: the key has no
+            access to the group).
+
+    """
+    summary = {"library_id": library_id, "library_type": library_type}
+    try:
+        library = get_current_library(api_key=api_key, library_id=library_id, library_type=library_type)
+    except zotero_errors.PyZoteroError as error:
+        summary["error"] = type(error).__name__
+        return summary
+
+    mark_library_active(api_key=api_key, library_id=library_id, library_type=library_type)
+    get_or_build_library_aggregate(library_id, "daily_aggregates", library_type=library_type)
+
+    summary["version"] = library["version"]
+    summary["num_items"] = len(library["items"])
+
+    return summary
+
+def load_libraries(api_key: str, libraries: list):
+    """The method concurrently brings several libraries up to date in the server side cache. Every
+    library is cached and synced on its own, so a library that is already cached only costs a
+    version check.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        libraries (lst): The libraries in the form [{"library_id", "library_type"}].
+
+    Returns:
+        lst: The summary of every library in the same order (see load_library_summary).
+
+    """
+    if len(libraries) == 0:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(MULTI_LIBRARY_WORKERS, len(libraries))) as executor:
+        return list(executor.map(
+            lambda library: load_library_summary(api_key, library["library_id"], library["library_type"]),
+            libraries))
+
+def get_merged_collection_key(library_key: str, collection_key: str):
+    """The method builds the key of a collection in the combined libraries, as collection keys are
+    only unique within their library.
+
+    Args:
+        library_key (str): The library cache key eg: 'group:123456'.
+
+        collection_key (str): The zotero collection key.
+
+    Returns:
+        str: The key eg: 'group:123456/ABCD2345'.
+
+    """
+    return f"{library_key}/{collection_key}"
+
+def merge_library_aggregates(library_aggregates, library_keys):
+    """The method sums the daily and day by collection counts of several libraries into the
+    aggregates of a single combined library.
+
+    Only the count arrays are combined, so the cost of the merge does not depend on the number of
+    items of the libraries.
+
+    Args:
+        library_aggregates (lst): The aggregates of every library built by build_sharded_aggregates.
+
+        library_keys (lst): The library cache key of every library eg: ['user:123456', 'group:654321'].
+
+    Returns:
+        dict: The combined aggregates in the format of build_sharded_aggregates, whose collection
+            keys are the collection keys of every library prefixed with its library key (see
+            get_merged_collection_key).
+
+    """
+    library_collection_keys = [
+        np.array([
+            get_merged_collection_key(library_key, collection_key) for collection_key in aggregates["collection_keys"].tolist()],
+            dtype=MERGED_COLLECTION_KEY_DTYPE)
+        for aggregates, library_key in zip(library_aggregates, library_keys)]
+    collection_keys = np.unique(np.concatenate(
+        library_collection_keys + [np.array([], dtype=MERGED_COLLECTION_KEY_DTYPE)])).astype(MERGED_COLLECTION_KEY_DTYPE)
+
+    library_aggregates = [
+        (aggregates, keys) for aggregates, keys in zip(library_aggregates, library_collection_keys)
+        if len(aggregates["daily"]) > 0]
+    if len(library_aggregates) == 0:
+        return {
+            "first_day": np.datetime64(0, "D"),
+            "daily": np.zeros(0, dtype=np.int64),
+            "day_collection": np.zeros((0, len(collection_keys)), dtype=np.int64),
+            "collection_keys": collection_keys
+        }
+
+    first_days = [int(aggregates["first_day"].astype(np.int64)) for aggregates, _ in library_aggregates]
+    first_day = min(first_days)
+    last_day = max(day + len(aggregates["daily"]) for day, (aggregates, _) in zip(first_days, library_aggregates))
+
+    daily_counts = np.zeros(last_day - first_day, dtype=np.int64)
+    day_collection_counts = np.zeros((last_day - first_day, len(collection_keys)), dtype=np.int64)
+    for library_first_day, (aggregates, keys) in zip(first_days, library_aggregates):
+        offset = library_first_day - first_day
+        days = slice(offset, offset + len(aggregates["daily"]))
+        daily_counts[days] += aggregates["daily"]
+        if len(keys) > 0:
+            columns = np.searchsorted(collection_keys, keys)
+            day_collection_counts[days, columns] += aggregates["day_collection"]
+
+    return {
+        "first_day": np.datetime64(first_day, "D"),
+        "daily": daily_counts,
+        "day_collection": day_collection_counts,
+        "collection_keys": collection_keys
+    }
+
+def merge_library_collections(library_collections):
+    """The method combines the collections of several libraries, naming the collections whose name
+    is used by more than one library after their library eg: 'Reading (group 123456)'.
+
+    The key of every collection is prefixed with its library key (see get_merged_collection_key) to
+    match the collection keys of the combined aggregates.
+
+    Args:
+        library_collections (lst): The (library_type, library_id, list of collection data) of every library.
+
+    Returns:
+        lst: The list of collection data of every library.
+
+    """
+    libraries_per_name = {}
+    for library_type, library_id, collections in library_collections:
+        for collection in collections:
+            libraries_per_name.setdefault(collection["data"]["name"], set()).add((library_type, library_id))
+
+    merged_collections = []
+    for library_type, library_id, collections in library_collections:
+        label = "personal" if library_type == "user" else f"group {library_id}"
+        library_key = get_library_cache_key(library_id, library_type)
+        for collection in collections:
+            name = collection["data"]["name"]
+            collection = dict(collection, key=get_merged_collection_key(library_key, collection["key"]))
+            if len(libraries_per_name[name]) > 1:
+                collection = dict(collection, data=dict(collection["data"], name=f"{name} ({label})"))
+            merged_collections.append(collection)
+
+    return merged_collections
+
+def get_merged_library_aggregates(api_key: str, libraries: list):
+    """The method returns the combined aggregates and collections of several cached libraries, once
+    the key of the session has been checked against every library (see authorize_library).
+
+    The aggregates of every library are maintained on their own by the library cache (and the
+    syncs), the combined aggregates are only summed again when the version of one of the libraries
+    changes.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        libraries (lst): The libraries in the form [{"library_id", "library_type"}].
+
+    Returns:
+        dict|None: The combined aggregates (see merge_library_aggregates) or None if one of the
+            libraries is not cached.
+
+        lst|None: The combined list of collection data (see merge_library_collections).
+
+    Raises:
+        zotero_errors.PyZoteroError: If the zotero API rejects the key for one of the libraries.
+
+    """
+    entries = [get_cached_library(library["library_id"], library["library_type"]) for library in libraries]
+    if len(entries) == 0 or any(entry == None for entry in entries):
+        return None, None
+
+    # The libraries in the store of the session are only combined if its key can read all of them:
+    for library in libraries:
+        authorize_library(api_key, library["library_id"], library["library_type"])
+
+    merge_key = tuple((entry["library"], entry["version"]) for entry in entries)
+    with _MERGED_AGGREGATES_LOCK:
+        merged = _MERGED_AGGREGATES.get(merge_key, None)
+        if merged != None:
+            _MERGED_AGGREGATES.move_to_end(merge_key)
+            return merged
+
+    library_aggregates = [
+        get_or_build_library_aggregate(library["library_id"], "daily_aggregates", library_type=library["library_type"])
+        for library in libraries]
+    merged = (
+        merge_library_aggregates(library_aggregates, [entry["library"] for entry in entries]),
+        merge_library_collections([
+            (library["library_type"], library["library_id"], entry["collections"])
+            for library, entry in zip(libraries, entries)]))
+
+    with _MERGED_AGGREGATES_LOCK:
+        _MERGED_AGGREGATES[merge_key] = merged
+        while len(_MERGED_AGGREGATES) > MERGED_AGGREGATE_CACHE_SIZE:
+            _MERGED_AGGREGATES.popitem(last=False)
+
+    return merged
+
+def get_merged_library_key(libraries: list):
+    """The method builds the key identifying a combination of libraries at their versions, eg: to
+    cache the figures of the combined libraries.
+
+    Args:
+        libraries (lst): The libraries in the form [{"library_id", "library_type", "version"}].
+
+    Returns:
+        str: The key eg: 'user:123456@10+group:654321@42'.
+
+    """
+    return "+".join(
+        f"{get_library_cache_key(library['library_id'], library['library_type'])}@{library.get('version', None)}"
+        for library in libraries)
@@ -0,0 +1,243 @@
+# Importing internal data methods:
+from .library_cache import (
+    get_authorized_library, get_or_build_library_aggregate, set_library_aggregate, register_library_aggregate)
+from .sharded_aggregation_methods import build_sharded_aggregates
+
+# Importing data manipulation packages:
+import pandas as pd
+import numpy as np
+import datetime
+
+# Windows (in days) of the rolling reading averages:
+ROLLING_WINDOWS = [7, 30, 90]
+
+def get_day_offset(first_day, day):
+    """The method returns the number of days between the first day of a daily count array and a day.
+
+    Args:
+        first_day (np.datetime64|datetime.date): The day of the first element of the daily counts.
+
+        day (datetime.date): The day the offset is computed for.
+
+    Returns:
+        int: The position of the day in the daily counts (negative before the first day).
+
+    """
+    return int((np.datetime64(day, "D") - np.datetime64(first_day, "D")).astype(int))
+
+def compute_reading_streaks(daily_counts, first_day, today: datetime.date = None):
+    """The method computes the current and the longest streaks of consecutive days with at least
+    one source read from a daily count array (eg: the array built by build_source_array or the
+    multi-year daily counts of build_sharded_aggregates).
+
+    The current streak is still running if a source was read today or yesterday.
+
+    Args:
+        daily_counts (np.array): The number of sources read per day.
+
+        first_day (np.datetime64|datetime.date): The day of the first element of the daily counts.
+
+        today (datetime.date): The day the current streak is measured at, defaults to the current date.
+
+    Returns:
+        dict: The streaks in the form {"current": int, "longest": int, "longest_start": datetime.date|None,
+            "longest_end": datetime.date|None}.
+
+    """
+    today = today if today != None else datetime.date.today()
+
+    # Days after today (eg: the end of a calendar year array) can't be part of a streak:
+    active = np.asarray(daily_counts)[:max(get_day_offset(first_day, today) + 1, 0)] > 0
+
+    # Start (inclusive) and end (exclusive) positions of every run of active days:
+    edges = np.flatnonzero(np.diff(np.concatenate([[False], active, [False]]).astype(np.int8)))
+    starts, ends = edges[::2], edges[1::2]
+    if len(starts) == 0:
+        return {"current": 0, "longest": 0, "longest_start": None, "longest_end": None}
+
+    lengths = ends - starts
+    longest = int(np.argmax(lengths))
+    first_day = np.datetime64(first_day, "D")
+
+    days_since_last_read = get_day_offset(first_day, today) - (ends[-1] - 1)
+
+    return {
+        "current": int(lengths[-1]) if days_since_last_read <= 1 else 0,
+        "longest": int(lengths[longest]),
+        "longest_start": (first_day + int(starts[longest])).astype(datetime.date),
+        "longest_end": (first_day + int(ends[longest]) - 1).astype(datetime.date)
+    }
+
+def compute_rolling_averages(daily_counts, first_day, windows=ROLLING_WINDOWS, today: datetime.date = None):
+    """The method computes the rolling average number of sources read per day over several windows.
+
+    Args:
+        daily_counts (np.array): The number of sources read per day.
+
+        first_day (np.datetime64|datetime.date): The day of the first element of the daily counts.
+
+        windows (lst): The rolling window sizes in days.
+
+        today (datetime.date): The last day of the averages (days without sources up to today are
+            counted as 0), defaults to the current date.
+
+    Returns:
+        pd.DataFrame: The averages indexed by day with one '<window>-day average' column per window.
+
+    """
+    today = today if today != None else datetime.date.today()
+
+    daily_series = pd.Series(
+        np.asarray(daily_counts),
+        index=pd.date_range(start=pd.Timestamp(np.datetime64(first_day, "D")), periods=len(daily_counts), freq="D"))
+    if len(daily_series) > 0:
+        daily_series = daily_series.reindex(
+            pd.date_range(start=daily_series.index[0], end=max(pd.Timestamp(today), daily_series.index[-1]), freq="D"),
+            fill_value=0)
+
+    return pd.DataFrame({
+        f"{window}-day average": daily_series.rolling(window, min_periods=1).mean() for window in windows
+    })
+
+def compute_year_over_year(day_collection_counts, first_day, collection_names, daily_counts=None, today: datetime.date = None):
+    """The method compares the number of sources read this year to date with the number read over the
+    same period of the previous year, for every collection and for the whole library.
+
+    Args:
+        day_collection_counts (np.array): The (days, collections) matrix of the number of sources read
+            per day in every collection (see build_sharded_aggregates).
+
+        first_day (np.datetime64|datetime.date): The day of the first row of the matrix.
+
+        collection_names (lst): The name of every column of the matrix.
+
+        daily_counts (None|np.array): The number of sources read per day in the whole library (including
+            the sources without a collection), defaults to the sum of the matrix rows.
+
+        today (datetime.date): The last day of the comparison, defaults to the current date.
+
+    Returns:
+        pd.DataFrame: The counts indexed by collection name (with the totals as 'All Sources') with
+            the 'Last Year', 'This Year', 'Change' and 'Change (%)' columns, sorted by 'This Year'.
+
+    """
+    today = today if today != None else datetime.date.today()
+    day_collection_counts = np.asarray(day_collection_counts)
+    daily_counts = np.asarray(daily_counts) if daily_counts is not None else day_collection_counts.sum(axis=1)
+
+    # The library totals are compared along with the collections as an extra column:
+    day_collection_counts = np.column_stack([day_collection_counts, daily_counts])
+    collection_names = list(collection_names) + ["All Sources"]
+
+    # The cumulative counts turn every period total into a difference of two rows:
+    cumulative_counts = np.vstack([
+        np.zeros((1, day_collection_counts.shape[1]), dtype=np.int64), np.cumsum(day_collection_counts, axis=0)])
+
+    def period_counts(start, end):
+        low = min(max(get_day_offset(first_day, start), 0), len(day_collection_counts))
+        high = min(max(get_day_offset(first_day, end) + 1, 0), len(day_collection_counts))
+        return cumulative_counts[max(high, low)] - cumulative_counts[low]
+
+    # The 29th of February is compared with the 28th:
+    last_year_today = today.replace(year=today.year - 1, day=min(today.day, 28 if today.month == 2 else today.day))
+    this_year = period_counts(datetime.date(today.year, 1, 1), today)
+    last_year = period_counts(datetime.date(today.year - 1, 1, 1), last_year_today)
+
+    year_over_year_df = pd.DataFrame(
+        {"Last Year": last_year, "This Year": this_year}, index=collection_names)
+    year_over_year_df = year_over_year_df.loc[~year_over_year_df.index.duplicated(keep="last")]
+
+    year_over_year_df["Change"] = year_over_year_df["This Year"] - year_over_year_df["Last Year"]
+    year_over_year_df["Change (%)"] = (
+        100 * year_over_year_df["Change"] / year_over_year_df["Last Year"].replace(0, np.nan)).round(1)
+
+    return year_over_year_df.sort_values("This Year", ascending=False, kind="stable")
+
+def build_reading_analytics(aggregates, collections, today: datetime.date = None):
+    """The method computes the reading streaks, rolling averages and year over year changes of a library
+    from its daily and day by collection counts.
+
+    Args:
+        aggregates (dict): The aggregates built by build_sharded_aggregates.
+
+        collections (lst): The list of collection data.
+
+        today (datetime.date): The day the analytics are computed for, defaults to the current date.
+
+    Returns:
+        dict: The analytics in the form {"date", "streaks", "rolling", "year_over_year"}.
+
+    """
+    today = today if today != None else datetime.date.today()
+    names = {collection["key"]: collection["data"]["name"] for collection in collections}
+
+    return {
+        "date": today,
+        "streaks": compute_reading_streaks(aggregates["daily"], aggregates["first_day"], today=today),
+        "rolling": compute_rolling_averages(aggregates["daily"], aggregates["first_day"], today=today),
+        "year_over_year": compute_year_over_year(
+            aggregates["day_collection"],
+            aggregates["first_day"],
+            [names[key] for key in aggregates["collection_keys"]],
+            daily_counts=aggregates["daily"],
+            today=today)
+    }
+
+def build_library_reading_analytics(entry):
+    """The method builds the reading analytics of a cached library from its daily aggregates, which are
+    kept up to date by the library syncs, so a sync only costs a pass over the day range.
+
+    Args:
+        entry (dict): The library cache entry.
+
+    Returns:
+        dict: The reading analytics (see build_reading_analytics).
+
+    """
+    daily_aggregates = entry["aggregates"].get("daily_aggregates", None)
+    if daily_aggregates == None or daily_aggregates["version"] != entry["version"]:
+        aggregates = build_sharded_aggregates(entry["items"], entry["collections"])
+    else:
+        aggregates = daily_aggregates["value"]
+
+    return build_reading_analytics(aggregates, entry["collections"])
+
+def get_cached_reading_analytics(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method returns the reading analytics of a library from the server side cache, loading the
+    library first if this server process has not queried it yet. They are rebuilt whenever the
+    library version or the current date changes.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The reading analytics (see build_reading_analytics).
+
+    """
+    # The key is checked against the library before any cached data is served:
+    entry = get_authorized_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    # Both are read from the same daily aggregates (see build_library_reading_analytics):
+    get_or_build_library_aggregate(library_id, "daily_aggregates", library_type=library_type)
+    reading_analytics = get_or_build_library_aggregate(library_id, "reading_analytics", library_type=library_type)
+    if reading_analytics["date"] != datetime.date.today():
+        reading_analytics = build_library_reading_analytics(entry)
+        # Stored like the registered aggregates so that it is still rebuilt on the next library version:
+        set_library_aggregate(
+            library_id, "reading_analytics", {"version": entry["version"], "value": reading_analytics}, library_type=library_type)
+
+    return reading_analytics
+
+# Maintaining the reading analytics alongside every cached library (the daily aggregates are updated first on sync):
+register_library_aggregate(
+    "reading_analytics",
+    build_library_reading_analytics,
+    delta_handler=lambda reading_analytics, delta, entry: build_library_reading_analytics(entry))
@@ -0,0 +1,78 @@
+# Importing plotly method:
+import plotly.express as px
+
+# Importing dash bootstrap components used to display the analytics:
+import dash_bootstrap_components as dbc
+from dash import html
+
+def plot_rolling_reading_averages(df, num_days: int = 365):
+    """A method that plots the rolling average number of sources read per day.
+
+    Args:
+        df (pd.DataFrame): The rolling averages built by compute_rolling_averages.
+
+        num_days (int): The number of most recent days that are plotted.
+
+    Returns:
+        px.Figure: The line graph with one trace per rolling window.
+
+    """
+    df = df.iloc[-num_days:]
+    fig = px.line(df, x=df.index, y=df.columns)
+
+    fig.update_layout(
+        yaxis_title="Sources Read per Day",
+        xaxis_title="",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+
+        xaxis=dict(showgrid=False, showline=True, linecolor="black"),
+        yaxis=dict(showgrid=False, showline=True, linecolor="black"),
+
+        legend=dict(title="", orientation="h", yanchor="bottom", y=1.02)
+    )
+
+    return fig
+
+def build_reading_stat_cards(reading_analytics):
+    """A method that builds the row of cards summarizing the reading streaks and the latest rolling
+    averages of a library.
+
+    Args:
+        reading_analytics (dict): The analytics built by build_reading_analytics.
+
+    Returns:
+        lst: The list of dbc.Col components containing one card per statistic.
+
+    """
+    streaks = reading_analytics["streaks"]
+    latest_averages = reading_analytics["rolling"].iloc[-1] if len(reading_analytics["rolling"]) > 0 else {}
+
+    stats = [("Current streak", f"{streaks['current']} days"), ("Longest streak", f"{streaks['longest']} days")]
+    stats += [(column.capitalize(), f"{latest_averages[column]:.2f}") for column in reading_analytics["rolling"].columns]
+
+    return [
+        dbc.Col(dbc.Card(dbc.CardBody([
+            html.H6(title, className="card-subtitle text-muted"),
+            html.H4(value, className="card-title")
+        ])))
+        for title, value in stats
+    ]
+
+def build_year_over_year_table(df, top_n: int = 10):
+    """A method that builds the table comparing the sources read this year to date with the same period
+    of the previous year.
+
+    Args:
+        df (pd.DataFrame): The comparison built by compute_year_over_year.
+
+        top_n (int): The number of collections displayed along with the library total.
+
+    Returns:
+        dbc.Table: The year over year table.
+
+    """
+    df = df.loc[["All Sources"] + [name for name in df.index if name != "All Sources"][:top_n]]
+    df = df.fillna("-").reset_index().rename(columns={"index": "Collection"})
+
+    return dbc.Table.from_dataframe(df, striped=True, bordered=False, hover=True, size="sm")
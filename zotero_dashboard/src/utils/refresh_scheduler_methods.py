@@ -0,0 +1,161 @@
+# Importing internal data methods:
+from .library_cache import (
+    get_library_cache_key, get_cached_library, sync_library, prewarm_library_aggregates, evict_library,
+    evict_idle_libraries)
+
+# Importing packages used to run the background refresh:
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import logging
+import random
+import time
+import os
+
+# Seconds between two version checks of an active library (0 disables the background refresh):
+REFRESH_INTERVAL = float(os.environ.get("ZOTERO_REFRESH_INTERVAL", 300))
+
+# Fraction of the interval the checks are randomly spread over so libraries are not all checked at once:
+REFRESH_JITTER = float(os.environ.get("ZOTERO_REFRESH_JITTER", 0.2))
+
+# Maximum number of libraries refreshed at the same time by a server process:
+REFRESH_MAX_CONCURRENCY = int(os.environ.get("ZOTERO_REFRESH_MAX_CONCURRENCY", 2))
+
+# Seconds since the last request after which a library is no longer refreshed (and is evicted from the cache):
+REFRESH_ACTIVE_WINDOW = float(os.environ.get("ZOTERO_REFRESH_ACTIVE_WINDOW", 24 * 3600))
+
+logger = logging.getLogger(__name__)
+
+# Recently active libraries keyed by library cache key:
+_ACTIVE_LIBRARIES = {}
+_ACTIVE_LOCK = threading.Lock()
+_SCHEDULER = {"thread": None, "executor": None}
+
+def mark_library_active(api_key: str, library_id: int, library_type: str = "user"):
+    """The method records a request for a library so that it is kept up to date by the
+    background refresh.
+
+    Args:
+        api_key (str): The zotero API user key.
+
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    """
+    library = get_library_cache_key(library_id, library_type)
+    now = time.monotonic()
+
+    with _ACTIVE_LOCK:
+        active_library = _ACTIVE_LIBRARIES.setdefault(library, {
+            "library_id": library_id,
+            "library_type": library_type,
+            "next_refresh": now + get_refresh_delay(),
+            "in_flight": False
+        })
+        active_library["api_key"] = api_key
+        active_library["last_seen"] = now
+
+def get_refresh_delay():
+    """The method returns the jittered number of seconds until the next version check of a library.
+
+    Returns:
+        float: The delay in seconds.
+
+    """
+    return REFRESH_INTERVAL * (1 + random.uniform(-REFRESH_JITTER, REFRESH_JITTER))
+
+def refresh_library(library: str):
+    """The method brings an active library up to date and pre-builds its aggregates, run by the
+    background refresh executor.
+
+    Args:
+        library (str): The library cache key.
+
+    """
+    with _ACTIVE_LOCK:
+        active_library = dict(_ACTIVE_LIBRARIES[library])
+
+    try:
+        # Only libraries loaded by this process are refreshed, the first load is left to the request:
+        if get_cached_library(active_library["library_id"], active_library["library_type"]) != None:
+            sync_library(
+                api_key=active_library["api_key"],
+                library_id=active_library["library_id"],
+                library_type=active_library["library_type"])
+            prewarm_library_aggregates(active_library["library_id"], active_library["library_type"])
+
+    except Exception:
+        logger.exception("Background refresh of the %s library failed", library)
+
+    finally:
+        with _ACTIVE_LOCK:
+            _ACTIVE_LIBRARIES[library]["in_flight"] = False
+            _ACTIVE_LIBRARIES[library]["next_refresh"] = time.monotonic() + get_refresh_delay()
+
+def schedule_library_refreshes(executor):
+    """The method submits the refresh of every active library that is due and forgets the
+    libraries that have not been requested within the active window, evicting them from the
+    library cache along with the cached libraries no request read within the window.
+
+    Args:
+        executor (ThreadPoolExecutor): The executor capping the number of concurrent refreshes.
+
+    Returns:
+        lst: The cache keys of the libraries submitted.
+
+    """
+    now = time.monotonic()
+    submitted = []
+    inactive_libraries = []
+
+    with _ACTIVE_LOCK:
+        for library, active_library in list(_ACTIVE_LIBRARIES.items()):
+            if active_library["in_flight"]:
+                continue
+            if now - active_library["last_seen"] > REFRESH_ACTIVE_WINDOW:
+                inactive_libraries.append(_ACTIVE_LIBRARIES.pop(library))
+                continue
+            if active_library["next_refresh"] <= now:
+                active_library["in_flight"] = True
+                submitted.append(library)
+        active_keys = list(_ACTIVE_LIBRARIES.keys())
+
+    for library in submitted:
+        executor.submit(refresh_library, library)
+
+    # Releasing the memory (and shared aggregate segments) of the libraries whose sessions are gone:
+    for active_library in inactive_libraries:
+        evict_library(active_library["library_id"], active_library["library_type"])
+    evict_idle_libraries(REFRESH_ACTIVE_WINDOW, keep=active_keys)
+
+    return submitted
+
+def start_refresh_scheduler():
+    """The method starts the daemon thread that periodically refreshes the active libraries of
+    the server process. Calling it again once started has no effect.
+
+    Returns:
+        bool: Whether the scheduler is running.
+
+    """
+    if REFRESH_INTERVAL <= 0:
+        return False
+
+    with _ACTIVE_LOCK:
+        if _SCHEDULER["thread"] != None:
+            return True
+
+        executor = ThreadPoolExecutor(max_workers=REFRESH_MAX_CONCURRENCY, thread_name_prefix="zotero-refresh")
+        tick = min(REFRESH_INTERVAL / 10, 5)
+
+        def run():
+            while True:
+                time.sleep(tick)
+                schedule_library_refreshes(executor)
+
+        _SCHEDULER["executor"] = executor
+        _SCHEDULER["thread"] = threading.Thread(target=run, name="zotero-refresh-scheduler", daemon=True)
+        _SCHEDULER["thread"].start()
+
+    return True
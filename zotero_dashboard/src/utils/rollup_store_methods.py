@@ -0,0 +1,336 @@
+# Importing internal data methods:
+from .library_cache import register_library_aggregate, get_library_cache_key
+
+# Importing data manipulation packages:
+import pandas as pd
+import datetime
+
+# Importing packages used to manage the database shared by every server process:
+import sqlite3
+import threading
+import tempfile
+import os
+
+# The database file is shared by every gunicorn worker of the host:
+ROLLUP_DATABASE_PATH = os.environ.get(
+    "ZOTERO_ROLLUP_DB", os.path.join(tempfile.gettempdir(), "zotero_dashboard_rollups.sqlite3"))
+
+# Time grains of the rollups and the SQLite expression building the period of a 'YYYY-MM-DD' day:
+ROLLUP_GRAINS = {
+    "day": "day",
+    "week": "date(day, '-6 days', 'weekday 1')",
+    "month": "substr(day, 1, 7)",
+    "year": "substr(day, 1, 4)"
+}
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS libraries (
+    library TEXT PRIMARY KEY,
+    version INTEGER
+);
+CREATE TABLE IF NOT EXISTS items (
+    library TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    date_added TEXT NOT NULL,
+    day TEXT NOT NULL,
+    collection_key TEXT NOT NULL,
+    item_type TEXT NOT NULL,
+    PRIMARY KEY (library, item_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_date_added ON items (library, date_added);
+CREATE INDEX IF NOT EXISTS items_collection_key ON items (library, collection_key, day);
+CREATE TABLE IF NOT EXISTS rollups (
+    library TEXT NOT NULL,
+    grain TEXT NOT NULL,
+    period TEXT NOT NULL,
+    collection_key TEXT NOT NULL,
+    item_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (library, grain, period, collection_key, item_type)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollups_collection_key ON rollups (library, grain, collection_key, period);
+"""
+
+_CONNECTIONS = threading.local()
+
+def get_rollup_connection():
+    """The method returns the connection of the current thread to the rollup database, creating
+    the database in WAL mode (so reads never wait on the worker writing a sync) the first time.
+
+    Returns:
+        sqlite3.Connection: The connection, in autocommit mode.
+
+    """
+    connection = getattr(_CONNECTIONS, "connection", None)
+    if connection == None:
+        connection = sqlite3.connect(ROLLUP_DATABASE_PATH, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(ROLLUP_SCHEMA)
+        _CONNECTIONS.connection = connection
+
+    return connection
+
+def get_item_rollup_row(item):
+    """The method extracts the fields of a zotero item stored in the rollup database.
+
+    Args:
+        item (dict): The zotero item.
+
+    Returns:
+        tuple|None: The (item key, dateAdded, day, first collection key, item type) of the item
+            or None for attachments.
+
+    """
+    data = item["data"]
+    if data["itemType"] == "attachment":
+        return None
+
+    collection_key = data["collections"][0] if len(data.get("collections", [])) > 0 else ""
+
+    return item["key"], data["dateAdded"], data["dateAdded"][:10], collection_key, data["itemType"]
+
+def get_rollup_periods(day: str):
+    """The method builds the period of every rollup grain a day belongs to, matching the
+    ROLLUP_GRAINS SQLite expressions.
+
+    Args:
+        day (str): The 'YYYY-MM-DD' day.
+
+    Returns:
+        dict: The period of the day for every grain eg: {"day": '2022-03-03', "week": '2022-02-28',
+            "month": '2022-03', "year": '2022'}.
+
+    """
+    date = datetime.date.fromisoformat(day)
+
+    return {
+        "day": day,
+        "week": (date - datetime.timedelta(days=date.weekday())).isoformat(),
+        "month": day[:7],
+        "year": day[:4]
+    }
+
+def get_rollup_version(library_id, library_type: str = "user"):
+    """The method returns the library version the rollups of a library were built at.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        int|None: The version or None if the library was never ingested.
+
+    """
+    row = get_rollup_connection().execute(
+        "SELECT version FROM libraries WHERE library = ?", (get_library_cache_key(library_id, library_type),)).fetchone()
+
+    return row[0] if row != None else None
+
+def _rebuild_rollups(connection, library: str, items, version: int):
+    """The method replaces every row of a library with its current items and recomputes the
+    rollups from the indexed item table. It must be called inside of a transaction.
+
+    Args:
+        connection (sqlite3.Connection): The rollup database connection.
+
+        library (str): The library cache key.
+
+        items (lst): The list of zotero items.
+
+        version (int): The library version of the items.
+
+    """
+    connection.execute("DELETE FROM items WHERE library = ?", (library,))
+    connection.execute("DELETE FROM rollups WHERE library = ?", (library,))
+
+    rows = (get_item_rollup_row(item) for item in items)
+    connection.executemany(
+        "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)",
+        ((library,) + row for row in rows if row != None))
+
+    for grain, period in ROLLUP_GRAINS.items():
+        connection.execute(f"""
+            INSERT INTO rollups
+            SELECT library, ?, {period}, collection_key, item_type, COUNT(*)
+            FROM items WHERE library = ?
+            GROUP BY {period}, collection_key, item_type""", (grain, library))
+
+    connection.execute("INSERT OR REPLACE INTO libraries VALUES (?, ?)", (library, version))
+
+def ingest_library_rollups(entry):
+    """The method writes the items of a freshly loaded library and their rollups to the rollup
+    database. Libraries already ingested at the same version (eg: by another worker) are skipped.
+
+    Args:
+        entry (dict): The library cache entry.
+
+    Returns:
+        int: The library version of the rollups.
+
+    """
+    connection = get_rollup_connection()
+
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        row = connection.execute("SELECT version FROM libraries WHERE library = ?", (entry["library"],)).fetchone()
+        if row == None or row[0] != entry["version"]:
+            _rebuild_rollups(connection, entry["library"], entry["items"], entry["version"])
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+    return entry["version"]
+
+def update_library_rollups(previous_version: int, delta, entry):
+    """The method applies the changes of a library sync to the rollup database. Only the rows of
+    the changed items and the rollup periods they fall into are written.
+
+    If the database is not at the version this process synced from (eg: another worker wrote a
+    different version) the library is rebuilt from the cached items instead.
+
+    Args:
+        previous_version (int): The library version of the rollups before the sync.
+
+        delta (dict): The delta applied to the cache (see sync_library).
+
+        entry (dict): The library cache entry after the sync.
+
+    Returns:
+        int: The library version of the rollups.
+
+    """
+    connection = get_rollup_connection()
+    library = entry["library"]
+
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        row = connection.execute("SELECT version FROM libraries WHERE library = ?", (library,)).fetchone()
+        stored_version = row[0] if row != None else None
+
+        if stored_version == delta["version"]:
+            pass
+        elif stored_version != previous_version:
+            _rebuild_rollups(connection, library, entry["items"], delta["version"])
+        else:
+            # Net count change of every (grain, period, collection, item type) touched by the sync:
+            count_changes = {}
+            for items, sign in ((delta["removed"], -1), (delta["added"], 1)):
+                for item in items:
+                    item_row = get_item_rollup_row(item)
+                    if item_row == None:
+                        continue
+
+                    _, _, day, collection_key, item_type = item_row
+                    for grain, period in get_rollup_periods(day).items():
+                        change_key = (grain, period, collection_key, item_type)
+                        count_changes[change_key] = count_changes.get(change_key, 0) + sign
+
+            connection.executemany(
+                "DELETE FROM items WHERE library = ? AND item_key = ?", ((library, item["key"]) for item in delta["removed"]))
+            rows = (get_item_rollup_row(item) for item in delta["added"])
+            connection.executemany(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)", ((library,) + row for row in rows if row != None))
+
+            connection.executemany("""
+                INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (library, grain, period, collection_key, item_type)
+                DO UPDATE SET count = count + excluded.count""",
+                ((library,) + change_key + (count,) for change_key, count in count_changes.items() if count != 0))
+            connection.execute("DELETE FROM rollups WHERE library = ? AND count = 0", (library,))
+
+            connection.execute("UPDATE libraries SET version = ? WHERE library = ?", (delta["version"], library))
+
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+    return delta["version"]
+
+def query_rollup_collection_counts(library_id, collections, cutoff=None, library_type: str = "user"):
+    """The method reads the number of sources read per collection from the yearly rollups, in the
+    same format as create_collection_counts.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        collections (lst): The list of collection data.
+
+        cutoff (None|int): The minimum number of sources read required for a collection to be included.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        pd.Dataframe: The dataframe containing the number of sources from each collection read.
+
+    """
+    collection_totals = dict(get_rollup_connection().execute("""
+        SELECT collection_key, SUM(count) FROM rollups
+        WHERE library = ? AND grain = 'year' AND collection_key != ''
+        GROUP BY collection_key""", (get_library_cache_key(library_id, library_type),)).fetchall())
+
+    collections = [dict(collection["data"], count=collection_totals.get(collection["key"], 0)) for collection in collections]
+    if cutoff != None:
+        collections = [collection for collection in collections if collection["count"] > cutoff]
+
+    return pd.DataFrame(collections)
+
+def query_rollup_timeseries_df(library_id, collections, grain: str = "day", library_type: str = "user"):
+    """The method reads the number of sources read per collection per period from the rollups, in
+    the same format as create_collection_timeseries_df for the 'day' grain.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        collections (lst): The list of collection data.
+
+        grain (str): The rollup grain, one of 'day', 'week', 'month' or 'year'.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        pd.DataFrame: The counts indexed by period covering the first to the last source of the
+            library, with one column per collection name.
+
+    """
+    library = get_library_cache_key(library_id, library_type)
+    connection = get_rollup_connection()
+
+    first_period, last_period = connection.execute(
+        "SELECT MIN(period), MAX(period) FROM rollups WHERE library = ? AND grain = ?", (library, grain)).fetchone()
+    # Like the dict built by create_collection_timeseries_df, later collections win on duplicate names:
+    collection_keys = {collection["data"]["name"]: collection["key"] for collection in collections}
+    collection_names = {key: name for name, key in collection_keys.items()}
+    columns = list(collection_keys.keys())
+
+    if first_period == None:
+        return pd.DataFrame(columns=columns, dtype=int)
+
+    counts_df = pd.read_sql_query(f"""
+        SELECT period, collection_key, SUM(count) AS count FROM rollups
+        WHERE library = ? AND grain = ? AND collection_key IN ({", ".join("?" * len(collection_names))})
+        GROUP BY period, collection_key""", connection, params=[library, grain] + list(collection_names.keys()))
+
+    counts_df["collection"] = counts_df["collection_key"].map(collection_names)
+    counts_df = counts_df.pivot(index="period", columns="collection", values="count")
+
+    if grain == "day":
+        index = pd.date_range(start=first_period, end=last_period, freq="D").strftime("%Y-%m-%d")
+    else:
+        index = sorted(row[0] for row in connection.execute(
+            "SELECT DISTINCT period FROM rollups WHERE library = ? AND grain = ?", (library, grain)))
+
+    return counts_df.reindex(index=index, columns=columns).fillna(0).astype(int)
+
+# Materializing the rollups of every library as soon as it is loaded and patching them on sync:
+register_library_aggregate(
+    "rollup_store",
+    ingest_library_rollups,
+    delta_handler=update_library_rollups,
+    build_on_ingest=True)
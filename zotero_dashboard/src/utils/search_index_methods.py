@@ -0,0 +1,402 @@
+# Importing internal data methods:
+from .library_cache import get_authorized_library, get_or_build_library_aggregate, register_library_aggregate
+
+# Importing data manipulation packages:
+import numpy as np
+import bisect
+import re
+
+# Tokens are lowercase runs of word characters:
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Query clauses are either a "quoted phrase" or a single (optionally prefix*) term:
+QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+# Term id inserted between the fields of an item so phrases never match across fields:
+FIELD_SEPARATOR = -1
+
+def tokenize(text):
+    """The method splits a piece of text into the lowercase tokens stored in the search index.
+
+    Args:
+        text (str): The text being tokenized.
+
+    Returns:
+        lst: The list of lowercase tokens.
+
+    """
+    if not text:
+        return []
+
+    return TOKEN_PATTERN.findall(text.lower())
+
+def extract_searchable_fields(item):
+    """The method extracts the text of the fields of a zotero item that are searchable: the
+    title, abstract, creator names and tags.
+
+    Args:
+        item (dict): A single zotero item.
+
+    Returns:
+        lst: The list of text fields of the item.
+
+    """
+    data = item["data"]
+
+    creators = []
+    for author in data.get("creators", []):
+        name = author.get("name", None)
+        if name == None:
+            name = f"{author.get('firstName', '')} {author.get('lastName', '')}"
+        creators.append(name)
+
+    tags = [tag.get("tag", "") for tag in data.get("tags", [])]
+
+    return [data.get("title", ""), data.get("abstractNote", "")] + creators + tags
+
+def build_search_index(items):
+    """The method builds an inverted index over the title, abstract, creators and tags of every non
+    attachment zotero item.
+
+    Every item is a document with an integer id. Each term id maps to the set of documents that 
+    contain it (used for term and prefix queries). The term ids of every document are also appended
+    to a flat corpus array so that phrase queries are verified with vectorized comparisons instead of
+    looping over the candidate documents.
+
+    Args:
+        items (lst): The list of zotero item data.
+
+    Returns:
+        dict: The search index in the form:
+            {
+                "doc_ids": {item_key: doc_id}, "doc_keys": [item_key|None], "doc_spans": {doc_id: (start, end)},
+                "free_doc_ids": [doc_id], "terms": {token: term_id}, "postings": [set(doc_id)],
+                "sorted_terms": [token]|None, "corpus": np.array, "corpus_docs": np.array,
+                "pending_tokens": [np.array], "pending_docs": [np.array], "corpus_size": int, "dead_tokens": int,
+                "writable_postings": set(term_id)|None
+            }
+
+    """
+    search_index = {
+        "doc_ids": {},
+        "doc_keys": [],
+        "doc_spans": {},
+        "free_doc_ids": [],
+        "terms": {},
+        "postings": [],
+        "sorted_terms": None,
+        "corpus": np.array([], dtype=np.int32),
+        "corpus_docs": np.array([], dtype=np.int32),
+        "pending_tokens": [],
+        "pending_docs": [],
+        "corpus_size": 0,
+        "dead_tokens": 0,
+        "writable_postings": None
+    }
+
+    for item in items:
+        add_search_document(search_index, item)
+
+    _get_corpus(search_index)
+
+    return search_index
+
+def _get_corpus(search_index):
+    """Concatenates the tokens of recently added documents onto the flat corpus arrays."""
+    if len(search_index["pending_tokens"]) > 0:
+        search_index["corpus"] = np.concatenate([search_index["corpus"]] + search_index["pending_tokens"])
+        search_index["corpus_docs"] = np.concatenate([search_index["corpus_docs"]] + search_index["pending_docs"])
+        search_index["pending_tokens"] = []
+        search_index["pending_docs"] = []
+
+    return search_index["corpus"], search_index["corpus_docs"]
+
+def _get_writable_postings(search_index, term_id: int):
+    """Returns the postings set of a term, copied first if it is still shared with the index it was copied from."""
+    writable_postings = search_index["writable_postings"]
+    if writable_postings != None and term_id not in writable_postings:
+        search_index["postings"][term_id] = set(search_index["postings"][term_id])
+        writable_postings.add(term_id)
+
+    return search_index["postings"][term_id]
+
+def add_search_document(search_index, item):
+    """The method adds (or replaces) a single zotero item in the search index.
+
+    Args:
+        search_index (dict): The index built by build_search_index.
+
+        item (dict): A single zotero item.
+
+    """
+    if item["data"]["itemType"] == "attachment":
+        return
+
+    remove_search_document(search_index, item["key"])
+
+    # Re-using the ids of deleted documents:
+    if len(search_index["free_doc_ids"]) > 0:
+        doc_id = search_index["free_doc_ids"].pop()
+    else:
+        doc_id = len(search_index["doc_keys"])
+        search_index["doc_keys"].append(None)
+
+    terms = search_index["terms"]
+    term_ids = []
+    for field in extract_searchable_fields(item):
+        for token in tokenize(field):
+            term_id = terms.get(token, None)
+            if term_id == None:
+                term_id = len(search_index["postings"])
+                terms[token] = term_id
+                search_index["postings"].append(set())
+                search_index["sorted_terms"] = None
+                if search_index["writable_postings"] != None:
+                    search_index["writable_postings"].add(term_id)
+
+            _get_writable_postings(search_index, term_id).add(doc_id)
+            term_ids.append(term_id)
+
+        term_ids.append(FIELD_SEPARATOR)
+
+    start = search_index["corpus_size"]
+    search_index["pending_tokens"].append(np.array(term_ids, dtype=np.int32))
+    search_index["pending_docs"].append(np.full(len(term_ids), doc_id, dtype=np.int32))
+    search_index["corpus_size"] = start + len(term_ids)
+
+    search_index["doc_ids"][item["key"]] = doc_id
+    search_index["doc_keys"][doc_id] = item["key"]
+    search_index["doc_spans"][doc_id] = (start, start + len(term_ids))
+
+def remove_search_document(search_index, item_key: str):
+    """The method removes a single zotero item from the search index if it is indexed.
+
+    The tokens of the document are overwritten in the corpus and the corpus is compacted once
+    more than half of it belongs to removed documents.
+
+    Args:
+        search_index (dict): The index built by build_search_index.
+
+        item_key (str): The zotero item key.
+
+    """
+    doc_id = search_index["doc_ids"].pop(item_key, None)
+    if doc_id == None:
+        return
+
+    corpus, _ = _get_corpus(search_index)
+    start, end = search_index["doc_spans"].pop(doc_id)
+
+    for term_id in np.unique(corpus[start:end]):
+        if term_id != FIELD_SEPARATOR:
+            _get_writable_postings(search_index, term_id).discard(doc_id)
+
+    corpus[start:end] = FIELD_SEPARATOR
+    search_index["doc_keys"][doc_id] = None
+    search_index["free_doc_ids"].append(doc_id)
+    search_index["dead_tokens"] += end - start
+
+    if search_index["dead_tokens"] > search_index["corpus_size"] // 2:
+        _compact_corpus(search_index)
+
+def _compact_corpus(search_index):
+    """Rebuilds the flat corpus arrays without the tokens of removed documents."""
+    corpus, corpus_docs = _get_corpus(search_index)
+
+    tokens, docs, spans = [], [], {}
+    position = 0
+    for doc_id, (start, end) in sorted(search_index["doc_spans"].items(), key=lambda span: span[1][0]):
+        tokens.append(corpus[start:end])
+        docs.append(corpus_docs[start:end])
+        spans[doc_id] = (position, position + end - start)
+        position += end - start
+
+    search_index["corpus"] = np.concatenate(tokens) if len(tokens) > 0 else np.array([], dtype=np.int32)
+    search_index["corpus_docs"] = np.concatenate(docs) if len(docs) > 0 else np.array([], dtype=np.int32)
+    search_index["doc_spans"] = spans
+    search_index["corpus_size"] = position
+    search_index["dead_tokens"] = 0
+
+def _copy_search_index(search_index):
+    """Copies the containers of the index that documents are added to or removed from, the postings sets are only copied once modified."""
+    corpus, corpus_docs = _get_corpus(search_index)
+
+    return dict(
+        search_index,
+        doc_ids=dict(search_index["doc_ids"]),
+        doc_keys=list(search_index["doc_keys"]),
+        doc_spans=dict(search_index["doc_spans"]),
+        free_doc_ids=list(search_index["free_doc_ids"]),
+        terms=dict(search_index["terms"]),
+        postings=list(search_index["postings"]),
+        corpus=corpus.copy(),
+        corpus_docs=corpus_docs,
+        pending_tokens=[],
+        pending_docs=[],
+        writable_postings=set())
+
+def update_search_index(search_index, delta, entry=None):
+    """The method applies the changes of a library sync (see utils.library_cache.sync_library) to
+    the search index so that only the changed items are re-tokenized.
+
+    The changes are applied to a copy of the index that only copies the postings sets of the
+    changed terms, so searches still running against the previous index (without the cache lock)
+    never see a partially updated index.
+
+    Args:
+        search_index (dict): The index built by build_search_index.
+
+        delta (dict): The library delta containing the "added" and "removed" zotero items.
+
+        entry (dict): The cache entry of the library (unused, part of the delta handler signature).
+
+    Returns:
+        dict: The updated search index.
+
+    """
+    search_index = _copy_search_index(search_index)
+
+    for item in delta["removed"]:
+        remove_search_document(search_index, item["key"])
+
+    for item in delta["added"]:
+        add_search_document(search_index, item)
+
+    # The index is only read once it is returned:
+    _get_corpus(search_index)
+    search_index["writable_postings"] = None
+
+    return search_index
+
+def _match_prefix(search_index, prefix: str):
+    """Returns the set of documents containing any term starting with the prefix."""
+    if search_index["sorted_terms"] == None:
+        search_index["sorted_terms"] = sorted(search_index["terms"].keys())
+
+    sorted_terms = search_index["sorted_terms"]
+    start = bisect.bisect_left(sorted_terms, prefix)
+    end = bisect.bisect_left(sorted_terms, prefix + "\uffff")
+
+    postings = [search_index["postings"][search_index["terms"][term]] for term in sorted_terms[start:end]]
+    if len(postings) == 0:
+        return set()
+
+    return set().union(*postings)
+
+def _match_phrase(search_index, tokens):
+    """Returns the set of documents containing the tokens next to each other in a single field."""
+    term_ids = [search_index["terms"].get(token, None) for token in tokens]
+    if None in term_ids:
+        return set()
+
+    if len(term_ids) == 1:
+        return search_index["postings"][term_ids[0]]
+
+    # Anchoring on the rarest term of the phrase and narrowing its positions down to the
+    # positions where every other term of the phrase sits at the right offset:
+    corpus, corpus_docs = _get_corpus(search_index)
+    anchor = min(range(len(term_ids)), key=lambda offset: len(search_index["postings"][term_ids[offset]]))
+
+    positions = np.flatnonzero(corpus == term_ids[anchor]) - anchor
+    positions = positions[(positions >= 0) & (positions <= len(corpus) - len(term_ids))]
+    for offset, term_id in enumerate(term_ids):
+        if offset != anchor:
+            positions = positions[corpus[positions + offset] == term_id]
+
+    return set(np.unique(corpus_docs[positions]).tolist())
+
+def search_library(search_index, query: str):
+    """The method runs a search query against the search index.
+
+    The query is a whitespace separated list of clauses that all have to match:
+        - term: items containing the term eg: energy
+        - prefix: items containing a term starting with the prefix eg: energ*
+        - phrase: items containing the terms next to each other eg: "energy policy"
+
+    Args:
+        search_index (dict): The index built by build_search_index.
+
+        query (str): The search query.
+
+    Returns:
+        set|None: The set of matching zotero item keys or None if the query is empty.
+
+    """
+    clause_matches = []
+    for phrase, term in QUERY_PATTERN.findall(query if query else ""):
+        if phrase:
+            tokens = tokenize(phrase)
+            if len(tokens) > 0:
+                clause_matches.append(_match_phrase(search_index, tokens))
+
+        elif term.endswith("*"):
+            tokens = tokenize(term[:-1])
+            if len(tokens) == 1:
+                clause_matches.append(_match_prefix(search_index, tokens[0]))
+            elif len(tokens) > 1:
+                clause_matches.append(_match_phrase(search_index, tokens))
+
+        else:
+            tokens = tokenize(term)
+            if len(tokens) > 0:
+                clause_matches.append(_match_phrase(search_index, tokens))
+
+    if len(clause_matches) == 0:
+        return None
+
+    # Intersecting from the smallest set of matches (the postings sets are never modified here):
+    clause_matches.sort(key=len)
+    doc_ids = clause_matches[0].intersection(*clause_matches[1:])
+
+    return {search_index["doc_keys"][doc_id] for doc_id in doc_ids}
+
+def get_cached_search_index(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method returns the search index of a library from the server side cache, loading the
+    library first if this server process has not queried it yet.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The index built by build_search_index.
+
+    """
+    # The key is checked against the library before any cached data is served:
+    get_authorized_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    return get_or_build_library_aggregate(library_id, "search_index", library_type=library_type)
+
+def filter_items_by_search(items, search_index, query: str):
+    """The method filters a list of zotero items down to the items matching a search query.
+
+    Args:
+        items (lst): The list of zotero item data.
+
+        search_index (dict): The index built by build_search_index.
+
+        query (str): The search query (see search_library).
+
+    Returns:
+        lst: The matching zotero items, or all items if the query is empty.
+
+    """
+    matching_keys = search_library(search_index, query)
+    if matching_keys == None:
+        return items
+
+    return [item for item in items if item["key"] in matching_keys]
+
+# Building the search index when a library is loaded and updating it on every sync:
+register_library_aggregate(
+    "search_index", 
+    lambda entry: build_search_index(entry["items"]), 
+    delta_handler=update_search_index, 
+    build_on_ingest=True)
@@ -0,0 +1,294 @@
+# Importing internal data methods:
+from .library_cache import register_library_aggregate
+
+# Importing data manipulation packages:
+import pandas as pd
+import numpy as np
+import datetime
+
+# Zotero keys are 8 characters, the extra width leaves room for other sources:
+COLLECTION_KEY_DTYPE = "U16"
+
+def encode_items_for_aggregation(items):
+    """The method extracts the only two fields of the zotero items the aggregations need into
+    fixed width NumPy string arrays that are counted with vectorized operations.
+
+    Args:
+        items (lst): The list of zotero item data sorted by dateAdded.
+
+    Returns:
+        dict: The encoded items in the form {"days": np.array of 'YYYY-MM-DD', "collections": np.array of
+            the first collection key of every item ('' if it has none)}.
+
+    """
+    sources = [item["data"] for item in items if item["data"]["itemType"] != "attachment"]
+
+    return {
+        "days": np.array([source["dateAdded"][:10] for source in sources], dtype="U10"),
+        "collections": np.array(
+            [source["collections"][0] if len(source["collections"]) > 0 else "" for source in sources],
+            dtype=COLLECTION_KEY_DTYPE)
+    }
+
+def aggregate_shard(days, collections, collection_keys):
+    """The method computes the daily and day by collection counts of the encoded items in a
+    single vectorized pass.
+
+    Args:
+        days (np.array): The 'YYYY-MM-DD' day every item was added.
+
+        collections (np.array): The first collection key of every item.
+
+        collection_keys (np.array): The sorted array of every collection key of the library.
+
+    Returns:
+        int: The first day of the items as a number of days since 1970-01-01.
+
+        np.array: The number of items added per day from the first day.
+
+        np.array: The (days, collections) matrix of the number of items added per day to every collection.
+
+    """
+    if len(days) == 0:
+        return 0, np.zeros(0, dtype=np.int64), np.zeros((0, len(collection_keys)), dtype=np.int64)
+
+    day_numbers = days.astype("datetime64[D]").astype(np.int64)
+    first_day = day_numbers.min()
+    day_offsets = day_numbers - first_day
+    num_days = day_offsets.max() + 1
+
+    daily_counts = np.bincount(day_offsets, minlength=num_days)
+
+    # Mapping collection keys to their position in the sorted key array (items without a known collection are dropped):
+    num_collections = len(collection_keys)
+    if num_collections > 0:
+        collection_codes = np.minimum(np.searchsorted(collection_keys, collections), num_collections - 1)
+        has_collection = collection_keys[collection_codes] == collections
+    else:
+        collection_codes = np.zeros(len(collections), dtype=np.int64)
+        has_collection = np.zeros(len(collections), dtype=bool)
+
+    day_collection_counts = np.bincount(
+        day_offsets[has_collection] * num_collections + collection_codes[has_collection],
+        minlength=num_days * num_collections).reshape(num_days, num_collections)
+
+    return int(first_day), daily_counts, day_collection_counts
+
+def build_sharded_aggregates(items, collections):
+    """The method computes the daily and day by collection counts of a library with a single
+    vectorized pass over its encoded items (see aggregate_shard).
+
+    The items are not split into shards aggregated by a pool of worker processes: encoding the items
+    takes most of the time and has to run in the request process anyway, so the multi-core
+    aggregation was declined.
+
+    Args:
+        items (lst): The list of zotero item data sorted by dateAdded.
+
+        collections (lst): The list of collection data.
+
+    Returns:
+        dict: The aggregates in the form:
+            {
+                "first_day": np.datetime64, "daily": np.array, "day_collection": np.array,
+                "collection_keys": np.array of the sorted collection keys (the day_collection columns)
+            }
+
+    """
+    encoded_items = encode_items_for_aggregation(items)
+    collection_keys = np.array(sorted(collection["key"] for collection in collections), dtype=COLLECTION_KEY_DTYPE)
+
+    first_day, daily_counts, day_collection_counts = aggregate_shard(
+        encoded_items["days"], encoded_items["collections"], collection_keys)
+
+    return {
+        "first_day": np.datetime64(first_day, "D"),
+        "daily": daily_counts,
+        "day_collection": day_collection_counts,
+        "collection_keys": collection_keys
+    }
+
+def apply_sharded_aggregates_delta(aggregates, delta, collections=None):
+    """The method applies the changes of a library sync to the sharded aggregates of the library, so
+    that they match the aggregates built from the updated items by build_sharded_aggregates.
+
+    Only the days and collections of the changed items are updated in place: added items are
+    counted, deleted items are subtracted and modified items (eg: moved to another collection or
+    with a new dateAdded) are subtracted in their previous state and counted in their new one. The
+    arrays are only reallocated when the day range or the collections of the library change.
+
+    Args:
+        aggregates (dict): The aggregates built by build_sharded_aggregates.
+
+        delta (dict): The delta applied to the library (see sync_library).
+
+        collections (None|lst): The list of collection data after the sync, defaults to the
+            collections of the delta.
+
+    Returns:
+        dict: The updated aggregates.
+
+    """
+    collections = collections if collections != None else delta["collections"]
+    collection_keys = np.array(sorted(collection["key"] for collection in collections), dtype=COLLECTION_KEY_DTYPE)
+    removed = encode_items_for_aggregation(delta["removed"])
+    added = encode_items_for_aggregation(delta["added"])
+
+    daily_counts = aggregates["daily"]
+    day_collection_counts = aggregates["day_collection"]
+    first_day = aggregates["first_day"].astype(np.int64)
+
+    # Extending the day range to the days of the changed items:
+    changed_days = np.concatenate([removed["days"], added["days"]]).astype("datetime64[D]").astype(np.int64)
+    if len(changed_days) > 0:
+        if len(daily_counts) == 0:
+            first_day = last_day = changed_days.min()
+        else:
+            last_day = first_day + len(daily_counts) - 1
+
+        new_first_day, new_last_day = min(first_day, changed_days.min()), max(last_day, changed_days.max())
+        if new_first_day != first_day or new_last_day - new_first_day + 1 != len(daily_counts):
+            offset = first_day - new_first_day
+            num_days = new_last_day - new_first_day + 1
+
+            daily_counts = np.zeros(num_days, dtype=np.int64)
+            daily_counts[offset: offset + len(aggregates["daily"])] = aggregates["daily"]
+            day_collection_counts = np.zeros((num_days, day_collection_counts.shape[1]), dtype=np.int64)
+            day_collection_counts[offset: offset + len(aggregates["daily"])] = aggregates["day_collection"]
+            first_day = new_first_day
+
+    # Columns of the collections created by the sync are added before counting the changes:
+    previous_keys = aggregates["collection_keys"]
+    all_keys = np.union1d(previous_keys, collection_keys).astype(COLLECTION_KEY_DTYPE)
+    if len(all_keys) != len(previous_keys):
+        expanded_counts = np.zeros((len(daily_counts), len(all_keys)), dtype=np.int64)
+        expanded_counts[:, np.searchsorted(all_keys, previous_keys)] = day_collection_counts
+        day_collection_counts = expanded_counts
+
+    # Removed items were counted against the previous collections and added items against the current ones:
+    for encoded_items, counted_keys, sign in ((removed, previous_keys, -1), (added, collection_keys, 1)):
+        day_offsets = encoded_items["days"].astype("datetime64[D]").astype(np.int64) - first_day
+        np.add.at(daily_counts, day_offsets, sign)
+
+        has_collection = np.isin(encoded_items["collections"], counted_keys)
+        collection_codes = np.searchsorted(all_keys, encoded_items["collections"][has_collection])
+        np.add.at(day_collection_counts, (day_offsets[has_collection], collection_codes), sign)
+
+    # Dropping the columns of deleted collections:
+    if len(all_keys) != len(collection_keys):
+        day_collection_counts = day_collection_counts[:, np.searchsorted(all_keys, collection_keys)]
+
+    # Trimming the days without items left at either end of the range:
+    if len(daily_counts) > 0 and (daily_counts[0] == 0 or daily_counts[-1] == 0):
+        active_days = np.flatnonzero(daily_counts)
+        if len(active_days) == 0:
+            first_day, daily_counts, day_collection_counts = 0, daily_counts[:0], day_collection_counts[:0]
+        else:
+            low, high = active_days[0], active_days[-1] + 1
+            first_day, daily_counts, day_collection_counts = \
+                first_day + low, daily_counts[low:high], day_collection_counts[low:high]
+
+    aggregates["first_day"] = np.datetime64(int(first_day), "D")
+    aggregates["daily"] = daily_counts
+    aggregates["day_collection"] = day_collection_counts
+    aggregates["collection_keys"] = collection_keys
+
+    return aggregates
+
+def _match_collection_codes(collection_keys, collections):
+    """Returns the position of every collection in the sorted key array and whether its key is in the aggregates."""
+    keys = np.array([collection["key"] for collection in collections], dtype=str)
+    if len(collection_keys) == 0 or len(keys) == 0:
+        return np.zeros(len(keys), dtype=np.int64), np.zeros(len(keys), dtype=bool)
+
+    # Collections that are not in the aggregates (eg: deleted by a later sync) are masked out:
+    codes = np.minimum(np.searchsorted(collection_keys, keys), len(collection_keys) - 1)
+
+    return codes, collection_keys[codes] == keys
+
+def sharded_collection_counts(aggregates, collections, cutoff=None):
+    """The method builds the number of sources read per collection from the sharded aggregates, in
+    the same format as create_collection_counts.
+
+    Args:
+        aggregates (dict): The aggregates built by build_sharded_aggregates.
+
+        collections (lst): The list of collection data, collections missing from the aggregates are left out.
+
+        cutoff (None|int): The minimum number of sources read required for a collection to be included.
+
+    Returns:
+        pd.Dataframe: The dataframe containing the number of sources from each collection read.
+
+    """
+    collection_totals = aggregates["day_collection"].sum(axis=0)
+    codes, has_collection = _match_collection_codes(aggregates["collection_keys"], collections)
+
+    collections = [
+        dict(collection["data"], count=int(collection_totals[code]))
+        for collection, code, matched in zip(collections, codes, has_collection) if matched]
+    if cutoff != None:
+        collections = [collection for collection in collections if collection["count"] > cutoff]
+
+    return pd.DataFrame(collections)
+
+def sharded_collection_timeseries_df(aggregates, collections):
+    """The method builds the number of sources read per collection per day from the sharded aggregates,
+    in the same format as create_collection_timeseries_df.
+
+    Args:
+        aggregates (dict): The aggregates built by build_sharded_aggregates.
+
+        collections (lst): The list of collection data, collections missing from the aggregates are left out.
+
+    Returns:
+        pd.DataFrame: The daily counts indexed by 'YYYY-MM-DD' with one column per collection name.
+
+    """
+    num_days = len(aggregates["daily"])
+    datetime_index = pd.date_range(start=pd.Timestamp(aggregates["first_day"]), periods=num_days, freq='D').strftime("%Y-%m-%d")
+    codes, has_collection = _match_collection_codes(aggregates["collection_keys"], collections)
+    collections = [collection for collection, matched in zip(collections, has_collection) if matched]
+    codes = codes[has_collection]
+
+    daily_collection_count_df = pd.DataFrame(
+        aggregates["day_collection"][:, codes] if len(codes) > 0 else np.zeros((num_days, 0), dtype=np.int64),
+        index=datetime_index,
+        columns=[collection["data"]["name"] for collection in collections])
+
+    # Like the dict built by create_collection_timeseries_df, later collections win on duplicate names:
+    return daily_collection_count_df.loc[:, ~daily_collection_count_df.columns.duplicated(keep="last")]
+
+def sharded_source_array(aggregates, year: int):
+    """The method slices the daily counts of the sharded aggregates down to a single year, in the
+    same format as build_source_array.
+
+    Args:
+        aggregates (dict): The aggregates built by build_sharded_aggregates.
+
+        year (int): The year of the calendar heatmap.
+
+    Returns:
+        lst: The 1-D array of source counts for every day of the year.
+
+    """
+    first_day = np.datetime64(datetime.date(year, 1, 1), "D")
+    num_days = (np.datetime64(datetime.date(year + 1, 1, 1), "D") - first_day).astype(int)
+
+    source_array = np.zeros(num_days, dtype=np.int64)
+    start = (first_day - aggregates["first_day"]).astype(int)
+
+    # Overlap between the year and the aggregated date range:
+    low, high = max(start, 0), min(start + num_days, len(aggregates["daily"]))
+    if low < high:
+        source_array[low - start: high - start] = aggregates["daily"][low: high]
+
+    return source_array.tolist()
+
+# Maintaining the daily and day by collection counts of every cached library from the sync deltas, shared
+# by every server process of the host:
+register_library_aggregate(
+    "daily_aggregates",
+    lambda entry: build_sharded_aggregates(entry["items"], entry["collections"]),
+    delta_handler=lambda aggregates, delta, entry: apply_sharded_aggregates_delta(aggregates, delta, entry["collections"]),
+    shared=True)
@@ -0,0 +1,316 @@
+# Importing data manipulation packages:
+import numpy as np
+
+# Importing packages used to share the aggregates between the server processes of the host:
+import threading
+import tempfile
+import shutil
+import json
+import time
+import uuid
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Root directory of the aggregate segments shared by every gunicorn worker of the host (an empty value disables sharing):
+SHARED_AGGREGATE_DIR = os.environ.get(
+    "ZOTERO_SHARED_AGGREGATE_DIR",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "zotero_dashboard_aggregates"))
+
+# Partially written segments left by a crashed process are removed after this many seconds:
+SHARED_AGGREGATE_STALE_SECONDS = 3600
+
+# Name of the file every process attached to a segment holds a shared lock on (its reference count):
+SEGMENT_LOCK_FILE = "refs.lock"
+SEGMENT_MANIFEST_FILE = "manifest.json"
+
+# Segments attached by this process in the form {segment: {"fd", "refs", "value"}}:
+_ATTACHED_SEGMENTS = {}
+_SEGMENTS_LOCK = threading.Lock()
+
+def shared_aggregates_enabled():
+    """The method checks whether the aggregates can be shared between the server processes, ie: a
+    shared directory is configured and the platform supports file locks.
+
+    Returns:
+        bool: Whether the shared aggregates are enabled.
+
+    """
+    return bool(SHARED_AGGREGATE_DIR) and fcntl != None
+
+def is_shareable_aggregate(value):
+    """The method checks whether an aggregate can be published as a shared segment, ie: it is a dict
+    of numpy arrays and scalars (eg: the daily aggregates built by build_sharded_aggregates).
+
+    Args:
+        value (object): The aggregate.
+
+    Returns:
+        bool: Whether the aggregate can be shared.
+
+    """
+    return isinstance(value, dict) and len(value) > 0 and all(
+        isinstance(key, str) and isinstance(array, (np.ndarray, np.generic)) and array.dtype != object
+        for key, array in value.items())
+
+def get_segment_path(library: str, name: str, version: int):
+    """The method builds the directory of the shared segment of an aggregate at a library version.
+
+    Args:
+        library (str): The library cache key eg: 'user:123456'.
+
+        name (str): The name the aggregate is registered under.
+
+        version (int): The library version the aggregate was built for.
+
+    Returns:
+        str: The segment directory.
+
+    """
+    return os.path.join(SHARED_AGGREGATE_DIR, library.replace(":", "_"), name, str(version))
+
+def _hold_segment(segment: str):
+    """The method takes a shared lock on the lock file of a segment, which is released when the
+    process closes it (or exits), so the segment is only removed once no process holds it.
+
+    Args:
+        segment (str): The segment directory.
+
+    Returns:
+        int|None: The file descriptor holding the lock or None if the segment no longer exists.
+
+    """
+    try:
+        fd = os.open(os.path.join(segment, SEGMENT_LOCK_FILE), os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+
+    fcntl.flock(fd, fcntl.LOCK_SH)
+
+    # The segment may have been removed while the lock was being taken:
+    if not os.path.exists(os.path.join(segment, SEGMENT_MANIFEST_FILE)):
+        os.close(fd)
+        return None
+
+    return fd
+
+def _map_segment(segment: str):
+    """The method maps the arrays of a segment read only, without copying them.
+
+    Args:
+        segment (str): The segment directory.
+
+    Returns:
+        dict: The aggregate with every array backed by the segment files.
+
+    """
+    with open(os.path.join(segment, SEGMENT_MANIFEST_FILE), "r") as file:
+        keys = json.load(file)["keys"]
+
+    value = {}
+    for position, key in enumerate(keys):
+        array = np.load(os.path.join(segment, f"{position}.npy"), mmap_mode="r", allow_pickle=False)
+        # Scalars (eg: the first day of the daily counts) are restored as numpy scalars:
+        value[key] = array[()] if array.ndim == 0 else array
+
+    return value
+
+def attach_shared_aggregate(library: str, name: str, version: int):
+    """The method attaches the segment of an aggregate published by any server process of the host.
+
+    Args:
+        library (str): The library cache key eg: 'user:123456'.
+
+        name (str): The name the aggregate is registered under.
+
+        version (int): The library version the aggregate was built for.
+
+    Returns:
+        dict|None: The aggregate with read only arrays or None if it was not published.
+
+        str|None: The segment directory, to be released with release_shared_aggregate.
+
+    """
+    if not shared_aggregates_enabled():
+        return None, None
+
+    segment = get_segment_path(library, name, version)
+    with _SEGMENTS_LOCK:
+        attached_segment = _ATTACHED_SEGMENTS.get(segment, None)
+        if attached_segment != None:
+            attached_segment["refs"] += 1
+            return dict(attached_segment["value"]), segment
+
+        try:
+            fd = _hold_segment(segment)
+            if fd == None:
+                return None, None
+            value = _map_segment(segment)
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+        _ATTACHED_SEGMENTS[segment] = {"fd": fd, "refs": 1, "value": value}
+
+    return dict(value), segment
+
+def publish_shared_aggregate(library: str, name: str, version: int, value):
+    """The method writes an aggregate to its shared segment and attaches it, so that the other
+    server processes map the same arrays instead of building their own copy.
+
+    The segment is written to a temporary directory that is renamed into place, so a process never
+    maps a partially written segment. If another process published the aggregate first its segment
+    is attached instead.
+
+    Args:
+        library (str): The library cache key eg: 'user:123456'.
+
+        name (str): The name the aggregate is registered under.
+
+        version (int): The library version the aggregate was built for.
+
+        value (dict): The aggregate, a dict of numpy arrays and scalars.
+
+    Returns:
+        dict: The aggregate with read only arrays, or the aggregate itself if it can't be shared.
+
+        str|None: The segment directory, to be released with release_shared_aggregate.
+
+    """
+    if not shared_aggregates_enabled() or not is_shareable_aggregate(value):
+        return value, None
+
+    segment = get_segment_path(library, name, version)
+    staging = os.path.join(os.path.dirname(segment), f".{version}.{os.getpid()}.{uuid.uuid4().hex}")
+    try:
+        os.makedirs(staging)
+        for position, array in enumerate(value.values()):
+            np.save(os.path.join(staging, f"{position}.npy"), np.asarray(array), allow_pickle=False)
+        open(os.path.join(staging, SEGMENT_LOCK_FILE), "w").close()
+        # The manifest is written last, a segment without one is incomplete:
+        with open(os.path.join(staging, SEGMENT_MANIFEST_FILE), "w") as file:
+            json.dump({"keys": list(value.keys())}, file)
+
+        try:
+            os.rename(staging, segment)
+        except OSError:
+            # Another process published the same version first:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        return value, None
+
+    reclaim_shared_aggregates(library, name, keep_version=version)
+
+    shared_value, segment = attach_shared_aggregate(library, name, version)
+    if shared_value == None:
+        return value, None
+
+    return shared_value, segment
+
+def release_shared_aggregate(segment: str):
+    """The method drops a reference of this process to a segment. Once the process holds no more
+    references its lock is released and the segment is removed if no other process holds it.
+
+    Args:
+        segment (str): The segment directory returned by attach_shared_aggregate.
+
+    """
+    with _SEGMENTS_LOCK:
+        attached_segment = _ATTACHED_SEGMENTS.get(segment, None)
+        if attached_segment == None:
+            return
+
+        attached_segment["refs"] -= 1
+        if attached_segment["refs"] > 0:
+            return
+
+        # The mapped arrays stay readable by their remaining users once the files are removed:
+        del _ATTACHED_SEGMENTS[segment]
+        os.close(attached_segment["fd"])
+
+    _remove_unused_segment(segment)
+
+def _remove_unused_segment(segment: str):
+    """The method removes a segment if no process holds a lock on it.
+
+    Args:
+        segment (str): The segment directory.
+
+    Returns:
+        bool: Whether the segment was removed.
+
+    """
+    try:
+        fd = os.open(os.path.join(segment, SEGMENT_LOCK_FILE), os.O_RDONLY)
+    except FileNotFoundError:
+        return False
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+
+    try:
+        # Removing the manifest first so that a process waiting on the lock sees the segment as gone:
+        os.remove(os.path.join(segment, SEGMENT_MANIFEST_FILE))
+        shutil.rmtree(segment, ignore_errors=True)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+    return True
+
+def reclaim_shared_aggregates(library: str, name: str, keep_version: int = None):
+    """The method removes the segments of the other versions of an aggregate that no process holds
+    anymore (eg: left behind by workers that were restarted) along with abandoned partial writes.
+
+    Args:
+        library (str): The library cache key eg: 'user:123456'.
+
+        name (str): The name the aggregate is registered under.
+
+        keep_version (int): The library version whose segment is kept.
+
+    """
+    if not shared_aggregates_enabled():
+        return
+
+    aggregate_dir = os.path.dirname(get_segment_path(library, name, 0))
+    try:
+        segments = os.listdir(aggregate_dir)
+    except FileNotFoundError:
+        return
+
+    for segment in segments:
+        path = os.path.join(aggregate_dir, segment)
+        if segment.startswith("."):
+            try:
+                if time.time() - os.path.getmtime(path) > SHARED_AGGREGATE_STALE_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+            continue
+
+        with _SEGMENTS_LOCK:
+            attached = path in _ATTACHED_SEGMENTS
+        if segment != str(keep_version) and not attached:
+            _remove_unused_segment(path)
+
+def copy_shared_aggregate(value):
+    """The method copies the read only arrays of a shared aggregate into private arrays, eg: before
+    a delta handler updates them in place.
+
+    Args:
+        value (dict): The aggregate returned by attach_shared_aggregate.
+
+    Returns:
+        dict: The aggregate with writable copies of its arrays.
+
+    """
+    return {key: np.array(array) if isinstance(array, np.ndarray) else array for key, array in value.items()}
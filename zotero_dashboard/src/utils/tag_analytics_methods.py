@@ -0,0 +1,226 @@
+# Importing internal data methods:
+from .library_cache import get_authorized_library, get_or_build_library_aggregate, register_library_aggregate
+
+# Importing data manipulation packages:
+import pandas as pd
+import numpy as np
+import scipy.sparse as sparse
+import unicodedata
+
+# Resolutions the tag counts over time can be computed at (numpy datetime units):
+TAG_PERIODS = {"year": "Y", "month": "M"}
+
+def normalize_tag(tag):
+    """The method converts a zotero tag dict into its display name and the key used to match
+    the same tag across items, so that 'Machine Learning' and 'machine learning ' are counted once.
+
+    Args:
+        tag (dict): A single zotero tag dict containing the 'tag' field.
+
+    Returns:
+        tuple: The (key, display name) of the tag or (None, None) if the tag is empty.
+
+    """
+    display_name = " ".join(unicodedata.normalize("NFKC", tag.get("tag", "") or "").split())
+    if display_name == "":
+        return None, None
+
+    return display_name.casefold(), display_name
+
+def build_tag_matrix(items, collections):
+    """The method builds the sparse item by tag and item by collection incidence matrices of a
+    zotero library in a single pass over the items.
+
+    Row i of both matrices is the i-th non attachment item, column j of the tag matrix is the
+    j-th distinct (normalized) tag and column k of the collection matrix is the k-th collection.
+
+    Args:
+        items (lst): The list of zotero item data.
+
+        collections (lst): The list of collection data.
+
+    Returns:
+        dict: The tag matrix in the form:
+            {
+                "matrix": sparse.csr_matrix of shape (items, tags),
+                "collection_matrix": sparse.csr_matrix of shape (items, collections),
+                "tags": [display name], "collection_names": [collection name],
+                "item_keys": [item key], "item_days": np.array of datetime64[D]
+            }
+
+    """
+    tag_codes = {}
+    tags = []
+    # The same tag strings are repeated across items, every one of them is only normalized once:
+    normalized_tags = {}
+    collection_codes = {collection["key"]: code for code, collection in enumerate(collections)}
+    item_keys, item_days = [], []
+    rows, columns = [], []
+    collection_rows, collection_columns = [], []
+
+    sources = [item["data"] for item in items if item["data"]["itemType"] != "attachment"]
+    for row, source in enumerate(sources):
+        item_keys.append(source["key"])
+        item_days.append(source["dateAdded"][:10])
+
+        item_tags = set()
+        for tag in source.get("tags", []):
+            raw_tag = tag.get("tag", "")
+            if raw_tag not in normalized_tags:
+                normalized_tags[raw_tag] = normalize_tag(tag)
+            key, display_name = normalized_tags[raw_tag]
+            if key == None or key in item_tags:
+                continue
+
+            item_tags.add(key)
+            code = tag_codes.get(key, None)
+            if code == None:
+                code = len(tags)
+                tag_codes[key] = code
+                tags.append(display_name)
+
+            rows.append(row)
+            columns.append(code)
+
+        for collection_key in set(source.get("collections", [])):
+            code = collection_codes.get(collection_key, None)
+            if code != None:
+                collection_rows.append(row)
+                collection_columns.append(code)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64))),
+        shape=(len(sources), len(tags)))
+    collection_matrix = sparse.csr_matrix(
+        (np.ones(len(collection_rows), dtype=np.float32),
+         (np.array(collection_rows, dtype=np.int64), np.array(collection_columns, dtype=np.int64))),
+        shape=(len(sources), len(collections)))
+
+    return {
+        "matrix": matrix,
+        "collection_matrix": collection_matrix,
+        "tags": tags,
+        "collection_names": [collection["data"]["name"] for collection in collections],
+        "item_keys": item_keys,
+        "item_days": np.array(item_days, dtype="datetime64[D]")
+    }
+
+def get_top_tag_codes(tag_matrix, top_n: int = 10):
+    """The method finds the column of the most used tags of the tag matrix.
+
+    Args:
+        tag_matrix (dict): The tag matrix built by build_tag_matrix.
+
+        top_n (int): The number of tags that are kept.
+
+    Returns:
+        np.array: The tag codes ordered from the most used tag (ties are ordered by first use).
+
+    """
+    matrix = tag_matrix["matrix"]
+    counts = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    if len(counts) <= top_n:
+        return np.argsort(-counts, kind="stable")
+
+    # Only the candidate tags are sorted, not every tag of the library:
+    candidates = np.argpartition(-counts, top_n - 1)[:top_n]
+    threshold = counts[candidates].min()
+    candidates = np.flatnonzero(counts >= threshold)
+
+    return candidates[np.argsort(-counts[candidates], kind="stable")][:top_n]
+
+def compute_top_tags_over_time(tag_matrix, top_n: int = 10, period: str = "year"):
+    """The method counts the number of sources read per year (or month) for the most used tags.
+
+    The per period counts of every tag are computed as a single sparse product of a period by
+    item indicator matrix with the item by tag incidence matrix.
+
+    Args:
+        tag_matrix (dict): The tag matrix built by build_tag_matrix.
+
+        top_n (int): The number of tags (by total number of sources) that are kept.
+
+        period (str): One of the TAG_PERIODS, 'year' or 'month'.
+
+    Returns:
+        pd.DataFrame: The number of sources read per period (index) for each top tag (columns).
+
+    """
+    matrix = tag_matrix["matrix"]
+    if matrix.shape[0] == 0 or matrix.shape[1] == 0:
+        return pd.DataFrame()
+
+    top_tags = get_top_tag_codes(tag_matrix, top_n=top_n)
+
+    periods, period_codes = np.unique(tag_matrix["item_days"].astype(f"datetime64[{TAG_PERIODS[period]}]"), return_inverse=True)
+    period_indicator = sparse.csr_matrix(
+        (np.ones(len(period_codes), dtype=np.float32), (period_codes, np.arange(len(period_codes)))),
+        shape=(len(periods), matrix.shape[0]))
+
+    period_counts = (period_indicator @ matrix[:, top_tags]).toarray().astype(int)
+    # Years are labelled like the creator counts, months by their first day:
+    index = periods.astype(int) + 1970 if period == "year" else pd.DatetimeIndex(periods.astype("datetime64[ns]"))
+
+    return pd.DataFrame(period_counts, index=index, columns=[tag_matrix["tags"][code] for code in top_tags])
+
+def compute_tag_collection_counts(tag_matrix, top_n: int = 15, top_collections: int = 15):
+    """The method counts the number of sources of every collection filed under the most used tags.
+
+    The (collection, tag) counts are the product of the transposed collection incidence matrix
+    with the tag incidence matrix, restricted to the most used tags.
+
+    Args:
+        tag_matrix (dict): The tag matrix built by build_tag_matrix.
+
+        top_n (int): The number of tags (by total number of sources) that are kept.
+
+        top_collections (int): The number of collections (by number of tagged sources) that are kept.
+
+    Returns:
+        pd.DataFrame: The dense (collections, tags) counts labelled with collection and tag names.
+
+    """
+    matrix, collection_matrix = tag_matrix["matrix"], tag_matrix["collection_matrix"]
+    if matrix.shape[1] == 0 or collection_matrix.shape[1] == 0:
+        return pd.DataFrame()
+
+    top_tags = get_top_tag_codes(tag_matrix, top_n=top_n)
+    collection_tag_counts = (collection_matrix.T @ matrix[:, top_tags]).toarray().astype(int)
+
+    # Keeping the collections with the most tagged sources, dropping the ones without any:
+    totals = collection_tag_counts.sum(axis=1)
+    top_rows = np.argsort(-totals, kind="stable")[:top_collections]
+    top_rows = top_rows[totals[top_rows] > 0]
+
+    return pd.DataFrame(
+        collection_tag_counts[top_rows],
+        index=[tag_matrix["collection_names"][row] for row in top_rows],
+        columns=[tag_matrix["tags"][code] for code in top_tags])
+
+def get_cached_tag_analytics(
+    api_key: str,
+    library_id: int,
+    library_type: str = "user"):
+    """The method returns the tag matrix of a library from the server side cache, loading the
+    library first if this server process has not queried it yet.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        api_key (str): The zotero API user key.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        dict: The tag matrix (see build_tag_matrix).
+
+    """
+    # The key is checked against the library before any cached data is served:
+    get_authorized_library(api_key=api_key, library_id=library_id, library_type=library_type)
+
+    return get_or_build_library_aggregate(library_id, "tag_analytics", library_type=library_type)
+
+# Building the tag matrix as soon as a library is loaded and again whenever its version changes:
+register_library_aggregate(
+    "tag_analytics", lambda entry: build_tag_matrix(entry["items"], entry["collections"]), build_on_ingest=True)
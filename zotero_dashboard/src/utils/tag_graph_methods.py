@@ -0,0 +1,60 @@
+# Importing plotly method:
+import plotly.express as px
+import plotly.graph_objects as go
+
+def plot_top_tags_timeseries(df):
+    """A method that plots the number of sources read per year for the most used tags.
+
+    Args:
+        df (pd.DataFrame): The counts built by compute_top_tags_over_time.
+
+    Returns:
+        px.Figure: The line graph with one trace per tag.
+
+    """
+    fig = px.line(df, x=df.index, y=df.columns, markers=True)
+
+    fig.update_layout(
+        yaxis_title="Sources Read",
+        xaxis_title="",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+
+        xaxis=dict(showgrid=False, showline=True, linecolor="black"),
+        yaxis=dict(showgrid=False, showline=True, linecolor="black"),
+
+        legend=dict(title="Tags")
+    )
+
+    return fig
+
+def plot_tag_heatmap(df):
+    """A method that plots the number of sources per collection filed under the most used tags
+    as a heatmap.
+
+    Args:
+        df (pd.DataFrame): The (collections, tags) counts built by compute_tag_collection_counts.
+
+    Returns:
+        go.Figure: The tag heatmap.
+
+    """
+    fig = go.Figure(data=go.Heatmap(
+        z=df.values,
+        x=df.columns,
+        y=df.index,
+        colorscale=[[0, '#eeeeee'], [1, "#76cf63"]],
+        hovertemplate="<b>%{y}</b><br>%{x}: %{z} sources<extra></extra>",
+        xgap=2,
+        ygap=2,
+        showscale=False
+    ))
+
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        yaxis=dict(autorange="reversed"),
+        xaxis=dict(tickangle=45)
+    )
+
+    return fig
@@ -0,0 +1,118 @@
+# Importing internal data methods:
+from .library_cache import get_library_cache_key
+from .zotero_data_methods import apply_collection_count_delta
+
+# Importing packages used to manage the process wide cache:
+from collections import OrderedDict
+import threading
+import os
+
+# Number of cumulative timeseries dataframes (one per library, figure and version) kept by the server process:
+TIMESERIES_CACHE_SIZE = int(os.environ.get("ZOTERO_TIMESERIES_CACHE_SIZE", 64))
+
+_TIMESERIES_DATAFRAMES = OrderedDict()
+_TIMESERIES_LOCK = threading.Lock()
+
+def cache_timeseries_df(library_id, name: str, version: int, timeseries_df, library_type: str = "user"):
+    """The method stores the cumulative dataframe a timeseries figure was built from at a library
+    version, so that the figure can later be patched with the changes of a library sync.
+
+    The dataframes are never updated in place: the dataframe of a version is only stored once and
+    every session showing the figure at that version patches from the same dataframe.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        name (str): The unique name of the figure, including any parameter it is built with
+            (eg: 'source_timeseries:Reading').
+
+        version (int): The library version the dataframe was built for.
+
+        timeseries_df (pd.DataFrame): The cumulative timeseries dataframe.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        pd.DataFrame: The dataframe stored for the version, which is the one stored first if the
+            figure was already cached at the version (eg: by another session).
+
+    """
+    key = (get_library_cache_key(library_id, library_type), name, version)
+    with _TIMESERIES_LOCK:
+        timeseries_df = _TIMESERIES_DATAFRAMES.setdefault(key, timeseries_df)
+        _TIMESERIES_DATAFRAMES.move_to_end(key)
+        while len(_TIMESERIES_DATAFRAMES) > TIMESERIES_CACHE_SIZE:
+            _TIMESERIES_DATAFRAMES.popitem(last=False)
+
+    return timeseries_df
+
+def get_cached_timeseries_df(library_id, name: str, version: int, library_type: str = "user"):
+    """The method returns the cumulative dataframe of a timeseries figure at a library version.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        name (str): The unique name of the figure (see cache_timeseries_df).
+
+        version (int): The library version the dataframe was built for.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        pd.DataFrame|None: The dataframe or None if it is not cached by this server process.
+
+    """
+    key = (get_library_cache_key(library_id, library_type), name, version)
+    with _TIMESERIES_LOCK:
+        timeseries_df = _TIMESERIES_DATAFRAMES.get(key, None)
+        if timeseries_df is not None:
+            _TIMESERIES_DATAFRAMES.move_to_end(key)
+
+    return timeseries_df
+
+def apply_cached_timeseries_delta(library_id, name: str, library_delta, fixed_columns: bool = False, library_type: str = "user"):
+    """The method applies the per-day collection count changes of a library sync to the cached
+    dataframe of a timeseries figure at the version the changes were computed from.
+
+    The updated dataframe is cached at the version of the sync, so a delta is only ever applied
+    once to a dataframe and the sessions receiving the same sync share its result.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        name (str): The unique name of the figure (see cache_timeseries_df).
+
+        library_delta (dict): The compact library delta built by the sync callback, with the
+            "base_version" the changes were computed from and the "version" they lead to.
+
+        fixed_columns (bool): Whether the updated dataframe only keeps the collections of the
+            cached dataframe (eg: a single collection timeseries) instead of appending the
+            collections that are new in the delta.
+
+        library_type (str): The library type of the zotero object. Can be group or
+            user.
+
+    Returns:
+        pd.DataFrame|None: The dataframe at the base version or None if it is not cached.
+
+        pd.DataFrame|None: The dataframe at the version of the sync or None if it can't be built
+            from the cache.
+
+    """
+    previous_df = get_cached_timeseries_df(library_id, name, library_delta["base_version"], library_type=library_type)
+    if previous_df is None:
+        return None, None
+
+    updated_df = get_cached_timeseries_df(library_id, name, library_delta["version"], library_type=library_type)
+    if updated_df is None:
+        updated_df = cache_timeseries_df(
+            library_id,
+            name,
+            library_delta["version"],
+            apply_collection_count_delta(
+                previous_df, library_delta["timeseries"], columns=list(previous_df.columns) if fixed_columns else None),
+            library_type=library_type)
+
+    return previous_df, updated_df
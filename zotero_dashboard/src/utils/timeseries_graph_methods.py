@@ -2,6 +2,9 @@
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Importing dash partial property updates:
+from dash import Patch
+
 def plot_collection_timeseries(df):
     """A method that uses plotly express to generate a multi-column timeseries from
     a formatted dataframe.
@@ -22,5 +25,102 @@ def plot_collection_timeseries(df):
 
     return fig
 
+def plot_single_collection_timeseries(df, collection_name):
+    """A method that plots the cumulative number of sources read for a single collection
+    as an area graph.
+
+    Args:
+        df (pd.DataFrame): The cumulative timeseries dataframe of the collection.
+
+        collection_name (str): The verbose name of the collection used for the title.
+
+    Returns:
+        px.Figure: The timeseries graph
+
+    """
+    timeseries_fig = px.area(df, x=df.index, y=df.columns)
+
+    # Custom figure formatting:
+    timeseries_fig.update_layout(
+        title=f"Total Sources Read for {collection_name}",
+        yaxis_title="Source Read",
+        xaxis_title="",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        showlegend=False
+
+    )
+    timeseries_fig.update_layout(
+        xaxis=dict(showgrid=False, showline=True, linecolor="black"),
+        yaxis=dict(showgrid=False, showline=True, linecolor="black")
+    )
+
+    return timeseries_fig
+
 def plot_total_item_timeseries(df):
-    pass
\ No newline at end of file
+    """A method that plots the cumulative number of sources read for every collection as a
+    stacked area graph.
+
+    Args:
+        df (pd.DataFrame): The cumulative timeseries dataframe with one column per collection.
+
+    Returns:
+        px.Figure: The timeseries graph
+
+    """
+    total_item_fig = px.area(df, x=df.index, y=df.columns)
+
+    # Customizing the figure:
+    total_item_fig.update_layout(
+        yaxis_title="Source Read",
+        xaxis_title="",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        
+        xaxis=dict(showgrid=False, showline=True, linecolor="black"),
+        yaxis=dict(showgrid=False, showline=True, linecolor="black"),
+
+        legend=dict(title="Categories")
+    )
+
+    return total_item_fig
+
+def build_timeseries_figure_patch(previous_df, updated_df):
+    """A method that builds a partial update for an area graph built by plot_total_item_timeseries
+    or plot_single_collection_timeseries so that only the changed points are sent to the browser.
+
+    Traces whose existing points are unchanged are only extended with the new dates, traces whose
+    existing points changed (eg: an item was deleted or moved collection) have their y values replaced.
+
+    Args:
+        previous_df (pd.DataFrame): The cumulative dataframe the figure in the browser was built from.
+
+        updated_df (pd.DataFrame): The updated cumulative dataframe.
+
+    Returns:
+        dash.Patch|None: The partial figure update or None if the figure has to be rebuilt because
+            collections were added or the date range now starts earlier.
+
+    """
+    if list(previous_df.columns) != list(updated_df.columns):
+        return None
+
+    if len(previous_df.index) == 0 or updated_df.index[0] != previous_df.index[0]:
+        return None
+
+    # Dates that are appended to the end of every trace:
+    new_dates = list(updated_df.index[len(previous_df.index):])
+    updated_existing_df = updated_df.iloc[:len(previous_df.index)]
+
+    patched_figure = Patch()
+    for trace_num, column in enumerate(updated_df.columns):
+
+        if (updated_existing_df[column].values != previous_df[column].values).any():
+            patched_figure["data"][trace_num]["y"] = updated_df[column].tolist()
+        elif len(new_dates) > 0:
+            patched_figure["data"][trace_num]["y"].extend(updated_df[column].iloc[len(previous_df.index):].tolist())
+
+        if len(new_dates) > 0:
+            patched_figure["data"][trace_num]["x"].extend(new_dates)
+
+    return patched_figure
\ No newline at end of file
@@ -9,6 +9,36 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 import datetime
+import os
+
+# Optional base url of the zotero API eg: a local fake API used by the load tests (benchmarks/load_test.py):
+ZOTERO_API_ENDPOINT = os.environ.get("ZOTERO_API_ENDPOINT", None)
+
+# Item queries only request the JSON data of non-attachment items (the dashboard never reads attachments,
+# bibliographies or citations), used along with the top level item endpoints:
+ITEM_QUERY_PARAMETERS = {"itemType": "-attachment", "include": "data"}
+
+def get_zotero_connection(library_id: int, library_type: str, api_key: str):
+    """The method creates the pyzotero API object used by every query of the dashboard, pointing
+    it at the ZOTERO_API_ENDPOINT if one is configured.
+
+    Args:
+        library_id (int): The zotero API user ID.
+
+        library_type (str): The library type of the zotero object. Can be group or 
+            user.
+
+        api_key (str): The zotero API user key.
+
+    Returns:
+        zotero.Zotero: The zotero API object.
+
+    """
+    zotero_con = zotero.Zotero(library_id, library_type, api_key)
+    if ZOTERO_API_ENDPOINT != None:
+        zotero_con.endpoint = ZOTERO_API_ENDPOINT.rstrip("/")
+
+    return zotero_con
 
 # Method that returns a collection of zotero items given a collection name:
 def get_zotero_collection(
@@ -18,6 +48,8 @@ def get_zotero_collection(
     library_type: str = "user"):
     """Method that returns a collection of zotero items given a collection 
     name
+
+    Only the top level items that are not attachments are queried (see ITEM_QUERY_PARAMETERS).
     
     Args:
         library_id (int): The zotero API user ID.
@@ -34,19 +66,20 @@ def get_zotero_collection(
         
     """
     # Creating a zotero API object:
-    zotero_con = zotero.Zotero(library_id, library_type, api_key)
+    zotero_con = get_zotero_connection(library_id, library_type, api_key)
     
+    # The parameters are passed to the item query itself as any other query (eg: the collections) resets them:
+    item_parameters = dict(sort="dateAdded", direction="asc", **ITEM_QUERY_PARAMETERS)
+
     # Querying the list of zotero collections to extract the ID for collection name:
     # If no collections provided:
-    zotero_con.add_parameters(sort="dateAdded", direction="asc")
-
     if collection_name == None:
-        items = zotero_con.everything(zotero_con.items())
+        items = zotero_con.everything(zotero_con.top(**item_parameters))
         
     # If a colleciton is provided:
     else:
         collection_id = None
-        for collection in zotero_con.collections():
+        for collection in zotero_con.everything(zotero_con.collections()):
             if collection["data"]["name"] == collection_name:
                 collection_id = collection["data"]["key"]
 
@@ -54,7 +87,7 @@ def get_zotero_collection(
         if collection_id == None:
             return None
 
-        items = zotero_con.everything(zotero_con.collection_items(collection_id))
+        items = zotero_con.everything(zotero_con.collection_items_top(collection_id, **item_parameters))
     
     #print("\n\n", items[0]["data"]["dateAdded"], items[-1]["data"]["dateAdded"])
 
@@ -151,7 +184,7 @@ def get_all_collections(
     api_key: str,
     library_id: int,
     library_type: str = "user"):
-    """A function that creates a zotero API and queries a list of zotero 
+    """A function that creates a zotero API and queries the full list of zotero 
     collections.
 
     Args:
@@ -167,9 +200,10 @@ def get_all_collections(
 
     """
     # Creating the zotero API object:
-    zotero_con = zotero.Zotero(library_id, library_type, api_key)
+    zotero_con = get_zotero_connection(library_id, library_type, api_key)
 
-    collections = zotero_con.collections()
+    # The collections are paginated like the items (at most 100 per request):
+    collections = zotero_con.everything(zotero_con.collections())
 
     return collections
 
@@ -262,4 +296,87 @@ def create_collection_timeseries_df(items, collections, start_date=None, end_dat
     # Building the dataframe based on the dictionary:
     daily_collection_count_df = pd.DataFrame.from_dict(collection_count_dict, orient="index")
     
-    return daily_collection_count_df
\ No newline at end of file
+    return daily_collection_count_df
+
+def create_collection_count_delta(added, removed, collections):
+    """The method counts how the number of sources read per collection per day changes when
+    a set of items is added to and removed from a library.
+
+    Only the changed items are iterated over so the cost scales with the size of the sync, not
+    the size of the library.
+
+    Args:
+        added (lst): The list of zotero items that were added (or the new version of modified items).
+
+        removed (lst): The list of zotero items that were removed (or the old version of modified items).
+
+        collections (lst): The list of collection data.
+
+    Returns:
+        dict: The sparse count changes in the form {"dates": [...], "collections": [...], "counts": [...]}
+            where the i-th entry of each list describes a single (day, collection name, change) triple.
+
+    """
+    collection_names = {collection["data"]["key"]: collection["data"]["name"] for collection in collections}
+
+    count_changes = {}
+    for items, sign in ((added, 1), (removed, -1)):
+        for item in items:
+            if item["data"]["itemType"] == "attachment" or len(item["data"]["collections"]) == 0:
+                continue
+
+            collection_name = collection_names.get(item["data"]["collections"][0], None)
+            if collection_name == None:
+                continue
+
+            change_key = (item["data"]["dateAdded"][:10], collection_name)
+            count_changes[change_key] = count_changes.get(change_key, 0) + sign
+
+    count_changes = {change_key: count for change_key, count in count_changes.items() if count != 0}
+
+    return {
+        "dates": [date for date, _ in count_changes.keys()],
+        "collections": [name for _, name in count_changes.keys()],
+        "counts": list(count_changes.values())
+    }
+
+def apply_collection_count_delta(cumulative_df, count_delta, columns=None):
+    """The method updates a cumulative collection timeseries dataframe (the cumsum of the
+    create_collection_timeseries_df output) with the sparse count changes of a library sync.
+
+    Args:
+        cumulative_df (pd.DataFrame): The cumulative number of sources read per collection indexed
+            by 'YYYY-MM-DD' date strings.
+
+        count_delta (dict): The sparse count changes built by create_collection_count_delta.
+
+        columns (None|lst): The collection names that are kept in the updated dataframe. If None
+            collections that are new in the count delta are appended as new columns.
+
+    Returns:
+        pd.DataFrame: The updated cumulative dataframe covering every day between the first and
+            the last date of both the original dataframe and the count delta.
+
+    """
+    delta_df = pd.DataFrame({
+        "date": count_delta["dates"], 
+        "collection": count_delta["collections"], 
+        "count": count_delta["counts"]})
+
+    if columns == None:
+        columns = list(cumulative_df.columns) + [name for name in delta_df["collection"].unique() if name not in cumulative_df.columns]
+    
+    delta_df = delta_df[delta_df["collection"].isin(columns)]
+    if len(delta_df) == 0:
+        return cumulative_df.reindex(columns=columns, fill_value=0)
+
+    delta_df = delta_df.pivot_table(index="date", columns="collection", values="count", aggfunc="sum")
+
+    # Building the full daily index spanning both datasets:
+    dates = list(cumulative_df.index) + list(delta_df.index)
+    datetime_index = pd.date_range(start=min(dates), end=max(dates), freq='D').strftime("%Y-%m-%d")
+
+    updated_df = cumulative_df.reindex(index=datetime_index, columns=columns).ffill().fillna(0) + \
+        delta_df.reindex(index=datetime_index, columns=columns).fillna(0).cumsum()
+
+    return updated_df.astype(int)
@@ -0,0 +1,103 @@
+# Making the dashboard source importable the same way the app imports it (from utils import ...):
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Keeping the rollup database and the shared aggregate segments of the tests out of the ones of a running dashboard:
+_TEST_DIRECTORY = tempfile.mkdtemp(prefix="zotero_dashboard_tests_")
+os.environ.setdefault("ZOTERO_ROLLUP_DB", os.path.join(_TEST_DIRECTORY, "rollups.sqlite3"))
+os.environ.setdefault("ZOTERO_SHARED_AGGREGATE_DIR", os.path.join(_TEST_DIRECTORY, "aggregates"))
+
+# Importing the packages used to fake the zotero API:
+from pyzotero import zotero_errors
+import pytest
+import copy
+
+class FakeZoteroLibrary:
+    """A zotero library served by FakeZotero, every change bumps the library version like the zotero API."""
+
+    def __init__(self, items=(), collections=(), api_keys=("valid-key",)):
+        self.version = 1
+        self.items = {item["key"]: dict(item, version=1) for item in items}
+        self.collections = list(collections)
+        self.deleted = {}
+        self.trashed = {}
+        self.api_keys = set(api_keys)
+        self.version_checks = 0
+
+    def save_item(self, item):
+        self.version += 1
+        self.items[item["key"]] = dict(item, version=self.version)
+
+    def delete_item(self, key: str):
+        self.version += 1
+        del self.items[key]
+        self.deleted[key] = self.version
+
+    def trash_item(self, key: str):
+        self.version += 1
+        self.trashed[key] = self.version
+
+    def save_collections(self, collections):
+        self.version += 1
+        self.collections = list(collections)
+
+class FakeZotero:
+    """The subset of the pyzotero API object queried by the dashboard, serving the libraries registered by the zotero_api fixture."""
+
+    libraries = {}
+
+    def __init__(self, library_id, library_type, api_key):
+        self.library = self.libraries.get((library_type, int(library_id)), None)
+        self.api_key = api_key
+
+    def _check_key(self):
+        if self.library == None or self.api_key not in self.library.api_keys:
+            raise zotero_errors.PyZoteroError("Invalid key")
+
+    def add_parameters(self, **parameters):
+        pass
+
+    def everything(self, results):
+        return results
+
+    def last_modified_version(self):
+        self._check_key()
+        self.library.version_checks += 1
+        return self.library.version
+
+    def top(self, since=None, **parameters):
+        self._check_key()
+        items = [
+            item for key, item in self.library.items.items()
+            if key not in self.library.trashed and (since == None or item["version"] > since)]
+        return copy.deepcopy(sorted(items, key=lambda item: item["data"]["dateAdded"]))
+
+    def deleted(self, since=None):
+        self._check_key()
+        return {"items": [key for key, version in self.library.deleted.items() if since == None or version > since]}
+
+    def trash(self, since=None, format=None, **parameters):
+        self._check_key()
+        return "\n".join(key for key, version in self.library.trashed.items() if since == None or version > since)
+
+    def collections(self, **parameters):
+        self._check_key()
+        return copy.deepcopy(self.library.collections)
+
+@pytest.fixture
+def zotero_api(monkeypatch):
+    """The fixture serving fake zotero libraries to the library cache, registered with
+    zotero_api[(library_type, library_id)] = FakeZoteroLibrary(...). The cache is emptied after the test."""
+    from utils import library_cache
+
+    monkeypatch.setattr("pyzotero.zotero.Zotero", FakeZotero)
+    monkeypatch.setattr(FakeZotero, "libraries", {})
+
+    yield FakeZotero.libraries
+
+    for library in list(library_cache._LIBRARY_CACHE.keys()):
+        library_type, library_id = library.split(":")
+        library_cache.evict_library(library_id, library_type)
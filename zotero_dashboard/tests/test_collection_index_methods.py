@@ -0,0 +1,120 @@
+# Importing the methods under test:
+from utils.collection_index_methods import (
+    build_collection_item_index, build_collection_daily_counts, query_collection_items, split_filter_part)
+from utils.collection_tree_methods import build_collection_tree, get_collection_descendants
+
+def make_collection(key: str, name: str, parent=False):
+    """The method builds the collection data of a test library."""
+    return {"key": key, "data": {"key": key, "name": name, "parentCollection": parent}}
+
+def make_item(key: str, date_added: str, collections=(), item_type: str = "journalArticle", title: str = ""):
+    """The method builds the item data of a test library."""
+    return {"key": key, "version": 1, "data": {
+        "key": key, "itemType": item_type, "title": title, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": list(collections), "creators": [{"firstName": "Ada", "lastName": "Lovelace", "creatorType": "author"}],
+        "tags": []}}
+
+# Energy is nested in Reading and Solar in Energy:
+COLLECTIONS = [
+    make_collection("AAAA0001", "Reading"),
+    make_collection("BBBB0002", "Energy", parent="AAAA0001"),
+    make_collection("CCCC0003", "Solar", parent="BBBB0002"),
+    make_collection("DDDD0004", "Other")]
+
+ITEMS = [
+    make_item("ITEM0001", "2022-01-03", ["AAAA0001"], title="Energy policy"),
+    make_item("ITEM0002", "2022-01-03", ["AAAA0001", "BBBB0002"], item_type="book", title="Solar power"),
+    make_item("ITEM0003", "2022-01-05", ["CCCC0003"], title="Wind turbines"),
+    make_item("ITEM0004", "2022-01-06", ["DDDD0004"], title="Hydrogen storage"),
+    make_item("ITEM0005", "2022-01-06", ["CCCC0003"], item_type="attachment"),
+]
+
+def paged_titles(collection_item_index, collection_key, **query):
+    """The method returns the titles of the page of a collection query."""
+    records, _, _ = query_collection_items(collection_item_index, collection_key, **query)
+
+    return [record["Title"] for record in records]
+
+def test_index_skips_attachments():
+    collection_item_index = build_collection_item_index(ITEMS)
+
+    assert collection_item_index["table"]["key"].tolist() == ["ITEM0001", "ITEM0002", "ITEM0003", "ITEM0004"]
+    assert collection_item_index["collections"]["CCCC0003"].tolist() == [2]
+    assert collection_item_index["items"][1] is ITEMS[1]
+
+def test_collection_items_are_paged():
+    collection_item_index = build_collection_item_index(ITEMS + [
+        make_item(f"ITEM01{position:02d}", "2022-02-01", ["DDDD0004"], title=f"Note {position}") for position in range(4)])
+
+    records, page_count, num_items = query_collection_items(collection_item_index, "DDDD0004", page_current=1, page_size=2)
+    assert [record["Title"] for record in records] == ["Note 1", "Note 2"]
+    assert (page_count, num_items) == (3, 5)
+    assert list(records[0].keys()) == ["Title", "Creators", "Item Type", "Date Added"]
+
+    assert paged_titles(collection_item_index, "DDDD0004", page_current=3, page_size=2) == []
+    assert query_collection_items(collection_item_index, "ZZZZ0009") == ([], 1, 0)
+
+def test_collection_items_are_sorted():
+    collection_item_index = build_collection_item_index(ITEMS)
+
+    assert paged_titles(collection_item_index, "AAAA0001", sort_by=[{"column_id": "Title", "direction": "desc"}]) == [
+        "Solar power", "Energy policy"]
+
+    # Sorting is stable, rows with equal values keep their dateAdded order:
+    assert paged_titles(collection_item_index, "AAAA0001", sort_by=[{"column_id": "Date Added", "direction": "asc"}]) == [
+        "Energy policy", "Solar power"]
+
+def test_collection_items_are_filtered():
+    collection_item_index = build_collection_item_index(ITEMS)
+    collection_keys = ["AAAA0001", "BBBB0002", "CCCC0003", "DDDD0004"]
+
+    assert paged_titles(collection_item_index, collection_keys, filter_query="{Title} contains POWER") == ["Solar power"]
+    assert paged_titles(collection_item_index, collection_keys, filter_query="{Item Type} = book") == ["Solar power"]
+    assert paged_titles(collection_item_index, collection_keys, filter_query="{Date Added} datestartswith 2022-01-0") == [
+        "Energy policy", "Solar power", "Wind turbines", "Hydrogen storage"]
+    assert paged_titles(
+        collection_item_index, collection_keys, filter_query="{Item Type} ne book && {Title} contains o") == [
+        "Energy policy", "Hydrogen storage"]
+
+    # Unknown columns are ignored:
+    assert len(paged_titles(collection_item_index, collection_keys, filter_query="{key} = ITEM0001")) == 4
+
+def test_numeric_filter_values_are_compared_as_text():
+    collection_item_index = build_collection_item_index(ITEMS)
+    collection_keys = ["AAAA0001", "BBBB0002", "CCCC0003", "DDDD0004"]
+
+    # The filter value is parsed as a number but the text columns are compared as text:
+    assert paged_titles(collection_item_index, collection_keys, filter_query="{Date Added} ge 2022-01-05") == [
+        "Wind turbines", "Hydrogen storage"]
+    assert paged_titles(collection_item_index, collection_keys, filter_query="{Title} gt 2") == [
+        "Energy policy", "Solar power", "Wind turbines", "Hydrogen storage"]
+    assert paged_titles(collection_item_index, collection_keys, filter_query="{Title} lt 2") == []
+
+def test_split_filter_part():
+    assert split_filter_part("{Title} contains 'solar power'") == ("Title", "contains", "solar power")
+    assert split_filter_part("{Date Added} ge 2022") == ("Date Added", "ge", 2022.0)
+    assert split_filter_part("{Item Type} = book") == ("Item Type", "eq", "book")
+    assert split_filter_part("Title") == [None, None, None]
+
+def test_subcollection_items_are_listed_once():
+    collection_item_index = build_collection_item_index(ITEMS)
+    collection_keys = get_collection_descendants(build_collection_tree(COLLECTIONS), "AAAA0001")
+
+    records, page_count, num_items = query_collection_items(collection_item_index, collection_keys)
+    assert [record["Title"] for record in records] == ["Energy policy", "Solar power", "Wind turbines"]
+    assert (page_count, num_items) == (1, 3)
+
+    records, _, num_items = query_collection_items(collection_item_index, "AAAA0001")
+    assert [record["Title"] for record in records] == ["Energy policy", "Solar power"]
+    assert num_items == 2
+
+def test_subcollection_items_are_counted_once():
+    collection_item_index = build_collection_item_index(ITEMS)
+    collection_keys = get_collection_descendants(build_collection_tree(COLLECTIONS), "AAAA0001")
+
+    counts = build_collection_daily_counts(collection_item_index, collection_keys, 2022)
+    assert counts[:6].tolist() == [0, 0, 2, 0, 1, 0]
+    assert counts.sum() == 3
+
+    assert build_collection_daily_counts(collection_item_index, "AAAA0001", 2022).sum() == 2
+    assert build_collection_daily_counts(collection_item_index, ["ZZZZ0009"], 2022).sum() == 0
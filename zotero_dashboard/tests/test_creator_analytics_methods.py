@@ -0,0 +1,58 @@
+# Importing the methods under test:
+from utils.creator_analytics_methods import (
+    normalize_creator_name, build_creator_matrix, build_creator_analytics, compute_top_creators_over_time,
+    get_top_creator_coauthorship)
+
+def make_item(key: str, date_added: str, creators=(), item_type: str = "journalArticle"):
+    """The method builds the item data of a test library."""
+    return {"key": key, "version": 1, "data": {
+        "key": key, "itemType": item_type, "dateAdded": f"{date_added}T12:00:00Z", "creators": list(creators)}}
+
+def make_creator(first_name: str, last_name: str):
+    """The method builds a two field zotero creator."""
+    return {"creatorType": "author", "firstName": first_name, "lastName": last_name}
+
+ADA = make_creator("Ada", "Lovelace")
+CHARLES = make_creator("Charles", "Babbage")
+MARY = make_creator("Mary", "Somerville")
+
+ITEMS = [
+    make_item("ITEM0001", "2021-03-01", [ADA, CHARLES]),
+    make_item("ITEM0002", "2021-06-01", [make_creator("ADA", "Lovelace "), CHARLES, MARY]),
+    make_item("ITEM0003", "2022-01-05", [make_creator("Ada", "Lovelace."), ADA]),
+    make_item("ITEM0004", "2022-02-01", [{"creatorType": "author", "name": "Royal Society"}]),
+    make_item("ITEM0005", "2022-02-01", [MARY], item_type="attachment"),
+]
+
+def test_creator_names_are_normalized():
+    assert normalize_creator_name(make_creator("José", "Núñez")) == ("jose nunez", "José Núñez")
+    assert normalize_creator_name(make_creator("J.", "Doe"))[0] == normalize_creator_name(make_creator("J", "Doe"))[0]
+    assert normalize_creator_name({"name": " Royal  Society "}) == ("royal society", "Royal Society")
+    assert normalize_creator_name(make_creator("", None)) == (None, None)
+
+def test_creator_matrix():
+    creator_matrix = build_creator_matrix(ITEMS)
+
+    # Attachments are skipped and every creator is only counted once per item:
+    assert creator_matrix["item_keys"] == ["ITEM0001", "ITEM0002", "ITEM0003", "ITEM0004"]
+    assert creator_matrix["creators"] == ["Ada Lovelace", "Charles Babbage", "Mary Somerville", "Royal Society"]
+    assert creator_matrix["matrix"].toarray().tolist() == [[1, 1, 0, 0], [1, 1, 1, 0], [1, 0, 0, 0], [0, 0, 0, 1]]
+    assert creator_matrix["item_years"].tolist() == [2021, 2021, 2022, 2022]
+
+def test_top_creators_over_time():
+    yearly_counts = compute_top_creators_over_time(build_creator_matrix(ITEMS), top_n=2)
+
+    assert yearly_counts.index.tolist() == [2021, 2022]
+    assert yearly_counts.to_dict("list") == {"Ada Lovelace": [2, 1], "Charles Babbage": [2, 0]}
+
+    assert compute_top_creators_over_time(build_creator_matrix([])).empty
+
+def test_coauthorship():
+    creator_analytics = build_creator_analytics(ITEMS)
+    coauthorship = creator_analytics["coauthorship"]
+
+    assert coauthorship.toarray().tolist() == [[0, 2, 1, 0], [2, 0, 1, 0], [1, 1, 0, 0], [0, 0, 0, 0]]
+
+    top_coauthorship = get_top_creator_coauthorship(creator_analytics, coauthorship, top_n=2)
+    assert top_coauthorship.index.tolist() == ["Ada Lovelace", "Charles Babbage"]
+    assert top_coauthorship.values.tolist() == [[0, 2], [2, 0]]
@@ -0,0 +1,116 @@
+# Importing the methods under test:
+from utils.export_methods import (
+    parse_export_filters, iter_item_export_rows, iter_aggregate_export_rows, stream_export, EXPORT_DATASETS)
+from utils.sharded_aggregation_methods import build_sharded_aggregates
+
+# Importing packages used to decode the exports:
+import pyarrow.parquet as pq
+import pytest
+import json
+import csv
+import io
+
+def make_collection(key: str, name: str, parent=False):
+    """The method builds the collection data of a test library."""
+    return {"key": key, "data": {"key": key, "name": name, "parentCollection": parent}}
+
+def make_item(key: str, date_added: str, collections=(), item_type: str = "journalArticle", title: str = ""):
+    """The method builds the item data of a test library."""
+    return {"key": key, "version": 1, "data": {
+        "key": key, "itemType": item_type, "title": title, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": list(collections), "creators": [{"firstName": "Ada", "lastName": "Lovelace", "creatorType": "author"}],
+        "tags": [{"tag": "energy"}]}}
+
+COLLECTIONS = [make_collection("AAAA0001", "Reading"), make_collection("BBBB0002", "Energy", parent="AAAA0001")]
+
+ITEMS = [
+    make_item("ITEM0001", "2022-01-30", ["AAAA0001"], title="Energy policy"),
+    make_item("ITEM0002", "2022-02-01", ["BBBB0002"], item_type="book", title="Solar power"),
+    make_item("ITEM0003", "2022-02-03", [], title="Wind turbines"),
+    make_item("ITEM0004", "2022-02-03", ["AAAA0001"], item_type="attachment"),
+]
+
+def decode_export(parts, export_format: str):
+    """The method joins the streamed parts of an export and decodes its rows."""
+    if export_format == "parquet":
+        return pq.read_table(io.BytesIO(b"".join(parts))).to_pylist()
+
+    content = "".join(parts)
+    if export_format == "csv":
+        return list(csv.DictReader(io.StringIO(content)))
+
+    return [json.loads(line) for line in content.splitlines()]
+
+@pytest.mark.parametrize("args", [
+    {"start": "2022-13-40"}, {"end": "2022-02-30"}, {"start": "2022-2-1"}, {"end": "yesterday"},
+    {"item_type": "book'; --"}, {"collection": "ZZZZ0009"}])
+def test_invalid_filters_are_rejected(args):
+    with pytest.raises(ValueError):
+        parse_export_filters(args, COLLECTIONS)
+
+def test_valid_filters():
+    filters = parse_export_filters(
+        {"start": "2022-02-01", "end": "2022-02-28", "item_type": "book", "collection": "BBBB0002", "q": "solar"}, COLLECTIONS)
+
+    assert filters == {"collection_key": "BBBB0002", "item_type": "book", "start_date": "2022-02-01", "end_date": "2022-02-28"}
+    assert parse_export_filters({"start": ""}, COLLECTIONS) == {
+        "collection_key": None, "item_type": None, "start_date": None, "end_date": None}
+
+def test_item_rows_are_filtered():
+    rows = list(iter_item_export_rows(ITEMS, COLLECTIONS, start_date="2022-02-01"))
+    assert [row["key"] for row in rows] == ["ITEM0002", "ITEM0003"]
+
+    rows = list(iter_item_export_rows(ITEMS, COLLECTIONS, collection_key="AAAA0001"))
+    assert [row["key"] for row in rows] == ["ITEM0001"]
+    assert rows[0]["collections"] == "Reading"
+    assert rows[0]["creators"] != ""
+
+    assert [row["key"] for row in iter_item_export_rows(ITEMS, COLLECTIONS, item_type="book")] == ["ITEM0002"]
+
+def test_aggregate_rows_are_sliced_to_the_dates():
+    aggregates = build_sharded_aggregates(ITEMS, COLLECTIONS)
+
+    rows = list(iter_aggregate_export_rows(aggregates, COLLECTIONS, "daily", start_date="2022-01-31", end_date="2022-02-02"))
+    assert rows == [{"date": "2022-01-31", "count": 0}, {"date": "2022-02-01", "count": 1}, {"date": "2022-02-02", "count": 0}]
+
+    rows = list(iter_aggregate_export_rows(aggregates, COLLECTIONS, "daily_collections"))
+    assert [(row["date"], row["collection"], row["count"]) for row in rows] == [
+        ("2022-01-30", "Reading", 1), ("2022-02-01", "Energy", 1)]
+
+    rows = list(iter_aggregate_export_rows(aggregates, COLLECTIONS, "collections", start_date="2022-02-01"))
+    assert [(row["collection"], row["parent_collection_key"], row["count"]) for row in rows] == [
+        ("Reading", "", 0), ("Energy", "AAAA0001", 1)]
+
+    # Dates outside of the library give empty exports:
+    assert list(iter_aggregate_export_rows(aggregates, COLLECTIONS, "daily", start_date="2030-01-01")) == []
+
+@pytest.mark.parametrize("export_format", ["csv", "jsonl", "parquet"])
+def test_exports_round_trip(export_format):
+    rows = list(iter_item_export_rows(ITEMS, COLLECTIONS))
+    exported = decode_export(list(stream_export(iter(rows), "items", export_format)), export_format)
+
+    assert [row["key"] for row in exported] == ["ITEM0001", "ITEM0002", "ITEM0003"]
+    assert exported[1]["title"] == "Solar power"
+
+@pytest.mark.parametrize("export_format", ["csv", "parquet"])
+def test_empty_exports_keep_the_columns(export_format):
+    parts = list(stream_export(iter([]), "daily", export_format))
+
+    if export_format == "csv":
+        assert "".join(parts) == "date,count\r\n"
+    else:
+        table = pq.read_table(io.BytesIO(b"".join(parts)))
+        assert table.num_rows == 0
+        assert table.column_names == [name for name, _ in EXPORT_DATASETS["daily"]]
+
+def test_empty_json_lines_export():
+    assert "".join(stream_export(iter([]), "items", "jsonl")) == ""
+
+def test_exports_are_streamed_in_chunks(monkeypatch):
+    monkeypatch.setattr("utils.export_methods.EXPORT_CHUNK_ROWS", 2)
+    rows = list(iter_item_export_rows(ITEMS, COLLECTIONS))
+
+    parts = list(stream_export(iter(rows), "items", "csv"))
+
+    assert len(parts) == 2
+    assert [row["key"] for row in decode_export(parts, "csv")] == ["ITEM0001", "ITEM0002", "ITEM0003"]
@@ -0,0 +1,98 @@
+# Importing the methods under test:
+from utils.figure_serialization_methods import (
+    encode_typed_array, encode_figure, serialize_figure, pre_serialize, get_cached_figure, get_serialized_library_items)
+from utils.library_cache import load_library, sync_library
+
+# Importing the packages used by the tests:
+from conftest import FakeZoteroLibrary
+import plotly.graph_objs as go
+import numpy as np
+import pytest
+import base64
+import orjson
+
+def make_item(key: str, date_added: str):
+    """The method builds the item data of a test library."""
+    return {"key": key, "data": {
+        "key": key, "itemType": "journalArticle", "title": key, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": [], "creators": [], "tags": []}}
+
+def decode_typed_array(typed_array):
+    """The method decodes a plotly.js typed array back into a numpy array."""
+    array = np.frombuffer(base64.b64decode(typed_array["bdata"]), dtype=np.dtype(typed_array["dtype"]))
+    if "shape" in typed_array:
+        array = array.reshape([int(size) for size in typed_array["shape"].split(", ")])
+
+    return array
+
+@pytest.mark.parametrize("values, dtype", [
+    (list(range(40)), "i1"),
+    ([float(value) for value in range(200, 240)], "u1"),
+    (np.arange(-1000, -960), "i2"),
+    (np.arange(40) * 100000, "i4"),
+    (np.arange(40) * 0.5, "f8"),
+    (np.arange(40, dtype=np.float32) * 0.5, "f4"),
+    (np.arange(40) * 2.0 ** 40, "f8")])
+def test_typed_arrays_use_the_smallest_type(values, dtype):
+    typed_array = encode_typed_array(values)
+
+    assert typed_array["dtype"] == dtype
+    assert decode_typed_array(typed_array).tolist() == np.asarray(values).tolist()
+
+def test_typed_arrays_keep_gaps_and_shapes():
+    values = np.arange(40, dtype=float)
+    values[3] = np.nan
+    decoded = decode_typed_array(encode_typed_array(values))
+    assert np.isnan(decoded[3]) and decoded[4] == 4
+
+    typed_array = encode_typed_array(np.arange(42).reshape(6, 7))
+    assert typed_array["shape"] == "6, 7"
+    assert decode_typed_array(typed_array).tolist() == np.arange(42).reshape(6, 7).tolist()
+
+def test_short_and_text_arrays_are_left_as_lists():
+    assert encode_typed_array(list(range(5))) == None
+    assert encode_typed_array([f"2022-01-{day:02d}" for day in range(1, 32)] * 2) == None
+
+def test_figures_are_encoded():
+    figure = go.Figure([
+        go.Heatmap(z=np.arange(70).reshape(10, 7), x=list(range(7)), text=["a"] * 70),
+        go.Scatter(x=[f"2022-{day // 28 + 1:02d}-{day % 28 + 1:02d}" for day in range(40)], y=np.arange(40) * 1.0)])
+    figure.update_layout(title="Sources")
+
+    encoded = encode_figure(figure)
+    assert encoded["data"][0]["z"]["shape"] == "10, 7"
+    assert list(encoded["data"][0]["x"]) == list(range(7))
+    assert encoded["data"][1]["x"][0] == "2022-01-01"
+    assert decode_typed_array(encoded["data"][1]["y"]).tolist() == list(range(40))
+    assert encoded["layout"]["title"]["text"] == "Sources"
+
+    serialized = orjson.loads(serialize_figure(figure))
+    assert serialized["data"][1]["y"] == encoded["data"][1]["y"]
+
+def test_pre_serialized_values_are_embedded_as_is():
+    fragment = pre_serialize([{"key": "ITEM0001", "counts": np.arange(3)}])
+
+    assert orjson.loads(orjson.dumps({"data": fragment})) == {"data": [{"key": "ITEM0001", "counts": [0, 1, 2]}]}
+
+def test_cached_figures_are_built_once_per_version(zotero_api):
+    library = zotero_api[("user", 1)] = FakeZoteroLibrary([make_item("ITEM0001", "2022-01-03")])
+    builds = []
+
+    def builder():
+        builds.append(1)
+        return go.Figure(go.Bar(y=list(range(40))))
+
+    # Libraries that are not cached are serialized on every call:
+    get_cached_figure(1, "bar", builder)
+    load_library("valid-key", 1)
+    first = get_cached_figure(1, "bar", builder)
+    assert get_cached_figure(1, "bar", builder) is first
+    assert len(builds) == 2
+
+    library.save_item(make_item("ITEM0002", "2022-01-04"))
+    sync_library("valid-key", 1)
+    assert get_cached_figure(1, "bar", builder) is not first
+    assert len(builds) == 3
+
+    assert [item["key"] for item in orjson.loads(orjson.dumps(get_serialized_library_items(1)))] == ["ITEM0001", "ITEM0002"]
+    assert get_serialized_library_items(2) == None
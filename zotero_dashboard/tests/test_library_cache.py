@@ -0,0 +1,195 @@
+# Importing the methods under test:
+from utils import library_cache
+from utils.library_cache import (
+    load_library, sync_library, get_cached_library, get_current_library, get_authorized_library, get_library_delta_since,
+    get_or_build_library_aggregate, evict_library, evict_idle_libraries, register_library_aggregate)
+from utils.sharded_aggregation_methods import build_sharded_aggregates
+from utils.search_index_methods import search_library
+
+# Importing the packages used by the tests:
+from conftest import FakeZoteroLibrary
+from pyzotero import zotero_errors
+import numpy as np
+import pytest
+
+def make_collection(key: str, name: str):
+    """The method builds the collection data of a test library."""
+    return {"key": key, "data": {"key": key, "name": name, "parentCollection": False}}
+
+def make_item(key: str, date_added: str, collections=(), title: str = ""):
+    """The method builds the item data of a test library."""
+    return {"key": key, "data": {
+        "key": key, "itemType": "journalArticle", "title": title, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": list(collections), "creators": [], "tags": []}}
+
+COLLECTIONS = [make_collection("AAAA0001", "Reading"), make_collection("BBBB0002", "Energy")]
+
+ITEMS = [
+    make_item("ITEM0001", "2022-01-03", ["AAAA0001"], title="Energy policy"),
+    make_item("ITEM0002", "2022-01-05", ["BBBB0002"], title="Solar power"),
+    make_item("ITEM0003", "2022-01-05", [], title="Wind turbines"),
+]
+
+@pytest.fixture
+def library(zotero_api):
+    """The fixture registering a test user library with the fake zotero API."""
+    zotero_api[("user", 1)] = FakeZoteroLibrary(ITEMS, COLLECTIONS)
+
+    return zotero_api[("user", 1)]
+
+def assert_aggregates_match_rebuild(entry):
+    """The method checks that the daily aggregates updated by the syncs match the aggregates built from the cached items."""
+    aggregates = get_or_build_library_aggregate(1, "daily_aggregates")
+    expected = build_sharded_aggregates(entry["items"], entry["collections"])
+
+    assert aggregates["first_day"] == expected["first_day"]
+    assert np.array_equal(aggregates["daily"], expected["daily"])
+    assert np.array_equal(aggregates["collection_keys"], expected["collection_keys"])
+    assert np.array_equal(aggregates["day_collection"], expected["day_collection"])
+
+def test_load_library(library):
+    entry = load_library("valid-key", 1)
+
+    assert entry["library"] == "user:1"
+    assert entry["version"] == 1
+    assert [item["key"] for item in entry["items"]] == ["ITEM0001", "ITEM0002", "ITEM0003"]
+    assert get_cached_library(1) is entry
+
+def test_sync_applies_added_modified_and_deleted_items(library):
+    load_library("valid-key", 1)
+    get_or_build_library_aggregate(1, "daily_aggregates")
+
+    library.save_item(make_item("ITEM0004", "2022-01-04", ["AAAA0001"], title="Hydrogen storage"))
+    library.save_item(make_item("ITEM0002", "2022-01-05", ["AAAA0001"], title="Solar power"))
+    library.delete_item("ITEM0003")
+    delta = sync_library("valid-key", 1)
+
+    entry = get_cached_library(1)
+    assert entry["version"] == library.version
+    assert [item["key"] for item in entry["items"]] == ["ITEM0001", "ITEM0004", "ITEM0002"]
+    assert sorted(item["key"] for item in delta["added"]) == ["ITEM0002", "ITEM0004"]
+    assert sorted(item["key"] for item in delta["removed"]) == ["ITEM0002", "ITEM0003"]
+    assert delta["deleted"] == ["ITEM0003"]
+
+    assert_aggregates_match_rebuild(entry)
+    assert search_library(get_or_build_library_aggregate(1, "search_index"), "hydrogen") == {"ITEM0004"}
+    assert search_library(get_or_build_library_aggregate(1, "search_index"), "wind") == set()
+
+def test_sync_drops_trashed_items(library):
+    load_library("valid-key", 1)
+    get_or_build_library_aggregate(1, "daily_aggregates")
+
+    library.trash_item("ITEM0001")
+    delta = sync_library("valid-key", 1)
+
+    entry = get_cached_library(1)
+    assert [item["key"] for item in entry["items"]] == ["ITEM0002", "ITEM0003"]
+    assert delta["deleted"] == ["ITEM0001"]
+    assert_aggregates_match_rebuild(entry)
+
+def test_sync_without_changes_only_checks_the_version(library):
+    entry = load_library("valid-key", 1)
+
+    delta = sync_library("valid-key", 1)
+
+    assert delta["added"] == [] and delta["removed"] == [] and delta["version"] == 1
+    assert get_cached_library(1) is entry
+
+def test_delta_log_combines_the_syncs_since_a_version(library):
+    load_library("valid-key", 1)
+
+    library.save_item(make_item("ITEM0004", "2022-01-04"))
+    sync_library("valid-key", 1)
+    library.delete_item("ITEM0004")
+    library.delete_item("ITEM0001")
+    sync_library("valid-key", 1)
+
+    delta = get_library_delta_since(1, 1)
+    assert delta["added"] == []
+    assert [item["key"] for item in delta["removed"]] == ["ITEM0001"]
+    assert delta["version"] == library.version
+
+    # Versions older than the log can't be brought up to date with a delta:
+    assert get_library_delta_since(1, 0) == None
+
+def test_delta_handlers_run_without_the_cache_lock(library, monkeypatch):
+    lock_states = []
+    monkeypatch.setitem(library_cache._AGGREGATE_REGISTRY, "lock_probe", {
+        "builder": lambda entry: entry["version"],
+        "delta_handler": lambda value, delta, entry: lock_states.append(library_cache._CACHE_LOCK.locked()) or entry["version"],
+        "build_on_ingest": True,
+        "shared": False})
+
+    load_library("valid-key", 1)
+    library.save_item(make_item("ITEM0004", "2022-01-04"))
+    sync_library("valid-key", 1)
+
+    assert lock_states == [False]
+    assert get_or_build_library_aggregate(1, "lock_probe") == library.version
+
+def test_sync_is_dropped_when_the_library_is_loaded_again_meanwhile(library, monkeypatch):
+    reloaded_entries = []
+    monkeypatch.setitem(library_cache._AGGREGATE_REGISTRY, "reload_probe", {
+        "builder": lambda entry: "built",
+        "delta_handler": lambda value, delta, entry: reloaded_entries.append(load_library("valid-key", 1)) or "synced",
+        "build_on_ingest": True,
+        "shared": False})
+
+    entry = load_library("valid-key", 1)
+    library.save_item(make_item("ITEM0004", "2022-01-04"))
+    sync_library("valid-key", 1)
+
+    # The entry loaded during the sync is kept as it is, the stale entry is not updated:
+    assert get_cached_library(1) is reloaded_entries[0]
+    assert reloaded_entries[0]["aggregates"]["reload_probe"]["value"] == "built"
+    assert entry["version"] == 1
+
+def test_current_library_loads_then_syncs(library):
+    entry = get_current_library("valid-key", 1)
+    assert entry["version"] == 1
+
+    library.save_item(make_item("ITEM0004", "2022-01-04"))
+    assert get_current_library("valid-key", 1)["version"] == library.version
+
+def test_invalid_keys_are_refused(library):
+    with pytest.raises(zotero_errors.PyZoteroError):
+        get_authorized_library("invalid-key", 1)
+
+    load_library("valid-key", 1)
+    with pytest.raises(zotero_errors.PyZoteroError):
+        get_authorized_library("invalid-key", 1)
+
+def test_authorized_keys_are_not_checked_again(library):
+    load_library("valid-key", 1)
+    version_checks = library.version_checks
+
+    for _ in range(3):
+        get_authorized_library("valid-key", 1)
+
+    assert library.version_checks == version_checks
+
+def test_least_recently_used_libraries_are_evicted(zotero_api, monkeypatch):
+    monkeypatch.setattr(library_cache, "LIBRARY_CACHE_SIZE", 2)
+    for library_id in (1, 2, 3):
+        zotero_api[("user", library_id)] = FakeZoteroLibrary(ITEMS, COLLECTIONS)
+
+    load_library("valid-key", 1)
+    load_library("valid-key", 2)
+    get_cached_library(1)
+    load_library("valid-key", 3)
+
+    assert list(library_cache._LIBRARY_CACHE.keys()) == ["user:1", "user:3"]
+
+def test_idle_libraries_are_evicted(zotero_api, monkeypatch):
+    for library_id in (1, 2):
+        zotero_api[("user", library_id)] = FakeZoteroLibrary(ITEMS, COLLECTIONS)
+    load_library("valid-key", 1)
+    load_library("valid-key", 2)
+    get_cached_library(1)["last_used"] -= 100
+
+    assert evict_idle_libraries(50, keep=["user:2"]) == ["user:1"]
+    assert evict_idle_libraries(0, keep=["user:2"]) == []
+    assert get_cached_library(1) == None
+
+    assert evict_library(2) == True
+    assert evict_library(2) == False
@@ -0,0 +1,153 @@
+# Importing the methods under test:
+from utils import library_cache
+from utils.local_library_methods import read_zotero_database, read_csl_json, read_local_library, parse_csl_date
+from utils.library_cache import load_library, get_current_library, get_authorized_library
+
+# Importing the packages used to write the local test libraries:
+import sqlite3
+import pytest
+import json
+import os
+
+# The subset of the zotero desktop database schema read by read_zotero_database:
+ZOTERO_SCHEMA = """
+CREATE TABLE libraries (libraryID INTEGER PRIMARY KEY, type TEXT NOT NULL);
+CREATE TABLE groups (groupID INTEGER PRIMARY KEY, libraryID INT NOT NULL);
+CREATE TABLE itemTypes (itemTypeID INTEGER PRIMARY KEY, typeName TEXT);
+CREATE TABLE fields (fieldID INTEGER PRIMARY KEY, fieldName TEXT);
+CREATE TABLE items (
+    itemID INTEGER PRIMARY KEY, itemTypeID INT, libraryID INT, key TEXT, version INT, dateAdded TEXT, dateModified TEXT);
+CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value TEXT);
+CREATE TABLE itemData (itemID INT, fieldID INT, valueID INT);
+CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+CREATE TABLE creators (creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT, fieldMode INT);
+CREATE TABLE itemCreators (itemID INT, creatorID INT, creatorTypeID INT, orderIndex INT);
+CREATE TABLE tags (tagID INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE itemTags (itemID INT, tagID INT, type INT);
+CREATE TABLE collections (
+    collectionID INTEGER PRIMARY KEY, collectionName TEXT, parentCollectionID INT, libraryID INT, key TEXT, version INT);
+CREATE TABLE collectionItems (collectionID INT, itemID INT, orderIndex INT);
+CREATE TABLE deletedItems (itemID INTEGER PRIMARY KEY);
+CREATE TABLE deletedCollections (collectionID INTEGER PRIMARY KEY);
+CREATE TABLE itemNotes (itemID INTEGER PRIMARY KEY, parentItemID INT, note TEXT);
+
+INSERT INTO libraries VALUES (1, 'user'), (2, 'group');
+INSERT INTO groups VALUES (123456789, 2);
+INSERT INTO itemTypes VALUES (1, 'journalArticle'), (2, 'book'), (3, 'attachment'), (4, 'note');
+INSERT INTO fields VALUES (1, 'title'), (2, 'DOI');
+INSERT INTO items VALUES
+    (1, 1, 1, 'ITEM0001', 5, '2022-03-01 14:02:11', '2022-03-02 09:00:00'),
+    (2, 2, 1, 'ITEM0002', 6, '2022-02-27 08:00:00', '2022-02-27 08:00:00'),
+    (3, 3, 1, 'ITEM0003', 7, '2022-03-01 15:00:00', '2022-03-01 15:00:00'),
+    (4, 1, 1, 'ITEM0004', 8, '2022-03-04 10:00:00', '2022-03-04 10:00:00'),
+    (5, 4, 1, 'ITEM0005', 9, '2022-03-05 10:00:00', '2022-03-05 10:00:00'),
+    (6, 1, 2, 'ITEM0006', 3, '2021-01-01 10:00:00', '2021-01-01 10:00:00');
+INSERT INTO itemDataValues VALUES (1, 'Energy policy'), (2, 'Solar power'), (3, '10.1000/xyz'), (4, 'Group paper');
+INSERT INTO itemData VALUES (1, 1, 1), (1, 2, 3), (2, 1, 2), (6, 1, 4);
+INSERT INTO creatorTypes VALUES (1, 'author'), (2, 'editor');
+INSERT INTO creators VALUES (1, 'Ada', 'Lovelace', 0), (2, NULL, 'Royal Society', 1);
+INSERT INTO itemCreators VALUES (1, 2, 2, 1), (1, 1, 1, 0);
+INSERT INTO tags VALUES (1, 'energy'), (2, 'auto');
+INSERT INTO itemTags VALUES (1, 1, 0), (1, 2, 1);
+INSERT INTO collections VALUES
+    (1, 'Reading', NULL, 1, 'AAAA0001', 2), (2, 'Energy', 1, 1, 'BBBB0002', 3), (3, 'Old', NULL, 1, 'CCCC0003', 4),
+    (4, 'Wind', NULL, 2, 'DDDD0004', 1);
+INSERT INTO collectionItems VALUES (2, 1, 0), (1, 1, 1), (1, 2, 0), (4, 6, 0);
+INSERT INTO deletedItems VALUES (4);
+INSERT INTO deletedCollections VALUES (3);
+INSERT INTO itemNotes VALUES (5, 1, 'A child note');
+"""
+
+CSL_ITEMS = [
+    {"id": "http://zotero.org/users/1/items/ITEM0001", "type": "article-journal", "title": "Energy policy",
+     "accessed": {"date-parts": [["2022", "3", "1"]]}, "author": [{"family": "Lovelace", "given": "Ada"}, {"literal": "Royal Society"}],
+     "keyword": "energy, policy", "DOI": "10.1000/xyz"},
+    {"id": "ITEM0002", "type": "book", "title": "Solar power", "issued": {"raw": "2021-06-15"}},
+    {"id": "ITEM0003", "type": "interview", "title": "Undated"},
+]
+
+@pytest.fixture
+def zotero_database(tmp_path):
+    """The fixture writing a test zotero desktop database."""
+    path = str(tmp_path / "zotero.sqlite")
+    connection = sqlite3.connect(path)
+    connection.executescript(ZOTERO_SCHEMA)
+    connection.commit()
+    connection.close()
+
+    return path
+
+@pytest.fixture
+def csl_export(tmp_path):
+    """The fixture writing a test CSL-JSON export, last modified on 2022-04-01."""
+    path = str(tmp_path / "library.json")
+    with open(path, "w", encoding="utf-8") as csl_file:
+        json.dump(CSL_ITEMS, csl_file)
+    os.utime(path, (1648771200, 1648771200))
+
+    return path
+
+def test_zotero_database_items(zotero_database):
+    items, _ = read_zotero_database(zotero_database)
+
+    # Attachments, child notes and trashed items are skipped like in the web API:
+    assert [item["key"] for item in items] == ["ITEM0002", "ITEM0001"]
+
+    data = items[1]["data"]
+    assert data["itemType"] == "journalArticle" and items[1]["version"] == 5
+    assert (data["title"], data["DOI"]) == ("Energy policy", "10.1000/xyz")
+    assert (data["dateAdded"], data["dateModified"]) == ("2022-03-01T14:02:11Z", "2022-03-02T09:00:00Z")
+    assert data["creators"] == [
+        {"creatorType": "author", "firstName": "Ada", "lastName": "Lovelace"}, {"creatorType": "editor", "name": "Royal Society"}]
+    assert data["tags"] == [{"tag": "energy"}, {"tag": "auto", "type": 1}]
+    assert data["collections"] == ["BBBB0002", "AAAA0001"]
+
+def test_zotero_database_collections(zotero_database):
+    _, collections = read_zotero_database(zotero_database)
+
+    assert [(collection["key"], collection["data"]["name"], collection["data"]["parentCollection"]) for collection in collections] == [
+        ("AAAA0001", "Reading", False), ("BBBB0002", "Energy", "AAAA0001")]
+
+def test_zotero_database_group_library(zotero_database):
+    items, collections = read_zotero_database(zotero_database, library_type="group", group_id=123456789)
+
+    assert [item["data"]["title"] for item in items] == ["Group paper"]
+    assert items[0]["data"]["collections"] == ["DDDD0004"]
+    assert [collection["key"] for collection in collections] == ["DDDD0004"]
+
+    with pytest.raises(ValueError):
+        read_zotero_database(zotero_database, library_type="group", group_id=1)
+
+def test_csl_json_items(csl_export):
+    items, collections = read_csl_json(csl_export)
+
+    assert collections == []
+    assert [item["key"] for item in items] == ["ITEM0002", "ITEM0001", "ITEM0003"]
+    assert [item["data"]["itemType"] for item in items] == ["book", "journalArticle", "document"]
+    assert [item["data"]["dateAdded"] for item in items] == ["2021-06-15T00:00:00Z", "2022-03-01T00:00:00Z", "2022-04-01T00:00:00Z"]
+
+    data = items[1]["data"]
+    assert data["creators"] == [
+        {"creatorType": "author", "firstName": "Ada", "lastName": "Lovelace"}, {"creatorType": "author", "name": "Royal Society"}]
+    assert data["tags"] == [{"tag": "energy"}, {"tag": "policy"}]
+    assert data["DOI"] == "10.1000/xyz"
+
+def test_csl_dates():
+    assert parse_csl_date({"date-parts": [[2021]]}) == "2021-01-01T00:00:00Z"
+    assert parse_csl_date({"date-parts": [[2021, 2, 30]]}) == None
+    assert parse_csl_date({"raw": "spring 2021"}) == None
+    assert parse_csl_date("2021-03-02") == None
+
+def test_local_library_is_served_without_api_keys(zotero_database, zotero_api, monkeypatch):
+    monkeypatch.setattr(library_cache, "ZOTERO_LOCAL_LIBRARY", zotero_database)
+
+    items, _, version = read_local_library(zotero_database)
+    entry = load_library(None, 1)
+
+    assert entry["version"] == version
+    assert [item["key"] for item in entry["items"]] == [item["key"] for item in items]
+    assert get_authorized_library("any-key", 1) is entry
+
+    # The library is read again once the file changes:
+    os.utime(zotero_database, ns=(0, (version + 1000) * 1000000))
+    assert get_current_library(None, 1)["version"] == version + 1000
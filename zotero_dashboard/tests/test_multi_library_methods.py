@@ -0,0 +1,54 @@
+# Importing the methods under test:
+from utils.multi_library_methods import merge_library_aggregates, merge_library_collections
+from utils.sharded_aggregation_methods import build_sharded_aggregates, sharded_collection_counts
+
+# Importing data manipulation packages:
+import numpy as np
+
+def make_collection(key: str, name: str):
+    """The method builds the collection data of a test library."""
+    return {"key": key, "data": {"key": key, "name": name, "parentCollection": False}}
+
+def make_item(key: str, date_added: str, collections=()):
+    """The method builds the item data of a test library."""
+    return {"key": key, "version": 1, "data": {
+        "key": key, "itemType": "journalArticle", "dateAdded": f"{date_added}T12:00:00Z", "collections": list(collections)}}
+
+# Both libraries use the collection key AAAA0001 for different collections:
+USER_COLLECTIONS = [make_collection("AAAA0001", "Reading"), make_collection("BBBB0002", "Energy")]
+USER_ITEMS = [
+    make_item("ITEM0001", "2021-03-01", ["AAAA0001"]),
+    make_item("ITEM0002", "2021-03-02", ["AAAA0001"]),
+    make_item("ITEM0003", "2021-03-05", ["BBBB0002"]),
+]
+
+GROUP_COLLECTIONS = [make_collection("AAAA0001", "Wind")]
+GROUP_ITEMS = [
+    make_item("ITEM0001", "2021-02-27", ["AAAA0001"]),
+    make_item("ITEM0004", "2021-03-02", []),
+]
+
+def merge_test_libraries():
+    """The method merges the test libraries the way get_merged_library_aggregates does."""
+    aggregates = merge_library_aggregates(
+        [build_sharded_aggregates(USER_ITEMS, USER_COLLECTIONS), build_sharded_aggregates(GROUP_ITEMS, GROUP_COLLECTIONS)],
+        ["user:1", "group:123456789"])
+    collections = merge_library_collections([("user", 1, USER_COLLECTIONS), ("group", 123456789, GROUP_COLLECTIONS)])
+
+    return aggregates, collections
+
+def test_merge_keeps_colliding_collection_keys_apart():
+    aggregates, collections = merge_test_libraries()
+
+    assert aggregates["collection_keys"].tolist() == ["group:123456789/AAAA0001", "user:1/AAAA0001", "user:1/BBBB0002"]
+    assert [collection["key"] for collection in collections] == aggregates["collection_keys"].tolist()[1:] + ["group:123456789/AAAA0001"]
+
+    counts = sharded_collection_counts(aggregates, collections)
+    assert dict(zip(counts["name"], counts["count"])) == {"Reading": 2, "Energy": 1, "Wind": 1}
+
+def test_merge_sums_daily_counts():
+    aggregates, _ = merge_test_libraries()
+
+    assert aggregates["first_day"] == np.datetime64("2021-02-27", "D")
+    assert aggregates["daily"].tolist() == [1, 0, 1, 2, 0, 0, 1]
+    assert aggregates["day_collection"].sum(axis=0).tolist() == [1, 2, 1]
@@ -0,0 +1,94 @@
+# Importing the methods under test:
+from utils import refresh_scheduler_methods
+from utils.refresh_scheduler_methods import mark_library_active, schedule_library_refreshes, start_refresh_scheduler
+from utils.library_cache import load_library, get_cached_library
+
+# Importing the packages used by the tests:
+from conftest import FakeZoteroLibrary
+import pytest
+
+def make_item(key: str, date_added: str):
+    """The method builds the item data of a test library."""
+    return {"key": key, "data": {
+        "key": key, "itemType": "journalArticle", "title": key, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": [], "creators": [], "tags": []}}
+
+class InlineExecutor:
+    """An executor running the submitted refreshes right away, in the scheduling thread."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args):
+        self.submitted.append(args)
+        function(*args)
+
+@pytest.fixture
+def library(zotero_api, monkeypatch):
+    """The fixture registering a test user library with the fake zotero API and no active libraries."""
+    monkeypatch.setattr(refresh_scheduler_methods, "_ACTIVE_LIBRARIES", {})
+    zotero_api[("user", 1)] = FakeZoteroLibrary([make_item("ITEM0001", "2022-01-03")])
+
+    return zotero_api[("user", 1)]
+
+def make_due(library: str = "user:1"):
+    """The method moves the next refresh of an active library to the past."""
+    refresh_scheduler_methods._ACTIVE_LIBRARIES[library]["next_refresh"] = 0
+
+def test_due_libraries_are_synced(library):
+    load_library("valid-key", 1)
+    mark_library_active("valid-key", 1)
+    library.save_item(make_item("ITEM0002", "2022-01-04"))
+
+    # The first check is only due after the refresh interval:
+    assert schedule_library_refreshes(InlineExecutor()) == []
+
+    make_due()
+    executor = InlineExecutor()
+    assert schedule_library_refreshes(executor) == ["user:1"]
+    assert executor.submitted == [("user:1",)]
+    assert get_cached_library(1)["version"] == library.version
+
+    active_library = refresh_scheduler_methods._ACTIVE_LIBRARIES["user:1"]
+    assert active_library["in_flight"] == False
+    assert active_library["next_refresh"] > 0
+
+def test_libraries_not_loaded_are_left_to_the_requests(library):
+    mark_library_active("valid-key", 1)
+    make_due()
+
+    assert schedule_library_refreshes(InlineExecutor()) == ["user:1"]
+    assert get_cached_library(1) == None
+    assert library.version_checks == 0
+
+def test_libraries_in_flight_are_not_submitted_again(library):
+    mark_library_active("valid-key", 1)
+    make_due()
+    refresh_scheduler_methods._ACTIVE_LIBRARIES["user:1"]["in_flight"] = True
+
+    assert schedule_library_refreshes(InlineExecutor()) == []
+
+def test_failed_refreshes_are_rescheduled(library, caplog):
+    load_library("valid-key", 1)
+    mark_library_active("revoked-key", 1)
+    make_due()
+
+    assert schedule_library_refreshes(InlineExecutor()) == ["user:1"]
+    assert "Background refresh of the user:1 library failed" in caplog.text
+    assert refresh_scheduler_methods._ACTIVE_LIBRARIES["user:1"]["in_flight"] == False
+    assert refresh_scheduler_methods._ACTIVE_LIBRARIES["user:1"]["next_refresh"] > 0
+
+def test_inactive_libraries_are_forgotten_and_evicted(library, monkeypatch):
+    monkeypatch.setattr(refresh_scheduler_methods, "REFRESH_ACTIVE_WINDOW", 50)
+    load_library("valid-key", 1)
+    mark_library_active("valid-key", 1)
+    refresh_scheduler_methods._ACTIVE_LIBRARIES["user:1"]["last_seen"] -= 100
+
+    assert schedule_library_refreshes(InlineExecutor()) == []
+    assert refresh_scheduler_methods._ACTIVE_LIBRARIES == {}
+    assert get_cached_library(1) == None
+
+def test_scheduler_is_disabled_without_an_interval(monkeypatch):
+    monkeypatch.setattr(refresh_scheduler_methods, "REFRESH_INTERVAL", 0)
+
+    assert start_refresh_scheduler() == False
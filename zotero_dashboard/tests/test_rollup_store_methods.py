@@ -0,0 +1,123 @@
+# Importing the methods under test:
+from utils.rollup_store_methods import (
+    get_rollup_connection, get_rollup_periods, get_rollup_version, query_rollup_collection_counts,
+    query_rollup_timeseries_df, _rebuild_rollups)
+from utils.library_cache import load_library, sync_library, get_cached_library
+from utils.zotero_data_methods import create_collection_counts
+
+# Importing the packages used by the tests:
+from conftest import FakeZoteroLibrary
+import pytest
+
+def make_collection(key: str, name: str):
+    """The method builds the collection data of a test library."""
+    return {"key": key, "data": {"key": key, "name": name, "parentCollection": False}}
+
+def make_item(key: str, date_added: str, collections=(), item_type: str = "journalArticle"):
+    """The method builds the item data of a test library."""
+    return {"key": key, "data": {
+        "key": key, "itemType": item_type, "title": key, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": list(collections), "creators": [], "tags": []}}
+
+COLLECTIONS = [make_collection("AAAA0001", "Reading"), make_collection("BBBB0002", "Energy")]
+
+ITEMS = [
+    make_item("ITEM0001", "2022-02-27", ["AAAA0001"]),
+    make_item("ITEM0002", "2022-03-01", ["AAAA0001", "BBBB0002"]),
+    make_item("ITEM0003", "2022-03-01", ["BBBB0002"], item_type="book"),
+    make_item("ITEM0004", "2022-03-03", []),
+    make_item("ITEM0005", "2022-03-03", ["BBBB0002"], item_type="attachment"),
+]
+
+def read_rollups(library: str = "user:1"):
+    """The method reads every rollup row of a library."""
+    return sorted(get_rollup_connection().execute(
+        "SELECT grain, period, collection_key, item_type, count FROM rollups WHERE library = ?", (library,)).fetchall())
+
+def rebuild_rollups(items, library: str = "user:1"):
+    """The method returns the rollup rows of a library rebuilt from scratch from its items."""
+    connection = get_rollup_connection()
+    connection.execute("BEGIN IMMEDIATE")
+    _rebuild_rollups(connection, library, items, 0)
+    rows = read_rollups(library)
+    connection.execute("ROLLBACK")
+
+    return rows
+
+@pytest.fixture
+def library(zotero_api):
+    """The fixture registering a test user library with the fake zotero API and an empty rollup database."""
+    connection = get_rollup_connection()
+    for table in ("libraries", "items", "rollups"):
+        connection.execute(f"DELETE FROM {table}")
+
+    zotero_api[("user", 1)] = FakeZoteroLibrary(ITEMS, COLLECTIONS)
+
+    return zotero_api[("user", 1)]
+
+def test_rollup_periods_match_the_sqlite_grains():
+    connection = get_rollup_connection()
+    for day in ("2022-02-27", "2022-02-28", "2022-03-03", "2022-03-06", "2023-01-01"):
+        periods = get_rollup_periods(day)
+        assert periods["week"] == connection.execute("SELECT date(?, '-6 days', 'weekday 1')", (day,)).fetchone()[0]
+
+    assert get_rollup_periods("2022-03-03") == {"day": "2022-03-03", "week": "2022-02-28", "month": "2022-03", "year": "2022"}
+
+def test_rollups_are_ingested_on_load(library):
+    load_library("valid-key", 1)
+
+    assert get_rollup_version(1) == 1
+    assert get_rollup_version(2) == None
+
+    counts = query_rollup_collection_counts(1, COLLECTIONS)
+    expected = create_collection_counts(ITEMS, COLLECTIONS)
+    assert counts[["key", "count"]].to_dict("records") == expected[["key", "count"]].to_dict("records")
+    assert query_rollup_collection_counts(1, COLLECTIONS, cutoff=1)["name"].tolist() == ["Reading"]
+
+def test_rollup_timeseries(library):
+    load_library("valid-key", 1)
+
+    daily = query_rollup_timeseries_df(1, COLLECTIONS)
+    assert daily.index.tolist() == ["2022-02-27", "2022-02-28", "2022-03-01", "2022-03-02", "2022-03-03"]
+    assert daily["Reading"].tolist() == [1, 0, 1, 0, 0]
+    assert daily["Energy"].tolist() == [0, 0, 1, 0, 0]
+
+    weekly = query_rollup_timeseries_df(1, COLLECTIONS, grain="week")
+    assert weekly.index.tolist() == ["2022-02-21", "2022-02-28"]
+    assert weekly.to_dict("list") == {"Reading": [1, 1], "Energy": [0, 1]}
+
+    assert query_rollup_timeseries_df(2, COLLECTIONS).empty
+
+def test_sync_patches_the_rollups(library):
+    load_library("valid-key", 1)
+
+    library.save_item(make_item("ITEM0006", "2022-03-03", ["BBBB0002"], item_type="book"))
+    library.save_item(make_item("ITEM0001", "2022-02-27", ["BBBB0002"]))
+    library.delete_item("ITEM0003")
+    sync_library("valid-key", 1)
+
+    assert get_rollup_version(1) == library.version
+    assert read_rollups() == rebuild_rollups(get_cached_library(1)["items"])
+    counts = query_rollup_collection_counts(1, COLLECTIONS)
+    assert dict(zip(counts["key"], counts["count"])) == {"AAAA0001": 1, "BBBB0002": 2}
+
+def test_stale_rollups_are_rebuilt_on_sync(library):
+    load_library("valid-key", 1)
+
+    # Another worker left the database at a version this process did not sync from:
+    get_rollup_connection().execute("UPDATE libraries SET version = 0 WHERE library = 'user:1'")
+    get_rollup_connection().execute("DELETE FROM rollups WHERE library = 'user:1' AND grain = 'year'")
+
+    library.save_item(make_item("ITEM0006", "2022-03-04", ["AAAA0001"]))
+    sync_library("valid-key", 1)
+
+    assert get_rollup_version(1) == library.version
+    assert read_rollups() == rebuild_rollups(get_cached_library(1)["items"])
+
+def test_ingest_skips_libraries_already_at_the_version(library):
+    load_library("valid-key", 1)
+    get_rollup_connection().execute("DELETE FROM rollups WHERE library = 'user:1' AND grain = 'day'")
+
+    load_library("valid-key", 1)
+
+    assert [row for row in read_rollups() if row[0] == "day"] == []
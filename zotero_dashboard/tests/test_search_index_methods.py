@@ -0,0 +1,75 @@
+# Importing the methods under test:
+from utils.search_index_methods import build_search_index, update_search_index, search_library
+
+def make_item(key: str, title: str, abstract: str = "", tags=(), item_type: str = "journalArticle"):
+    """The method builds the item data of a test library."""
+    return {"key": key, "version": 1, "data": {
+        "key": key, "itemType": item_type, "title": title, "abstractNote": abstract,
+        "creators": [{"firstName": "Ada", "lastName": "Lovelace"}], "tags": [{"tag": tag} for tag in tags]}}
+
+ITEMS = [
+    make_item("ITEM0001", "Energy policy in Europe", "A review of energy markets", tags=["energy"]),
+    make_item("ITEM0002", "Solar energy storage", "Battery storage for solar power"),
+    make_item("ITEM0003", "Wind turbines", "Offshore wind and energy policy", tags=["wind"]),
+    make_item("ITEM0004", "Attached file", item_type="attachment"),
+]
+
+QUERIES = ['energy', 'energ*', '"energy policy"', 'storage solar', 'wind*', 'lovelace', 'hydrogen', '"solar power"']
+
+def sync_items(items, changed=(), deleted_keys=()):
+    """The method applies changed and deleted items to a test library the way sync_library does.
+
+    Returns:
+        lst: The items after the sync.
+
+        dict: The delta of the sync (see sync_library).
+
+    """
+    changed_keys = {item["key"] for item in changed}
+    removed = [item for item in items if item["key"] in changed_keys or item["key"] in deleted_keys]
+    synced_items = [item for item in items if item["key"] not in changed_keys and item["key"] not in deleted_keys]
+
+    return synced_items + list(changed), {"added": list(changed), "removed": removed, "deleted": list(deleted_keys)}
+
+def test_update_matches_rebuild():
+    changed = [
+        make_item("ITEM0002", "Hydrogen storage", "Storage of hydrogen for power"),
+        make_item("ITEM0005", "Energy policy of hydrogen", tags=["energy"])]
+    synced_items, delta = sync_items(ITEMS, changed=changed, deleted_keys=["ITEM0003"])
+
+    updated = update_search_index(build_search_index(ITEMS), delta)
+    expected = build_search_index(synced_items)
+
+    for query in QUERIES:
+        assert search_library(updated, query) == search_library(expected, query)
+
+def test_update_leaves_previous_index_unchanged():
+    search_index = build_search_index(ITEMS)
+    results = {query: search_library(search_index, query) for query in QUERIES}
+    postings = [set(posting) for posting in search_index["postings"]]
+
+    _, delta = sync_items(
+        ITEMS, changed=[make_item("ITEM0001", "Hydrogen markets", tags=["hydrogen"])], deleted_keys=["ITEM0002"])
+    updated = update_search_index(search_index, delta)
+
+    # Searches still running against the previous index keep seeing the library before the sync:
+    assert updated is not search_index
+    assert search_index["postings"] == postings
+    for query in QUERIES:
+        assert search_library(search_index, query) == results[query]
+
+    assert search_library(updated, "hydrogen") == {"ITEM0001"}
+    assert search_library(updated, "solar") == set()
+
+def test_successive_updates_match_rebuild():
+    items = ITEMS
+    search_index = build_search_index(items)
+    for position in range(5):
+        items, delta = sync_items(items, changed=[make_item(f"ITEM01{position:02d}", f"Energy note {position}")])
+        search_index = update_search_index(search_index, delta)
+        items, delta = sync_items(items, deleted_keys=[items[0]["key"]])
+        search_index = update_search_index(search_index, delta)
+
+    expected = build_search_index(items)
+    for query in QUERIES + ['note', '"energy note"']:
+        assert search_library(search_index, query) == search_library(expected, query)
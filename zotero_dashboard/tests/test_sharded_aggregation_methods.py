@@ -0,0 +1,178 @@
+# Importing the methods under test:
+from utils.sharded_aggregation_methods import (
+    build_sharded_aggregates, apply_sharded_aggregates_delta, sharded_collection_counts, sharded_collection_timeseries_df)
+
+# Importing data manipulation packages:
+import numpy as np
+import copy
+
+def make_collection(key: str):
+    """The method builds the collection data of a test library."""
+    return {"key": key, "data": {"key": key, "name": f"Collection {key}", "parentCollection": False}}
+
+def make_item(key: str, date_added: str, collections=(), item_type: str = "journalArticle"):
+    """The method builds the item data of a test library."""
+    return {"key": key, "version": 1, "data": {
+        "key": key, "itemType": item_type, "dateAdded": f"{date_added}T12:00:00Z", "collections": list(collections)}}
+
+COLLECTIONS = [make_collection("AAAA0001"), make_collection("BBBB0002"), make_collection("CCCC0003")]
+
+ITEMS = sorted([
+    make_item("ITEM0001", "2021-03-01", ["AAAA0001"]),
+    make_item("ITEM0002", "2021-03-01", ["BBBB0002"]),
+    make_item("ITEM0003", "2021-03-04", ["AAAA0001", "CCCC0003"]),
+    make_item("ITEM0004", "2021-03-10", []),
+    make_item("ITEM0005", "2021-03-10", ["CCCC0003"]),
+    make_item("ITEM0006", "2021-03-15", ["BBBB0002"]),
+    make_item("ITEM0007", "2021-03-12", ["AAAA0001"], item_type="attachment"),
+], key=lambda item: item["data"]["dateAdded"])
+
+def sync_items(items, collections, changed=(), deleted_keys=()):
+    """The method applies changed and deleted items to a test library the way sync_library does.
+
+    Returns:
+        lst: The items after the sync, sorted by dateAdded.
+
+        dict: The delta of the sync (see sync_library).
+
+    """
+    changed_keys = {item["key"] for item in changed}
+    removed = [item for item in items if item["key"] in changed_keys or item["key"] in deleted_keys]
+    synced_items = [item for item in items if item["key"] not in changed_keys and item["key"] not in deleted_keys]
+    synced_items = sorted(synced_items + list(changed), key=lambda item: item["data"]["dateAdded"])
+
+    delta = {
+        "added": list(changed), "removed": removed, "deleted": list(deleted_keys), "collections": collections, "version": 2}
+
+    return synced_items, delta
+
+def assert_delta_matches_rebuild(items, collections, changed=(), deleted_keys=(), synced_collections=None):
+    """The method checks that the aggregates updated with a sync delta match the aggregates built
+    from the synced items."""
+    synced_collections = synced_collections if synced_collections != None else collections
+    aggregates = build_sharded_aggregates(items, collections)
+    synced_items, delta = sync_items(items, synced_collections, changed=changed, deleted_keys=deleted_keys)
+
+    updated = apply_sharded_aggregates_delta(copy.deepcopy(aggregates), delta)
+    expected = build_sharded_aggregates(synced_items, synced_collections)
+
+    assert updated["first_day"] == expected["first_day"]
+    assert np.array_equal(updated["daily"], expected["daily"])
+    assert np.array_equal(updated["collection_keys"], expected["collection_keys"])
+    assert np.array_equal(updated["day_collection"], expected["day_collection"])
+
+    return updated
+
+def test_added_items():
+    updated = assert_delta_matches_rebuild(ITEMS, COLLECTIONS, changed=[
+        make_item("ITEM0101", "2021-03-05", ["BBBB0002"]),
+        make_item("ITEM0102", "2021-03-10", [])])
+
+    assert updated["daily"].sum() == 8
+
+def test_deleted_items():
+    assert_delta_matches_rebuild(ITEMS, COLLECTIONS, deleted_keys=["ITEM0002", "ITEM0005"])
+
+def test_deleted_items_at_the_ends_of_the_range():
+    updated = assert_delta_matches_rebuild(ITEMS, COLLECTIONS, deleted_keys=["ITEM0001", "ITEM0002", "ITEM0006"])
+
+    assert updated["first_day"] == np.datetime64("2021-03-04")
+
+def test_deleted_attachment():
+    assert_delta_matches_rebuild(ITEMS, COLLECTIONS, deleted_keys=["ITEM0007"])
+
+def test_collection_move():
+    moved = make_item("ITEM0001", "2021-03-01", ["CCCC0003"])
+
+    assert_delta_matches_rebuild(ITEMS, COLLECTIONS, changed=[moved])
+
+def test_date_added_change():
+    moved = make_item("ITEM0003", "2021-03-12", ["AAAA0001", "CCCC0003"])
+
+    assert_delta_matches_rebuild(ITEMS, COLLECTIONS, changed=[moved])
+
+def test_new_collection():
+    collections = COLLECTIONS + [make_collection("AAAB0004")]
+
+    updated = assert_delta_matches_rebuild(
+        ITEMS, COLLECTIONS, changed=[make_item("ITEM0101", "2021-03-04", ["AAAB0004"])], synced_collections=collections)
+
+    assert updated["day_collection"].shape[1] == 4
+
+def test_removed_collection():
+    # Deleting a collection in zotero also removes it from its items:
+    collections = [collection for collection in COLLECTIONS if collection["key"] != "BBBB0002"]
+    changed = [
+        make_item("ITEM0002", "2021-03-01", []),
+        make_item("ITEM0006", "2021-03-15", [])]
+
+    updated = assert_delta_matches_rebuild(ITEMS, COLLECTIONS, changed=changed, synced_collections=collections)
+
+    assert list(updated["collection_keys"]) == ["AAAA0001", "CCCC0003"]
+
+def test_removed_empty_collection():
+    collections = [collection for collection in COLLECTIONS if collection["key"] != "CCCC0003"]
+    items = [item for item in ITEMS if "CCCC0003" not in item["data"]["collections"]]
+
+    assert_delta_matches_rebuild(items, COLLECTIONS, synced_collections=collections)
+
+def test_day_range_extended_at_the_start():
+    updated = assert_delta_matches_rebuild(ITEMS, COLLECTIONS, changed=[make_item("ITEM0101", "2020-12-25", ["AAAA0001"])])
+
+    assert updated["first_day"] == np.datetime64("2020-12-25")
+
+def test_day_range_extended_at_the_end():
+    updated = assert_delta_matches_rebuild(ITEMS, COLLECTIONS, changed=[make_item("ITEM0101", "2021-04-02", ["CCCC0003"])])
+
+    assert len(updated["daily"]) == (np.datetime64("2021-04-02") - np.datetime64("2021-03-01")).astype(int) + 1
+
+def test_day_range_extended_at_both_ends():
+    assert_delta_matches_rebuild(ITEMS, COLLECTIONS, changed=[
+        make_item("ITEM0101", "2020-12-25", ["AAAA0001"]),
+        make_item("ITEM0102", "2021-04-02", [])])
+
+def test_delta_on_an_empty_library():
+    assert_delta_matches_rebuild([], COLLECTIONS, changed=[make_item("ITEM0101", "2021-03-05", ["BBBB0002"])])
+
+def test_random_deltas_match_rebuild():
+    random = np.random.default_rng(7)
+    keys = [collection["key"] for collection in COLLECTIONS]
+    items = ITEMS
+    for sync in range(20):
+        changed = []
+        for position in random.choice(len(items), size=min(3, len(items)), replace=False):
+            day = np.datetime64("2021-02-20") + int(random.integers(0, 60))
+            changed.append(make_item(items[position]["key"], str(day), [keys[random.integers(0, 3)]]))
+        changed.append(make_item(f"NEW{sync:05d}", str(np.datetime64("2021-03-01") + int(random.integers(0, 30))), []))
+        deleted_keys = [items[random.integers(0, len(items))]["key"]]
+        deleted_keys = [key for key in deleted_keys if key not in {item["key"] for item in changed}]
+
+        assert_delta_matches_rebuild(items, COLLECTIONS, changed=changed, deleted_keys=deleted_keys)
+        items, _ = sync_items(items, COLLECTIONS, changed=changed, deleted_keys=deleted_keys)
+
+def test_readers_skip_collections_removed_by_a_sync():
+    # The collections stored in a browser session can be older than the synced aggregates:
+    collections = [collection for collection in COLLECTIONS if collection["key"] != "BBBB0002"]
+    changed = [
+        make_item("ITEM0002", "2021-03-01", []),
+        make_item("ITEM0006", "2021-03-15", [])]
+    aggregates = build_sharded_aggregates(ITEMS, COLLECTIONS)
+    _, delta = sync_items(ITEMS, collections, changed=changed)
+    updated = apply_sharded_aggregates_delta(copy.deepcopy(aggregates), delta)
+
+    counts = sharded_collection_counts(updated, COLLECTIONS)
+    assert dict(zip(counts["name"], counts["count"])) == {"Collection AAAA0001": 2, "Collection CCCC0003": 1}
+
+    timeseries_df = sharded_collection_timeseries_df(updated, COLLECTIONS)
+    assert list(timeseries_df.columns) == ["Collection AAAA0001", "Collection CCCC0003"]
+    assert timeseries_df.sum().tolist() == [2, 1]
+
+def test_readers_never_map_a_missing_key_to_another_collection():
+    # A key sorted between the keys of the aggregates must not be given the column of its neighbour:
+    aggregates = build_sharded_aggregates(ITEMS, COLLECTIONS)
+    collections = [make_collection("BBBB0001"), make_collection("ZZZZ0009")] + COLLECTIONS[1:2]
+
+    counts = sharded_collection_counts(aggregates, collections)
+    assert dict(zip(counts["name"], counts["count"])) == {"Collection BBBB0002": 2}
+
+    assert list(sharded_collection_timeseries_df(aggregates, collections).columns) == ["Collection BBBB0002"]
@@ -0,0 +1,138 @@
+# Importing the methods under test:
+from utils import shared_aggregate_methods
+from utils.shared_aggregate_methods import (
+    publish_shared_aggregate, attach_shared_aggregate, release_shared_aggregate, reclaim_shared_aggregates,
+    copy_shared_aggregate, get_segment_path)
+from utils.library_cache import load_library, sync_library, evict_library, get_cached_library, get_or_build_library_aggregate
+
+# Importing the packages used by the tests:
+from conftest import FakeZoteroLibrary
+import numpy as np
+import subprocess
+import pytest
+import sys
+import os
+
+pytestmark = pytest.mark.skipif(shared_aggregate_methods.fcntl == None, reason="The shared aggregates require file locks")
+
+# A process holding a segment of the test directory until its standard input is closed:
+HOLDER_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from utils.shared_aggregate_methods import attach_shared_aggregate
+value, segment = attach_shared_aggregate("user:1", "daily", 1)
+print(segment != None, flush=True)
+sys.stdin.read()
+"""
+
+def make_item(key: str, date_added: str):
+    """The method builds the item data of a test library."""
+    return {"key": key, "data": {
+        "key": key, "itemType": "journalArticle", "title": key, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": [], "creators": [], "tags": []}}
+
+def make_aggregate():
+    """The method builds an aggregate in the format of build_sharded_aggregates."""
+    return {"first_day": np.datetime64("2022-01-03", "D"), "daily": np.arange(10, dtype=np.int32)}
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    """The fixture giving every test its own shared aggregate directory and attached segments."""
+    monkeypatch.setattr(shared_aggregate_methods, "SHARED_AGGREGATE_DIR", str(tmp_path))
+    monkeypatch.setattr(shared_aggregate_methods, "_ATTACHED_SEGMENTS", {})
+
+    return str(tmp_path)
+
+def test_published_aggregates_are_mapped_read_only(shared_dir):
+    value, segment = publish_shared_aggregate("user:1", "daily", 1, make_aggregate())
+
+    assert segment == get_segment_path("user:1", "daily", 1)
+    assert value["first_day"] == np.datetime64("2022-01-03", "D")
+    assert value["daily"].tolist() == list(range(10))
+    assert isinstance(value["daily"], np.memmap) and not value["daily"].flags.writeable
+
+    copied = copy_shared_aggregate(value)
+    copied["daily"][0] = 5
+    assert copied["daily"].flags.writeable and value["daily"][0] == 0
+
+def test_unshareable_aggregates_are_kept_private(shared_dir):
+    for aggregate in ({}, {"names": np.array(["a", None], dtype=object)}, {"daily": [1, 2]}, [np.arange(3)]):
+        value, segment = publish_shared_aggregate("user:1", "daily", 1, aggregate)
+        assert value is aggregate and segment == None
+
+    assert attach_shared_aggregate("user:1", "daily", 2) == (None, None)
+
+def test_segments_are_removed_with_their_last_reference(shared_dir):
+    _, segment = publish_shared_aggregate("user:1", "daily", 1, make_aggregate())
+    value, attached_segment = attach_shared_aggregate("user:1", "daily", 1)
+
+    assert attached_segment == segment
+    assert shared_aggregate_methods._ATTACHED_SEGMENTS[segment]["refs"] == 2
+
+    release_shared_aggregate(segment)
+    assert os.path.isdir(segment)
+
+    release_shared_aggregate(segment)
+    assert not os.path.exists(segment)
+    assert shared_aggregate_methods._ATTACHED_SEGMENTS == {}
+
+    # The arrays of a removed segment stay readable by their remaining users:
+    assert value["daily"].sum() == 45
+
+def test_segments_held_by_another_process_are_kept(shared_dir):
+    _, segment = publish_shared_aggregate("user:1", "daily", 1, make_aggregate())
+
+    holder = subprocess.Popen(
+        [sys.executable, "-c", HOLDER_SCRIPT, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        env=dict(os.environ, ZOTERO_SHARED_AGGREGATE_DIR=shared_dir))
+    try:
+        assert holder.stdout.readline().strip() == "True"
+
+        release_shared_aggregate(segment)
+        assert os.path.isdir(segment)
+        reclaim_shared_aggregates("user:1", "daily", keep_version=2)
+        assert os.path.isdir(segment)
+    finally:
+        holder.communicate("")
+
+    # The lock of the holder is released when it exits:
+    reclaim_shared_aggregates("user:1", "daily", keep_version=2)
+    assert not os.path.exists(segment)
+
+def test_publishing_reclaims_the_unused_versions(shared_dir):
+    _, first_segment = publish_shared_aggregate("user:1", "daily", 1, make_aggregate())
+    _, second_segment = publish_shared_aggregate("user:1", "daily", 2, make_aggregate())
+    release_shared_aggregate(first_segment)
+    release_shared_aggregate(second_segment)
+    assert os.listdir(os.path.dirname(second_segment)) == []
+
+    # Abandoned partial writes are only removed once they are stale:
+    staging = os.path.join(os.path.dirname(second_segment), ".3.1.abandoned")
+    recent_staging = os.path.join(os.path.dirname(second_segment), ".4.1.abandoned")
+    os.makedirs(staging)
+    os.makedirs(recent_staging)
+    os.utime(staging, (0, 0))
+
+    _, segment = publish_shared_aggregate("user:1", "daily", 5, make_aggregate())
+    assert sorted(os.listdir(os.path.dirname(segment))) == [".4.1.abandoned", "5"]
+
+def test_library_cache_releases_the_replaced_segments(shared_dir, zotero_api):
+    library = zotero_api[("user", 1)] = FakeZoteroLibrary([make_item("ITEM0001", "2022-01-03")])
+
+    load_library("valid-key", 1)
+    aggregates = get_or_build_library_aggregate(1, "daily_aggregates")
+    first_segment = get_cached_library(1)["aggregates"]["daily_aggregates"]["segment"]
+    assert first_segment == get_segment_path("user:1", "daily_aggregates", 1)
+    assert not aggregates["daily"].flags.writeable
+
+    library.save_item(make_item("ITEM0002", "2022-01-05"))
+    sync_library("valid-key", 1)
+    second_segment = get_cached_library(1)["aggregates"]["daily_aggregates"]["segment"]
+    assert second_segment == get_segment_path("user:1", "daily_aggregates", library.version)
+    assert get_or_build_library_aggregate(1, "daily_aggregates")["daily"].tolist() == [1, 0, 1]
+    assert not os.path.exists(first_segment)
+
+    evict_library(1)
+    assert not os.path.exists(second_segment)
+    assert shared_aggregate_methods._ATTACHED_SEGMENTS == {}
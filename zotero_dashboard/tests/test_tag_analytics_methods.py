@@ -0,0 +1,87 @@
+# Importing the methods under test:
+from utils.tag_analytics_methods import (
+    normalize_tag, build_tag_matrix, get_top_tag_codes, compute_top_tags_over_time, compute_tag_collection_counts,
+    get_cached_tag_analytics)
+from utils.library_cache import load_library, sync_library
+
+# Importing the packages used by the tests:
+from conftest import FakeZoteroLibrary
+import pandas as pd
+
+def make_collection(key: str, name: str):
+    """The method builds the collection data of a test library."""
+    return {"key": key, "data": {"key": key, "name": name, "parentCollection": False}}
+
+def make_item(key: str, date_added: str, tags=(), collections=(), item_type: str = "journalArticle"):
+    """The method builds the item data of a test library."""
+    return {"key": key, "version": 1, "data": {
+        "key": key, "itemType": item_type, "title": key, "dateAdded": f"{date_added}T12:00:00Z",
+        "collections": list(collections), "creators": [], "tags": [{"tag": tag} for tag in tags]}}
+
+COLLECTIONS = [make_collection("AAAA0001", "Reading"), make_collection("BBBB0002", "Energy")]
+
+ITEMS = [
+    make_item("ITEM0001", "2021-03-01", ["Machine Learning", "energy"], ["AAAA0001"]),
+    make_item("ITEM0002", "2021-03-20", ["machine  learning ", "Machine learning", "solar"], ["AAAA0001", "BBBB0002"]),
+    make_item("ITEM0003", "2022-01-05", ["Energy", ""], ["BBBB0002", "ZZZZ0009"]),
+    make_item("ITEM0004", "2022-02-01", ["energy"]),
+    make_item("ITEM0005", "2022-02-01", ["solar"], ["BBBB0002"], item_type="attachment"),
+]
+
+def test_tags_are_normalized():
+    assert normalize_tag({"tag": " Machine  Learning "}) == ("machine learning", "Machine Learning")
+    assert normalize_tag({"tag": "   "}) == (None, None)
+    assert normalize_tag({"tag": None}) == (None, None)
+
+def test_tag_matrix():
+    tag_matrix = build_tag_matrix(ITEMS, COLLECTIONS)
+
+    # Attachments and empty tags are skipped, every tag is only counted once per item under its first spelling:
+    assert tag_matrix["item_keys"] == ["ITEM0001", "ITEM0002", "ITEM0003", "ITEM0004"]
+    assert tag_matrix["tags"] == ["Machine Learning", "energy", "solar"]
+    assert tag_matrix["matrix"].toarray().tolist() == [[1, 1, 0], [1, 0, 1], [0, 1, 0], [0, 1, 0]]
+
+    # Collections that are not in the library are skipped:
+    assert tag_matrix["collection_matrix"].toarray().tolist() == [[1, 0], [1, 1], [0, 1], [0, 0]]
+    assert tag_matrix["collection_names"] == ["Reading", "Energy"]
+
+def test_top_tags_are_ordered_by_use_then_first_use():
+    tag_matrix = build_tag_matrix(ITEMS, COLLECTIONS)
+
+    assert get_top_tag_codes(tag_matrix, top_n=2).tolist() == [1, 0]
+    assert get_top_tag_codes(tag_matrix, top_n=10).tolist() == [1, 0, 2]
+
+    tag_matrix = build_tag_matrix(
+        [make_item(f"ITEM01{position:02d}", "2022-01-01", [f"tag {position % 7}"]) for position in range(40)], [])
+    assert get_top_tag_codes(tag_matrix, top_n=3).tolist() == [0, 1, 2]
+
+def test_top_tags_over_time():
+    tag_matrix = build_tag_matrix(ITEMS, COLLECTIONS)
+
+    yearly_counts = compute_top_tags_over_time(tag_matrix, top_n=2)
+    assert yearly_counts.index.tolist() == [2021, 2022]
+    assert yearly_counts.to_dict("list") == {"energy": [1, 2], "Machine Learning": [2, 0]}
+
+    monthly_counts = compute_top_tags_over_time(tag_matrix, top_n=1, period="month")
+    assert monthly_counts.index.tolist() == list(pd.to_datetime(["2021-03-01", "2022-01-01", "2022-02-01"]))
+    assert monthly_counts["energy"].tolist() == [1, 1, 1]
+
+    assert compute_top_tags_over_time(build_tag_matrix([], COLLECTIONS)).empty
+
+def test_tag_collection_counts():
+    collection_counts = compute_tag_collection_counts(build_tag_matrix(ITEMS, COLLECTIONS), top_n=2)
+
+    assert collection_counts.index.tolist() == ["Reading", "Energy"]
+    assert collection_counts.to_dict("list") == {"energy": [1, 1], "Machine Learning": [2, 1]}
+
+    assert compute_tag_collection_counts(build_tag_matrix(ITEMS, [])).empty
+
+def test_cached_tag_analytics_follow_the_library_version(zotero_api):
+    library = zotero_api[("user", 1)] = FakeZoteroLibrary(ITEMS, COLLECTIONS)
+
+    load_library("valid-key", 1)
+    assert get_cached_tag_analytics("valid-key", 1)["tags"] == ["Machine Learning", "energy", "solar"]
+
+    library.save_item(make_item("ITEM0006", "2022-03-01", ["hydrogen"]))
+    sync_library("valid-key", 1)
+    assert get_cached_tag_analytics("valid-key", 1)["tags"] == ["Machine Learning", "energy", "solar", "hydrogen"]